@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+MoltArena 스킬 마이크로 벤치마크
+
+API Key나 네트워크 연결 없이 로컬에서 실행합니다.
+
+사용법:
+  python benchmark.py                                   # 전체 실행
+  python benchmark.py notifications [count]             # 알림 렌더링만
+  python benchmark.py commands [repeat] [latency_ms]    # script.py 명령별 (stand-in 서버)
+
+벤치마크 항목:
+  - notifications: 알림 렌더링 처리량 (건/초)
+    format_notification 반복 호출 vs render_many, 언어별
+  - commands: script.py 명령(메인 함수)별 지연 p50/p95, 명령 1회당 API 요청 수, 최대 할당량
+    mock_server.py를 별도 프로세스로 띄워 실행하며, 매번 캐시를 비워 CLI를 새로 실행한 것과 같은 조건으로 측정
+    (배틀 종료를 기다리는 watch, 푸시를 기다리는 listen, External API를 호출하는 load-api는 제외)
+"""
+
+import itertools
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+import script
+from test_integration import Colors, print_header, print_info
+
+
+# ============== 공통 ==============
+
+def measure(func, repeat: int = 5) -> float:
+    """func를 repeat번 실행해 가장 빠른 시간(초) 반환"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def print_rate(label: str, count: int, seconds: float) -> None:
+    print(f"  {label:<32} {count / seconds:>12,.0f} 건/초  ({seconds * 1000:,.1f} ms / {count:,}건)")
+
+
+# ============== 알림 렌더링 ==============
+
+# Heartbeat 한 주기의 대략적인 구성 (BP / 토너먼트 배틀이 대부분)
+SAMPLE_NOTIFICATIONS = [
+    ({'type': 'bp_earned', 'data': {'amount': 150, 'reason': '배틀 승리', 'new_balance': 12500}}, 30),
+    ({'type': 'tournament_battle_completed',
+      'data': {'result': 'win', 'opponent_name': 'WittyBot', 'tournament_name': 'Daily Champion'}}, 25),
+    ({'type': 'battle_completed', 'data': {
+        'id': 'battle_1234567890', 'battle_number': 1234, 'winner_id': 'agent_a',
+        'agent_a': {'id': 'agent_a', 'name': 'TrashKing'}, 'agent_b': {'id': 'agent_b', 'name': 'WittyBot'},
+        'rounds': [{'winner': 'agent_a'}, {'winner': 'agent_b'}, {'winner': 'agent_a'}],
+        'rating_change': {'before': 1500, 'after': 1532}}}, 10),
+    ({'type': 'rank_change', 'data': {'old_rank': 120, 'new_rank': 98}}, 8),
+    ({'type': 'referral_conversion', 'data': {'type': 'signup', 'points': 1000}}, 8),
+    ({'type': 'bp_earned', 'data': {'amount': 1250, 'count': 7, 'new_balance': 13750}}, 5),
+    ({'type': 'tournament_ended',
+      'data': {'tournament_name': 'Daily Champion', 'final_rank': 2, 'prize_amount': 150}}, 5),
+    ({'type': 'challenge', 'data': {'challenger': 'SavageBot'}}, 5),
+    ({'type': 'top_100', 'data': {'rank': 98}}, 2),
+    ({'type': 'system_message', 'message': '점검 예정 안내', 'data': {}}, 2),
+]
+
+
+def make_notifications(count: int) -> list:
+    """가중치대로 섞은 알림 count개"""
+    pool = [n for n, weight in SAMPLE_NOTIFICATIONS for _ in range(weight)]
+    return [pool[i % len(pool)] for i in range(count)]
+
+
+def bench_notifications(count: int = 20000) -> None:
+    """알림 렌더링 처리량"""
+    print_header(f"알림 렌더링 ({count:,}건)")
+    notifications = make_notifications(count)
+
+    seconds = measure(lambda: [script.format_notification(n) for n in notifications])
+    print_rate("format_notification (ko)", count, seconds)
+
+    for language in ('ko', 'en'):
+        seconds = measure(lambda: script.render_many(notifications, language))
+        print_rate(f"render_many ({language})", count, seconds)
+
+    plain = [n for n in notifications if n['type'] != 'battle_completed']
+    seconds = measure(lambda: script.render_many(plain))
+    print_rate("render_many (배틀 결과 제외)", len(plain), seconds)
+
+
+# ============== 명령별 (stand-in 서버) ==============
+
+BENCH_API_KEY = 'pk_live_benchmark'
+BENCH_TOURNAMENT = 'tournament_daily'  # mock_server.py의 등록 중인 토너먼트
+BENCH_ENDPOINT = 'https://bench.example.com/roast'
+
+
+class MockProcess:
+    """mock_server.py를 별도 프로세스로 실행 (서버 쪽 할당이 측정에 섞이지 않도록)"""
+
+    def __init__(self, latency_ms: float = 0):
+        self.latency_ms = latency_ms
+        self.url = None
+        self._process = None
+
+    def __enter__(self):
+        env = dict(os.environ, MOLTARENA_MOCK_LATENCY_MS=str(self.latency_ms),
+                   MOLTARENA_MOCK_BATTLE_SECONDS='0')
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mock_server.py')
+        self._process = subprocess.Popen([sys.executable, '-u', path, '0'], stdout=subprocess.PIPE,
+                                         env=env, text=True)
+        line = self._process.stdout.readline()
+        match = re.search(r'http://\S+', line)
+        if not match:
+            self.__exit__()
+            raise RuntimeError(f"stand-in 서버를 시작하지 못했습니다: {line.strip()}")
+        self.url = match.group(0)
+        return self
+
+    def __exit__(self, *exc):
+        self._process.terminate()
+        self._process.wait(5)
+        self._process.stdout.close()
+
+
+def mock_control(url: str, method: str, path: str, **body) -> Dict:
+    """stand-in 서버 제어 엔드포인트(/_mock/*) 호출 (url은 MoltArenaAPI의 api_url)"""
+    base = url.rsplit('/api', 1)[0]
+    response = requests.request(method, f"{base}/_mock{path}", json=body or None, timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+
+def percentile(values: List[float], q: float) -> float:
+    """nearest-rank 백분위수"""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, int(-(-q * len(ordered) // 100)) - 1))] if ordered else 0.0
+
+
+def command_cases(api: script.MoltArenaAPI, url: str) -> List[tuple]:
+    """(명령, 실행 함수, 준비 함수) 목록
+
+    준비 함수는 측정 밖에서 실행하며 반환값(튜플)을 실행 함수 인자로 넘깁니다.
+    에이전트를 새로 만드는 명령은 다른 명령의 결과가 바뀌지 않도록 마지막에 둡니다.
+    """
+    counter = itertools.count(1)
+
+    def push_notifications() -> tuple:
+        for notification, _ in SAMPLE_NOTIFICATIONS[:3]:
+            mock_control(url, 'POST', '/notifications', type=notification['type'], data=notification['data'])
+        return ()
+
+    def configure_external_api() -> tuple:
+        api.set_external_api(api.list_agents()[0]['id'], BENCH_ENDPOINT)
+        return ()
+
+    def leave_tournaments() -> tuple:
+        for tournament in api.list_tournaments():
+            if tournament.get('myEntry'):
+                api.cancel_tournament(tournament['id'], tournament['myEntry']['id'])
+        return ()
+
+    def enter_tournament() -> tuple:
+        leave_tournaments()
+        entry = api.join_tournament(BENCH_TOURNAMENT, api.list_agents()[0]['id'])['entry']
+        return BENCH_TOURNAMENT, entry['id']
+
+    return [
+        ('list', script.list_agents, None),
+        ('status', script.get_status, None),
+        ('leaderboard', script.get_leaderboard, None),
+        ('last', script.get_last_battle, None),
+        ('battle', script.start_battle, None),
+        ('battle-all', script.start_all_battles, None),
+        ('heartbeat', script.heartbeat, push_notifications),
+        ('set-api', lambda: script.set_external_api(endpoint=BENCH_ENDPOINT), None),
+        ('test-api', script.test_external_api, configure_external_api),
+        ('remove-api', script.remove_external_api, configure_external_api),
+        ('tournaments', script.list_tournaments, None),
+        ('join', lambda: script.join_tournament(BENCH_TOURNAMENT), leave_tournaments),
+        ('cancel', script.cancel_tournament, enter_tournament),
+        ('tleaderboard', lambda: script.get_tournament_leaderboard(BENCH_TOURNAMENT), None),
+        ('bp', script.get_bp_balance, None),
+        ('bp-history', script.get_bp_transactions, None),
+        ('referral', script.get_referral_stats, None),
+        ('referral-history', script.get_referral_conversions, None),
+        ('deploy', script.deploy_agent, lambda: (f"BenchBot{next(counter)}",)),
+        ('import', script.import_moltbook, lambda: (f"bench_user_{next(counter)}",)),
+    ]
+
+
+def measure_command(url: str, run: Callable, setup: Optional[Callable] = None, repeat: int = 20) -> Dict[str, Any]:
+    """명령을 repeat번 실행해 지연 / 요청 수 / 실패 수를, 한 번 더 실행해 tracemalloc 최대 할당량을 측정"""
+    latencies = []
+    request_count = failures = peak = 0
+    for i in range(repeat + 1):
+        args = setup() if setup else ()
+        script.invalidate_cached()
+        traced = i == repeat  # tracemalloc은 실행을 느리게 하므로 마지막 한 번만
+        before = mock_control(url, 'GET', '/stats')['requests']
+        if traced:
+            tracemalloc.start()
+        started = time.perf_counter()
+        result = run(*args)
+        elapsed = time.perf_counter() - started
+        if traced:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            continue
+        latencies.append(elapsed)
+        request_count += mock_control(url, 'GET', '/stats')['requests'] - before
+        text = result if isinstance(result, str) else '\n'.join(result)
+        failures += text.startswith('❌')
+    return {
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'requests': request_count / max(repeat, 1),
+        'peak_kb': peak / 1024,
+        'failures': failures,
+    }
+
+
+def run_commands(url: str, repeat: int = 20, names: List[str] = None) -> List[Dict[str, Any]]:
+    """stand-in 서버(url)에 대해 명령별 측정 (공유 클라이언트와 Heartbeat 상태 경로는 끝나면 복원)"""
+    script.disable_disk_cache()
+    api = script.MoltArenaAPI(api_key=BENCH_API_KEY, api_url=url,
+                              rate_limiter=script.RateLimiter(limit=10 ** 6))
+    previous = script.set_client(api)
+    state_dir = script.STATE_DIR
+    rows = []
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            script.STATE_DIR = directory
+            for name, run, setup in command_cases(api, url):
+                if names is None or name in names:
+                    rows.append({'command': name, **measure_command(url, run, setup, repeat)})
+    finally:
+        script.STATE_DIR = state_dir
+        script.set_client(previous)
+        api.close()
+        script.invalidate_cached()
+    return rows
+
+
+def bench_commands(repeat: int = 20, latency_ms: int = 0) -> None:
+    """script.py 명령별 지연 / 요청 수 / 할당"""
+    print_header(f"명령별 ({repeat}회, 응답 지연 {latency_ms}ms, 캐시 없음)")
+    with MockProcess(latency_ms) as mock:
+        rows = run_commands(mock.url, repeat)
+
+    print(f"  {'command':<18} {'p50 ms':>9} {'p95 ms':>9} {'req/call':>9} {'peak KB':>9} {'fail':>5}")
+    for row in rows:
+        print(f"  {row['command']:<18} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['requests']:>9.1f} "
+              f"{row['peak_kb']:>9,.0f} {row['failures']:>5}")
+
+
+BENCHMARKS = {
+    'notifications': bench_notifications,
+    'commands': bench_commands,
+}
+
+
+def main() -> int:
+    """메인 벤치마크 실행"""
+    print(f"\n{Colors.BOLD}⏱️  MoltArena 마이크로 벤치마크{Colors.RESET}")
+
+    names = sys.argv[1:2] or list(BENCHMARKS)
+    args = [int(a) for a in sys.argv[2:]]
+    for name in names:
+        if name not in BENCHMARKS:
+            print_info(f"알 수 없는 벤치마크: {name} ({', '.join(BENCHMARKS)})")
+            return 1
+        BENCHMARKS[name](*args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
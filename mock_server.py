@@ -0,0 +1,1113 @@
+#!/usr/bin/env python3
+"""
+MoltArena API 로컬 stand-in 서버
+
+test_integration.py는 실제 서버(moltarena.crosstoken.io)와 pk_live_ API Key가 있어야 하므로,
+오프라인에서 클라이언트를 회귀 테스트하거나 벤치마크할 수 있도록 MoltArenaAPI가 호출하는
+모든 엔드포인트를 메모리 상태로 구현합니다. 표준 라이브러리만 사용합니다.
+
+  - 에이전트: 배포, 목록(ETag), 상태, Moltbook import, External API 설정/해제/테스트
+  - 배틀: 시작, 진행 상황(시간에 따라 라운드 진행), 에이전트별 배틀 기록
+  - 리더보드(ETag, limit/offset), 토너먼트(Last-Modified, 참가/취소/리더보드), BP, 레퍼럴
+  - 알림: 폴링(long-poll 포함), SSE 스트림 (배틀이 끝나면 battle_completed 알림)
+  - 응답 지연(고정 + 무작위), 오류 주입(확률 / 엔드포인트별 다음 N회), API Key별 요청 한도와 429 응답
+
+응답 형식은 API_REFERENCE.md를 따르며, 같은 seed면 같은 데이터로 시작합니다.
+
+사용법:
+  python mock_server.py [port]
+  MOLTARENA_MOCK_LATENCY_MS=80 MOLTARENA_MOCK_ERROR_RATE=0.05 python mock_server.py 8090
+  MOLTARENA_API_URL=http://127.0.0.1:8090/api MOLTARENA_API_KEY=pk_live_mock python script.py list
+
+제어 엔드포인트 (인증 없음, 지연/오류 주입/요청 수 집계 대상 아님):
+  GET  /_mock/stats          엔드포인트별 요청 수와 상태 코드 집계
+  POST /_mock/config         {"latency_ms", "jitter_ms", "error_rate", "error_status",
+                              "rate_limit", "rate_limit_period", "battle_seconds"} 변경
+  POST /_mock/faults         {"route": "GET /leaderboard", "status": 503, "count": 1, "retry_after": null}
+  POST /_mock/notifications  {"type": "bp_earned", "data": {...}, "delay": 0}
+                             {"redeliver": "<알림 id>", "delay": 0} (같은 알림 재전송)
+  POST /_mock/reset          데이터와 집계를 처음 상태로
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import random
+import hashlib
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, List, Dict, Any, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# ============== 설정 ==============
+MOCK_HOST = os.getenv('MOLTARENA_MOCK_HOST', '127.0.0.1')
+MOCK_PORT = int(os.getenv('MOLTARENA_MOCK_PORT', '8090'))
+MOCK_SEED = int(os.getenv('MOLTARENA_MOCK_SEED', '0'))
+
+# 응답 지연
+MOCK_LATENCY_MS = float(os.getenv('MOLTARENA_MOCK_LATENCY_MS', '0'))  # 모든 API 응답에 더할 지연
+MOCK_JITTER_MS = float(os.getenv('MOLTARENA_MOCK_JITTER_MS', '0'))  # 0 ~ jitter 사이 무작위 추가 지연
+
+# 오류 주입
+MOCK_ERROR_RATE = float(os.getenv('MOLTARENA_MOCK_ERROR_RATE', '0'))  # 이 확률로 error_status 응답
+MOCK_ERROR_STATUS = int(os.getenv('MOLTARENA_MOCK_ERROR_STATUS', '503'))
+
+# Rate limit (API Key별 고정 윈도, 0이면 제한 없음 / X-RateLimit-* 헤더 없음)
+MOCK_RATE_LIMIT = int(os.getenv('MOLTARENA_MOCK_RATE_LIMIT', '0'))
+MOCK_RATE_LIMIT_PERIOD = float(os.getenv('MOLTARENA_MOCK_RATE_LIMIT_PERIOD', '3600'))  # 초
+
+# 데이터
+MOCK_AGENTS = 3  # 처음부터 있는 내 에이전트 수
+MOCK_LEADERBOARD_SIZE = 250  # 다른 사용자 에이전트 수
+MOCK_BATTLE_HISTORY = 30  # 내 에이전트별 지난 배틀 수
+MOCK_BATTLE_SECONDS = float(os.getenv('MOLTARENA_MOCK_BATTLE_SECONDS', '10'))  # 새 5라운드 배틀이 끝나는 시간
+MOCK_BP_BALANCE = 5000
+
+# 알림
+LONG_POLL_MAX_WAIT = 60  # long-poll wait 상한 (초)
+STREAM_KEEPALIVE = 15  # SSE keep-alive 주석 간격 (초)
+
+LEADERBOARD_MAX_LIMIT = 100
+BATTLE_LIMIT_MAX = 100
+STYLES = ['witty', 'sarcastic', 'absurd', 'dark', 'wholesome']
+AGENT_NAMES = ['RoastMaster', 'SavageBot', 'WittyBot', 'BurnUnit', 'SnarkLord',
+               'MicDropper', 'ZingerX', 'Sizzle', 'Quipster', 'PunDemon']
+MY_AGENT_NAMES = ['TrashKing', 'ByteRoaster', 'SarcasmEngine']
+TOPICS = ['coding', 'crypto', 'gaming', 'startups', 'music', 'fitness']
+
+ERROR_CODES = {
+    400: 'validation_error', 401: 'unauthorized', 403: 'forbidden', 404: 'not_found',
+    405: 'method_not_allowed', 429: 'rate_limit_exceeded', 500: 'internal_error',
+    502: 'bad_gateway', 503: 'service_unavailable', 504: 'gateway_timeout',
+}
+
+
+# ============== 유틸리티 ==============
+
+class MockAPIError(Exception):
+    """API 오류 응답 ({"success": false, "error": {"code", "message"}})"""
+
+    def __init__(self, status: int, message: str, code: str = None):
+        self.status = status
+        self.code = code or ERROR_CODES.get(status, 'error')
+        self.message = message
+        super().__init__(message)
+
+
+def iso(timestamp: float) -> str:
+    """Unix timestamp → ISO 8601 (UTC, 밀리초)"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def parse_time(value: Optional[str]) -> Optional[float]:
+    """ISO 8601 문자열 → Unix timestamp (시간대가 없으면 UTC)"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        raise MockAPIError(400, f"Invalid datetime: {value}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def int_param(query: Dict[str, str], name: str, default: int, low: int = 0, high: int = None) -> int:
+    """정수 쿼리 파라미터 (범위를 벗어나면 잘라냄)"""
+    try:
+        value = int(query.get(name, default))
+    except ValueError:
+        raise MockAPIError(400, f"{name} must be an integer")
+    value = max(low, value)
+    return min(value, high) if high is not None else value
+
+
+# ============== 상태 ==============
+
+class ArenaState:
+    """MoltArena 계정 하나(내 에이전트, BP, 레퍼럴, 알림)와 다른 사용자 에이전트의 메모리 상태
+
+    라우트 처리 메서드는 (query, body, **경로 파라미터)를 받아 응답 dict를 반환하고,
+    잘못된 요청은 MockAPIError로 알립니다. 모든 변경은 잠금 안에서 이루어집니다.
+    """
+
+    def __init__(
+        self,
+        seed: int = MOCK_SEED,
+        agents: int = MOCK_AGENTS,
+        leaderboard_size: int = MOCK_LEADERBOARD_SIZE,
+        history: int = MOCK_BATTLE_HISTORY,
+        battle_seconds: float = MOCK_BATTLE_SECONDS
+    ):
+        """
+        Args:
+            seed: 데이터 생성 seed (같으면 같은 데이터)
+            agents: 내 에이전트 수 (최대 len(MY_AGENT_NAMES))
+            leaderboard_size: 다른 사용자 에이전트 수
+            history: 내 에이전트별 지난 배틀 수
+            battle_seconds: 새 5라운드 배틀이 끝나기까지 걸리는 시간 (라운드 수에 비례)
+        """
+        self.battle_seconds = battle_seconds
+        self.closed = False
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._sequence = 0
+
+        self.agents: Dict[str, Dict] = {}  # 에이전트 ID -> 에이전트 (다른 사용자 포함)
+        self.mine: List[str] = []  # 내 에이전트 ID (생성 순)
+        self.battles: Dict[str, Dict] = {}
+        self.histories: Dict[str, List[str]] = defaultdict(list)  # 에이전트 ID -> 배틀 ID (최신순)
+        self.external_apis: Dict[str, Dict] = {}
+        self.tournaments: Dict[str, Dict] = {}
+        self.entries: Dict[str, Dict] = {}  # 토너먼트 참가 ID -> 참가 정보
+        self.tournaments_modified = int(time.time())
+        self.notifications: List[Tuple[float, Dict]] = []  # (전달 시각, 알림)
+        self.bp = {'balance': MOCK_BP_BALANCE, 'totalEarned': MOCK_BP_BALANCE + 1200, 'totalSpent': 1200}
+        self.transactions: List[Dict] = []
+        self._ranked: Optional[List[Dict]] = None  # 레이팅 순 (레이팅이 바뀌면 None)
+        self._ranks: Dict[str, int] = {}
+
+        self._populate(agents, leaderboard_size, history)
+
+    def _next_id(self, prefix: str) -> str:
+        self._sequence += 1
+        return f"{prefix}_{self._sequence:06d}"
+
+    def _populate(self, agents: int, leaderboard_size: int, history: int) -> None:
+        rng = self._rng
+        rating = 2200.0
+        for i in range(leaderboard_size):
+            rating -= rng.uniform(0, 2400 / max(leaderboard_size, 1))  # 2200 → 약 1000
+            name = f"{AGENT_NAMES[i % len(AGENT_NAMES)]}{i + 1}"
+            self._add_agent(f"agent_{i + 1:04d}", name, rng.choice(STYLES), round(rating, 1),
+                            wins=rng.randint(10, 200), losses=rng.randint(10, 150))
+
+        for name in MY_AGENT_NAMES[:agents]:
+            agent = self._add_agent(self._next_id('agent'), name, rng.choice(STYLES), 1500.0)
+            self.mine.append(agent['id'])
+
+        now = time.time()
+        for index, agent_id in enumerate(self.mine):
+            for k in range(history, 0, -1):
+                started = now - k * 1800 - index * 300 - 120
+                self._create_battle(agent_id, self._pick_opponent(agent_id), 5, started, 100.0, notify=False)
+
+        self._add_tournament('tournament_daily', 'Daily Champion', 'registration', 100, 150, 32, 12)
+        self._add_tournament('tournament_weekly', 'Weekly Roast Cup', 'in_progress', 300, 1000, 64, 64)
+        self._add_tournament('tournament_rookie', 'Rookie League', 'scheduled', 50, 80, 16, 0)
+        self._add_tournament('tournament_legends', 'Legends Invitational', 'completed', 500, 5000, 8, 8)
+
+        self.transactions = [
+            self._transaction(150, 'battle_reward', '배틀 승리', now - 3600),
+            self._transaction(1000, 'referral_signup', '레퍼럴 가입', now - 86400),
+            self._transaction(-300, 'tournament_entry', 'Weekly Roast Cup 참가', now - 2 * 86400),
+        ]
+        self.referral = {
+            'code': 'MOCK1234',
+            'stats': {'totalClicks': 234, 'totalSignups': 15, 'totalPointsEarned': 180.5},
+            'points': {'total': 180.5, 'signup': 150, 'agent': 15, 'moltbook': 9, 'content': 6.5,
+                       'claimable': 150, 'pending': 30.5, 'claimed': 0},
+            'totalReferrals': 15,
+        }
+        self.conversions = [
+            {'id': f"conv_{i:03d}", 'eventType': event, 'pointsAwarded': points,
+             'claimableAfter': iso(now + (7 - i) * 86400), 'createdAt': iso(now - i * 86400)}
+            for i, (event, points) in enumerate([('signup', 1), ('agent_created', 1), ('moltbook_linked', 3),
+                                                 ('content_share', 0.1), ('signup', 1)] * 4)
+        ]
+
+    def _add_agent(self, agent_id: str, name: str, style: str, rating: float, wins: int = 0,
+                   losses: int = 0, rating_deviation: float = 350.0) -> Dict:
+        agent = {
+            'id': agent_id, 'name': name, 'display_name': name,
+            'personality': {'style': style, 'traits': [], 'backstory': None, 'catchphrase': None},
+            'rating': rating, 'rating_deviation': rating_deviation,
+            'total_battles': wins + losses, 'wins': wins, 'losses': losses,
+            'status': 'active', 'created_at': iso(time.time()),
+        }
+        self.agents[agent_id] = agent
+        self._ranked = None
+        return agent
+
+    def _add_tournament(self, tournament_id: str, name: str, status: str, fee: int, prize: int,
+                        capacity: int, participants: int) -> None:
+        field = [a for a in self.agents if a not in self.mine][:participants]
+        self.tournaments[tournament_id] = {
+            'id': tournament_id, 'name': name, 'status': status, 'entryFeeBp': fee, 'prizePool': prize,
+            'maxParticipants': capacity, 'currentParticipants': participants,
+            'standings': {a: [self._rng.randint(0, 6), self._rng.randint(0, 6)] for a in field},
+        }
+
+    def _transaction(self, amount: int, tx_type: str, description: str, at: float = None) -> Dict:
+        return {'id': self._next_id('tx'), 'amount': amount, 'type': tx_type,
+                'description': description, 'createdAt': iso(at or time.time())}
+
+    # ==================== 조회용 뷰 ====================
+
+    def _ranking(self) -> List[Dict]:
+        if self._ranked is None:
+            self._ranked = sorted(self.agents.values(), key=lambda a: -a['rating'])
+            self._ranks = {a['id']: rank for rank, a in enumerate(self._ranked, 1)}
+        return self._ranked
+
+    def _rank(self, agent_id: str) -> int:
+        self._ranking()
+        return self._ranks[agent_id]
+
+    def _agent_view(self, agent: Dict) -> Dict:
+        return {**agent, 'rank': self._rank(agent['id'])}
+
+    def _my_agent(self, agent_id: str) -> Dict:
+        if agent_id not in self.agents:
+            raise MockAPIError(404, f"Agent not found: {agent_id}")
+        if agent_id not in self.mine:
+            raise MockAPIError(403, "You do not own this agent")
+        return self.agents[agent_id]
+
+    def _battle_view(self, battle: Dict, now: float) -> Dict:
+        total = battle['total_rounds']
+        elapsed = now - battle['started']
+        view = {
+            'id': battle['id'], 'battle_number': battle['battle_number'],
+            'agent_a': battle['agent_a'], 'agent_b': battle['agent_b'],
+            'topic': battle['topic'], 'language': battle['language'], 'total_rounds': total,
+            'created_at': iso(battle['started']), 'started_at': iso(battle['started']),
+        }
+        if elapsed < battle['duration']:
+            played = int(elapsed / battle['duration'] * total)
+            return {**view, 'status': 'in_progress', 'current_round': played + 1,
+                    'rounds': battle['rounds'][:played]}
+        return {**view, 'status': 'completed', 'current_round': total, 'winner_id': battle['winner_id'],
+                'ended_at': iso(battle['started'] + battle['duration']), 'rounds': battle['rounds'],
+                'rating_change': battle['rating_change']}
+
+    def _pick_opponent(self, agent_id: str) -> str:
+        """레이팅이 비슷한(±150) 다른 사용자 에이전트, 없으면 아무나"""
+        rating = self.agents[agent_id]['rating']
+        others = [a for a in self.agents.values() if a['id'] not in self.mine]
+        similar = [a for a in others if abs(a['rating'] - rating) <= 150]
+        return self._rng.choice(similar or others)['id']
+
+    def _create_battle(self, agent_id: str, opponent_id: str, rounds: int, started: float, duration: float,
+                       topic: str = None, language: str = 'ko', notify: bool = True) -> Dict:
+        """배틀 생성 (결과는 시작할 때 정하고 끝나는 시각에 공개)"""
+        rng = self._rng
+        agent, opponent = self.agents[agent_id], self.agents[opponent_id]
+        expected = 1 / (1 + 10 ** ((opponent['rating'] - agent['rating']) / 400))
+        won = rng.random() < expected
+        delta = round(32 * ((1 if won else 0) - expected))
+
+        winner, loser = (agent_id, opponent_id) if won else (opponent_id, agent_id)
+        needed = rounds // 2 + 1
+        round_winners = [winner] * needed + [rng.choice((winner, loser)) for _ in range(rounds - needed)]
+        rng.shuffle(round_winners)
+
+        battle_id = self._next_id('battle')
+        battle = {
+            'id': battle_id, 'battle_number': self._sequence,
+            'agent_a': {'id': agent_id, 'name': agent['name'], 'display_name': agent['display_name']},
+            'agent_b': {'id': opponent_id, 'name': opponent['name'], 'display_name': opponent['display_name']},
+            'topic': topic or rng.choice(TOPICS), 'language': language, 'total_rounds': rounds,
+            'started': started, 'duration': duration, 'winner_id': winner,
+            'rounds': [{'round_number': i, 'winner_id': w} for i, w in enumerate(round_winners, 1)],
+            'rating_change': {'before': round(agent['rating']), 'after': round(agent['rating']) + delta,
+                              'delta': delta},
+        }
+        self.battles[battle_id] = battle
+        for participant in (agent_id, opponent_id):
+            self.histories[participant].insert(0, battle_id)
+
+        agent['rating'] += delta
+        opponent['rating'] -= delta
+        agent['total_battles'] += 1
+        agent['wins' if won else 'losses'] += 1
+        agent['rating_deviation'] = max(50.0, agent['rating_deviation'] - 10)
+        self._ranked = None
+
+        if notify:
+            self._notify('battle_completed', {'battle_id': battle_id}, started + duration)
+        return battle
+
+    # ==================== 에이전트 ====================
+
+    def deploy_agent(self, query: Dict, body: Dict) -> Dict:
+        name = str(body.get('name') or '').strip()
+        style = (body.get('personality') or {}).get('style', 'witty')
+        if not name or len(name) > 50:
+            raise MockAPIError(400, "name is required (1-50 characters)")
+        if style not in STYLES:
+            raise MockAPIError(400, f"Invalid style: {style}")
+        with self._lock:
+            if any(a['name'].lower() == name.lower() for a in self.agents.values()):
+                raise MockAPIError(400, f"Agent name already taken: {name}")
+            agent = self._add_agent(self._next_id('agent'), name, style, 1500.0)
+            agent['display_name'] = body.get('displayName') or name
+            agent['personality'] = {**agent['personality'], **(body.get('personality') or {})}
+            self.mine.append(agent['id'])
+            return {'success': True, 'agent': self._agent_view(agent)}
+
+    def list_agents(self, query: Dict, body: Dict) -> Dict:
+        with self._lock:
+            return {'success': True, 'agents': [self._agent_view(self.agents[a]) for a in self.mine]}
+
+    def agent_status(self, query: Dict, body: Dict, agent_id: str) -> Dict:
+        with self._lock:
+            if agent_id not in self.agents:
+                raise MockAPIError(404, f"Agent not found: {agent_id}")
+            return {'success': True, 'agent': self._agent_view(self.agents[agent_id])}
+
+    def get_agent(self, query: Dict, body: Dict, agent_id: str) -> Dict:
+        with self._lock:
+            if agent_id not in self.agents:
+                raise MockAPIError(404, f"Agent not found: {agent_id}")
+            result = {'success': True, 'agent': self._agent_view(self.agents[agent_id])}
+            if query.get('includeBattles') == 'true':
+                limit = int_param(query, 'battleLimit', 10, 1, BATTLE_LIMIT_MAX)
+                now = time.time()
+                result['battles'] = [self._battle_view(self.battles[b], now)
+                                     for b in self.histories[agent_id][:limit]]
+            return result
+
+    def import_moltbook(self, query: Dict, body: Dict) -> Dict:
+        username = str(body.get('moltbookUsername') or '').strip()
+        if not username:
+            raise MockAPIError(400, "moltbookUsername is required")
+        karma = int(hashlib.sha1(username.encode()).hexdigest(), 16) % 20000
+        confidence = 'high' if karma >= 5000 else 'medium' if karma >= 500 else 'low'
+        rating = round(1200 + min(karma, 10000) * 0.06)
+        deviation = {'high': 150.0, 'medium': 250.0, 'low': 350.0}[confidence]
+        with self._lock:
+            if any(a['name'].lower() == username.lower() for a in self.agents.values()):
+                raise MockAPIError(400, f"Agent name already taken: {username}")
+            agent = self._add_agent(self._next_id('agent'), username, 'witty', float(rating),
+                                    rating_deviation=deviation)
+            self.mine.append(agent['id'])
+            return {
+                'success': True,
+                'agent': self._agent_view(agent),
+                'moltbook': {'username': username, 'karma': karma},
+                'ratingMapping': {'initialRating': rating, 'confidence': confidence, 'ratingDeviation': deviation},
+            }
+
+    # ==================== External API ====================
+
+    def get_external_api(self, query: Dict, body: Dict, agent_id: str) -> Dict:
+        with self._lock:
+            self._my_agent(agent_id)
+            config = self.external_apis.get(agent_id)
+            if config is None:
+                return {'success': True, 'agentType': 'internal', 'externalApi': None}
+            return {'success': True, 'agentType': 'external', 'externalApi': dict(config['externalApi']),
+                    'status': 'active', 'consecutiveFailures': config['consecutiveFailures']}
+
+    def set_external_api(self, query: Dict, body: Dict, agent_id: str) -> Dict:
+        endpoint = str(body.get('endpoint') or '')
+        timeout = body.get('timeout', 5000)
+        if not endpoint.startswith('https://'):
+            raise MockAPIError(400, "endpoint must be an https:// URL")
+        if not isinstance(timeout, int) or not 1000 <= timeout <= 10000:
+            raise MockAPIError(400, "timeout must be between 1000 and 10000 ms")
+        with self._lock:
+            self._my_agent(agent_id)
+            config = {'endpoint': endpoint, 'timeout': timeout,
+                      'fallbackToInternal': bool(body.get('fallbackToInternal', True))}
+            self.external_apis[agent_id] = {'externalApi': config, 'consecutiveFailures': 0}
+            return {'success': True, 'agentType': 'external', 'externalApi': dict(config)}
+
+    def remove_external_api(self, query: Dict, body: Dict, agent_id: str) -> Dict:
+        with self._lock:
+            self._my_agent(agent_id)
+            if self.external_apis.pop(agent_id, None) is None:
+                raise MockAPIError(404, "External API is not configured")
+            return {'success': True, 'agentType': 'internal', 'message': 'External API removed'}
+
+    def test_external_api(self, query: Dict, body: Dict, agent_id: str) -> Dict:
+        """연결 테스트 (실제로 호출하지 않고 정상 응답을 흉내)"""
+        with self._lock:
+            agent = self._my_agent(agent_id)
+            if agent_id not in self.external_apis:
+                raise MockAPIError(400, "External API is not configured")
+            return {'success': True, 'status': 'ok', 'latencyMs': self._rng.randint(80, 400),
+                    'data': {'message': f"Test roast from {agent['name']}"}}
+
+    # ==================== 배틀 ====================
+
+    def start_battle(self, query: Dict, body: Dict) -> Dict:
+        agent_id = body.get('agent1Id')
+        rounds = body.get('rounds', 5)
+        if not agent_id:
+            raise MockAPIError(400, "agent1Id is required")
+        if not isinstance(rounds, int) or not 3 <= rounds <= 10:
+            raise MockAPIError(400, "rounds must be between 3 and 10")
+        with self._lock:
+            agent = self._my_agent(agent_id)
+            opponent_id = body.get('agent2Id')
+            if opponent_id:
+                if opponent_id not in self.agents or opponent_id == agent_id:
+                    raise MockAPIError(404, f"Opponent not found: {opponent_id}")
+            else:
+                opponent_id = self._pick_opponent(agent_id)
+            opponent = self.agents[opponent_id]
+            before = agent['rating']
+            battle = self._create_battle(agent_id, opponent_id, rounds, time.time(),
+                                         self.battle_seconds * rounds / 5, body.get('topic'),
+                                         body.get('language', 'ko'))
+            return {'success': True, 'battle': {
+                'id': battle['id'], 'battle_number': battle['battle_number'], 'status': 'in_progress',
+                'participants': {
+                    'agent1': {'id': agent_id, 'name': agent['name'], 'displayName': agent['display_name'],
+                               'rating': before},
+                    'agent2': {'id': opponent_id, 'name': opponent['name'],
+                               'displayName': opponent['display_name'], 'rating': opponent['rating']},
+                },
+                'topic': battle['topic'], 'language': battle['language'],
+                'total_rounds': rounds, 'current_round': 1, 'started_at': iso(battle['started']),
+            }}
+
+    def get_battle(self, query: Dict, body: Dict, battle_id: str) -> Dict:
+        with self._lock:
+            if battle_id not in self.battles:
+                raise MockAPIError(404, f"Battle not found: {battle_id}")
+            return {'success': True, 'battle': self._battle_view(self.battles[battle_id], time.time())}
+
+    # ==================== 리더보드 ====================
+
+    def leaderboard(self, query: Dict, body: Dict) -> Dict:
+        limit = int_param(query, 'limit', 10, 1, LEADERBOARD_MAX_LIMIT)
+        offset = int_param(query, 'offset', 0)
+        with self._lock:
+            ordered = self._ranking()
+            return {'success': True, 'agents': [self._agent_view(a) for a in ordered[offset:offset + limit]],
+                    'total': len(ordered)}
+
+    # ==================== 토너먼트 ====================
+
+    def _my_entry(self, tournament_id: str) -> Optional[Dict]:
+        for entry in self.entries.values():
+            if entry['tournamentId'] == tournament_id:
+                return entry
+        return None
+
+    def _tournament_view(self, tournament: Dict) -> Dict:
+        view = {k: v for k, v in tournament.items() if k != 'standings'}
+        entry = self._my_entry(tournament['id'])
+        reason = None
+        if entry:
+            reason = 'already_registered'
+        elif tournament['status'] != 'registration':
+            reason = f"status_{tournament['status']}"
+        elif tournament['currentParticipants'] >= tournament['maxParticipants']:
+            reason = 'tournament_full'
+        view['myEntry'] = dict(entry) if entry else None
+        view['canJoin'] = reason is None
+        view['canJoinReason'] = reason
+        return view
+
+    def _touch_tournaments(self) -> None:
+        # Last-Modified는 초 단위이므로 같은 초에 바뀌어도 값이 달라지게 함
+        self.tournaments_modified = max(int(time.time()), self.tournaments_modified + 1)
+
+    def list_tournaments(self, query: Dict, body: Dict) -> Dict:
+        limit = int_param(query, 'limit', 10, 1, 50)
+        status = query.get('status')
+        with self._lock:
+            tournaments = [self._tournament_view(t) for t in self.tournaments.values()
+                           if not status or t['status'] == status]
+            return {'success': True, 'tournaments': tournaments[:limit]}
+
+    def _tournament(self, tournament_id: str) -> Dict:
+        if tournament_id not in self.tournaments:
+            raise MockAPIError(404, f"Tournament not found: {tournament_id}")
+        return self.tournaments[tournament_id]
+
+    def join_tournament(self, query: Dict, body: Dict, tournament_id: str) -> Dict:
+        agent_id = body.get('agentId')
+        payment_type = body.get('paymentType', 'bp')
+        if not agent_id:
+            raise MockAPIError(400, "agentId is required")
+        with self._lock:
+            tournament = self._tournament(tournament_id)
+            agent = self._my_agent(agent_id)
+            reason = self._tournament_view(tournament)['canJoinReason']
+            if reason:
+                raise MockAPIError(400, f"Cannot join tournament: {reason}", reason)
+            fee = tournament['entryFeeBp'] if payment_type == 'bp' else 0
+            if fee > self.bp['balance']:
+                raise MockAPIError(400, "Insufficient BP", 'insufficient_bp')
+
+            self.bp['balance'] -= fee
+            self.bp['totalSpent'] += fee
+            self.transactions.insert(0, self._transaction(-fee, 'tournament_entry', f"{tournament['name']} 참가"))
+            entry = {'id': self._next_id('entry'), 'tournamentId': tournament_id, 'agentId': agent_id,
+                     'agentName': agent['display_name'], 'paymentType': payment_type, 'paymentAmount': fee,
+                     'status': 'registered', 'createdAt': iso(time.time())}
+            self.entries[entry['id']] = entry
+            tournament['currentParticipants'] += 1
+            tournament['standings'][agent_id] = [0, 0]
+            self._touch_tournaments()
+            return {'success': True, 'entry': dict(entry)}
+
+    def cancel_tournament(self, query: Dict, body: Dict, tournament_id: str) -> Dict:
+        with self._lock:
+            tournament = self._tournament(tournament_id)
+            entry = self.entries.get(body.get('entryId'))
+            if entry is None or entry['tournamentId'] != tournament_id:
+                raise MockAPIError(404, f"Entry not found: {body.get('entryId')}")
+            if tournament['status'] != 'registration':
+                raise MockAPIError(400, "Tournament already started", 'registration_closed')
+
+            del self.entries[entry['id']]
+            refunded = entry['paymentAmount'] if entry['paymentType'] == 'bp' else 0
+            self.bp['balance'] += refunded
+            self.bp['totalSpent'] -= refunded
+            if refunded:
+                self.transactions.insert(0, self._transaction(refunded, 'tournament_refund',
+                                                              f"{tournament['name']} 환불"))
+            tournament['currentParticipants'] -= 1
+            tournament['standings'].pop(entry['agentId'], None)
+            self._touch_tournaments()
+            return {'success': True, 'message': 'Tournament entry cancelled', 'refunded': refunded}
+
+    def tournament_leaderboard(self, query: Dict, body: Dict, tournament_id: str) -> Dict:
+        limit = int_param(query, 'limit', 10, 1, 100)
+        with self._lock:
+            tournament = self._tournament(tournament_id)
+            standings = sorted(tournament['standings'].items(), key=lambda item: (-item[1][0], item[1][1]))
+            leaderboard = []
+            for rank, (agent_id, (wins, losses)) in enumerate(standings[:limit], 1):
+                agent = self.agents[agent_id]
+                leaderboard.append({
+                    'rank': rank,
+                    'agent': {'id': agent_id, 'name': agent['name'], 'displayName': agent['display_name']},
+                    'stats': {'wins': wins, 'losses': losses},
+                })
+            return {'success': True, 'tournament': self._tournament_view(tournament), 'leaderboard': leaderboard}
+
+    # ==================== BP & 레퍼럴 ====================
+
+    def get_bp(self, query: Dict, body: Dict) -> Dict:
+        with self._lock:
+            result = {'success': True, 'bp': dict(self.bp)}
+            if query.get('transactions') == 'true':
+                result['transactions'] = self.transactions[:int_param(query, 'limit', 20, 1, 100)]
+            return result
+
+    def get_referral(self, query: Dict, body: Dict) -> Dict:
+        with self._lock:
+            result = {'success': True, 'referral': json.loads(json.dumps(self.referral))}
+            if query.get('conversions') == 'true':
+                result['conversions'] = self.conversions[:int_param(query, 'limit', 20, 1, 100)]
+            return result
+
+    # ==================== 알림 ====================
+
+    def _notify(self, ntype: str, data: Dict, at: float = None) -> Dict:
+        at = round(at if at is not None else time.time(), 3)  # ISO 문자열과 같은 정밀도
+        notification = {'id': self._next_id('notif'), 'type': ntype, 'data': data, 'created_at': iso(at)}
+        self.notifications.append((at, notification))
+        self._changed.notify_all()
+        return notification
+
+    def notify(self, ntype: str, data: Dict = None, delay: float = 0) -> Dict:
+        """delay초 뒤에 전달할 알림 추가"""
+        with self._lock:
+            return self._notify(ntype, data or {}, time.time() + delay)
+
+    def redeliver(self, notification_id: str, delay: float = 0) -> Dict:
+        """이미 추가한 알림을 같은 id로 delay초 뒤에 한 번 더 전달 (at-least-once 재전송 흉내)"""
+        with self._lock:
+            for _, notification in self.notifications:
+                if notification['id'] == notification_id:
+                    self.notifications.append((round(time.time() + delay, 3), notification))
+                    self._changed.notify_all()
+                    return notification
+            raise MockAPIError(404, f"Notification not found: {notification_id}")
+
+    def _materialize(self, notification: Dict) -> Dict:
+        if notification['type'] == 'battle_completed' and 'battle_id' in notification['data']:
+            battle = self.battles[notification['data']['battle_id']]
+            return {**notification, 'data': self._battle_view(battle, battle['started'] + battle['duration'])}
+        return notification
+
+    def due_notifications(self, after: Optional[float], now: float) -> List[Tuple[float, Dict]]:
+        """(after, now] 사이에 전달 시각이 된 알림 (전달 시각 순)"""
+        with self._lock:
+            due = [(at, n) for at, n in self.notifications if at <= now and (after is None or at > after)]
+            return [(at, self._materialize(n)) for at, n in sorted(due, key=lambda item: item[0])]
+
+    def wait_notifications(self, after: Optional[float], timeout: float) -> Tuple[List[Tuple[float, Dict]], float]:
+        """새 알림이 생기거나 timeout이 지날 때까지 대기 후 (알림, 기준 시각) 반환"""
+        deadline = time.time() + timeout
+        with self._changed:
+            while True:
+                now = time.time()
+                due = self.due_notifications(after, now)
+                if due or now >= deadline or self.closed:
+                    return due, now
+                upcoming = [at for at, _ in self.notifications if at > now]
+                self._changed.wait(max(0.0, min([deadline] + upcoming) - now))
+
+    def poll_notifications(self, query: Dict, body: Dict) -> Dict:
+        since = parse_time(query.get('since'))
+        wait = int_param(query, 'wait', 0, 0, LONG_POLL_MAX_WAIT)
+        due, now = self.wait_notifications(since, wait)
+        return {'success': True, 'notifications': [n for _, n in due], 'polled_at': iso(now)}
+
+    def close(self) -> None:
+        """대기 중인 long-poll / 스트림 깨우기"""
+        with self._changed:
+            self.closed = True
+            self._changed.notify_all()
+
+
+# ============== 서버 ==============
+
+# (메서드, 경로, ArenaState 메서드, 조건부 GET 검증자)
+ROUTES = [
+    ('POST', '/deploy/agent', 'deploy_agent', None),
+    ('GET', '/deploy/list', 'list_agents', 'etag'),
+    ('GET', '/deploy/status/{agent_id}', 'agent_status', None),
+    ('POST', '/deploy/import/moltbook', 'import_moltbook', None),
+    ('GET', '/agents/{agent_id}/external-api', 'get_external_api', None),
+    ('PATCH', '/agents/{agent_id}/external-api', 'set_external_api', None),
+    ('DELETE', '/agents/{agent_id}/external-api', 'remove_external_api', None),
+    ('POST', '/agents/{agent_id}/external-api', 'test_external_api', None),
+    ('GET', '/agents/{agent_id}', 'get_agent', None),
+    ('POST', '/deploy/battle', 'start_battle', None),
+    ('GET', '/battles/{battle_id}', 'get_battle', None),
+    ('GET', '/leaderboard', 'leaderboard', 'etag'),
+    ('GET', '/deploy/tournaments', 'list_tournaments', 'last-modified'),
+    ('POST', '/deploy/tournaments/{tournament_id}/join', 'join_tournament', None),
+    ('POST', '/deploy/tournaments/{tournament_id}/cancel', 'cancel_tournament', None),
+    ('GET', '/deploy/tournaments/{tournament_id}/leaderboard', 'tournament_leaderboard', None),
+    ('GET', '/deploy/bp', 'get_bp', None),
+    ('GET', '/deploy/referral', 'get_referral', None),
+    ('GET', '/notifications/poll', 'poll_notifications', None),
+    ('GET', '/notifications/stream', None, 'stream'),
+]
+
+
+def compile_routes(routes: List[tuple]) -> List[tuple]:
+    """경로 템플릿({name})을 정규식으로 변환, 'METHOD /템플릿'을 집계 키로 사용"""
+    compiled = []
+    for method, template, handler, validator in routes:
+        pattern = re.sub(r'\\{(\w+)\\}', r'(?P<\1>[^/]+)', re.escape(template))
+        compiled.append((method, re.compile(f"^{pattern}$"), handler, validator, f"{method} {template}"))
+    return compiled
+
+
+class MockArenaServer:
+    """ArenaState를 HTTP로 제공하는 stand-in 서버 (스레드 HTTP 서버, keep-alive)
+
+    API는 {url}(= http://host:port/api) 아래에 있으며, 응답마다 지연을 더하고
+    오류 주입 / Rate limit을 적용한 뒤 ArenaState 메서드로 처리합니다.
+    """
+
+    API_PREFIX = '/api'
+    CONTROL_PREFIX = '/_mock'
+
+    def __init__(
+        self,
+        state: ArenaState = None,
+        host: str = MOCK_HOST,
+        port: int = MOCK_PORT,
+        latency_ms: float = MOCK_LATENCY_MS,
+        jitter_ms: float = MOCK_JITTER_MS,
+        error_rate: float = MOCK_ERROR_RATE,
+        error_status: int = MOCK_ERROR_STATUS,
+        rate_limit: int = MOCK_RATE_LIMIT,
+        rate_limit_period: float = MOCK_RATE_LIMIT_PERIOD,
+        battle_seconds: float = MOCK_BATTLE_SECONDS,
+        seed: int = MOCK_SEED
+    ):
+        """
+        Args:
+            state: 서버 상태 (없으면 seed로 새로 생성)
+            host: 바인드 주소
+            port: 포트 (0이면 임의 포트, 실제 포트는 address / url)
+            latency_ms: 모든 API 응답에 더할 지연 (ms)
+            jitter_ms: 0 ~ jitter_ms 사이 무작위 추가 지연 (ms)
+            error_rate: 이 확률로 error_status 오류 응답 (0~1)
+            error_status: 무작위 오류 상태 코드
+            rate_limit: API Key별 rate_limit_period 동안 허용할 요청 수 (0이면 제한 없음)
+            rate_limit_period: 한도 주기 (초)
+            battle_seconds: 새 5라운드 배틀이 끝나기까지 걸리는 시간 (state를 주면 무시)
+            seed: 상태 생성 / 지연 / 오류 주입 seed
+        """
+        self.seed = seed
+        self.state = state or ArenaState(seed=seed, battle_seconds=battle_seconds)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.rate_limit_period = rate_limit_period
+
+        self.counts = Counter()  # 'METHOD /경로 템플릿' -> 요청 수
+        self.statuses = Counter()  # 상태 코드 -> 응답 수
+        self.routes = compile_routes(ROUTES)
+        self._faults: Dict[str, deque] = defaultdict(deque)  # 집계 키 또는 '*' -> (status, retry_after)
+        self._windows: Dict[str, List[float]] = {}  # API Key -> [윈도 시작, 사용한 요청 수]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    # ==================== 실행 ====================
+
+    def start(self) -> "MockArenaServer":
+        """백그라운드 스레드에서 요청 처리 시작"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def close(self) -> None:
+        """새 요청을 받지 않고 열린 long-poll / 스트림을 끝낸 뒤 종료"""
+        self.state.close()
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join(5)
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._httpd.server_address[:2]
+
+    @property
+    def url(self) -> str:
+        """MoltArenaAPI의 api_url로 쓸 주소"""
+        host, port = self.address
+        return f"http://{host}:{port}{self.API_PREFIX}"
+
+    # ==================== 오류 주입 / 집계 ====================
+
+    def inject(self, route: str = '*', status: int = 503, count: int = 1, retry_after: float = None) -> None:
+        """route('GET /leaderboard' 같은 집계 키, '*'는 모든 엔드포인트)의 다음 count개 요청을 status로 실패"""
+        with self._lock:
+            self._faults[route].extend([(status, retry_after)] * count)
+
+    def configure(self, **options) -> Dict[str, Any]:
+        """지연 / 오류율 / Rate limit / 배틀 시간 변경 (알 수 없는 이름은 MockAPIError)"""
+        types = {'latency_ms': float, 'jitter_ms': float, 'error_rate': float, 'error_status': int,
+                 'rate_limit': int, 'rate_limit_period': float}
+        for name, value in options.items():
+            if name == 'battle_seconds':
+                self.state.battle_seconds = float(value)
+            elif name in types:
+                setattr(self, name, types[name](value))
+            else:
+                raise MockAPIError(400, f"Unknown option: {name}")
+        return self.config()
+
+    def config(self) -> Dict[str, Any]:
+        return {'latency_ms': self.latency_ms, 'jitter_ms': self.jitter_ms, 'error_rate': self.error_rate,
+                'error_status': self.error_status, 'rate_limit': self.rate_limit,
+                'rate_limit_period': self.rate_limit_period, 'battle_seconds': self.state.battle_seconds}
+
+    def reset(self) -> None:
+        """상태와 집계, 주입한 오류, 요청 한도를 처음으로"""
+        old, self.state = self.state, ArenaState(seed=self.seed, battle_seconds=self.state.battle_seconds)
+        old.close()
+        with self._lock:
+            self.counts.clear()
+            self.statuses.clear()
+            self._faults.clear()
+            self._windows.clear()
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.counts.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'requests': sum(self.counts.values()), 'routes': dict(self.counts),
+                    'statuses': {str(k): v for k, v in sorted(self.statuses.items())}}
+
+    def _delay(self) -> float:
+        with self._lock:
+            jitter = self._rng.uniform(0, self.jitter_ms) if self.jitter_ms > 0 else 0.0
+        return (self.latency_ms + jitter) / 1000
+
+    def _fault(self, key: str) -> Optional[tuple]:
+        """주입한 오류 또는 error_rate에 따른 (status, retry_after)"""
+        with self._lock:
+            for name in (key, '*'):
+                if self._faults.get(name):
+                    return self._faults[name].popleft()
+            if self.error_rate > 0 and self._rng.random() < self.error_rate:
+                return self.error_status, None
+        return None
+
+    def _rate_limit(self, api_key: str) -> Tuple[bool, Dict[str, str]]:
+        """API Key별 고정 윈도 한도 (허용 여부, X-RateLimit-* 헤더)"""
+        if self.rate_limit <= 0:
+            return True, {}
+        now = time.time()
+        with self._lock:
+            window = self._windows.get(api_key)
+            if window is None or now >= window[0] + self.rate_limit_period:
+                window = self._windows[api_key] = [now, 0]
+            allowed = window[1] < self.rate_limit
+            if allowed:
+                window[1] += 1
+            reset_at = window[0] + self.rate_limit_period
+            headers = {
+                'X-RateLimit-Limit': str(self.rate_limit),
+                'X-RateLimit-Remaining': str(self.rate_limit - window[1]),
+                'X-RateLimit-Reset': iso(reset_at),
+            }
+        if not allowed:
+            headers['Retry-After'] = str(max(1, math.ceil(reset_at - now)))
+        return allowed, headers
+
+    def _match(self, method: str, path: str) -> Tuple[Optional[tuple], Dict[str, str], bool]:
+        """(라우트, 경로 파라미터, 경로는 맞지만 메서드가 다른지)"""
+        path_matched = False
+        for route in self.routes:
+            match = route[1].match(path)
+            if match:
+                if route[0] == method:
+                    return route, match.groupdict(), False
+                path_matched = True
+        return None, {}, path_matched
+
+    # ==================== HTTP ====================
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True  # 헤더와 본문을 따로 쓰므로 delayed ACK(~40ms) 대기 방지
+
+            def do_GET(self):
+                self._handle()
+
+            def do_POST(self):
+                self._handle()
+
+            def do_PATCH(self):
+                self._handle()
+
+            def do_DELETE(self):
+                self._handle()
+
+            def _handle(self):
+                parts = urlsplit(self.path)
+                query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+                try:
+                    body = self._read_body()
+                except MockAPIError as e:
+                    return self._error(e)
+
+                if parts.path.startswith(server.CONTROL_PREFIX + '/'):
+                    return self._control(parts.path[len(server.CONTROL_PREFIX):], body)
+                if not parts.path.startswith(server.API_PREFIX + '/'):
+                    return self._error(MockAPIError(404, f"Not found: {parts.path}"))
+                path = parts.path[len(server.API_PREFIX):]
+
+                route, params, wrong_method = server._match(self.command, path)
+                key = route[4] if route else f"{self.command} {path}"
+                with server._lock:
+                    server.counts[key] += 1
+
+                delay = server._delay()
+                if delay > 0:
+                    time.sleep(delay)
+
+                auth = self.headers.get('Authorization', '')
+                if not auth.startswith('Bearer ') or not auth[len('Bearer '):].strip():
+                    return self._error(MockAPIError(401, "Invalid API key"))
+                allowed, limit_headers = server._rate_limit(auth[len('Bearer '):].strip())
+                if not allowed:
+                    return self._error(MockAPIError(
+                        429, f"Rate limit exceeded. Reset at: {limit_headers['X-RateLimit-Reset']}"), limit_headers)
+
+                if route is None:
+                    return self._error(MockAPIError(405 if wrong_method else 404,
+                                                    f"{'Method not allowed' if wrong_method else 'Not found'}: "
+                                                    f"{self.command} {path}"), limit_headers)
+
+                fault = server._fault(key)
+                if fault is not None:
+                    status, retry_after = fault
+                    if retry_after is not None:
+                        limit_headers = {**limit_headers, 'Retry-After': str(retry_after)}
+                    return self._error(MockAPIError(status, f"Injected failure ({status})"), limit_headers)
+
+                _, _, handler, validator, _ = route
+                if validator == 'stream':
+                    return self._stream(query, limit_headers)
+                try:
+                    payload = getattr(server.state, handler)(query, body, **params)
+                except MockAPIError as e:
+                    return self._error(e, limit_headers)
+                self._conditional(payload, validator, limit_headers)
+
+            def _read_body(self) -> Dict:
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                if not raw:
+                    return {}
+                if 'application/x-www-form-urlencoded' in self.headers.get('Content-Type', ''):
+                    return {k: v[-1] for k, v in parse_qs(raw.decode()).items()}
+                try:
+                    body = json.loads(raw)
+                except ValueError:
+                    raise MockAPIError(400, "Request body must be JSON")
+                if not isinstance(body, dict):
+                    raise MockAPIError(400, "Request body must be a JSON object")
+                return body
+
+            def _conditional(self, payload: Dict, validator: Optional[str], headers: Dict[str, str]):
+                """ETag / Last-Modified 검증자를 붙이고, 바뀌지 않았으면 304"""
+                body = json.dumps(payload, ensure_ascii=False).encode()
+                if validator == 'etag':
+                    etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+                    headers = {**headers, 'ETag': etag}
+                    if self.headers.get('If-None-Match') == etag:
+                        return self._send(304, None, headers)
+                elif validator == 'last-modified':
+                    modified = server.state.tournaments_modified
+                    headers = {**headers, 'Last-Modified': formatdate(modified, usegmt=True)}
+                    try:
+                        since = parsedate_to_datetime(self.headers.get('If-Modified-Since'))
+                    except (TypeError, ValueError):
+                        since = None
+                    if since is not None and since.timestamp() >= modified:
+                        return self._send(304, None, headers)
+                self._send(200, body, headers)
+
+            def _error(self, error: MockAPIError, headers: Dict[str, str] = None):
+                self._send(error.status, {'success': False, 'error': {'code': error.code, 'message': error.message}},
+                           headers)
+
+            def _send(self, status: int, payload, headers: Dict[str, str] = None):
+                if payload is None:
+                    body = b''
+                elif isinstance(payload, bytes):
+                    body = payload
+                else:
+                    body = json.dumps(payload, ensure_ascii=False).encode()
+                with server._lock:
+                    server.statuses[status] += 1
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                if status != 304:
+                    self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, query: Dict[str, str], headers: Dict[str, str]):
+                """SSE 스트림 (id는 전달 시각 ms, Last-Event-ID로 이어받기), 서버 종료 시 끝냄"""
+                last_id = self.headers.get('Last-Event-ID')
+                try:
+                    cursor = int(last_id) / 1000 if last_id else parse_time(query.get('since'))
+                except ValueError:
+                    return self._error(MockAPIError(400, "Invalid Last-Event-ID"))
+                except MockAPIError as e:
+                    return self._error(e)
+
+                with server._lock:
+                    server.statuses[200] += 1
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Transfer-Encoding', 'chunked')
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.close_connection = True
+
+                state = server.state
+                try:
+                    self._chunk(': connected\n\n')
+                    while not state.closed:
+                        due, now = state.wait_notifications(cursor, STREAM_KEEPALIVE)
+                        events = [f"id: {int(at * 1000)}\nevent: notification\ndata: "
+                                  f"{json.dumps(n, ensure_ascii=False)}\n\n" for at, n in due]
+                        self._chunk(''.join(events) or ': keep-alive\n\n')
+                        cursor = due[-1][0] if due else cursor
+                    self.wfile.write(b'0\r\n\r\n')
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def _chunk(self, text: str):
+                data = text.encode()
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+                self.wfile.flush()
+
+            def _control(self, path: str, body: Dict):
+                """/_mock/* 제어 엔드포인트"""
+                try:
+                    if self.command == 'GET' and path == '/stats':
+                        return self._send(200, server.stats())
+                    if self.command == 'POST' and path == '/config':
+                        return self._send(200, server.configure(**body))
+                    if self.command == 'POST' and path == '/faults':
+                        server.inject(body.get('route', '*'), int(body.get('status', 503)),
+                                      int(body.get('count', 1)), body.get('retry_after'))
+                        return self._send(200, {'success': True})
+                    if self.command == 'POST' and path == '/notifications':
+                        if body.get('redeliver'):
+                            notification = server.state.redeliver(body['redeliver'], float(body.get('delay', 0)))
+                            return self._send(200, {'success': True, 'notification': notification})
+                        if not body.get('type'):
+                            raise MockAPIError(400, "type is required")
+                        notification = server.state.notify(body['type'], body.get('data'),
+                                                           float(body.get('delay', 0)))
+                        return self._send(200, {'success': True, 'notification': notification})
+                    if self.command == 'POST' and path == '/reset':
+                        server.reset()
+                        return self._send(200, {'success': True})
+                    raise MockAPIError(404, f"Not found: {self.command} {server.CONTROL_PREFIX}{path}")
+                except (TypeError, ValueError) as e:
+                    self._error(MockAPIError(400, str(e)))
+                except MockAPIError as e:
+                    self._error(e)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+# ============== 실행 ==============
+
+def main() -> int:
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else MOCK_PORT
+    server = MockArenaServer(port=port)
+    print(f"🧪 MoltArena stand-in 서버 실행 중: {server.url}", flush=True)
+    print(f"   지연 {server.latency_ms:.0f}ms(+{server.jitter_ms:.0f}), 오류율 {server.error_rate:.0%}, "
+          f"요청 한도 {server.rate_limit or '없음'}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        print(f"종료했습니다. {json.dumps(server.stats(), ensure_ascii=False)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
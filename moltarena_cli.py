@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+MoltArena CLI 클라이언트 (상주 데몬 전달용)
+
+명령을 `python script.py serve`로 실행 중인 데몬에 Unix 도메인 소켓으로 전달하고
+결과를 출력합니다. 데몬은 커넥션 풀, 캐시, 에이전트 이름 인덱스, Heartbeat 상태를
+유지하므로 명령마다 인터프리터를 새로 띄우고 requests를 import하는 비용이 없습니다.
+
+데몬이 실행 중이 아니거나 처리할 수 없는 명령(listen, batch, serve, 다른 API Key)이면
+script.py를 import해 현재 프로세스에서 그대로 실행합니다. 명령을 보낸 뒤 연결이 끊기면
+데몬이 이미 실행했을 수 있으므로(battle, join 등) 다시 실행하지 않고 오류로 끝냅니다.
+표준 라이브러리만 사용합니다.
+
+사용법 (script.py와 같은 인자):
+  python moltarena_cli.py status MyAgent
+  python moltarena_cli.py list
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sys
+
+# script.py의 daemon_socket_path() / api_key_fingerprint()와 같은 규칙
+CONNECT_TIMEOUT = 0.5  # 초
+
+
+def api_key_fingerprint() -> str:
+    return hashlib.sha256(os.getenv('MOLTARENA_API_KEY', '').encode()).hexdigest()[:16]
+
+
+def socket_path() -> str:
+    if os.getenv('MOLTARENA_SOCKET'):
+        return os.path.expanduser(os.environ['MOLTARENA_SOCKET'])
+    state_dir = (os.getenv('MOLTARENA_STATE_DIR') or os.getenv('MOLTARENA_CACHE_DIR')
+                 or os.path.join('~', '.moltarena'))
+    return os.path.join(os.path.expanduser(state_dir), f"daemon-{api_key_fingerprint()}.sock")
+
+
+class DaemonError(Exception):
+    """명령을 보낸 뒤 데몬의 응답을 받지 못함 (명령이 실행되었을 수 있음)"""
+
+
+def forward(argv, path=None):
+    """데몬에 명령을 전달하고 응답 반환
+
+    Returns:
+        데몬 응답, 데몬에 연결할 수 없으면 None (명령을 보내지 않았으므로 로컬에서 실행해도 안전)
+
+    Raises:
+        DaemonError: 명령을 보낸 뒤 연결이 끊기거나 응답이 잘렸을 때
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    request = {'argv': argv, 'key': api_key_fingerprint()}
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with sock:
+        try:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(path or socket_path())
+        except OSError:
+            return None
+
+        try:
+            sock.settimeout(None)  # 명령 실행 시간은 제한하지 않음 (watch 등)
+            sock.sendall((json.dumps(request, ensure_ascii=False) + '\n').encode())
+            with sock.makefile('rb') as reader:
+                line = reader.readline()
+        except OSError as e:
+            raise DaemonError(f"데몬 연결이 끊겼습니다: {e}") from e
+
+    if not line.endswith(b'\n'):
+        raise DaemonError("데몬이 응답을 끝내기 전에 연결을 닫았습니다.")
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        raise DaemonError(f"데몬 응답을 해석할 수 없습니다: {e}") from e
+
+
+def run_local(argv) -> int:
+    """데몬 없이 현재 프로세스에서 실행"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import script
+    if script.METRICS_FILE:
+        import atexit
+        atexit.register(script.write_metrics)
+    return script.main(argv)
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        response = forward(argv)
+    except DaemonError as e:
+        # 데몬이 이미 실행했을 수 있으므로 로컬에서 다시 실행하지 않음
+        print(f"Error: {e} 명령이 실행되었는지 확인한 뒤 다시 시도해주세요.")
+        return 1
+    # 연결 실패, 폴백 응답, 실행 전에 거절된 요청({"error": ...})은 로컬에서 실행
+    if response is None or response.get('fallback') or 'exit_code' not in response:
+        return run_local(argv)
+    print(response['output'])
+    return response['exit_code']
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,47 +6,516 @@ AI 에이전트 로스트 배틀 플랫폼 MoltArena를 제어합니다.
 """
 
 import os
+import atexit
 import json
+import glob
+import difflib
+import errno
+import random
+import shlex
+import socket
+import socketserver
+import sqlite3
+import string
+import sys
+import asyncio
+import bisect
 import hashlib
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+import heapq
+import hmac
+import itertools
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, List, Dict, Any, Tuple, Iterable, Iterator, AsyncIterator, Callable
 from dataclasses import dataclass, asdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     print("requests 라이브러리가 필요합니다: pip install requests")
     raise
 
+try:
+    import aiohttp  # AsyncMoltArenaAPI 사용 시에만 필요
+except ImportError:
+    aiohttp = None
+
 # ============== 설정 ==============
 MOLTARENA_API_URL = os.getenv('MOLTARENA_API_URL', 'https://moltarena.crosstoken.io/api')
 MOLTARENA_API_KEY = os.getenv('MOLTARENA_API_KEY')
 
-# 캐시 (간단한 메모리 캐시)
-_cache: Dict[str, Any] = {}
-_cache_ttl: Dict[str, float] = {}
+# 캐시 (LRU + TTL 메모리 캐시)
 CACHE_DURATION = 60  # 60초
+CACHE_MAX_ENTRIES = int(os.getenv('MOLTARENA_CACHE_MAX_ENTRIES', '256'))
+CACHE_MAX_BYTES = int(os.getenv('MOLTARENA_CACHE_MAX_BYTES', str(8 * 1024 * 1024)))  # 대략적인 JSON 크기 기준
+
+# 디스크 캐시 (선택, CLI 실행 간 캐시 유지). 디렉터리를 지정하면 활성화
+CACHE_DIR = os.getenv('MOLTARENA_CACHE_DIR')
+DISK_CACHE_MAX_BYTES = int(os.getenv('MOLTARENA_DISK_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+
+LEADERBOARD_PAGE_SIZE = 100  # /leaderboard limit 최대값
+VALIDATOR_TTL = 3600  # ETag/Last-Modified 검증자 보관 시간 (초)
+
+# HTTP 커넥션 풀 (프로세스 전체에서 공유)
+REQUEST_TIMEOUT = 30  # 초
+POOL_CONNECTIONS = int(os.getenv('MOLTARENA_POOL_CONNECTIONS', '4'))   # 캐시할 호스트별 풀 수
+POOL_MAXSIZE = int(os.getenv('MOLTARENA_POOL_MAXSIZE', '10'))          # 호스트당 최대 커넥션 수
+POOL_BLOCK = os.getenv('MOLTARENA_POOL_BLOCK', 'false').lower() == 'true'  # 한도 초과 시 대기 여부
+
+# Rate Limit (API Key당 100 요청/시간)
+RATE_LIMIT = int(os.getenv('MOLTARENA_RATE_LIMIT', '100'))
+RATE_LIMIT_PERIOD = 3600  # 초
+RATE_LIMIT_MAX_WAIT = float(os.getenv('MOLTARENA_RATE_LIMIT_MAX_WAIT', '30'))  # 대기 한도 하한 (초)
+RATE_LIMIT_WAIT_TOKENS = 2  # 기본 대기 한도는 토큰 몇 개가 충전되는 시간인지 (100/시간이면 72초)
+RATE_LIMIT_RESERVE = int(os.getenv('MOLTARENA_RATE_LIMIT_RESERVE', '10'))  # 백그라운드 요청이 쓸 수 없는 예비분
+
+# 재시도 (멱등 요청만) & 서킷 브레이커
+CONNECT_TIMEOUT = 5  # 초
+RETRY_MAX_ATTEMPTS = int(os.getenv('MOLTARENA_RETRY_MAX_ATTEMPTS', '3'))  # 첫 시도 포함
+RETRY_BACKOFF_BASE = 0.5  # 초
+RETRY_BACKOFF_MAX = 8.0  # 초
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('MOLTARENA_CIRCUIT_FAILURE_THRESHOLD', '5'))  # 연속 실패 수
+CIRCUIT_RESET_TIMEOUT = float(os.getenv('MOLTARENA_CIRCUIT_RESET_TIMEOUT', '30'))  # open 유지 시간 (초)
+
+# 요청 메트릭 (엔드포인트 템플릿별 지연 / 요청 수 / 오류 / 캐시 적중률)
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # 초
+METRICS_FILE = os.getenv('MOLTARENA_METRICS_FILE')  # 설정 시 CLI 종료 때 저장 (.prom이면 Prometheus 형식, 아니면 JSON)
+
+# Heartbeat 상태 (커서 + 중복 제거). API Key별 파일로 저장
+STATE_DIR = os.getenv('MOLTARENA_STATE_DIR') or CACHE_DIR or os.path.join('~', '.moltarena')
+DEDUPE_MAX_ENTRIES = 2000  # 기억할 알림 지문 수
+DEDUPE_WINDOW = 24 * 3600  # 커서보다 이만큼 오래된 지문은 정리 (초)
+
+# 알림 우선순위 큐 (한 번에 보내지 못한 알림은 다음 Heartbeat로 이월)
+MAX_NOTIFICATIONS = 5  # Heartbeat 한 번에 보낼 최대 메시지 수
+NOTIFICATION_AGING_INTERVAL = 300  # 이월된 알림은 이만큼 기다릴 때마다 우선순위 +1 (초)
+PENDING_MAX_ENTRIES = 500  # 이월 큐 최대 크기
+
+# 알림 리스너 (SSE / long-poll / Webhook 푸시, 불가하면 폴링)
+LISTEN_POLL_INTERVAL = 300  # 폴링 폴백 간격 (초, Heartbeat와 동일)
+LONG_POLL_WAIT = int(os.getenv('MOLTARENA_LONG_POLL_WAIT', '300'))  # long-poll 최대 대기 (초)
+LISTEN_RECONNECT_MAX = 60.0  # 재연결 백오프 상한 (초)
+LISTEN_REPROBE_INTERVAL = 3600  # 폴링으로 내려간 뒤 푸시를 다시 시도하는 간격 (초)
+WEBHOOK_HOST = os.getenv('MOLTARENA_WEBHOOK_HOST', '127.0.0.1')
+WEBHOOK_PORT = int(os.getenv('MOLTARENA_WEBHOOK_PORT', '8787'))
+WEBHOOK_PATH = '/moltarena-webhook'
+WEBHOOK_SECRET = os.getenv('MOLTARENA_WEBHOOK_SECRET')  # 설정 시 X-MoltArena-Signature(HMAC-SHA256) 검증
+
+# 일괄 배틀 (battle-all)
+BATTLE_CONCURRENCY = int(os.getenv('MOLTARENA_BATTLE_CONCURRENCY', '5'))  # 동시에 시작할 배틀 수
+
+# 배틀 완료 감시 (watch). 라운드 수와 관측한 소요 시간으로 조회 시점을 정함
+BATTLE_ROUND_SECONDS = 20.0  # 관측 전 라운드당 예상 소요 시간 (초)
+BATTLE_POLL_MIN_INTERVAL = 3.0  # 같은 배틀을 다시 조회하기까지 최소 간격 (초)
+BATTLE_POLL_MAX_INTERVAL = 60.0  # 최대 간격 (초)
+BATTLE_WATCH_TIMEOUT = 1800  # 이 시간 안에 끝나지 않은 배틀은 감시 중단 (초)
+
+# 배틀 기록 (에이전트별 /agents/{id}?includeBattles=true를 병합)
+HISTORY_BATTLE_LIMIT = 20  # since만 주었을 때 에이전트별 첫 조회 수 (부족하면 두 배씩 늘려 다시 조회)
+HISTORY_BATTLE_LIMIT_MAX = 100  # 에이전트별 최대 조회 수
+
+# 배치 모드 (batch)
+BATCH_PARALLEL = int(os.getenv('MOLTARENA_BATCH_PARALLEL', '1'))  # 동시에 실행할 명령 수 (1이면 입력 순서대로)
+
+# 상주 데몬 (serve). 기본 소켓은 API Key별 STATE_DIR/daemon-<지문>.sock
+DAEMON_SOCKET = os.getenv('MOLTARENA_SOCKET')
+DAEMON_IDLE_TIMEOUT = float(os.getenv('MOLTARENA_DAEMON_IDLE_TIMEOUT', '0'))  # 명령이 없으면 종료할 시간 (초, 0이면 계속)
+DAEMON_CONNECT_TIMEOUT = 0.5  # 초
+
+# External API 부하 테스트 (load-api)
+LOAD_TEST_REQUESTS = 100  # 보낼 /roast 요청 수
+LOAD_TEST_CONCURRENCY = 10  # 동시 요청 수
+
+# 요청 우선순위 (낮을수록 먼저 처리)
+PRIORITY_HIGH = 0        # 사용자가 직접 실행한 변경 요청 (배틀 시작, 배포 등)
+PRIORITY_NORMAL = 1      # 일반 조회
+PRIORITY_BACKGROUND = 2  # Heartbeat 폴링 등 백그라운드 요청
 
 
 # ============== 유틸리티 ==============
-def get_cached(key: str) -> Optional[Any]:
-    """캐시에서 값 조회"""
-    if key in _cache:
-        if datetime.now().timestamp() < _cache_ttl.get(key, 0):
-            return _cache[key]
+_MISSING = object()  # 캐시 미스 표시 (None/빈 리스트도 유효한 값)
+
+
+def api_key_fingerprint(api_key: str = None) -> str:
+    """API Key를 드러내지 않는 식별자 (SHA-256 앞 16자리, 기본: MOLTARENA_API_KEY)
+
+    캐시 네임스페이스와 데몬 소켓 이름에 사용합니다.
+    """
+    return hashlib.sha256((api_key or MOLTARENA_API_KEY or '').encode()).hexdigest()[:16]
+
+
+class TTLCache:
+    """크기 제한이 있는 스레드 안전 LRU + TTL 캐시
+
+    항목마다 만료 시간을 따로 가지며, max_entries 또는 max_bytes를 넘으면
+    가장 오래 사용하지 않은 항목부터 제거합니다.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _sizeof(value: Any) -> int:
+        try:
+            return len(json.dumps(value, ensure_ascii=False, default=str))
+        except (TypeError, ValueError):
+            return len(repr(value))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """값 조회 (없거나 만료되면 default)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if time.monotonic() < entry[1]:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def set(self, key: str, value: Any, ttl: float = CACHE_DURATION) -> None:
+        """값 저장 (ttl초 후 만료)"""
+        size = self._sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if ttl <= 0 or size > self.max_bytes:
+                return
+            self._data[key] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def invalidate(self, key: str = None, prefix: str = None) -> int:
+        """항목 삭제 (key 또는 prefix로 시작하는 모든 키, 둘 다 없으면 전체)
+
+        Returns:
+            삭제된 항목 수
+        """
+        with self._lock:
+            if key is not None:
+                keys = [key] if key in self._data else []
+            elif prefix is not None:
+                keys = [k for k in self._data if k.startswith(prefix)]
+            else:
+                keys = list(self._data)
+            for k in keys:
+                self._remove(k)
+            return len(keys)
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """모니터링용 통계"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskCache:
+    """SQLite 기반 영구 캐시 (CLI 실행 간 유지)
+
+    - API Key별 네임스페이스 (키 원문 대신 api_key_fingerprint() 저장, 호출마다 지정 가능)
+    - 항목별 만료 시각, 트랜잭션 단위 원자적 쓰기
+    - WAL 모드 + busy timeout으로 여러 프로세스가 동시에 사용 가능
+    - 전체 크기가 max_bytes를 넘으면 만료된 항목, 그다음 곧 만료될 항목부터 제거
+
+    디스크 오류는 캐시 미스로 처리하며 명령 실행을 막지 않습니다.
+    """
+
+    def __init__(self, directory: str, api_key: str = None, max_bytes: int = DISK_CACHE_MAX_BYTES):
+        self.path = os.path.join(os.path.expanduser(directory), 'moltarena_cache.sqlite3')
+        self.namespace = api_key_fingerprint(api_key)  # namespace 인자를 생략했을 때 사용
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' ns TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,'
+            ' expires_at REAL NOT NULL, size INTEGER NOT NULL,'
+            ' PRIMARY KEY (ns, key))'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires_at)')
+
+    def get(self, key: str, namespace: str = None) -> Optional[tuple]:
+        """(값, 남은 TTL초) 조회. 없거나 만료되면 None"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT value, expires_at FROM entries WHERE ns = ? AND key = ?',
+                    (namespace or self.namespace, key)
+                ).fetchone()
+        except sqlite3.Error:
+            self.errors += 1
+            return None
+
+        remaining = row[1] - time.time() if row else 0
+        if remaining <= 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0]), remaining
+
+    def set(self, key: str, value: Any, ttl: float, namespace: str = None) -> None:
+        """값 저장 (JSON으로 직렬화할 수 없는 값은 저장하지 않음)"""
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return
+
+        try:
+            with self._lock:
+                self._conn.execute('BEGIN IMMEDIATE')
+                try:
+                    self._conn.execute(
+                        'INSERT OR REPLACE INTO entries (ns, key, value, expires_at, size) VALUES (?, ?, ?, ?, ?)',
+                        (namespace or self.namespace, key, payload, time.time() + ttl, len(payload))
+                    )
+                    self._evict()
+                    self._conn.execute('COMMIT')
+                except BaseException:
+                    self._conn.execute('ROLLBACK')
+                    raise
+        except sqlite3.Error:
+            self.errors += 1
+
+    def _evict(self) -> None:
+        """크기 초과 시 항목 제거 (트랜잭션 안에서 호출)"""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        self._conn.execute('DELETE FROM entries WHERE expires_at <= ?', (time.time(),))
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 곧 만료될 항목부터 (전체의 90%까지 줄여서 매번 제거하지 않도록)
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute('SELECT rowid, size FROM entries ORDER BY expires_at').fetchall()
+        doomed = []
+        for rowid, size in rows:
+            if total <= target:
+                break
+            doomed.append((rowid,))
+            total -= size
+        self._conn.executemany('DELETE FROM entries WHERE rowid = ?', doomed)
+
+    def invalidate(self, key: str = None, prefix: str = None, namespace: str = None) -> None:
+        """항목 삭제 (한 네임스페이스 안에서)"""
+        namespace = namespace or self.namespace
+        try:
+            with self._lock:
+                if key is not None:
+                    self._conn.execute('DELETE FROM entries WHERE ns = ? AND key = ?', (namespace, key))
+                elif prefix is not None:
+                    self._conn.execute(
+                        "DELETE FROM entries WHERE ns = ? AND substr(key, 1, ?) = ?",
+                        (namespace, len(prefix), prefix)
+                    )
+                else:
+                    self._conn.execute('DELETE FROM entries WHERE ns = ?', (namespace,))
+        except sqlite3.Error:
+            self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            with self._lock:
+                entries, size = self._conn.execute(
+                    'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries'
+                ).fetchone()
+        except sqlite3.Error:
+            entries, size = None, None
+        return {
+            'path': self.path,
+            'entries': entries,
+            'bytes': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'max_bytes': self.max_bytes
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache = TTLCache()
+_disk_cache: Optional[DiskCache] = None
+_disk_cache_lock = threading.Lock()
+_disk_cache_configured = False
+
+
+def enable_disk_cache(
+    directory: str,
+    api_key: str = None,
+    max_bytes: int = DISK_CACHE_MAX_BYTES
+) -> Optional[DiskCache]:
+    """디스크 캐시 활성화 (메모리 캐시 뒤의 2단계 캐시)
+
+    Args:
+        directory: 캐시 파일을 둘 디렉터리
+        api_key: DiskCache를 직접 쓸 때의 기본 네임스페이스 API Key (기본: MOLTARENA_API_KEY).
+            get_cached() 등은 호출한 클라이언트의 API Key 네임스페이스를 사용
+        max_bytes: 디스크 캐시 최대 크기
+    """
+    global _disk_cache, _disk_cache_configured
+    with _disk_cache_lock:
+        if _disk_cache is not None:
+            _disk_cache.close()
+        try:
+            _disk_cache = DiskCache(directory, api_key or MOLTARENA_API_KEY, max_bytes)
+        except (OSError, sqlite3.Error):
+            _disk_cache = None
+        _disk_cache_configured = True
+        return _disk_cache
+
+
+def disable_disk_cache() -> None:
+    """디스크 캐시 비활성화"""
+    global _disk_cache, _disk_cache_configured
+    with _disk_cache_lock:
+        if _disk_cache is not None:
+            _disk_cache.close()
+        _disk_cache = None
+        _disk_cache_configured = True
+
+
+def _get_disk_cache() -> Optional[DiskCache]:
+    """MOLTARENA_CACHE_DIR가 설정되어 있으면 첫 사용 시 디스크 캐시 활성화"""
+    if not _disk_cache_configured and CACHE_DIR:
+        enable_disk_cache(CACHE_DIR)
+    return _disk_cache
+
+
+def _scoped_key(key: str, api_key: str = None) -> str:
+    """메모리 캐시 키 (API Key별로 분리, 한 프로세스에서 여러 API Key를 써도 서로의 응답을 읽지 않음)
+
+    디스크 캐시는 같은 api_key_fingerprint()를 네임스페이스로 사용합니다.
+    """
+    return f"{api_key_fingerprint(api_key)}:{key}"
+
+
+def get_cached(key: str, default: Any = None, api_key: str = None) -> Any:
+    """캐시에서 값 조회 (없으면 default)
+
+    메모리 캐시를 먼저 보고, 없으면 디스크 캐시에서 읽어 메모리에 올립니다.
+    api_key(기본: MOLTARENA_API_KEY)별로 따로 저장됩니다.
+    """
+    scoped = _scoped_key(key, api_key)
+    value = _cache.get(scoped, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    disk = _get_disk_cache()
+    if disk is not None:
+        found = disk.get(key, api_key_fingerprint(api_key))
+        if found is not None:
+            value, remaining = found
+            _cache.set(scoped, value, remaining)
+            return value
+    return default
+
+
+def set_cached(key: str, value: Any, ttl: int = CACHE_DURATION, api_key: str = None):
+    """캐시에 값 저장 (api_key별 네임스페이스)"""
+    _cache.set(_scoped_key(key, api_key), value, ttl)
+    disk = _get_disk_cache()
+    if disk is not None:
+        if ttl > 0:
+            disk.set(key, value, ttl, api_key_fingerprint(api_key))
         else:
-            del _cache[key]
-            del _cache_ttl[key]
-    return None
+            disk.invalidate(key, namespace=api_key_fingerprint(api_key))
 
 
-def set_cached(key: str, value: Any, ttl: int = CACHE_DURATION):
-    """캐시에 값 저장"""
-    _cache[key] = value
-    _cache_ttl[key] = datetime.now().timestamp() + ttl
+def invalidate_cached(key: str = None, prefix: str = None, api_key: str = None) -> int:
+    """캐시 무효화 (api_key 네임스페이스의 key 또는 prefix, 둘 다 없으면 네임스페이스 전체)
 
+    셋 다 없으면 메모리 캐시는 모든 API Key의 항목을 지웁니다.
+    """
+    disk = _get_disk_cache()
+    if disk is not None:
+        disk.invalidate(key, prefix, api_key_fingerprint(api_key))
+    if key is None and prefix is None and api_key is None:
+        return _cache.invalidate()
+    if key is not None:
+        return _cache.invalidate(_scoped_key(key, api_key))
+    return _cache.invalidate(prefix=_scoped_key(prefix or '', api_key))
+
+
+def cache_stats() -> Dict[str, Any]:
+    """캐시 적중/미스/제거 통계 (디스크 캐시 사용 시 'disk' 포함)"""
+    stats = _cache.stats()
+    if _disk_cache is not None:
+        stats['disk'] = _disk_cache.stats()
+    return stats
+
+
+# ============== HTTP 세션 ==============
+def create_session(
+    pool_connections: int = POOL_CONNECTIONS,
+    pool_maxsize: int = POOL_MAXSIZE,
+    pool_block: bool = POOL_BLOCK
+) -> requests.Session:
+    """Keep-alive 커넥션 풀을 사용하는 requests.Session 생성
 
-# ============== API 클라이언트 ==============
+    Args:
+        pool_connections: 캐시할 호스트별 커넥션 풀 수
+        pool_maxsize: 호스트당 유지할 최대 커넥션 수
+        pool_block: True면 호스트당 한도를 넘는 요청은 커넥션이 반환될 때까지 대기
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+# ============== 오류 ==============
 class MoltArenaAPIError(Exception):
     """MoltArena API 오류"""
     def __init__(self, message: str, status_code: int = None, details: dict = None):
@@ -56,12 +525,842 @@ class MoltArenaAPIError(Exception):
         super().__init__(self.message)
 
 
+# ============== Rate Limit ==============
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """ISO 8601 또는 HTTP-date 문자열을 Unix timestamp로 변환 (시간대가 없으면 UTC)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_reset_time(value: Optional[str]) -> Optional[float]:
+    """Retry-After / X-RateLimit-Reset 헤더를 '지금부터 남은 초'로 변환
+
+    초 단위 숫자, Unix timestamp, ISO 8601, HTTP-date 형식을 지원합니다.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    now = time.time()
+
+    try:
+        number = float(value)
+        # 큰 값은 Unix timestamp, 작은 값은 남은 초로 해석
+        return max(0.0, number - now) if number > 10 ** 9 else max(0.0, number)
+    except ValueError:
+        pass
+
+    reset_at = parse_timestamp(value)
+    return max(0.0, reset_at - now) if reset_at is not None else None
+
+
+class RateLimiter:
+    """토큰 버킷 기반 요청 스케줄러
+
+    로컬 토큰 버킷(limit/period 속도로 충전)으로 요청을 고르게 분산하고,
+    응답의 X-RateLimit-* 헤더와 429 응답으로 서버 상태에 맞춰 보정합니다.
+    토큰이 없으면 실패하는 대신 대기하며, 대기 중인 요청은 우선순위 순으로 처리합니다.
+    PRIORITY_BACKGROUND 요청은 마지막 reserve개의 토큰을 사용할 수 없어
+    Heartbeat 폴링이 사용자 명령에 필요한 한도를 소진하지 않습니다.
+
+    기본 대기 한도는 토큰 RATE_LIMIT_WAIT_TOKENS개가 충전되는 시간(100/시간이면 72초)과
+    RATE_LIMIT_MAX_WAIT 중 긴 쪽입니다. 충전 간격(36초)보다 짧으면 한도를 다 쓴 뒤에는
+    기다리지 않고 모든 요청이 바로 429로 실패합니다.
+    """
+
+    def __init__(
+        self,
+        limit: int = RATE_LIMIT,
+        period: float = RATE_LIMIT_PERIOD,
+        max_wait: float = None,
+        reserve: int = RATE_LIMIT_RESERVE
+    ):
+        """
+        Args:
+            limit: period 동안 허용되는 요청 수
+            period: 한도 주기 (초)
+            max_wait: 요청당 최대 대기 시간 (초). 더 기다려야 하면 즉시 429 오류
+                (기본: 충전 간격에 맞춰 계산, 클래스 설명 참고)
+            reserve: 백그라운드 요청이 남겨둬야 하는 토큰 수
+        """
+        self.limit = limit
+        self.period = period
+        self.max_wait = max_wait
+        self.reserve = min(reserve, max(limit - 1, 0))
+        self.remaining: Optional[int] = None  # 서버가 알려준 남은 요청 수
+
+        self._tokens = float(limit)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting = [0, 0, 0]  # 우선순위별 대기 요청 수
+        self._cond = threading.Condition()
+
+    @property
+    def tokens(self) -> float:
+        """현재 사용 가능한 토큰 수"""
+        with self._cond:
+            self._refill(time.monotonic())
+            return self._tokens
+
+    @property
+    def refill_interval(self) -> float:
+        """토큰 하나가 충전되는 시간 (초)"""
+        return self.period / self.limit
+
+    def wait_limit(self, max_wait: float = None) -> float:
+        """요청 하나가 토큰을 기다릴 최대 시간 (초)"""
+        if max_wait is None:
+            max_wait = self.max_wait
+        if max_wait is None:
+            # limit은 X-RateLimit-Limit 헤더로 바뀔 수 있으므로 매번 계산
+            max_wait = max(RATE_LIMIT_MAX_WAIT, self.refill_interval * RATE_LIMIT_WAIT_TOKENS)
+        return max_wait
+
+    def _refill(self, now: float):
+        rate = self.limit / self.period
+        self._tokens = min(float(self.limit), self._tokens + (now - self._updated) * rate)
+        self._updated = now
+
+    def _try_take(self, priority: int) -> float:
+        """토큰 획득 시도. 성공하면 0, 실패하면 다시 시도할 때까지의 초 (락 보유 상태에서 호출)"""
+        now = time.monotonic()
+        self._refill(now)
+
+        if self._blocked_until:
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            # 보류가 풀리면 서버 상태를 확인할 요청 하나는 허용 (이후 응답 헤더로 보정)
+            self._blocked_until = 0.0
+            self._tokens = max(self._tokens, 1.0)
+
+        need = 1.0 + (self.reserve if priority >= PRIORITY_BACKGROUND else 0)
+        higher_waiting = any(self._waiting[:priority])
+
+        if self._tokens >= need and not higher_waiting:
+            self._tokens -= 1.0
+            return 0.0
+
+        missing = max(need - self._tokens, 0.0)
+        wait = missing * self.period / self.limit
+        # 상위 우선순위 요청이 먼저 가져가도록 잠시 양보
+        return max(wait, 0.05) if higher_waiting else wait
+
+    def _too_long(self, wait: float) -> MoltArenaAPIError:
+        return MoltArenaAPIError(
+            f"요청 한도를 초과했습니다. 약 {wait:.0f}초 후 다시 시도해주세요.",
+            status_code=429,
+            details={'retry_after': wait}
+        )
+
+    def acquire(self, priority: int = PRIORITY_NORMAL, max_wait: float = None):
+        """토큰 하나를 획득할 때까지 대기
+
+        Raises:
+            MoltArenaAPIError: max_wait 안에 획득할 수 없을 때 (status_code=429)
+        """
+        priority = min(max(priority, 0), len(self._waiting) - 1)
+        deadline = time.monotonic() + self.wait_limit(max_wait)
+
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    wait = self._try_take(priority)
+                    if wait <= 0:
+                        return
+                    if time.monotonic() + wait > deadline:
+                        raise self._too_long(wait)
+                    self._cond.wait(wait)
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+
+    async def acquire_async(self, priority: int = PRIORITY_NORMAL, max_wait: float = None):
+        """acquire()의 asyncio 버전 (이벤트 루프를 막지 않음)"""
+        priority = min(max(priority, 0), len(self._waiting) - 1)
+        deadline = time.monotonic() + self.wait_limit(max_wait)
+
+        with self._cond:
+            self._waiting[priority] += 1
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_take(priority)
+                if wait <= 0:
+                    return
+                if time.monotonic() + wait > deadline:
+                    raise self._too_long(wait)
+                await asyncio.sleep(min(wait, 1.0))
+        finally:
+            with self._cond:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+
+    def update(self, headers) -> None:
+        """응답 헤더(X-RateLimit-Limit/Remaining/Reset)로 버킷 보정"""
+        limit = headers.get('X-RateLimit-Limit')
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset_in = parse_reset_time(headers.get('X-RateLimit-Reset'))
+
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+
+            if limit and limit.isdigit() and int(limit) > 0:
+                self.limit = int(limit)
+
+            if remaining is not None and remaining.isdigit():
+                self.remaining = int(remaining)
+                # 남은 요청 수는 서버 기준으로 맞춤
+                self._tokens = float(min(self.remaining, self.limit))
+                if self.remaining == 0 and reset_in is not None:
+                    self._blocked_until = max(self._blocked_until, now + reset_in)
+
+            self._cond.notify_all()
+
+    def block(self, seconds: float) -> None:
+        """429 응답 등으로 seconds 동안 모든 요청 보류"""
+        with self._cond:
+            now = time.monotonic()
+            self._tokens = 0.0
+            self._updated = now
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._cond.notify_all()
+
+
+# ============== 재시도 & 서킷 브레이커 ==============
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+RETRYABLE_STATUS_CODES = frozenset({500, 502, 503, 504})
+
+
+@dataclass
+class RetryPolicy:
+    """멱등 요청 재시도 정책 (지수 백오프 + full jitter)"""
+    max_attempts: int = RETRY_MAX_ATTEMPTS
+    backoff_base: float = RETRY_BACKOFF_BASE
+    backoff_max: float = RETRY_BACKOFF_MAX
+    max_retry_after: float = RATE_LIMIT_MAX_WAIT  # 이보다 긴 Retry-After는 재시도하지 않음
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """attempt번째 시도 실패 후 대기할 시간 (None이면 재시도하지 않음)"""
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_retry_after else None
+        # 여러 클라이언트가 동시에 재시도하지 않도록 [0, 상한] 구간에서 무작위 선택
+        cap = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, cap)
+
+
+def endpoint_family(endpoint: str) -> str:
+    """서킷 브레이커 단위 (예: /deploy/list → /deploy, /notifications/poll → /notifications)"""
+    path = endpoint.split('?', 1)[0].strip('/')
+    return '/' + path.split('/', 1)[0]
+
+
+class CircuitBreaker:
+    """엔드포인트 그룹별 서킷 브레이커
+
+    연속 failure_threshold번 실패(타임아웃, 연결 오류, 5xx)하면 open 상태가 되어
+    reset_timeout 동안 요청을 보내지 않고 즉시 실패합니다.
+    이후 half-open 상태에서 시험 요청 하나만 허용하고, 성공하면 다시 closed로 돌아갑니다.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now: float) -> str:
+        if self.failures < self.failure_threshold:
+            return self.CLOSED
+        if now - self._opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self) -> bool:
+        """요청 허용 여부 확인
+
+        Returns:
+            이 요청이 half-open 시험 요청이면 True. 결과와 관계없이 끝나면 release()를 호출해야 합니다.
+
+        Raises:
+            MoltArenaAPIError: open 상태이거나 half-open 시험 요청이 이미 진행 중일 때 (status_code=503)
+        """
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(now)
+            if state == self.CLOSED:
+                return False
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            retry_after = max(self.reset_timeout - (now - self._opened_at), 1.0)
+
+        raise MoltArenaAPIError(
+            f"API 서버({self.name})가 일시적으로 불안정합니다. 약 {retry_after:.0f}초 후 다시 시도해주세요.",
+            status_code=503,
+            details={'circuit': self.name, 'retry_after': retry_after}
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """시험 요청 종료 (429, 취소, 예상하지 못한 예외처럼 성공/실패를 기록하지 않은 경우에도 호출)
+
+        상태는 바꾸지 않고 다음 요청이 다시 시험 요청이 될 수 있게 합니다.
+        """
+        with self._lock:
+            self._probing = False
+
+
+class CircuitBreakers:
+    """endpoint_family()별 CircuitBreaker 레지스트리"""
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        family = endpoint_family(endpoint)
+        breaker = self._breakers.get(family)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    family, CircuitBreaker(family, self.failure_threshold, self.reset_timeout)
+                )
+        return breaker
+
+    def states(self) -> Dict[str, str]:
+        """그룹별 현재 상태"""
+        return {name: breaker.state for name, breaker in list(self._breakers.items())}
+
+
+# ============== 조건부 요청 ==============
+
+def _conditional_headers(cache_key: str, api_key: str = None) -> tuple:
+    """저장된 검증자로 조건부 요청 헤더 생성
+
+    Returns:
+        (저장된 항목 또는 None, 요청 헤더 dict)
+    """
+    stored = get_cached(f"validators:{cache_key}", api_key=api_key)
+    headers = {}
+    if stored is not None:
+        if stored.get('etag'):
+            headers['If-None-Match'] = stored['etag']
+        if stored.get('last_modified'):
+            headers['If-Modified-Since'] = stored['last_modified']
+    return stored, headers
+
+
+def _store_validators(cache_key: str, headers, result: Dict, api_key: str = None) -> None:
+    """응답의 ETag / Last-Modified와 응답 본문 저장 (검증자가 없으면 저장하지 않음)"""
+    etag = headers.get('ETag')
+    last_modified = headers.get('Last-Modified')
+    if etag or last_modified:
+        set_cached(f"validators:{cache_key}", {
+            'etag': etag,
+            'last_modified': last_modified,
+            'result': result
+        }, VALIDATOR_TTL, api_key=api_key)
+
+
+# ============== 요청 메트릭 ==============
+
+ENDPOINT_ID_PARENTS = frozenset({'agents', 'battles', 'status', 'tournaments'})  # 다음 경로 조각이 ID인 조각
+LOCAL_REJECTIONS = frozenset({'circuit_open', 'rate_limit_wait'})  # 서버로 보내지 않고 실패한 요청
+
+
+def endpoint_template(endpoint: str) -> str:
+    """메트릭 집계 단위 (예: /battles/battle_123 → /battles/{id}, 쿼리 문자열 제외)"""
+    parts = endpoint.split('?', 1)[0].rstrip('/').split('/')
+    for i in range(1, len(parts)):
+        if parts[i] and parts[i - 1] in ENDPOINT_ID_PARENTS:
+            parts[i] = '{id}'
+    return '/'.join(parts) or '/'
+
+
+def _label_value(value: Any) -> str:
+    """Prometheus 레이블 값 이스케이프"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def content_length(headers) -> int:
+    """Content-Length 헤더 값 (없거나 잘못되면 0)"""
+    try:
+        return int(headers.get('Content-Length') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def error_kind(status: Optional[int]) -> Optional[str]:
+    """HTTP 상태 코드의 오류 분류 (오류가 아니면 None)"""
+    if status is None or status < 400:
+        return None
+    if status == 429:
+        return 'rate_limited'
+    return 'client_error' if status < 500 else 'server_error'
+
+
+@dataclass
+class RequestEvent:
+    """HTTP 요청 한 번의 결과 (재시도는 시도마다 하나씩, RequestMetrics 훅에 전달)"""
+    method: str
+    endpoint: str                # 집계 단위 (endpoint_template)
+    path: str                    # 실제 요청 경로
+    status: Optional[int]        # 응답을 받지 못했으면 None
+    elapsed: float               # 요청 시작부터 응답 수신까지 (초, 스트림은 헤더까지)
+    attempt: int = 1
+    queued: float = 0.0          # 서킷 브레이커 / Rate limit 토큰 대기 시간 (초)
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    error: Optional[str] = None  # timeout / connection / circuit_open / rate_limit_wait / rate_limited / client_error / server_error
+
+    @property
+    def sent(self) -> bool:
+        """서버로 실제 요청을 보냈는지"""
+        return self.error not in LOCAL_REJECTIONS
+
+
+class _EndpointStats:
+    """(메서드, 엔드포인트 템플릿) 하나의 누적 값"""
+
+    __slots__ = ('requests', 'statuses', 'errors', 'retries', 'bytes_sent', 'bytes_received',
+                 'buckets', 'latency_sum', 'latency_max', 'queued_sum', 'cache_hits', 'cache_misses', 'coalesced')
+
+    def __init__(self, bucket_count: int):
+        self.requests = 0
+        self.statuses: Dict[int, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.buckets = [0] * (bucket_count + 1)  # 마지막은 +Inf
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.queued_sum = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.coalesced = 0
+
+
+class RequestMetrics:
+    """엔드포인트별 요청 메트릭 (스레드 안전)
+
+    (메서드, 엔드포인트 템플릿)별로 요청 수, 상태 코드, 오류 종류, 재시도, 송수신 바이트,
+    지연 히스토그램과 캐시 적중률을 집계합니다. 여러 클라이언트가 공유할 수 있습니다.
+    add_hook()으로 등록한 함수는 요청마다 RequestEvent를 받습니다 (훅의 예외는 무시).
+
+    내보내기:
+        snapshot()       - JSON으로 직렬화할 수 있는 dict (요청 수 많은 순)
+        to_prometheus()  - Prometheus 텍스트 형식
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = METRICS_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.started_at = time.time()
+        self.hook_errors = 0
+        self._endpoints: Dict[Tuple[str, str], _EndpointStats] = {}
+        self._hooks: List[Any] = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook) -> None:
+        """요청마다 hook(RequestEvent) 호출"""
+        with self._lock:
+            self._hooks = self._hooks + [hook]
+
+    def remove_hook(self, hook) -> None:
+        with self._lock:
+            self._hooks = [h for h in self._hooks if h is not hook]
+
+    def _stats(self, method: str, endpoint: str) -> _EndpointStats:
+        """집계 항목 (락 보유 상태에서 호출)"""
+        key = (method.upper(), endpoint)
+        stats = self._endpoints.get(key)
+        if stats is None:
+            stats = self._endpoints[key] = _EndpointStats(len(self.buckets))
+        return stats
+
+    def record(self, event: RequestEvent) -> None:
+        """요청 결과 기록 후 훅 호출"""
+        if event.error is None:
+            event.error = error_kind(event.status)
+
+        with self._lock:
+            stats = self._stats(event.method, event.endpoint)
+            if event.error:
+                stats.errors[event.error] = stats.errors.get(event.error, 0) + 1
+            stats.queued_sum += event.queued
+            if event.sent:
+                stats.requests += 1
+                if event.attempt > 1:
+                    stats.retries += 1
+                if event.status is not None:
+                    stats.statuses[event.status] = stats.statuses.get(event.status, 0) + 1
+                stats.bytes_sent += event.bytes_sent
+                stats.bytes_received += event.bytes_received
+                stats.buckets[bisect.bisect_left(self.buckets, event.elapsed)] += 1
+                stats.latency_sum += event.elapsed
+                stats.latency_max = max(stats.latency_max, event.elapsed)
+            hooks = self._hooks
+
+        for hook in hooks:
+            try:
+                hook(event)
+            except Exception:
+                self.hook_errors += 1
+
+    def record_cache(self, method: str, endpoint: str, hit: bool) -> None:
+        """캐시를 거치는 조회의 적중 / 미스 기록"""
+        with self._lock:
+            stats = self._stats(method, endpoint)
+            if hit:
+                stats.cache_hits += 1
+            else:
+                stats.cache_misses += 1
+
+    def record_coalesced(self, method: str, endpoint: str) -> None:
+        """진행 중인 같은 요청의 결과를 받아 요청을 보내지 않은 호출 기록"""
+        with self._lock:
+            self._stats(method, endpoint).coalesced += 1
+
+    def reset(self) -> None:
+        """누적 값 초기화 (훅은 유지)"""
+        with self._lock:
+            self._endpoints.clear()
+            self.started_at = time.time()
+            self.hook_errors = 0
+
+    def _quantile(self, counts: List[int], q: float, latency_max: float) -> Optional[float]:
+        """히스토그램으로 추정한 q 분위수 (버킷 안에서 선형 보간, 초)"""
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        cumulative = 0
+        lower = 0.0
+        for i, count in enumerate(counts):
+            if count and cumulative + count >= rank:
+                if i == len(self.buckets):
+                    return latency_max
+                upper = min(self.buckets[i], latency_max)
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+            if i < len(self.buckets):
+                lower = self.buckets[i]
+        return latency_max
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON 스냅샷 (엔드포인트는 요청 수 많은 순)"""
+        with self._lock:
+            items = [(key, stats, list(stats.buckets), dict(stats.statuses), dict(stats.errors))
+                     for key, stats in self._endpoints.items()]
+            started_at = self.started_at
+
+        total_requests = sum(stats.requests for _, stats, *_ in items)
+        endpoints = []
+        for (method, endpoint), stats, counts, statuses, errors in items:
+            lookups = stats.cache_hits + stats.cache_misses
+            cumulative = list(itertools.accumulate(counts))
+            endpoints.append({
+                'method': method,
+                'endpoint': endpoint,
+                'requests': stats.requests,
+                'share': stats.requests / total_requests if total_requests else 0.0,
+                'statuses': {str(code): count for code, count in sorted(statuses.items())},
+                'errors': errors,
+                'retries': stats.retries,
+                'bytes_sent': stats.bytes_sent,
+                'bytes_received': stats.bytes_received,
+                'latency': {
+                    'count': stats.requests,
+                    'sum': stats.latency_sum,
+                    'mean': stats.latency_sum / stats.requests if stats.requests else None,
+                    'max': stats.latency_max,
+                    'p50': self._quantile(counts, 0.5, stats.latency_max),
+                    'p95': self._quantile(counts, 0.95, stats.latency_max),
+                    'p99': self._quantile(counts, 0.99, stats.latency_max),
+                    'buckets': {f"{bound:g}": count for bound, count in zip(self.buckets, cumulative)},
+                },
+                'queued_seconds': stats.queued_sum,
+                'coalesced': stats.coalesced,
+                'cache': {
+                    'hits': stats.cache_hits,
+                    'misses': stats.cache_misses,
+                    'hit_ratio': stats.cache_hits / lookups if lookups else None,
+                },
+            })
+        endpoints.sort(key=lambda e: (-e['requests'], -e['cache']['hits'] - e['coalesced'], e['endpoint'], e['method']))
+
+        return {
+            'started_at': datetime.fromtimestamp(started_at, timezone.utc).isoformat(),
+            'uptime': time.time() - started_at,
+            'totals': {
+                'requests': total_requests,
+                'errors': sum(sum(e['errors'].values()) for e in endpoints),
+                'retries': sum(e['retries'] for e in endpoints),
+                'bytes_sent': sum(e['bytes_sent'] for e in endpoints),
+                'bytes_received': sum(e['bytes_received'] for e in endpoints),
+                'cache_hits': sum(e['cache']['hits'] for e in endpoints),
+                'cache_misses': sum(e['cache']['misses'] for e in endpoints),
+                'coalesced': sum(e['coalesced'] for e in endpoints),
+            },
+            'endpoints': endpoints,
+        }
+
+    def to_prometheus(self, prefix: str = 'moltarena') -> str:
+        """Prometheus 텍스트 형식 (exposition format 0.0.4)"""
+        def labels(**values) -> str:
+            return '{' + ','.join(f'{name}="{_label_value(value)}"' for name, value in values.items()) + '}'
+
+        snapshot = self.snapshot()
+        families = [
+            ('requests_total', 'counter', 'MoltArena API로 보낸 HTTP 요청 수 (재시도, 응답 없이 끝난 요청 포함)'),
+            ('responses_total', 'counter', '상태 코드별 응답 수 (타임아웃 / 연결 오류는 request_errors_total)'),
+            ('request_errors_total', 'counter', '오류 종류별 요청 수 (서버로 보내지 않은 요청 포함)'),
+            ('request_retries_total', 'counter', '재시도 요청 수'),
+            ('request_sent_bytes_total', 'counter', '요청 본문 바이트'),
+            ('response_received_bytes_total', 'counter', '응답 본문 바이트'),
+            ('request_queued_seconds_total', 'counter', '서킷 브레이커 / Rate limit 대기 시간'),
+            ('request_duration_seconds', 'histogram', '요청 시작부터 응답 수신까지 걸린 시간'),
+            ('cache_lookups_total', 'counter', '캐시를 거치는 조회 수 (result=hit/miss)'),
+            ('request_coalesced_total', 'counter', '진행 중인 같은 요청의 결과를 받아 보내지 않은 요청 수'),
+        ]
+        samples = {name: [] for name, _, _ in families}
+        for e in snapshot['endpoints']:
+            base = {'method': e['method'], 'endpoint': e['endpoint']}
+            for code, count in e['statuses'].items():
+                samples['responses_total'].append((labels(**base, status=code), count))
+            for kind, count in sorted(e['errors'].items()):
+                samples['request_errors_total'].append((labels(**base, error=kind), count))
+            if not e['requests']:
+                continue
+            samples['requests_total'].append((labels(**base), e['requests']))
+            samples['request_retries_total'].append((labels(**base), e['retries']))
+            samples['request_sent_bytes_total'].append((labels(**base), e['bytes_sent']))
+            samples['response_received_bytes_total'].append((labels(**base), e['bytes_received']))
+            samples['request_queued_seconds_total'].append((labels(**base), e['queued_seconds']))
+            histogram = samples['request_duration_seconds']
+            for bound, count in e['latency']['buckets'].items():
+                histogram.append(('_bucket' + labels(**base, le=bound), count))
+            histogram.append(('_bucket' + labels(**base, le='+Inf'), e['requests']))
+            histogram.append(('_sum' + labels(**base), e['latency']['sum']))
+            histogram.append(('_count' + labels(**base), e['requests']))
+        for e in snapshot['endpoints']:
+            if e['cache']['hits'] or e['cache']['misses']:
+                base = {'method': e['method'], 'endpoint': e['endpoint']}
+                samples['cache_lookups_total'].append((labels(**base, result='hit'), e['cache']['hits']))
+                samples['cache_lookups_total'].append((labels(**base, result='miss'), e['cache']['misses']))
+            if e['coalesced']:
+                samples['request_coalesced_total'].append(
+                    (labels(method=e['method'], endpoint=e['endpoint']), e['coalesced']))
+
+        lines = []
+        for name, kind, help_text in families:
+            metric = f"{prefix}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for suffix, value in samples[name]:
+                lines.append(f"{metric}{suffix} {value:g}" if isinstance(value, float) else f"{metric}{suffix} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str) -> None:
+        """파일로 저장 (.prom이면 Prometheus 형식, 아니면 JSON). 임시 파일에 쓴 뒤 교체"""
+        path = os.path.expanduser(path)
+        text = self.to_prometheus() if path.endswith('.prom') else json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+# ============== 동시 요청 병합 (single-flight) ==============
+
+class _Flight:
+    """진행 중인 호출 하나 (SingleFlight 내부)"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """같은 키의 동시 호출을 실행 하나로 합침
+
+    먼저 들어온 호출만 함수를 실행하고, 실행 중에 같은 키로 들어온 호출은 끝나기를 기다려
+    같은 결과를 받습니다 (실패하면 같은 예외). 실행이 끝나면 키를 지우므로 결과를 보관하지 않으며,
+    캐시는 이 위 단계에서 처리합니다. 스레드와 asyncio 태스크 모두 지원합니다.
+    """
+
+    def __init__(self):
+        self.coalesced = 0  # 다른 호출의 결과를 받은 호출 수
+        self._flights: Dict[Any, _Flight] = {}
+        self._tasks: Dict[Any, "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Any, func, on_shared=None) -> Any:
+        """func() 실행 (같은 키가 실행 중이면 그 결과를 기다림)
+
+        Args:
+            key: 합칠 호출을 구분하는 키 (hashable)
+            func: 인자 없는 함수
+            on_shared: 다른 호출의 결과를 기다리게 될 때 호출할 함수 (메트릭 기록 등)
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            if on_shared is not None:
+                on_shared()
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    async def do_async(self, key: Any, func, on_shared=None) -> Any:
+        """do()의 asyncio 버전 (func는 인자 없는 코루틴 함수, 같은 이벤트 루프 안에서 합침)
+
+        실행은 별도 태스크에서 하므로 기다리던 호출 하나가 취소되어도 나머지는 결과를 받습니다.
+        """
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        with self._lock:
+            task = self._tasks.get(loop_key)
+            shared = task is not None
+            if shared:
+                self.coalesced += 1
+            else:
+                task = self._tasks[loop_key] = loop.create_task(func())
+                task.add_done_callback(lambda t: self._finish(loop_key, t))
+        if shared and on_shared is not None:
+            on_shared()
+        return await asyncio.shield(task)
+
+    def _finish(self, loop_key: Any, task: "asyncio.Future") -> None:
+        with self._lock:
+            if self._tasks.get(loop_key) is task:
+                del self._tasks[loop_key]
+        # 기다리던 호출이 모두 취소된 경우에도 'exception was never retrieved' 경고가 나지 않도록
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        """진행 중인 호출 수"""
+        with self._lock:
+            return len(self._flights) + len(self._tasks)
+
+
+def _params_key(params: Any) -> tuple:
+    """쿼리 파라미터를 single-flight 키로 (dict / 튜플 목록)"""
+    if not params:
+        return ()
+    items = params.items() if isinstance(params, dict) else params
+    return tuple(sorted((str(k), str(v)) for k, v in items))
+
+
+# ============== API 클라이언트 ==============
+
 class MoltArenaAPI:
     """MoltArena API 클라이언트"""
 
-    def __init__(self, api_key: str = None, api_url: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        api_url: str = None,
+        session: requests.Session = None,
+        timeout: float = REQUEST_TIMEOUT,
+        rate_limiter: RateLimiter = None,
+        retry_policy: RetryPolicy = None,
+        circuit_breakers: CircuitBreakers = None,
+        metrics: RequestMetrics = None,
+        single_flight: SingleFlight = None
+    ):
+        """
+        Args:
+            api_key: API Key (기본: MOLTARENA_API_KEY 환경변수)
+            api_url: API URL (기본: MOLTARENA_API_URL 환경변수)
+            session: 재사용할 requests.Session (없으면 새 커넥션 풀 생성)
+            timeout: 요청 타임아웃 (초)
+            rate_limiter: 요청 스케줄러 (같은 API Key를 쓰는 클라이언트끼리 공유 가능)
+            retry_policy: 멱등 요청 재시도 정책
+            circuit_breakers: 엔드포인트 그룹별 서킷 브레이커
+            metrics: 엔드포인트별 요청 메트릭 (여러 클라이언트가 공유 가능)
+            single_flight: 동시에 들어온 같은 GET을 요청 하나로 합치는 레지스트리
+                (여러 클라이언트가 공유 가능, self.single_flight = None이면 합치지 않음)
+        """
         self.api_key = api_key or MOLTARENA_API_KEY
         self.api_url = api_url or MOLTARENA_API_URL
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breakers = circuit_breakers or CircuitBreakers()
+        self.metrics = metrics if metrics is not None else RequestMetrics()
+        self.single_flight = single_flight if single_flight is not None else SingleFlight()
 
         if not self.api_key:
             raise MoltArenaAPIError(
@@ -75,38 +1374,180 @@ class MoltArenaAPI:
             "User-Agent": "Moltbot-MoltArena-Skill/1.0"
         }
 
-    def _request(self, method: str, endpoint: str, **kwargs) -> Dict:
-        """API 요청 실행"""
-        url = f"{self.api_url}{endpoint}"
+        # 외부에서 주입한 세션은 호출자가 소유 (close()에서 닫지 않음)
+        self._owns_session = session is None
+        self.session = session if session is not None else create_session()
 
-        try:
-            response = requests.request(
-                method,
-                url,
-                headers=self.headers,
-                timeout=30,
-                **kwargs
+    def close(self):
+        """소유한 HTTP 세션 종료"""
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _request(self, method: str, endpoint: str, priority: int = PRIORITY_NORMAL, **kwargs) -> Dict:
+        """API 요청 실행 후 JSON 응답 반환 (동시에 들어온 같은 GET은 요청 하나로 합침)"""
+        if method.upper() == 'GET':
+            return self._coalesce(
+                ('request', endpoint, _params_key(kwargs.get('params'))), endpoint,
+                lambda: self._send(method, endpoint, priority=priority, **kwargs).json()
             )
+        return self._send(method, endpoint, priority=priority, **kwargs).json()
+
+    def _coalesce(self, key: tuple, endpoint: str, func) -> Any:
+        """같은 키로 진행 중인 GET이 있으면 보내지 않고 그 결과(또는 예외)를 받음
+
+        캐시 미스가 동시에 몰려도(TTL 만료 직후 등) 요청은 하나만 나갑니다.
+        먼저 들어온 호출의 우선순위로 요청하며, 결과 객체는 기다린 호출끼리 공유합니다.
+        """
+        if self.single_flight is None:
+            return func()
+        return self.single_flight.do(
+            (self.api_url, self.api_key) + key, func,
+            on_shared=lambda: self.metrics.record_coalesced('GET', endpoint_template(endpoint))
+        )
+
+    def _conditional_get(
+        self,
+        endpoint: str,
+        cache_key: str,
+        priority: int = PRIORITY_NORMAL,
+        **kwargs
+    ) -> Dict:
+        """ETag / Last-Modified 검증자를 붙인 조건부 GET
+
+        이전 응답의 검증자가 있으면 If-None-Match / If-Modified-Since를 보내고,
+        304 응답이면 저장해 둔 응답을 그대로 반환합니다. 동시에 들어온 같은 조회는 요청 하나로 합칩니다.
+        """
+        return self._coalesce(
+            ('conditional', cache_key, endpoint, _params_key(kwargs.get('params'))), endpoint,
+            lambda: self._revalidate(endpoint, cache_key, priority, **kwargs)
+        )
 
-            # 에러 응답 처리
-            if not response.ok:
+    def _revalidate(self, endpoint: str, cache_key: str, priority: int, **kwargs) -> Dict:
+        """_conditional_get의 실제 요청"""
+        stored, headers = _conditional_headers(cache_key, self.api_key)
+        response = self._send("GET", endpoint, priority=priority, headers=headers, **kwargs)
+
+        if response.status_code == 304:
+            if stored is not None:
+                set_cached(f"validators:{cache_key}", stored, VALIDATOR_TTL, api_key=self.api_key)
+                return stored['result']
+            response = self._send("GET", endpoint, priority=priority, **kwargs)
+
+        result = response.json()
+        _store_validators(cache_key, response.headers, result, self.api_key)
+        return result
+
+    def _send(
+        self,
+        method: str,
+        endpoint: str,
+        priority: int = PRIORITY_NORMAL,
+        headers: Dict[str, str] = None,
+        timeout: float = None,
+        **kwargs
+    ) -> requests.Response:
+        """API 요청 실행 (4xx/5xx 응답은 MoltArenaAPIError)
+
+        - Rate limit 토큰을 얻을 때까지 대기하고, 429 응답은 Retry-After 후 재시도
+        - 멱등 요청(GET 등)은 타임아웃/연결 오류/5xx에 대해 지수 백오프로 재시도
+        - 엔드포인트 그룹의 서킷이 open이면 요청 없이 즉시 실패
+        - 시도마다 결과를 self.metrics에 기록
+        """
+        url = f"{self.api_url}{endpoint}"
+        template = endpoint_template(endpoint)
+        breaker = self.circuit_breakers.get(endpoint)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        max_attempts = max(1, self.retry_policy.max_attempts)
+
+        for attempt in range(1, max_attempts + 1):
+            queued_at = time.perf_counter()
+            try:
+                # 토큰을 기다리는 동안 시험 요청 자리를 차지하지 않도록 토큰을 먼저 받음
+                self.rate_limiter.acquire(priority)
+                probe = breaker.allow()
+            except MoltArenaAPIError as e:
+                self.metrics.record(RequestEvent(
+                    method, template, endpoint, None, 0.0, attempt, time.perf_counter() - queued_at,
+                    error='rate_limit_wait' if e.status_code == 429 else 'circuit_open'
+                ))
+                raise
+
+            try:
+                started = time.perf_counter()
                 try:
-                    error_data = response.json()
-                    error_msg = error_data.get('error', {}).get('message', response.text)
-                except:
-                    error_msg = response.text
-
-                raise MoltArenaAPIError(
-                    f"API 오류: {error_msg}",
-                    status_code=response.status_code
-                )
+                    response = self.session.request(
+                        method,
+                        url,
+                        headers={**self.headers, **headers} if headers else self.headers,
+                        timeout=(CONNECT_TIMEOUT, timeout or self.timeout),
+                        **kwargs
+                    )
+                except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                    timed_out = isinstance(e, requests.exceptions.Timeout)
+                    self.metrics.record(RequestEvent(
+                        method, template, endpoint, None, time.perf_counter() - started, attempt,
+                        started - queued_at, error='timeout' if timed_out else 'connection'
+                    ))
+                    breaker.record_failure()
+                    delay = self.retry_policy.delay(attempt) if idempotent else None
+                    if delay is not None and attempt < max_attempts:
+                        time.sleep(delay)
+                        continue
+                    if timed_out:
+                        raise MoltArenaAPIError("API 요청 시간 초과. 잠시 후 다시 시도해주세요.")
+                    raise MoltArenaAPIError("API 서버에 연결할 수 없습니다. 네트워크를 확인해주세요.")
+
+                body = response.request.body
+                self.metrics.record(RequestEvent(
+                    method, template, endpoint, response.status_code, time.perf_counter() - started, attempt,
+                    started - queued_at,
+                    bytes_sent=len(body.encode() if isinstance(body, str) else body) if body else 0,
+                    # 스트림 응답은 본문을 읽지 않도록 Content-Length만 사용
+                    bytes_received=content_length(response.headers) if kwargs.get('stream') else len(response.content)
+                ))
+                self.rate_limiter.update(response.headers)
+                retry_after = parse_reset_time(response.headers.get('Retry-After'))
+
+                if response.status_code == 429:
+                    # 서버가 처리하지 않은 요청이므로 메서드와 관계없이 재시도
+                    if retry_after is None:
+                        retry_after = parse_reset_time(response.headers.get('X-RateLimit-Reset'))
+                    self.rate_limiter.block(retry_after if retry_after is not None else 60.0)
+                    if attempt < max_attempts:
+                        continue
+                elif response.status_code in RETRYABLE_STATUS_CODES:
+                    breaker.record_failure()
+                    delay = self.retry_policy.delay(attempt, retry_after) if idempotent else None
+                    if delay is not None and attempt < max_attempts:
+                        time.sleep(delay)
+                        continue
+                else:
+                    breaker.record_success()
+                break
+            finally:
+                if probe:
+                    breaker.release()
+
+        # 에러 응답 처리
+        if not response.ok:
+            try:
+                error_data = response.json()
+                error_msg = error_data.get('error', {}).get('message', response.text)
+            except:
+                error_msg = response.text
 
-            return response.json()
+            raise MoltArenaAPIError(
+                f"API 오류: {error_msg}",
+                status_code=response.status_code
+            )
 
-        except requests.exceptions.Timeout:
-            raise MoltArenaAPIError("API 요청 시간 초과. 잠시 후 다시 시도해주세요.")
-        except requests.exceptions.ConnectionError:
-            raise MoltArenaAPIError("API 서버에 연결할 수 없습니다. 네트워크를 확인해주세요.")
+        return response
 
     # ==================== 에이전트 관리 ====================
 
@@ -131,9 +1572,9 @@ class MoltArenaAPI:
             }
         }
 
-        result = self._request("POST", "/deploy/agent", json=payload)
+        result = self._request("POST", "/deploy/agent", json=payload, priority=PRIORITY_HIGH)
         # 캐시 무효화
-        set_cached("my_agents", None, 0)
+        invalidate_cached("my_agents", api_key=self.api_key)
         return result
 
     def list_agents(self, use_cache: bool = True) -> List[Dict]:
@@ -141,13 +1582,14 @@ class MoltArenaAPI:
         cache_key = "my_agents"
 
         if use_cache:
-            cached = get_cached(cache_key)
-            if cached:
+            cached = get_cached(cache_key, api_key=self.api_key)
+            self.metrics.record_cache("GET", "/deploy/list", cached is not None)
+            if cached is not None:
                 return cached
 
-        result = self._request("GET", "/deploy/list")
+        result = self._conditional_get("/deploy/list", cache_key)
         agents = result.get("agents", [])
-        set_cached(cache_key, agents)
+        set_cached(cache_key, agents, api_key=self.api_key)
         return agents
 
     def get_agent_status(self, agent_id: str) -> Dict:
@@ -199,7 +1641,8 @@ class MoltArenaAPI:
         opponent_id: str = None,
         topic: str = None,
         language: str = "ko",
-        rounds: int = 5
+        rounds: int = 5,
+        priority: int = PRIORITY_HIGH
     ) -> Dict:
         """배틀 시작
 
@@ -210,6 +1653,7 @@ class MoltArenaAPI:
             topic: 배틀 토픽 (없으면 자동 생성)
             language: 언어 (en/ko/zh/ja/es, 기본 ko)
             rounds: 라운드 수 (3-10, 기본 5)
+            priority: 요청 우선순위 (일괄 실행은 PRIORITY_NORMAL)
         """
         payload = {
             "agent1Id": agent_id,
@@ -224,22 +1668,121 @@ class MoltArenaAPI:
         if topic:
             payload["topic"] = topic
 
-        return self._request("POST", "/deploy/battle", json=payload)
+        return self._request("POST", "/deploy/battle", json=payload, priority=priority)
+
+    def start_battles(
+        self,
+        agents: List[Any],
+        max_concurrency: int = BATTLE_CONCURRENCY,
+        priority: int = PRIORITY_NORMAL,
+        **battle_options
+    ) -> "BattleReport":
+        """여러 에이전트의 배틀을 최대 max_concurrency개씩 동시에 시작
+
+        요청은 Rate limit 스케줄러를 거치며, 한도가 소진되면(429) 남은 에이전트는
+        시도하지 않고 skipped로 표시합니다 (report.retry_after 후 다시 실행).
+        배틀 시작(POST)은 재시도하지 않으므로 같은 에이전트의 배틀이 중복으로 생기지 않습니다.
+
+        Args:
+            agents: 에이전트 dict(list_agents 결과) 또는 ID 목록
+            max_concurrency: 동시 요청 수 (HTTP 커넥션 풀 크기 이하 권장)
+            priority: 요청 우선순위 (기본 NORMAL - 사용자가 직접 실행한 명령이 먼저 처리됨)
+            **battle_options: start_battle 인자 (opponent_id 제외)
+        """
+        started = time.monotonic()
+        exhausted = threading.Event()
+        retry_after = []
+
+        def launch(agent) -> BattleLaunch:
+            entry = BattleLaunch.for_agent(agent)
+            if exhausted.is_set():
+                entry.skipped, entry.error, entry.status_code = True, "요청 한도 소진으로 시작하지 않음", 429
+                return entry
+            launch_started = time.monotonic()
+            try:
+                entry.record(self.start_battle(entry.agent_id, priority=priority, **battle_options))
+            except MoltArenaAPIError as e:
+                entry.fail(e)
+                if e.status_code == 429:
+                    exhausted.set()
+                    retry_after.append(e.details.get('retry_after'))
+            entry.elapsed = time.monotonic() - launch_started
+            return entry
+
+        if not agents:
+            return BattleReport([], 0.0)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(agents)))) as executor:
+            launches = list(executor.map(launch, agents))
+        return BattleReport(
+            launches, time.monotonic() - started,
+            max((r for r in retry_after if r is not None), default=None)
+        )
 
-    def get_battle(self, battle_id: str) -> Dict:
+    def get_battle(self, battle_id: str, priority: int = PRIORITY_NORMAL) -> Dict:
         """배틀 상태 조회"""
-        return self._request("GET", f"/battles/{battle_id}")
+        return self._request("GET", f"/battles/{battle_id}", priority=priority)
+
+    def watch_battles(self, battles: List[Any], **options) -> Iterator[Dict]:
+        """진행 중인 배틀들을 감시해 끝나는 순서대로 배틀 dict 반환 (BattleWatcher 참고)
+
+        Args:
+            battles: 배틀 ID, start_battle 응답의 battle dict 또는 BattleLaunch 목록
+            **options: BattleWatcher 옵션 (min_interval, max_interval, timeout 등)
+        """
+        watcher = BattleWatcher(self, **options)
+        watcher.add(*battles)
+        return watcher.watch()
 
     def get_my_battles(self, limit: int = 5) -> List[Dict]:
-        """내 최근 배틀 목록"""
-        agents = self.list_agents()
-        if not agents:
-            return []
+        """내 최근 배틀 목록 (모든 에이전트, 최신순)"""
+        return list(self.iter_battle_history(limit=limit))
+
+    def get_battle_history(self, agents: List[Dict] = None, limit: int = None, since: str = None) -> List[Dict]:
+        """여러 에이전트의 배틀 기록 (최신순, iter_battle_history 참고)"""
+        return list(self.iter_battle_history(agents, limit=limit, since=since))
+
+    def get_agent_battles(self, agent_id: str, limit: int, priority: int = PRIORITY_NORMAL) -> List[Dict]:
+        """에이전트 한 명의 최근 배틀 (최신순, 최대 limit개)"""
+        result = self._request("GET", f"/agents/{agent_id}", params={
+            'includeBattles': 'true',
+            'battleLimit': str(limit)
+        }, priority=priority)
+        return result.get('battles') or []
+
+    def iter_battle_history(
+        self,
+        agents: List[Dict] = None,
+        limit: int = None,
+        since: str = None,
+        max_concurrency: int = BATTLE_CONCURRENCY,
+        priority: int = PRIORITY_NORMAL
+    ) -> Iterator[Dict]:
+        """여러 에이전트의 배틀 기록을 최신순 하나의 스트림으로 반환
+
+        에이전트별 첫 페이지를 동시에 조회한 뒤 k-way 병합하며, 내 에이전트끼리의 배틀은 한 번만 반환합니다.
+        다음 페이지는 병합이 그 에이전트의 목록을 끝까지 읽었을 때만 조회하고, 반복을 시작하기 전에는
+        아무것도 조회하지 않습니다. 배틀이 없는 에이전트(total_battles == 0)는 조회하지 않고,
+        에이전트별 조회 수는 limit으로 제한합니다.
+
+        Args:
+            agents: 대상 에이전트 (없으면 내 에이전트 전체)
+            limit: 최대 배틀 수
+            since: ISO 8601 datetime - 이 시간 이후의 배틀만
+            max_concurrency: 첫 페이지를 동시에 조회할 에이전트 수
+            priority: 요청 우선순위
+        """
+        if agents is None:
+            agents = self.list_agents()
+        plan = BattleHistoryPlan(agents, limit, since)
+        if not plan.agents or (limit is not None and limit <= 0):
+            return
 
-        # 첫 번째 에이전트의 최근 배틀 조회
-        agent_id = agents[0]['id']
-        result = self._request("GET", f"/agents/{agent_id}?includeBattles=true&battleLimit={limit}")
-        return result.get('battles', [])
+        def fetch(agent_id: str, want: int) -> List[Dict]:
+            return self.get_agent_battles(agent_id, want, priority=priority)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(plan.agents)))) as executor:
+            first = list(executor.map(lambda agent: fetch(agent['id'], plan.first_limit(agent)), plan.agents))
+        yield from plan.merge([plan.pages(agent, battles, fetch) for agent, battles in zip(plan.agents, first)])
 
     # ==================== 정보 조회 ====================
 
@@ -247,15 +1790,89 @@ class MoltArenaAPI:
         """리더보드 조회"""
         cache_key = f"leaderboard_{limit}"
 
-        cached = get_cached(cache_key)
-        if cached:
+        cached = get_cached(cache_key, api_key=self.api_key)
+        self.metrics.record_cache("GET", "/leaderboard", cached is not None)
+        if cached is not None:
             return cached
 
-        result = self._request("GET", f"/leaderboard?limit={limit}")
+        result = self._conditional_get("/leaderboard", cache_key, params={'limit': str(limit)})
         agents = result.get("agents", [])
-        set_cached(cache_key, agents, 120)  # 2분 캐시
+        set_cached(cache_key, agents, 120, api_key=self.api_key)  # 2분 캐시
         return agents
 
+    def iter_leaderboard(
+        self,
+        page_size: int = LEADERBOARD_PAGE_SIZE,
+        prefetch: int = 2,
+        max_agents: int = None,
+        priority: int = PRIORITY_BACKGROUND
+    ) -> Iterator[Dict]:
+        """전체 리더보드를 순위 순으로 스트리밍 (limit/offset 페이지 단위)
+
+        현재 페이지를 넘기는 동안 다음 prefetch개 페이지를 미리 요청합니다.
+        메모리에는 최대 prefetch + 1 페이지만 유지되며, 요청은 Rate limit 스케줄러를 거칩니다.
+
+        Args:
+            page_size: 페이지 크기 (최대 100)
+            prefetch: 미리 요청할 페이지 수 (0이면 순차 조회)
+            max_agents: 최대 조회 수 (없으면 끝까지)
+            priority: 요청 우선순위 (기본: 백그라운드, 사용자 명령용 예비 한도는 쓰지 않음)
+        """
+        page_size = max(1, min(page_size, LEADERBOARD_PAGE_SIZE))
+
+        def fetch(offset: int) -> Dict:
+            return self._request("GET", "/leaderboard", params={
+                'limit': str(page_size),
+                'offset': str(offset)
+            }, priority=priority)
+
+        first = fetch(0)
+        total = first.get('total')
+        end = total if total is not None else float('inf')
+        if max_agents is not None:
+            end = min(end, max_agents)
+
+        executor = ThreadPoolExecutor(max_workers=prefetch) if prefetch > 0 else None
+        pending = deque()
+        next_offset = page_size
+        yielded = 0
+
+        def schedule():
+            nonlocal next_offset
+            while executor and len(pending) < prefetch and next_offset < end:
+                pending.append(executor.submit(fetch, next_offset))
+                next_offset += page_size
+
+        try:
+            page = first
+            while True:
+                schedule()
+                agents = page.get('agents', [])
+                for agent in agents:
+                    if yielded >= end:
+                        return
+                    yield agent
+                    yielded += 1
+
+                if len(agents) < page_size or yielded >= end:
+                    return
+                if pending:
+                    page = pending.popleft().result()
+                else:
+                    page = fetch(next_offset)
+                    next_offset += page_size
+        finally:
+            for future in pending:
+                future.cancel()
+            if executor:
+                executor.shutdown(wait=False)
+
+    def snapshot_leaderboard(self, max_agents: int = None, prefetch: int = 2) -> "LeaderboardSnapshot":
+        """전체 리더보드(또는 상위 max_agents명)의 컬럼형 스냅샷"""
+        return LeaderboardSnapshot.from_agents(
+            self.iter_leaderboard(max_agents=max_agents, prefetch=prefetch)
+        )
+
     def get_my_rank(self, agent_id: str = None) -> Dict:
         """내 랭킹 조회"""
         if not agent_id:
@@ -266,6 +1883,47 @@ class MoltArenaAPI:
 
         return self.get_agent_status(agent_id)
 
+    # ==================== 토너먼트 ====================
+
+    def list_tournaments(self, status: str = None, limit: int = 10) -> List[Dict]:
+        """토너먼트 목록 조회 (참가 상태 포함)"""
+        params = {'limit': str(limit)}
+        if status:
+            params['status'] = status
+        result = self._conditional_get('/deploy/tournaments', f"tournaments_{status}_{limit}", params=params)
+        return result.get('tournaments', [])
+
+    def join_tournament(self, tournament_id: str, agent_id: str, payment_type: str = 'bp') -> Dict:
+        """토너먼트 참가"""
+        return self._request('POST', f'/deploy/tournaments/{tournament_id}/join', json={
+            'agentId': agent_id,
+            'paymentType': payment_type
+        }, priority=PRIORITY_HIGH)
+
+    def cancel_tournament(self, tournament_id: str, entry_id: str) -> Dict:
+        """토너먼트 참가 취소"""
+        return self._request('POST', f'/deploy/tournaments/{tournament_id}/cancel', json={
+            'entryId': entry_id
+        }, priority=PRIORITY_HIGH)
+
+    def get_tournament_leaderboard(self, tournament_id: str, limit: int = 10) -> Dict:
+        """토너먼트 리더보드 조회"""
+        return self._request('GET', f'/deploy/tournaments/{tournament_id}/leaderboard', params={
+            'limit': str(limit)
+        })
+
+    # ==================== BP & 레퍼럴 ====================
+
+    def get_bp(self, transactions: bool = False, limit: int = 10) -> Dict:
+        """BP 잔액 조회 (transactions=True면 거래내역 포함)"""
+        params = {'transactions': 'true', 'limit': str(limit)} if transactions else None
+        return self._request('GET', '/deploy/bp', params=params)
+
+    def get_referral(self, conversions: bool = False, limit: int = 10) -> Dict:
+        """레퍼럴 현황 조회 (conversions=True면 전환내역 포함)"""
+        params = {'conversions': 'true', 'limit': str(limit)} if conversions else None
+        return self._request('GET', '/deploy/referral', params=params)
+
     # ==================== Heartbeat ====================
 
     def poll_notifications(self, since: str = None) -> List[Dict]:
@@ -273,87 +1931,1595 @@ class MoltArenaAPI:
 
         Args:
             since: ISO 8601 datetime - 이 시간 이후의 알림만 조회
+
+        Raises:
+            MoltArenaAPIError: 폴링 실패 시 (Heartbeat가 커서를 진행시키지 않도록 전파)
         """
-        try:
-            endpoint = "/notifications/poll"
-            if since:
-                endpoint += f"?since={since}"
-            result = self._request("GET", endpoint)
-            return result.get("notifications", [])
-        except MoltArenaAPIError:
-            # 폴링 실패 시 빈 리스트 반환
-            return []
+        result = self.poll_notifications_page(since)
+        return result.get("notifications", [])
 
+    def poll_notifications_page(self, since: str = None, wait: int = None) -> Dict:
+        """알림 폴링 응답 전체 반환 ({"notifications": [...], "polled_at": 서버 시각})
 
-# ============== 포매터 ==============
+        다음 폴링의 since에는 로컬 시계 대신 이 응답의 polled_at을 사용해야 합니다.
+        wait를 주면 long-poll로 요청해 새 알림이 생기거나 wait초가 지날 때까지 응답을 기다립니다.
+        """
+        params = {'since': since} if since else {}
+        if wait:
+            params['wait'] = str(int(wait))
+            return self._request(
+                "GET", "/notifications/poll", params=params,
+                priority=PRIORITY_BACKGROUND, timeout=wait + self.timeout
+            )
+        return self._request("GET", "/notifications/poll", params=params or None, priority=PRIORITY_BACKGROUND)
 
-def format_battle_result(battle: Dict) -> str:
-    """Wordle 스타일 배틀 결과 포맷"""
-    rounds = battle.get('rounds', [])
-    winner_id = battle.get('winner_id')
+    def open_notification_stream(self, since: str = None, last_event_id: str = None) -> requests.Response:
+        """알림 SSE 스트림 연결 (GET /notifications/stream, text/event-stream)
 
-    # 라운드 결과 이모지
-    rounds_display = []
-    for i, r in enumerate(rounds, 1):
-        round_winner = r.get('winner_id') or r.get('winner')
-        if round_winner == winner_id:
-            rounds_display.append(f"R{i} 🟢")
-        else:
-            rounds_display.append(f"R{i} 🔴")
+        반환한 응답은 호출자가 닫아야 합니다. 서버는 timeout보다 짧은 간격으로
+        keep-alive 주석을 보내야 하며, 스트림을 지원하지 않으면 MoltArenaAPIError(404/415 등).
+        """
+        headers = {'Accept': 'text/event-stream', 'Cache-Control': 'no-cache'}
+        if last_event_id:
+            headers['Last-Event-ID'] = last_event_id
+        params = {'since': since} if since else None
+        response = self._send(
+            "GET", "/notifications/stream", priority=PRIORITY_BACKGROUND,
+            headers=headers, params=params, stream=True
+        )
+        if 'text/event-stream' not in response.headers.get('Content-Type', ''):
+            response.close()
+            raise MoltArenaAPIError("알림 스트림을 지원하지 않는 서버입니다.", status_code=415)
+        return response
 
-    rounds_str = " | ".join(rounds_display)
 
-    # 에이전트 정보
-    agent_a = battle.get('agent_a', {})
-    agent_b = battle.get('agent_b', {})
+# ============== 공유 클라이언트 ==============
 
-    if winner_id == agent_a.get('id'):
-        winner_name = agent_a.get('display_name') or agent_a.get('name', 'Agent A')
-        loser_name = agent_b.get('display_name') or agent_b.get('name', 'Agent B')
-        result_text = "Victory!"
-    elif winner_id == agent_b.get('id'):
-        winner_name = agent_b.get('display_name') or agent_b.get('name', 'Agent B')
-        loser_name = agent_a.get('display_name') or agent_a.get('name', 'Agent A')
-        result_text = "Defeat..."
-    else:
-        winner_name = agent_a.get('display_name') or agent_a.get('name', 'Agent A')
-        loser_name = agent_b.get('display_name') or agent_b.get('name', 'Agent B')
-        result_text = "Draw!"
+_client: Optional[MoltArenaAPI] = None
+_client_lock = threading.Lock()
 
-    # 레이팅 변화
-    rating_change = battle.get('rating_change', {})
-    before = rating_change.get('before', 1500)
-    after = rating_change.get('after', 1500)
-    delta = after - before
-    delta_str = f"+{delta}" if delta > 0 else str(delta)
 
-    battle_number = battle.get('battle_number', battle.get('id', '???')[:8])
-    battle_id = battle.get('id', '')
+def get_client() -> MoltArenaAPI:
+    """프로세스 전체에서 공유하는 MoltArenaAPI 반환 (필요 시 생성)"""
+    global _client
+    client = _client
+    if client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MoltArenaAPI()
+            client = _client
+    return client
 
-    return f"""
-🔥 MOLT ARENA BATTLE #{battle_number}
-━━━━━━━━━━━━━━━━━━━━━━
 
-🏆 {winner_name}  vs  {loser_name}
+def set_client(client: Optional[MoltArenaAPI]) -> Optional[MoltArenaAPI]:
+    """공유 클라이언트 교체 (미리 구성한 클라이언트 주입용)
 
-{rounds_str}
+    None을 넘기면 다음 get_client() 호출 시 새로 생성합니다.
 
-📊 Result: {result_text}
-📈 Rating: {before:.0f} → {after:.0f} ({delta_str})
+    Returns:
+        이전 공유 클라이언트
+    """
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+    return previous
 
-🔗 moltarena.crosstoken.io/battle/{battle_id}
-""".strip()
 
+def write_metrics(path: str = None) -> bool:
+    """공유 클라이언트의 요청 메트릭을 파일로 저장 (.prom이면 Prometheus 형식, 아니면 JSON)
 
-def format_agent_status(agent: Dict) -> str:
-    """에이전트 상태 포맷"""
-    name = agent.get('display_name') or agent.get('name', 'Unknown')
-    rating = agent.get('rating', 1500)
-    rd = agent.get('rating_deviation', 350)
-    rank = agent.get('rank')
-    total = agent.get('total_battles', 0)
-    wins = agent.get('wins', 0)
-    losses = agent.get('losses', 0)
+    Args:
+        path: 저장 경로 (기본: MOLTARENA_METRICS_FILE)
+
+    Returns:
+        저장했는지 (경로가 없거나 공유 클라이언트를 만들지 않았으면 False)
+    """
+    path = path or METRICS_FILE
+    client = _client
+    if not path or client is None:
+        return False
+    try:
+        client.metrics.write(path)
+    except OSError:
+        return False
+    return True
+
+
+# ============== 비동기 API 클라이언트 ==============
+
+async def gather_limited(aws, limit: int, return_exceptions: bool = False) -> List[Any]:
+    """코루틴을 최대 limit개씩 동시에 실행
+
+    하나가 실패하거나 호출자가 취소되면 남은 작업도 모두 취소합니다
+    (return_exceptions=True면 실패를 결과로 담고 계속 진행).
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(aw):
+        async with semaphore:
+            return await aw
+
+    tasks = [asyncio.ensure_future(run(aw)) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class AsyncMoltArenaAPI:
+    """MoltArena 비동기 API 클라이언트 (aiohttp)
+
+    MoltArenaAPI와 같은 메서드를 코루틴으로 제공합니다.
+    하나의 aiohttp.ClientSession(커넥션 풀)을 모든 요청이 공유합니다.
+
+    사용 예:
+        async with AsyncMoltArenaAPI() as api:
+            agents = await api.list_agents()
+            statuses = await api.gather(*(api.get_agent_status(a['id']) for a in agents))
+    """
+
+    def __init__(
+        self,
+        api_key: str = None,
+        api_url: str = None,
+        session: "aiohttp.ClientSession" = None,
+        timeout: float = REQUEST_TIMEOUT,
+        pool_maxsize: int = POOL_MAXSIZE,
+        max_concurrency: int = 10,
+        rate_limiter: RateLimiter = None,
+        retry_policy: RetryPolicy = None,
+        circuit_breakers: CircuitBreakers = None,
+        metrics: RequestMetrics = None,
+        single_flight: SingleFlight = None
+    ):
+        """
+        Args:
+            api_key: API Key (기본: MOLTARENA_API_KEY 환경변수)
+            api_url: API URL (기본: MOLTARENA_API_URL 환경변수)
+            session: 재사용할 aiohttp.ClientSession (없으면 첫 요청 시 생성)
+            timeout: 요청 타임아웃 (초)
+            pool_maxsize: 호스트당 최대 커넥션 수
+            max_concurrency: gather()의 기본 동시 실행 수
+            rate_limiter: 요청 스케줄러 (MoltArenaAPI와 공유 가능)
+            retry_policy: 멱등 요청 재시도 정책
+            circuit_breakers: 엔드포인트 그룹별 서킷 브레이커 (MoltArenaAPI와 공유 가능)
+            metrics: 엔드포인트별 요청 메트릭 (MoltArenaAPI와 공유 가능)
+            single_flight: 동시에 들어온 같은 GET을 요청 하나로 합치는 레지스트리 (이벤트 루프별로 합침)
+        """
+        if aiohttp is None:
+            raise MoltArenaAPIError("aiohttp 라이브러리가 필요합니다: pip install aiohttp")
+
+        self.api_key = api_key or MOLTARENA_API_KEY
+        self.api_url = api_url or MOLTARENA_API_URL
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breakers = circuit_breakers or CircuitBreakers()
+        self.metrics = metrics if metrics is not None else RequestMetrics()
+        self.single_flight = single_flight if single_flight is not None else SingleFlight()
+
+        if not self.api_key:
+            raise MoltArenaAPIError(
+                "MOLTARENA_API_KEY 환경변수가 필요합니다. "
+                "moltarena.crosstoken.io/settings/api에서 발급받으세요."
+            )
+
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "User-Agent": "Moltbot-MoltArena-Skill/1.0"
+        }
+
+        self._owns_session = session is None
+        self.session = session
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """공유 세션 반환 (실행 중인 이벤트 루프에서 지연 생성)"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.pool_maxsize)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout, sock_connect=CONNECT_TIMEOUT)
+            )
+            self._owns_session = True
+        return self.session
+
+    async def close(self):
+        """소유한 HTTP 세션 종료"""
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def gather(self, *aws, limit: int = None, return_exceptions: bool = False) -> List[Any]:
+        """여러 요청을 동시에 실행 (기본 최대 max_concurrency개)"""
+        return await gather_limited(aws, limit or self.max_concurrency, return_exceptions)
+
+    async def _request(self, method: str, endpoint: str, priority: int = PRIORITY_NORMAL, **kwargs) -> Dict:
+        """API 요청 실행 후 JSON 응답 반환 (동시에 들어온 같은 GET은 요청 하나로 합침)"""
+        if method.upper() == 'GET':
+            return await self._coalesce(
+                ('request', endpoint, _params_key(kwargs.get('params'))), endpoint,
+                lambda: self._send_json(method, endpoint, priority=priority, **kwargs)
+            )
+        return await self._send_json(method, endpoint, priority=priority, **kwargs)
+
+    async def _send_json(self, method: str, endpoint: str, **kwargs) -> Dict:
+        status, headers, body = await self._send(method, endpoint, **kwargs)
+        return json.loads(body)
+
+    async def _coalesce(self, key: tuple, endpoint: str, func) -> Any:
+        """MoltArenaAPI._coalesce의 비동기 버전 (func는 인자 없는 코루틴 함수)"""
+        if self.single_flight is None:
+            return await func()
+        return await self.single_flight.do_async(
+            (self.api_url, self.api_key) + key, func,
+            on_shared=lambda: self.metrics.record_coalesced('GET', endpoint_template(endpoint))
+        )
+
+    async def _conditional_get(
+        self,
+        endpoint: str,
+        cache_key: str,
+        priority: int = PRIORITY_NORMAL,
+        **kwargs
+    ) -> Dict:
+        """ETag / Last-Modified 검증자를 붙인 조건부 GET (MoltArenaAPI._conditional_get과 동일)"""
+        return await self._coalesce(
+            ('conditional', cache_key, endpoint, _params_key(kwargs.get('params'))), endpoint,
+            lambda: self._revalidate(endpoint, cache_key, priority, **kwargs)
+        )
+
+    async def _revalidate(self, endpoint: str, cache_key: str, priority: int, **kwargs) -> Dict:
+        """_conditional_get의 실제 요청"""
+        stored, headers = _conditional_headers(cache_key, self.api_key)
+        status, response_headers, body = await self._send(
+            "GET", endpoint, priority=priority, headers=headers, **kwargs
+        )
+
+        if status == 304:
+            if stored is not None:
+                set_cached(f"validators:{cache_key}", stored, VALIDATOR_TTL, api_key=self.api_key)
+                return stored['result']
+            status, response_headers, body = await self._send("GET", endpoint, priority=priority, **kwargs)
+
+        result = json.loads(body)
+        _store_validators(cache_key, response_headers, result, self.api_key)
+        return result
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        data: Any = None,
+        priority: int = PRIORITY_NORMAL,
+        headers: Dict[str, str] = None,
+        **kwargs
+    ) -> tuple:
+        """API 요청 실행 후 (status, headers, body) 반환
+
+        Rate limit, 재시도, 서킷 브레이커, 메트릭 기록은 MoltArenaAPI._send와 동일합니다.
+        """
+        request_headers = {**self.headers, **headers} if headers else self.headers
+        url = f"{self.api_url}{endpoint}"
+        template = endpoint_template(endpoint)
+        breaker = self.circuit_breakers.get(endpoint)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        max_attempts = max(1, self.retry_policy.max_attempts)
+
+        # requests와 같이 data=dict는 폼 인코딩, data=None은 생략
+        if data is not None:
+            kwargs['data'] = data
+        if 'json' in kwargs:
+            bytes_sent = len(json.dumps(kwargs['json']).encode())
+        else:
+            bytes_sent = len(data) if isinstance(data, (str, bytes)) else 0
+
+        for attempt in range(1, max_attempts + 1):
+            queued_at = time.perf_counter()
+            try:
+                # 토큰을 기다리는 동안 시험 요청 자리를 차지하지 않도록 토큰을 먼저 받음
+                await self.rate_limiter.acquire_async(priority)
+                probe = breaker.allow()
+            except MoltArenaAPIError as e:
+                self.metrics.record(RequestEvent(
+                    method, template, endpoint, None, 0.0, attempt, time.perf_counter() - queued_at,
+                    error='rate_limit_wait' if e.status_code == 429 else 'circuit_open'
+                ))
+                raise
+
+            try:
+                started = time.perf_counter()
+                try:
+                    async with self._get_session().request(method, url, headers=request_headers, **kwargs) as response:
+                        body = await response.text()
+                        status = response.status
+                        response_headers = response.headers
+                except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+                    timed_out = isinstance(e, asyncio.TimeoutError)
+                    self.metrics.record(RequestEvent(
+                        method, template, endpoint, None, time.perf_counter() - started, attempt,
+                        started - queued_at, error='timeout' if timed_out else 'connection'
+                    ))
+                    breaker.record_failure()
+                    delay = self.retry_policy.delay(attempt) if idempotent else None
+                    if delay is not None and attempt < max_attempts:
+                        await asyncio.sleep(delay)
+                        continue
+                    if timed_out:
+                        raise MoltArenaAPIError("API 요청 시간 초과. 잠시 후 다시 시도해주세요.")
+                    raise MoltArenaAPIError("API 서버에 연결할 수 없습니다. 네트워크를 확인해주세요.")
+
+                self.metrics.record(RequestEvent(
+                    method, template, endpoint, status, time.perf_counter() - started, attempt,
+                    started - queued_at, bytes_sent=bytes_sent, bytes_received=len(body.encode())
+                ))
+                self.rate_limiter.update(response_headers)
+                retry_after = parse_reset_time(response_headers.get('Retry-After'))
+
+                if status == 429:
+                    if retry_after is None:
+                        retry_after = parse_reset_time(response_headers.get('X-RateLimit-Reset'))
+                    self.rate_limiter.block(retry_after if retry_after is not None else 60.0)
+                    if attempt < max_attempts:
+                        continue
+                elif status in RETRYABLE_STATUS_CODES:
+                    breaker.record_failure()
+                    delay = self.retry_policy.delay(attempt, retry_after) if idempotent else None
+                    if delay is not None and attempt < max_attempts:
+                        await asyncio.sleep(delay)
+                        continue
+                else:
+                    breaker.record_success()
+                break
+            finally:
+                if probe:
+                    breaker.release()
+
+        # 에러 응답 처리
+        if status >= 400:
+            try:
+                error_msg = json.loads(body).get('error', {}).get('message', body)
+            except (ValueError, AttributeError):
+                error_msg = body
+
+            raise MoltArenaAPIError(
+                f"API 오류: {error_msg}",
+                status_code=status
+            )
+
+        return status, response_headers, body
+
+    # ==================== 에이전트 관리 ====================
+
+    async def deploy_agent(
+        self,
+        name: str,
+        style: str = "witty",
+        display_name: str = None,
+        traits: List[str] = None,
+        backstory: str = None,
+        catchphrase: str = None
+    ) -> Dict:
+        """새 에이전트 배포"""
+        payload = {
+            "name": name,
+            "displayName": display_name or name,
+            "personality": {
+                "style": style,
+                "traits": traits or [],
+                "backstory": backstory,
+                "catchphrase": catchphrase
+            }
+        }
+
+        result = await self._request("POST", "/deploy/agent", json=payload, priority=PRIORITY_HIGH)
+        # 캐시 무효화
+        invalidate_cached("my_agents", api_key=self.api_key)
+        return result
+
+    async def list_agents(self, use_cache: bool = True) -> List[Dict]:
+        """내 에이전트 목록 조회"""
+        cache_key = "my_agents"
+
+        if use_cache:
+            cached = get_cached(cache_key, api_key=self.api_key)
+            self.metrics.record_cache("GET", "/deploy/list", cached is not None)
+            if cached is not None:
+                return cached
+
+        result = await self._conditional_get("/deploy/list", cache_key)
+        agents = result.get("agents", [])
+        set_cached(cache_key, agents, api_key=self.api_key)
+        return agents
+
+    async def get_agent_status(self, agent_id: str) -> Dict:
+        """에이전트 상태 조회"""
+        return await self._request("GET", f"/deploy/status/{agent_id}")
+
+    async def import_moltbook(self, username: str, sync_karma: bool = True) -> Dict:
+        """Moltbook 에이전트 가져오기"""
+        return await self._request("POST", "/deploy/import/moltbook", json={
+            "moltbookUsername": username,
+            "syncKarma": sync_karma,
+            "linkOwner": True
+        })
+
+    # ==================== External API 관리 ====================
+
+    async def get_external_api(self, agent_id: str) -> Dict:
+        """에이전트의 External API 설정 조회"""
+        return await self._request("GET", f"/agents/{agent_id}/external-api")
+
+    async def set_external_api(
+        self,
+        agent_id: str,
+        endpoint: str,
+        timeout: int = 5000,
+        fallback_to_internal: bool = True
+    ) -> Dict:
+        """에이전트에 External API 설정"""
+        return await self._request("PATCH", f"/agents/{agent_id}/external-api", json={
+            "endpoint": endpoint,
+            "timeout": timeout,
+            "fallbackToInternal": fallback_to_internal
+        })
+
+    async def remove_external_api(self, agent_id: str) -> Dict:
+        """에이전트의 External API 설정 제거"""
+        return await self._request("DELETE", f"/agents/{agent_id}/external-api")
+
+    async def test_external_api(self, agent_id: str) -> Dict:
+        """에이전트의 External API 연결 테스트"""
+        return await self._request("POST", f"/agents/{agent_id}/external-api")
+
+    # ==================== 배틀 관리 ====================
+
+    async def start_battle(
+        self,
+        agent_id: str,
+        matchmaking: str = "similar_rating",
+        opponent_id: str = None,
+        topic: str = None,
+        language: str = "ko",
+        rounds: int = 5,
+        priority: int = PRIORITY_HIGH
+    ) -> Dict:
+        """배틀 시작 (인자는 MoltArenaAPI.start_battle과 동일)"""
+        payload = {
+            "agent1Id": agent_id,
+            "language": language,
+            "rounds": rounds
+        }
+
+        if opponent_id:
+            payload["agent2Id"] = opponent_id
+
+        if topic:
+            payload["topic"] = topic
+
+        return await self._request("POST", "/deploy/battle", json=payload, priority=priority)
+
+    async def start_battles(
+        self,
+        agents: List[Any],
+        max_concurrency: int = None,
+        priority: int = PRIORITY_NORMAL,
+        **battle_options
+    ) -> "BattleReport":
+        """여러 에이전트의 배틀을 동시에 시작 (MoltArenaAPI.start_battles 참고, 기본 최대 max_concurrency개)"""
+        started = time.monotonic()
+        exhausted = asyncio.Event()
+        retry_after = []
+
+        async def launch(agent) -> BattleLaunch:
+            entry = BattleLaunch.for_agent(agent)
+            if exhausted.is_set():
+                entry.skipped, entry.error, entry.status_code = True, "요청 한도 소진으로 시작하지 않음", 429
+                return entry
+            launch_started = time.monotonic()
+            try:
+                entry.record(await self.start_battle(entry.agent_id, priority=priority, **battle_options))
+            except MoltArenaAPIError as e:
+                entry.fail(e)
+                if e.status_code == 429:
+                    exhausted.set()
+                    retry_after.append(e.details.get('retry_after'))
+            entry.elapsed = time.monotonic() - launch_started
+            return entry
+
+        launches = await gather_limited([launch(a) for a in agents], max_concurrency or self.max_concurrency)
+        return BattleReport(
+            launches, time.monotonic() - started,
+            max((r for r in retry_after if r is not None), default=None)
+        )
+
+    async def get_battle(self, battle_id: str, priority: int = PRIORITY_NORMAL) -> Dict:
+        """배틀 상태 조회"""
+        return await self._request("GET", f"/battles/{battle_id}", priority=priority)
+
+    async def watch_battles(self, battles: List[Any], **options) -> AsyncIterator[Dict]:
+        """진행 중인 배틀들을 감시해 끝나는 순서대로 반환 (MoltArenaAPI.watch_battles 참고)"""
+        watcher = BattleWatcher(self, **options)
+        watcher.add(*battles)
+        async for battle in watcher.watch_async():
+            yield battle
+
+    async def get_my_battles(self, limit: int = 5) -> List[Dict]:
+        """내 최근 배틀 목록 (모든 에이전트, 최신순)"""
+        return await self.get_battle_history(limit=limit)
+
+    async def get_agent_battles(self, agent_id: str, limit: int, priority: int = PRIORITY_NORMAL) -> List[Dict]:
+        """에이전트 한 명의 최근 배틀 (최신순, 최대 limit개)"""
+        result = await self._request("GET", f"/agents/{agent_id}", params={
+            'includeBattles': 'true',
+            'battleLimit': str(limit)
+        }, priority=priority)
+        return result.get('battles') or []
+
+    async def get_battle_history(self, agents: List[Dict] = None, limit: int = None, since: str = None) -> List[Dict]:
+        """여러 에이전트의 배틀 기록 (최신순, iter_battle_history 참고)"""
+        return [battle async for battle in self.iter_battle_history(agents, limit=limit, since=since)]
+
+    async def iter_battle_history(
+        self,
+        agents: List[Dict] = None,
+        limit: int = None,
+        since: str = None,
+        max_concurrency: int = None,
+        priority: int = PRIORITY_NORMAL
+    ) -> AsyncIterator[Dict]:
+        """여러 에이전트의 배틀 기록을 최신순 하나의 스트림으로 반환 (MoltArenaAPI.iter_battle_history 참고)"""
+        if agents is None:
+            agents = await self.list_agents()
+        plan = BattleHistoryPlan(agents, limit, since)
+        if not plan.agents or (limit is not None and limit <= 0):
+            return
+
+        async def fetch(agent_id: str, want: int) -> List[Dict]:
+            return await self.get_agent_battles(agent_id, want, priority=priority)
+
+        first = await gather_limited([fetch(agent['id'], plan.first_limit(agent)) for agent in plan.agents],
+                                     max_concurrency or self.max_concurrency)
+        histories = [plan.pages_async(agent, battles, fetch) for agent, battles in zip(plan.agents, first)]
+        try:
+            async for battle in plan.merge_async(histories):
+                yield battle
+        finally:
+            for history in histories:
+                await history.aclose()
+
+    # ==================== 정보 조회 ====================
+
+    async def get_leaderboard(self, limit: int = 10) -> List[Dict]:
+        """리더보드 조회"""
+        cache_key = f"leaderboard_{limit}"
+
+        cached = get_cached(cache_key, api_key=self.api_key)
+        self.metrics.record_cache("GET", "/leaderboard", cached is not None)
+        if cached is not None:
+            return cached
+
+        result = await self._conditional_get("/leaderboard", cache_key, params={'limit': str(limit)})
+        agents = result.get("agents", [])
+        set_cached(cache_key, agents, 120, api_key=self.api_key)  # 2분 캐시
+        return agents
+
+    async def iter_leaderboard(
+        self,
+        page_size: int = LEADERBOARD_PAGE_SIZE,
+        prefetch: int = 2,
+        max_agents: int = None,
+        priority: int = PRIORITY_BACKGROUND
+    ) -> AsyncIterator[Dict]:
+        """전체 리더보드를 순위 순으로 스트리밍 (MoltArenaAPI.iter_leaderboard와 동일)
+
+        사용 예:
+            async for agent in api.iter_leaderboard(prefetch=3):
+                ...
+        """
+        page_size = max(1, min(page_size, LEADERBOARD_PAGE_SIZE))
+
+        async def fetch(offset: int) -> Dict:
+            return await self._request("GET", "/leaderboard", params={
+                'limit': str(page_size),
+                'offset': str(offset)
+            }, priority=priority)
+
+        first = await fetch(0)
+        total = first.get('total')
+        end = total if total is not None else float('inf')
+        if max_agents is not None:
+            end = min(end, max_agents)
+
+        pending = deque()
+        next_offset = page_size
+        yielded = 0
+
+        def schedule():
+            nonlocal next_offset
+            while len(pending) < prefetch and next_offset < end:
+                pending.append(asyncio.ensure_future(fetch(next_offset)))
+                next_offset += page_size
+
+        try:
+            page = first
+            while True:
+                schedule()
+                agents = page.get('agents', [])
+                for agent in agents:
+                    if yielded >= end:
+                        return
+                    yield agent
+                    yielded += 1
+
+                if len(agents) < page_size or yielded >= end:
+                    return
+                if pending:
+                    page = await pending.popleft()
+                else:
+                    page = await fetch(next_offset)
+                    next_offset += page_size
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def snapshot_leaderboard(self, max_agents: int = None, prefetch: int = 2) -> "LeaderboardSnapshot":
+        """전체 리더보드(또는 상위 max_agents명)의 컬럼형 스냅샷"""
+        snapshot = LeaderboardSnapshot()
+        async for agent in self.iter_leaderboard(max_agents=max_agents, prefetch=prefetch):
+            snapshot.append(agent)
+        return snapshot
+
+    async def get_my_rank(self, agent_id: str = None) -> Dict:
+        """내 랭킹 조회"""
+        if not agent_id:
+            agents = await self.list_agents()
+            if not agents:
+                raise MoltArenaAPIError("등록된 에이전트가 없습니다.")
+            agent_id = agents[0]['id']
+
+        return await self.get_agent_status(agent_id)
+
+    # ==================== 토너먼트 ====================
+
+    async def list_tournaments(self, status: str = None, limit: int = 10) -> List[Dict]:
+        """토너먼트 목록 조회 (참가 상태 포함)"""
+        params = {'limit': str(limit)}
+        if status:
+            params['status'] = status
+        result = await self._conditional_get('/deploy/tournaments', f"tournaments_{status}_{limit}", params=params)
+        return result.get('tournaments', [])
+
+    async def join_tournament(self, tournament_id: str, agent_id: str, payment_type: str = 'bp') -> Dict:
+        """토너먼트 참가"""
+        return await self._request('POST', f'/deploy/tournaments/{tournament_id}/join', json={
+            'agentId': agent_id,
+            'paymentType': payment_type
+        }, priority=PRIORITY_HIGH)
+
+    async def cancel_tournament(self, tournament_id: str, entry_id: str) -> Dict:
+        """토너먼트 참가 취소"""
+        return await self._request('POST', f'/deploy/tournaments/{tournament_id}/cancel', json={
+            'entryId': entry_id
+        }, priority=PRIORITY_HIGH)
+
+    async def get_tournament_leaderboard(self, tournament_id: str, limit: int = 10) -> Dict:
+        """토너먼트 리더보드 조회"""
+        return await self._request('GET', f'/deploy/tournaments/{tournament_id}/leaderboard', params={
+            'limit': str(limit)
+        })
+
+    # ==================== BP & 레퍼럴 ====================
+
+    async def get_bp(self, transactions: bool = False, limit: int = 10) -> Dict:
+        """BP 잔액 조회 (transactions=True면 거래내역 포함)"""
+        params = {'transactions': 'true', 'limit': str(limit)} if transactions else None
+        return await self._request('GET', '/deploy/bp', params=params)
+
+    async def get_referral(self, conversions: bool = False, limit: int = 10) -> Dict:
+        """레퍼럴 현황 조회 (conversions=True면 전환내역 포함)"""
+        params = {'conversions': 'true', 'limit': str(limit)} if conversions else None
+        return await self._request('GET', '/deploy/referral', params=params)
+
+    # ==================== Heartbeat ====================
+
+    async def poll_notifications(self, since: str = None) -> List[Dict]:
+        """알림 폴링 (Heartbeat용)
+
+        Args:
+            since: ISO 8601 datetime - 이 시간 이후의 알림만 조회
+
+        Raises:
+            MoltArenaAPIError: 폴링 실패 시 (Heartbeat가 커서를 진행시키지 않도록 전파)
+        """
+        result = await self.poll_notifications_page(since)
+        return result.get("notifications", [])
+
+    async def poll_notifications_page(self, since: str = None, wait: int = None) -> Dict:
+        """알림 폴링 응답 전체 반환 ({"notifications": [...], "polled_at": 서버 시각})
+
+        다음 폴링의 since에는 로컬 시계 대신 이 응답의 polled_at을 사용해야 합니다.
+        wait를 주면 long-poll로 요청합니다 (MoltArenaAPI.poll_notifications_page 참고).
+        """
+        params = {'since': since} if since else {}
+        if wait:
+            params['wait'] = str(int(wait))
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=CONNECT_TIMEOUT, sock_read=wait + self.timeout)
+            return await self._request(
+                "GET", "/notifications/poll", params=params, priority=PRIORITY_BACKGROUND, timeout=timeout
+            )
+        return await self._request("GET", "/notifications/poll", params=params or None, priority=PRIORITY_BACKGROUND)
+
+
+# ============== 에이전트 이름 검색 ==============
+
+class AgentResolver:
+    """에이전트 이름 검색 인덱스
+
+    에이전트 목록마다 한 번 만들어 재사용합니다.
+    - id / name / display_name 정확 일치 (대소문자 무시)
+    - 3-gram 인덱스로 부분 문자열 후보를 좁힌 뒤 접두사 > 부분 문자열 순으로 순위
+    - 일치하는 것이 없으면 difflib 유사도로 오타 보정
+    같은 순위의 후보가 여럿이면 임의로 고르지 않고 모호하다고 보고합니다.
+    """
+
+    NGRAM = 3
+    FUZZY_CUTOFF = 0.75
+
+    def __init__(self, agents: List[Dict]):
+        self.agents = agents
+        self._exact: Dict[str, List[int]] = {}
+        self._grams: Dict[str, set] = {}
+        self._keys: List[Tuple[str, ...]] = []
+
+        for i, agent in enumerate(agents):
+            keys = tuple(dict.fromkeys(
+                k.lower() for k in (agent.get('name'), agent.get('display_name')) if k
+            ))
+            self._keys.append(keys)
+
+            for key in keys + ((str(agent['id']).lower(),) if agent.get('id') else ()):
+                self._exact.setdefault(key, []).append(i)
+            for key in keys:
+                for gram in self._ngrams(key):
+                    self._grams.setdefault(gram, set()).add(i)
+
+    @classmethod
+    def _ngrams(cls, text: str) -> set:
+        return {text[i:i + cls.NGRAM] for i in range(len(text) - cls.NGRAM + 1)}
+
+    def _candidates(self, query: str) -> range:
+        """query를 부분 문자열로 가질 수 있는 에이전트 인덱스"""
+        if len(query) < self.NGRAM:
+            return range(len(self.agents))
+        postings = sorted((self._grams.get(g, set()) for g in self._ngrams(query)), key=len)
+        return sorted(set.intersection(*postings)) if postings else []
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[float, Dict]]:
+        """(점수, 에이전트) 목록을 점수 높은 순으로 반환
+
+        점수: 정확 일치 1.0, 접두사 0.9, 부분 문자열 0.8, 유사 이름 0.0~0.75
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        exact = self._exact.get(query)
+        if exact:
+            return [(1.0, self.agents[i]) for i in exact[:limit]]
+
+        ranked = []
+        for i in self._candidates(query):
+            keys = self._keys[i]
+            if any(k.startswith(query) for k in keys):
+                ranked.append((0.9, i))
+            elif any(query in k for k in keys):
+                ranked.append((0.8, i))
+
+        if not ranked:
+            ranked = self._fuzzy(query)
+
+        ranked.sort(key=lambda item: -item[0])
+        return [(score, self.agents[i]) for score, i in ranked[:limit]]
+
+    def _fuzzy(self, query: str) -> List[Tuple[float, int]]:
+        """3-gram을 공유하는 후보 중 유사도가 높은 이름"""
+        shared: Dict[int, int] = {}
+        for gram in self._ngrams(query):
+            for i in self._grams.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+        pool = sorted(shared, key=lambda i: -shared[i])[:50] if shared else range(len(self.agents))
+
+        ranked = []
+        for i in pool:
+            ratio = max(
+                (difflib.SequenceMatcher(None, query, k).ratio() for k in self._keys[i]),
+                default=0.0
+            )
+            if ratio >= self.FUZZY_CUTOFF:
+                ranked.append((ratio * self.FUZZY_CUTOFF, i))
+        return ranked
+
+    def resolve(self, query: str) -> Tuple[Optional[Dict], List[Dict]]:
+        """이름으로 에이전트 하나 찾기
+
+        Returns:
+            (에이전트, []) - 하나로 특정됨
+            (None, 후보 목록) - 같은 순위 후보가 여럿 (모호함)
+            (None, []) - 찾지 못함
+        """
+        matches = self.search(query, limit=5)
+        if not matches:
+            return None, []
+        best = matches[0][0]
+        tied = [agent for score, agent in matches if score == best]
+        if len(tied) == 1:
+            return tied[0], []
+        return None, tied
+
+
+_resolver: Optional[AgentResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver(agents: List[Dict]) -> AgentResolver:
+    """에이전트 목록에 대한 검색 인덱스 (같은 목록 객체면 재사용)"""
+    global _resolver
+    resolver = _resolver
+    if resolver is None or resolver.agents is not agents:
+        resolver = AgentResolver(agents)
+        with _resolver_lock:
+            _resolver = resolver
+    return resolver
+
+
+def find_agent(agents: List[Dict], agent_name: str = None) -> Tuple[Optional[Dict], Optional[str]]:
+    """이름으로 에이전트 찾기 (이름이 없으면 첫 번째 에이전트)
+
+    Returns:
+        (에이전트, None) 또는 (None, 사용자에게 보여줄 오류 메시지)
+    """
+    if not agent_name:
+        return agents[0], None
+
+    agent, ambiguous = get_resolver(agents).resolve(agent_name)
+    if agent:
+        return agent, None
+    if ambiguous:
+        names = ", ".join(a.get('display_name') or a.get('name', '?') for a in ambiguous)
+        return None, f"'{agent_name}'에 해당하는 에이전트가 여러 개입니다: {names}\n더 정확한 이름을 입력해주세요."
+    return None, f"'{agent_name}' 에이전트를 찾을 수 없습니다."
+
+
+# ============== 리더보드 스냅샷 ==============
+
+class LeaderboardSnapshot:
+    """리더보드 한 시점의 컬럼형 스냅샷
+
+    에이전트별 dict 대신 id / 순위 / 레이팅 / RD / 승수를 병렬 배열(array)로 저장합니다.
+    5000명 기준 dict 리스트보다 훨씬 작고, 두 스냅샷 비교는 id → 행 인덱스 조인 한 번으로 끝납니다.
+    """
+
+    __slots__ = ('taken_at', 'ids', 'names', 'ranks', 'ratings', 'rds', 'wins', '_index')
+
+    def __init__(self, taken_at: float = None):
+        self.taken_at = taken_at if taken_at is not None else time.time()
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.ranks = array('i')
+        self.ratings = array('d')
+        self.rds = array('d')
+        self.wins = array('i')
+        self._index: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def from_agents(cls, agents, taken_at: float = None) -> "LeaderboardSnapshot":
+        """리더보드 에이전트 목록(또는 iter_leaderboard 이터레이터)으로 스냅샷 생성"""
+        snapshot = cls(taken_at)
+        for agent in agents:
+            snapshot.append(agent)
+        return snapshot
+
+    def append(self, agent: Dict) -> None:
+        """리더보드 에이전트 한 명 추가 (rank가 없으면 추가 순서를 순위로 사용)"""
+        self.ids.append(str(agent.get('id')))
+        self.names.append(agent.get('display_name') or agent.get('name') or '')
+        self.ranks.append(int(agent.get('rank') or len(self.ids)))
+        self.ratings.append(float(agent.get('rating') or 0))
+        self.rds.append(float(agent.get('rating_deviation') or 0))
+        self.wins.append(int(agent.get('wins') or 0))
+        self._index = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def index(self) -> Dict[str, int]:
+        """agent id → 행 번호"""
+        if self._index is None:
+            self._index = {agent_id: row for row, agent_id in enumerate(self.ids)}
+        return self._index
+
+    def row(self, i: int) -> Dict:
+        return {
+            'id': self.ids[i],
+            'name': self.names[i],
+            'rank': self.ranks[i],
+            'rating': self.ratings[i],
+            'rating_deviation': self.rds[i],
+            'wins': self.wins[i]
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            'taken_at': self.taken_at,
+            'ids': self.ids,
+            'names': self.names,
+            'ranks': self.ranks.tolist(),
+            'ratings': self.ratings.tolist(),
+            'rds': self.rds.tolist(),
+            'wins': self.wins.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LeaderboardSnapshot":
+        snapshot = cls(data['taken_at'])
+        snapshot.ids = list(data['ids'])
+        snapshot.names = list(data['names'])
+        snapshot.ranks = array('i', data['ranks'])
+        snapshot.ratings = array('d', data['ratings'])
+        snapshot.rds = array('d', data['rds'])
+        snapshot.wins = array('i', data['wins'])
+        return snapshot
+
+    def diff(self, previous: "LeaderboardSnapshot") -> "LeaderboardDiff":
+        """previous → self 변화 계산"""
+        old_index = previous.index
+        movers = []
+        new_entries = []
+        rating_deltas: Dict[str, float] = {}
+
+        for j, agent_id in enumerate(self.ids):
+            i = old_index.get(agent_id)
+            if i is None:
+                new_entries.append(self.row(j))
+                continue
+            rank_delta = previous.ranks[i] - self.ranks[j]  # 양수 = 상승
+            rating_delta = self.ratings[j] - previous.ratings[i]
+            if rating_delta:
+                rating_deltas[agent_id] = rating_delta
+            if rank_delta:
+                movers.append({
+                    **self.row(j),
+                    'old_rank': previous.ranks[i],
+                    'rank_delta': rank_delta,
+                    'rating_delta': rating_delta
+                })
+
+        new_index = self.index
+        dropouts = [previous.row(i) for i, agent_id in enumerate(previous.ids) if agent_id not in new_index]
+        movers.sort(key=lambda m: (-abs(m['rank_delta']), m['rank']))
+
+        return LeaderboardDiff(
+            since=previous.taken_at,
+            until=self.taken_at,
+            movers=movers,
+            new_entries=new_entries,
+            dropouts=dropouts,
+            rating_deltas=rating_deltas
+        )
+
+
+@dataclass
+class LeaderboardDiff:
+    """두 리더보드 스냅샷 사이의 변화"""
+    since: float
+    until: float
+    movers: List[Dict]          # 순위가 바뀐 에이전트 (변동 폭 큰 순), rank_delta > 0이면 상승
+    new_entries: List[Dict]     # 새로 진입
+    dropouts: List[Dict]        # 범위 밖으로 이탈
+    rating_deltas: Dict[str, float]  # agent id → 레이팅 변화 (변화 없는 에이전트 제외)
+
+
+class LeaderboardSnapshotStore:
+    """리더보드 스냅샷 보관소 (최근 max_snapshots개)
+
+    directory를 지정하면 스냅샷을 JSON 파일로 저장해 프로세스 재시작 후에도 비교할 수 있습니다.
+    """
+
+    def __init__(self, directory: str = None, max_snapshots: int = 24):
+        self.directory = os.path.expanduser(directory) if directory else None
+        self.max_snapshots = max_snapshots
+        self._snapshots: deque = deque(maxlen=max_snapshots)
+        self._lock = threading.Lock()
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            for path in sorted(glob.glob(os.path.join(self.directory, 'leaderboard_*.json')))[-max_snapshots:]:
+                try:
+                    with open(path, encoding='utf-8') as f:
+                        self._snapshots.append(LeaderboardSnapshot.from_dict(json.load(f)))
+                except (OSError, ValueError, KeyError):
+                    continue
+
+    def add(self, snapshot: LeaderboardSnapshot) -> Optional[LeaderboardDiff]:
+        """스냅샷 추가 후 직전 스냅샷과의 변화 반환 (첫 스냅샷이면 None)"""
+        with self._lock:
+            previous = self._snapshots[-1] if self._snapshots else None
+            self._snapshots.append(snapshot)
+            if self.directory:
+                self._persist(snapshot)
+        return snapshot.diff(previous) if previous is not None else None
+
+    def _persist(self, snapshot: LeaderboardSnapshot) -> None:
+        path = os.path.join(self.directory, f"leaderboard_{snapshot.taken_at:017.6f}.json")
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, path)
+            for old_path in sorted(glob.glob(os.path.join(self.directory, 'leaderboard_*.json')))[:-self.max_snapshots]:
+                os.remove(old_path)
+        except OSError:
+            pass
+
+    def latest(self) -> Optional[LeaderboardSnapshot]:
+        with self._lock:
+            return self._snapshots[-1] if self._snapshots else None
+
+    def snapshots(self) -> List[LeaderboardSnapshot]:
+        with self._lock:
+            return list(self._snapshots)
+
+    def diff(self, since: float = None) -> Optional[LeaderboardDiff]:
+        """최신 스냅샷과 since 시각 이전의 가장 최근 스냅샷 비교 (since가 없으면 직전 스냅샷)"""
+        snapshots = self.snapshots()
+        if len(snapshots) < 2:
+            return None
+        latest = snapshots[-1]
+        if since is None:
+            return latest.diff(snapshots[-2])
+        candidates = [s for s in snapshots[:-1] if s.taken_at <= since]
+        base = candidates[-1] if candidates else snapshots[0]
+        return latest.diff(base)
+
+
+# ============== 일괄 배틀 ==============
+
+@dataclass
+class BattleLaunch:
+    """일괄 배틀에서 에이전트 하나의 결과"""
+    agent_id: Optional[str]
+    agent_name: str
+    battle_id: Optional[str] = None
+    opponent_id: Optional[str] = None
+    opponent_name: Optional[str] = None
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+    skipped: bool = False  # 요청 한도 소진으로 시작하지 않음 (나중에 다시 시도 가능)
+    elapsed: float = 0.0
+
+    @classmethod
+    def for_agent(cls, agent: Any) -> "BattleLaunch":
+        """에이전트 dict(list_agents 결과) 또는 ID로 생성"""
+        if isinstance(agent, dict):
+            return cls(agent.get('id'), agent.get('display_name') or agent.get('name') or agent.get('id'))
+        return cls(agent, agent)
+
+    @property
+    def ok(self) -> bool:
+        return self.battle_id is not None and self.error is None
+
+    def record(self, result: Dict) -> None:
+        """start_battle 응답 반영 (participants.agent2가 상대)"""
+        battle = result.get('battle', {})
+        opponent = battle.get('participants', {}).get('agent2', {})
+        self.battle_id = battle.get('id')
+        self.opponent_id = opponent.get('id')
+        self.opponent_name = opponent.get('displayName') or opponent.get('name')
+
+    def fail(self, error: MoltArenaAPIError) -> None:
+        self.error = error.message
+        self.status_code = error.status_code
+        self.skipped = error.status_code == 429
+
+
+@dataclass
+class BattleReport:
+    """일괄 배틀 결과"""
+    launches: List[BattleLaunch]
+    elapsed: float
+    retry_after: Optional[float] = None  # 한도가 소진됐다면 다시 시도할 수 있을 때까지 (초)
+
+    @property
+    def started(self) -> List[BattleLaunch]:
+        return [l for l in self.launches if l.ok]
+
+    @property
+    def failed(self) -> List[BattleLaunch]:
+        return [l for l in self.launches if not l.ok and not l.skipped]
+
+    @property
+    def skipped(self) -> List[BattleLaunch]:
+        return [l for l in self.launches if l.skipped]
+
+    def to_dict(self) -> Dict:
+        return {
+            'started': [asdict(l) for l in self.started],
+            'failed': [asdict(l) for l in self.failed],
+            'skipped': [asdict(l) for l in self.skipped],
+            'elapsed': round(self.elapsed, 3),
+            'retry_after': self.retry_after,
+        }
+
+
+# ============== 배틀 완료 감시 ==============
+
+BATTLE_FINAL_STATUSES = frozenset({'completed', 'cancelled', 'failed', 'expired'})
+
+
+class _WatchedBattle:
+    """감시 중인 배틀 하나의 진행 상황과 조회 일정"""
+    __slots__ = ('battle_id', 'added_at', 'started_at', 'total_rounds', 'current_round',
+                 'first_round', 'expected_end', 'polls', 'overdue')
+
+    def __init__(self, battle_id: str, added_at: float):
+        self.battle_id = battle_id
+        self.added_at = added_at
+        self.started_at: Optional[float] = None  # 서버 시각 (epoch 초)
+        self.total_rounds = 5
+        self.current_round = 1
+        self.first_round = 1  # 감시를 시작할 때의 라운드
+        self.expected_end = added_at
+        self.polls = 0
+        self.overdue = 0  # 예상 종료 이후 연속으로 진행 중이었던 횟수
+
+
+class BattleWatcher:
+    """진행 중인 배틀 여러 개를 한꺼번에 감시해 끝나는 순서대로 반환
+
+    배틀마다 남은 라운드 수 × 라운드당 소요 시간으로 끝날 시각을 추정해 그때 조회하고,
+    추정보다 늦어지면 min_interval부터 두 배씩 간격을 늘립니다 (max_interval 상한).
+    라운드당 소요 시간은 끝난 배틀의 시작/종료 시각으로 계속 보정합니다.
+    끝난 배틀은 더 조회하지 않으며, 조회는 Rate limit 스케줄러를 거치고
+    한도가 소진되면 retry_after만큼 미룹니다.
+
+    동기 클라이언트는 watch(), AsyncMoltArenaAPI는 watch_async()를 사용합니다.
+    반환하는 배틀 dict는 format_battle_result()에 그대로 넘길 수 있습니다.
+    """
+
+    SMOOTHING = 0.3  # 라운드당 소요 시간 지수 이동 평균 가중치
+
+    def __init__(
+        self,
+        api: Any = None,
+        min_interval: float = BATTLE_POLL_MIN_INTERVAL,
+        max_interval: float = BATTLE_POLL_MAX_INTERVAL,
+        timeout: float = BATTLE_WATCH_TIMEOUT,
+        round_seconds: float = BATTLE_ROUND_SECONDS,
+        max_concurrency: int = BATTLE_CONCURRENCY,
+        priority: int = PRIORITY_BACKGROUND
+    ):
+        self.api = api
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.timeout = timeout
+        self.round_seconds = round_seconds
+        self.max_concurrency = max(1, max_concurrency)
+        self.priority = priority
+        self.observed = 0  # 소요 시간을 반영한 배틀 수
+        self.polls = 0
+        self.errors: Dict[str, str] = {}  # 감시를 중단한 배틀 ID -> 사유
+        self._battles: Dict[str, _WatchedBattle] = {}
+        self._schedule: List[tuple] = []  # (조회 시각, 순번, 배틀 ID) 최소 힙
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._battles)
+
+    def add(self, *battles: Any) -> None:
+        """감시할 배틀 추가 (배틀 ID, start_battle 응답/battle dict, BattleLaunch)"""
+        now = time.monotonic()
+        for battle in battles:
+            if isinstance(battle, BattleLaunch):
+                battle_id, info = battle.battle_id, {}
+            elif isinstance(battle, dict):
+                info = battle.get('battle', battle)
+                battle_id = info.get('id')
+            else:
+                battle_id, info = battle, {}
+            if not battle_id or battle_id in self._battles:
+                continue
+            watched = _WatchedBattle(battle_id, now)
+            self._battles[battle_id] = watched
+            self._update(watched, info, now)
+            watched.first_round = watched.current_round
+            self._push(watched, now)
+
+    # ---------- 일정 ----------
+
+    def _update(self, watched: _WatchedBattle, battle: Dict, now: float) -> None:
+        """응답의 라운드 진행 상황으로 예상 종료 시각 갱신"""
+        rounds = battle.get('rounds')
+        total = battle.get('total_rounds')
+        if total is None and isinstance(rounds, int):
+            total = rounds
+        if total:
+            watched.total_rounds = int(total)
+        current = battle.get('current_round')
+        if current is None and isinstance(rounds, list) and rounds:
+            current = len(rounds) + 1
+        progressed = False
+        if current and int(current) > watched.current_round:
+            watched.current_round = int(current)
+            watched.overdue = 0
+            progressed = True
+        if watched.started_at is None:
+            watched.started_at = parse_timestamp(battle.get('started_at') or battle.get('created_at'))
+
+        remaining = max(watched.total_rounds - watched.current_round + 1, 0)
+        if watched.polls == 0 or progressed:
+            watched.expected_end = now + remaining * self.round_seconds
+
+    def _push(self, watched: _WatchedBattle, now: float, delay: float = None) -> None:
+        if delay is None:
+            if watched.expected_end > now:
+                delay = watched.expected_end - now
+            else:
+                delay = self.min_interval * (2 ** watched.overdue)
+                watched.overdue += 1
+        delay = min(max(delay, self.min_interval), self.max_interval)
+        self._seq += 1
+        heapq.heappush(self._schedule, (now + delay, self._seq, watched.battle_id))
+
+    def _pop_due(self, now: float) -> List[str]:
+        """조회할 때가 된 배틀 ID (최대 max_concurrency개)"""
+        due = []
+        while self._schedule and self._schedule[0][0] <= now and len(due) < self.max_concurrency:
+            _, _, battle_id = heapq.heappop(self._schedule)
+            if battle_id in self._battles:
+                due.append(battle_id)
+        return due
+
+    def _wait_time(self, now: float) -> float:
+        return max(self._schedule[0][0] - now, 0.0) if self._schedule else 0.0
+
+    def _observe(self, watched: _WatchedBattle, battle: Dict, now: float) -> None:
+        """끝난 배틀의 소요 시간으로 라운드당 소요 시간 보정"""
+        rounds = battle.get('rounds')
+        count = len(rounds) if isinstance(rounds, list) and rounds else watched.total_rounds
+        started = watched.started_at
+        ended = parse_timestamp(battle.get('ended_at'))
+        if started is not None and ended is not None and ended > started:
+            duration = ended - started
+        elif watched.first_round <= 1:
+            duration = now - watched.added_at  # 첫 라운드부터 본 배틀만 (조회 지연만큼 길게 잡힘)
+        else:
+            return
+        per_round = duration / max(count, 1)
+        if self.observed == 0:
+            self.round_seconds = per_round
+        else:
+            self.round_seconds += self.SMOOTHING * (per_round - self.round_seconds)
+        self.observed += 1
+
+    def _handle(self, battle_id: str, result: Optional[Dict], error: Optional[Exception]) -> Optional[Dict]:
+        """조회 결과 반영. 끝난 배틀이면 battle dict 반환"""
+        watched = self._battles.get(battle_id)
+        if watched is None:
+            return None
+        now = time.monotonic()
+        watched.polls += 1
+        self.polls += 1
+
+        if error is not None:
+            if isinstance(error, MoltArenaAPIError) and error.status_code == 429:
+                self._push(watched, now, error.details.get('retry_after') or self.max_interval)
+            elif isinstance(error, MoltArenaAPIError) and error.status_code in (403, 404):
+                self._drop(battle_id, error.message)
+            elif now - watched.added_at >= self.timeout:
+                self._drop(battle_id, str(getattr(error, 'message', error)))
+            else:
+                watched.overdue += 1
+                self._push(watched, now, self.min_interval * (2 ** watched.overdue))
+            return None
+
+        battle = result.get('battle', result)
+        if battle.get('status') in BATTLE_FINAL_STATUSES:
+            del self._battles[battle_id]
+            if battle.get('status') == 'completed':
+                self._observe(watched, battle, now)
+            return battle
+
+        if now - watched.added_at >= self.timeout:
+            self._drop(battle_id, "감시 시간 초과")
+            return None
+        self._update(watched, battle, now)
+        self._push(watched, now)
+        return None
+
+    def _requeue(self, battle_ids) -> None:
+        """반환 도중 중단돼 결과를 반영하지 못한 배틀을 다시 일정에 넣음 (다음 watch에서 이어서 감시)"""
+        now = time.monotonic()
+        for battle_id in battle_ids:
+            if battle_id in self._battles:
+                self._push(self._battles[battle_id], now, self.min_interval)
+
+    def _drop(self, battle_id: str, reason: str) -> None:
+        self._battles.pop(battle_id, None)
+        self.errors[battle_id] = reason
+
+    # ---------- 실행 ----------
+
+    def watch(self) -> Iterator[Dict]:
+        """끝난 배틀을 끝난 순서대로 반환 (동기 클라이언트, 조회는 스레드 풀에서 동시 실행)"""
+        api = self.api or get_client()
+
+        def fetch(battle_id: str) -> tuple:
+            try:
+                return battle_id, api.get_battle(battle_id, priority=self.priority), None
+            except MoltArenaAPIError as e:
+                return battle_id, None, e
+
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        inflight = set()
+        try:
+            while self._schedule:
+                due = self._pop_due(time.monotonic())
+                if not due:
+                    time.sleep(self._wait_time(time.monotonic()))
+                    continue
+                inflight.update(due)
+                for future in as_completed([executor.submit(fetch, b) for b in due]):
+                    battle_id, result, error = future.result()
+                    inflight.discard(battle_id)
+                    battle = self._handle(battle_id, result, error)
+                    if battle is not None:
+                        yield battle
+        finally:
+            executor.shutdown(wait=False)
+            self._requeue(inflight)
+
+    async def watch_async(self) -> AsyncIterator[Dict]:
+        """watch()의 비동기 버전 (api는 AsyncMoltArenaAPI)"""
+        api = self.api
+
+        async def fetch(battle_id: str) -> tuple:
+            try:
+                return battle_id, await api.get_battle(battle_id, priority=self.priority), None
+            except MoltArenaAPIError as e:
+                return battle_id, None, e
+
+        inflight = set()
+        try:
+            while self._schedule:
+                due = self._pop_due(time.monotonic())
+                if not due:
+                    await asyncio.sleep(self._wait_time(time.monotonic()))
+                    continue
+                inflight.update(due)
+                for next_done in asyncio.as_completed([fetch(b) for b in due]):
+                    battle_id, result, error = await next_done
+                    inflight.discard(battle_id)
+                    battle = self._handle(battle_id, result, error)
+                    if battle is not None:
+                        yield battle
+        finally:
+            self._requeue(inflight)
+
+
+# ============== 배틀 기록 ==============
+
+def battle_timestamp(battle: Dict) -> float:
+    """배틀 정렬 기준 시각 (종료 > 시작 > 생성 시각, 없으면 0)"""
+    for key in ('ended_at', 'started_at', 'created_at'):
+        value = parse_timestamp(battle.get(key))
+        if value is not None:
+            return value
+    return 0.0
+
+
+class BattleHistoryPlan:
+    """여러 에이전트의 배틀 기록 조회 계획과 병합
+
+    에이전트별 목록은 서버가 최신순으로 돌려주므로 각 목록의 앞쪽만 비교해 k-way 병합합니다
+    (전부 이어 붙여 다시 정렬하지 않음). 첫 페이지는 병합에 모두 필요하므로 한 번에 조회하고,
+    그 뒤 페이지는 병합이 그 에이전트의 목록을 끝까지 읽었을 때만 조회합니다.
+    limit / since에 닿으면 병합을 멈추므로 더 읽을 페이지도 조회하지 않습니다.
+    """
+
+    def __init__(self, agents: List[Dict], limit: int = None, since: str = None):
+        self.limit = limit
+        self.since = parse_timestamp(since) if since else None
+        self.agents = [a for a in agents if a.get('id') and a.get('total_battles') != 0]
+
+    def first_limit(self, agent: Dict) -> int:
+        """에이전트별 첫 battleLimit"""
+        want = self.limit or HISTORY_BATTLE_LIMIT
+        if agent.get('total_battles'):
+            want = min(want, agent['total_battles'])
+        return max(1, min(want, HISTORY_BATTLE_LIMIT_MAX))
+
+    def next_limit(self, agent: Dict, battles: List[Dict], want: int) -> Optional[int]:
+        """since 이후 배틀이 더 있을 수 있으면 다음 battleLimit, 아니면 None"""
+        if self.limit is not None or self.since is None:
+            return None
+        if len(battles) < want or want >= HISTORY_BATTLE_LIMIT_MAX:
+            return None
+        if agent.get('total_battles') is not None and want >= agent['total_battles']:
+            return None
+        if battle_timestamp(battles[-1]) <= self.since:
+            return None
+        return min(want * 2, HISTORY_BATTLE_LIMIT_MAX)
+
+    @staticmethod
+    def rest(previous: List[Dict], page: List[Dict]) -> List[Dict]:
+        """더 크게 다시 조회한 페이지에서 이미 반환한 배틀 뒤쪽만 (그 사이 끝난 배틀은 제외)"""
+        last = battle_timestamp(previous[-1])
+        seen = {b.get('id') for b in previous}
+        return [b for b in page if battle_timestamp(b) <= last and b.get('id') not in seen]
+
+    def pages(self, agent: Dict, battles: List[Dict], fetch: Callable[[str, int], List[Dict]]) -> Iterator[Dict]:
+        """에이전트 한 명의 기록 (첫 페이지 battles 다음은 끝까지 읽었을 때만 fetch)"""
+        want = self.first_limit(agent)
+        yield from battles
+        while True:
+            want = self.next_limit(agent, battles, want)
+            if want is None:
+                return
+            page = fetch(agent['id'], want)
+            rest = self.rest(battles, page)
+            battles = page
+            yield from rest
+
+    async def pages_async(self, agent: Dict, battles: List[Dict], fetch) -> AsyncIterator[Dict]:
+        """pages()의 비동기 버전 (fetch는 코루틴 함수)"""
+        want = self.first_limit(agent)
+        for battle in battles:
+            yield battle
+        while True:
+            want = self.next_limit(agent, battles, want)
+            if want is None:
+                return
+            page = await fetch(agent['id'], want)
+            rest = self.rest(battles, page)
+            battles = page
+            for battle in rest:
+                yield battle
+
+    def admit(self, battle: Dict, seen: set) -> Optional[bool]:
+        """병합한 배틀을 반환할지 (since에 닿으면 None - 병합 종료)"""
+        if self.since is not None and battle_timestamp(battle) <= self.since:
+            return None
+        battle_id = battle.get('id')
+        if battle_id in seen:
+            return False
+        if battle_id:
+            seen.add(battle_id)
+        return True
+
+    def merge(self, histories: List[Iterable[Dict]]) -> Iterator[Dict]:
+        """에이전트별 기록을 최신순으로 병합 (내 에이전트끼리의 배틀은 한 번만)"""
+        if self.limit is not None and self.limit <= 0:
+            return
+        seen = set()
+        count = 0
+        for battle in heapq.merge(*histories, key=battle_timestamp, reverse=True):
+            admitted = self.admit(battle, seen)
+            if admitted is None:
+                return
+            if admitted:
+                yield battle
+                count += 1
+                if self.limit is not None and count >= self.limit:
+                    return  # 다음 배틀을 꺼내지 않아야 다음 페이지도 조회하지 않음
+
+    async def merge_async(self, histories: List[AsyncIterator[Dict]]) -> AsyncIterator[Dict]:
+        """merge()의 비동기 버전"""
+        heap = []
+
+        async def advance(index: int) -> None:
+            try:
+                battle = await histories[index].__anext__()
+            except StopAsyncIteration:
+                return
+            heapq.heappush(heap, (-battle_timestamp(battle), index, battle))
+
+        if self.limit is not None and self.limit <= 0:
+            return
+        for index in range(len(histories)):
+            await advance(index)
+        seen = set()
+        count = 0
+        while heap:
+            _, index, battle = heapq.heappop(heap)
+            admitted = self.admit(battle, seen)
+            if admitted is None:
+                return
+            if admitted:
+                yield battle
+                count += 1
+                if self.limit is not None and count >= self.limit:
+                    return
+            await advance(index)
+
+
+# ============== 포매터 ==============
+
+def _round_marks(count: int) -> List[Tuple[str, str]]:
+    """라운드별 (승, 패) 표시"""
+    return [(f"R{i} 🟢", f"R{i} 🔴") for i in range(1, count + 1)]
+
+
+_ROUND_MARKS = _round_marks(10)
+
+
+def format_battle_result(battle: Dict) -> str:
+    """Wordle 스타일 배틀 결과 포맷"""
+    winner_id = battle.get('winner_id')
+
+    # 라운드 결과 이모지 (표시 문자열은 미리 만들어 둔 것을 사용)
+    rounds = battle.get('rounds', [])
+    marks = _ROUND_MARKS if len(rounds) <= len(_ROUND_MARKS) else _round_marks(len(rounds))
+    round_marks = []
+    for mark, r in zip(marks, rounds):
+        round_marks.append(mark[(r.get('winner_id') or r.get('winner')) != winner_id])
+    rounds_str = " | ".join(round_marks)
+
+    # 에이전트 정보 (이기면 A가 앞, 지면 B가 앞)
+    agent_a = battle.get('agent_a', {})
+    agent_b = battle.get('agent_b', {})
+    name_a = agent_a.get('display_name') or agent_a.get('name', 'Agent A')
+    name_b = agent_b.get('display_name') or agent_b.get('name', 'Agent B')
+    if winner_id == agent_a.get('id'):
+        winner_name, loser_name, result_text = name_a, name_b, "Victory!"
+    elif winner_id == agent_b.get('id'):
+        winner_name, loser_name, result_text = name_b, name_a, "Defeat..."
+    else:
+        winner_name, loser_name, result_text = name_a, name_b, "Draw!"
+
+    # 레이팅 변화
+    rating_change = battle.get('rating_change', {})
+    before = rating_change.get('before', 1500)
+    after = rating_change.get('after', 1500)
+    delta = after - before
+    delta_str = f"+{delta}" if delta > 0 else str(delta)
+    # {:.0f}와 같은 결과 (정수는 float으로 바꾸지 않음)
+    before_str = str(before) if type(before) is int else f"{before:.0f}"
+    after_str = str(after) if type(after) is int else f"{after:.0f}"
+
+    battle_id = battle.get('id', '')
+    battle_number = battle['battle_number'] if 'battle_number' in battle else battle.get('id', '???')[:8]
+
+    return (
+        f"🔥 MOLT ARENA BATTLE #{battle_number}\n━━━━━━━━━━━━━━━━━━━━━━\n\n"
+        f"🏆 {winner_name}  vs  {loser_name}\n\n{rounds_str}\n\n"
+        f"📊 Result: {result_text}\n📈 Rating: {before_str} → {after_str} ({delta_str})\n\n"
+        f"🔗 moltarena.crosstoken.io/battle/{battle_id}"
+    )
+
+
+def format_agent_status(agent: Dict) -> str:
+    """에이전트 상태 포맷"""
+    name = agent.get('display_name') or agent.get('name', 'Unknown')
+    rating = agent.get('rating', 1500)
+    rd = agent.get('rating_deviation', 350)
+    rank = agent.get('rank')
+    total = agent.get('total_battles', 0)
+    wins = agent.get('wins', 0)
+    losses = agent.get('losses', 0)
 
     win_rate = (wins / max(total, 1)) * 100
     rank_str = f"#{rank}" if rank else "N/A"
@@ -386,159 +3552,541 @@ def format_agent_list(agents: List[Dict]) -> str:
     return "\n".join(lines)
 
 
-def format_leaderboard(agents: List[Dict]) -> str:
-    """리더보드 포맷"""
-    lines = ["🏆 MOLT ARENA LEADERBOARD", "━━━━━━━━━━━━━━━━━━━━━━"]
+def format_leaderboard(agents: List[Dict]) -> str:
+    """리더보드 포맷"""
+    lines = ["🏆 MOLT ARENA LEADERBOARD", "━━━━━━━━━━━━━━━━━━━━━━"]
+
+    for i, agent in enumerate(agents[:10], 1):
+        name = agent.get('display_name') or agent.get('name')
+        rating = agent.get('rating', 0)
+
+        if i == 1:
+            medal = "🥇"
+        elif i == 2:
+            medal = "🥈"
+        elif i == 3:
+            medal = "🥉"
+        else:
+            medal = f"{i}."
+
+        lines.append(f"{medal} {name} - {rating:,.0f}")
+
+    return "\n".join(lines)
+
+
+def format_leaderboard_diff(diff: LeaderboardDiff, limit: int = 5) -> str:
+    """리더보드 변동 포맷 (순위 변동 상위 limit명)"""
+    lines = ["📊 리더보드 변동", "━━━━━━━━━━━━━━━━━━━━━━"]
+
+    for m in diff.movers[:limit]:
+        direction = "⬆️" if m['rank_delta'] > 0 else "⬇️"
+        delta = m['rating_delta']
+        delta_str = f"+{delta:.0f}" if delta > 0 else f"{delta:.0f}"
+        lines.append(f"{direction} {m['name']} #{m['old_rank']} → #{m['rank']} ({delta_str})")
+
+    if diff.new_entries:
+        lines.append(f"🆕 신규 진입: {len(diff.new_entries)}명")
+    if diff.dropouts:
+        lines.append(f"👋 이탈: {len(diff.dropouts)}명")
+    if len(lines) == 2:
+        lines.append("변동 없음")
+
+    return "\n".join(lines)
+
+
+def format_battle_report(report: BattleReport, limit: int = 20) -> str:
+    """일괄 배틀 결과 포맷 (성공/실패는 각각 최대 limit개 표시)"""
+    started, failed, skipped = report.started, report.failed, report.skipped
+    lines = [
+        f"⚔️ 일괄 배틀: {len(started)}/{len(report.launches)}개 시작 ({report.elapsed:.1f}초)",
+        "━━━━━━━━━━━━━━━━━━━━━━",
+    ]
+
+    for l in started[:limit]:
+        lines.append(f"✅ {l.agent_name} vs {l.opponent_name or 'Unknown'}")
+    if len(started) > limit:
+        lines.append(f"   ... 외 {len(started) - limit}개")
+
+    for l in failed[:limit]:
+        lines.append(f"❌ {l.agent_name}: {l.error}")
+    if len(failed) > limit:
+        lines.append(f"   ... 외 {len(failed) - limit}개 실패")
+
+    if skipped:
+        retry = f" (약 {report.retry_after:.0f}초 후 다시 시도)" if report.retry_after else ""
+        lines.append(f"⏸️ 요청 한도 소진으로 {len(skipped)}개 미실행{retry}")
+
+    return "\n".join(lines)
+
+
+# ============== 알림 렌더러 ==============
+
+# 언어별 알림 템플릿 (str.format). 'ko'가 기본이며 다른 언어는 빠진 키를 'ko'에서 가져옴
+NOTIFICATION_TEMPLATES: Dict[str, Dict[str, str]] = {
+    'ko': {
+        'rank_change': "🎉 랭킹 변동!\n#{old_rank} → #{new_rank} {direction}{diff}",
+        'challenge': "⚔️ 도전장 도착!\n{challenger}이(가) 도전을 요청했습니다.\n수락하시겠습니까?",
+        'top_100': "🎉 축하합니다!\nTop 100 진입! (#{rank})",
+        'tournament_started': (
+            "🏆 토너먼트 시작!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "{name} 배틀이 시작되었습니다.\n행운을 빕니다! 🍀"
+        ),
+        'tournament_battle_completed': (
+            "⚔️ 토너먼트 배틀 완료!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "🏆 {tournament}\nvs {opponent}\n결과: {result}"
+        ),
+        'tournament_battles_summary': (
+            "⚔️ 토너먼트 배틀 {count}회 완료!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "🏆 {tournament}\n결과: {wins}승 {losses}패{draws}"
+        ),
+        'tournament_draws': " {draws}무",
+        'tournament_rank_change': (
+            "📊 토너먼트 순위 변동!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "🏆 {tournament}\n#{old_rank} → #{new_rank} {direction}{diff}"
+        ),
+        'tournament_ended': (
+            "🎉 토너먼트 종료!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "🏆 {name}\n{medal} 최종 순위: #{rank}"
+        ),
+        'tournament_ended_prize': (
+            "🎉 토너먼트 종료!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "🏆 {name}\n{medal} 최종 순위: #{rank}\n🎁 상금: {prize:,.0f} CROSS"
+        ),
+        'tournament_registration_reminder': (
+            "⏰ 등록 마감 임박!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "🏆 {name}\n등록이 {ends_in}분 후 마감됩니다!\n지금 바로 참가하세요."
+        ),
+        'tournament_registration_open': (
+            "🆕 토너먼트 등록 시작!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "🏆 {name}\n💰 참가비: {entry_fee} BP\n지금 바로 참가하세요!"
+        ),
+        'bp_earned': "💰 BP 획득!\n━━━━━━━━━━━━━━━━━━━━━━\n+{amount:,} BP ({reason})",
+        'bp_earned_balance': "💰 BP 획득!\n━━━━━━━━━━━━━━━━━━━━━━\n+{amount:,} BP ({reason})\n현재 잔액: {balance:,} BP",
+        'bp_rewards': "보상 {count}건",
+        'bp_daily_bonus': "🎁 일일 보너스!\n━━━━━━━━━━━━━━━━━━━━━━\n+{amount:,} BP\n🔥 연속 {streak}일 출석!",
+        'referral_conversion': (
+            "🎯 레퍼럴 전환!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "{source}으로 +{points:,} 포인트 획득!\n계속 공유하고 포인트 모으세요."
+        ),
+        'referral_sources': "{source} {count}건",
+        'referral_mixed_sources': "전환 {count}건",
+        'referral_points_claimable': (
+            "💎 클레임 가능!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "{points:,} 포인트를 클레임할 수 있습니다.\nmoltarena.crosstoken.io/settings/referral"
+        ),
+        'default': "📢 알림: {message}",
+    },
+    'en': {
+        'rank_change': "🎉 Rank changed!\n#{old_rank} → #{new_rank} {direction}{diff}",
+        'challenge': "⚔️ Challenge received!\n{challenger} wants to battle.\nAccept?",
+        'top_100': "🎉 Congratulations!\nTop 100 achieved! (#{rank})",
+        'tournament_started': (
+            "🏆 Tournament started!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "{name} battles have begun.\nGood luck! 🍀"
+        ),
+        'tournament_battle_completed': (
+            "⚔️ Tournament battle complete!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "🏆 {tournament}\nvs {opponent}\nResult: {result}"
+        ),
+        'tournament_battles_summary': (
+            "⚔️ {count} tournament battles complete!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "🏆 {tournament}\nResult: {wins}W-{losses}L{draws}"
+        ),
+        'tournament_draws': "-{draws}D",
+        'tournament_rank_change': (
+            "📊 Tournament rank changed!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "🏆 {tournament}\n#{old_rank} → #{new_rank} {direction}{diff}"
+        ),
+        'tournament_ended': (
+            "🎉 Tournament ended!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "🏆 {name}\n{medal} Final rank: #{rank}"
+        ),
+        'tournament_ended_prize': (
+            "🎉 Tournament ended!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "🏆 {name}\n{medal} Final rank: #{rank}\n🎁 Prize: {prize:,.0f} CROSS"
+        ),
+        'tournament_registration_reminder': (
+            "⏰ Registration closing soon!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "🏆 {name}\nRegistration closes in {ends_in} minutes!\nJoin now."
+        ),
+        'tournament_registration_open': (
+            "🆕 Tournament registration open!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "🏆 {name}\n💰 Entry fee: {entry_fee} BP\nJoin now!"
+        ),
+        'bp_earned': "💰 BP earned!\n━━━━━━━━━━━━━━━━━━━━━━\n+{amount:,} BP ({reason})",
+        'bp_earned_balance': "💰 BP earned!\n━━━━━━━━━━━━━━━━━━━━━━\n+{amount:,} BP ({reason})\nBalance: {balance:,} BP",
+        'bp_rewards': "from {count} rewards",
+        'bp_daily_bonus': "🎁 Daily bonus!\n━━━━━━━━━━━━━━━━━━━━━━\n+{amount:,} BP\n🔥 {streak}-day streak!",
+        'referral_conversion': (
+            "🎯 Referral conversion!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "+{points:,} points from {source}!\nKeep sharing to earn more."
+        ),
+        'referral_sources': "{count}× {source}",
+        'referral_mixed_sources': "{count} conversions",
+        'referral_points_claimable': (
+            "💎 Points claimable!\n━━━━━━━━━━━━━━━━━━━━━━\n"
+            "You can claim {points:,} points.\nmoltarena.crosstoken.io/settings/referral"
+        ),
+        'default': "📢 Notification: {message}",
+    },
+}
+
+# 언어별 조회 표 (템플릿에 넣을 값)
+NOTIFICATION_LABELS: Dict[str, Dict[str, Any]] = {
+    'ko': {
+        'tournament_results': {'win': '🏆 승리!', 'loss': '😢 패배...', 'draw': '🤝 무승부'},
+        'referral_types': {'signup': '친구 가입', 'agent_create': '에이전트 생성', 'moltbook_skill': '스킬 연동'},
+        'medals': {1: '🥇', 2: '🥈', 3: '🥉'},
+        'tournament': 'Tournament',
+        'reward': '보상',
+        'unknown': 'Unknown',
+    },
+    'en': {
+        'tournament_results': {'win': '🏆 Victory!', 'loss': '😢 Defeat...', 'draw': '🤝 Draw'},
+        'referral_types': {'signup': 'a friend signup', 'agent_create': 'an agent creation',
+                           'moltbook_skill': 'a skill link'},
+        'reward': 'reward',
+    },
+}
+
+
+# 템플릿 키별 렌더링 인자 순서 (렌더러가 templates[key](*values)에 넘기는 순서)
+# 언어마다 필드를 쓰는 순서가 달라도 인자 순서는 같음. 여기 없는 키는 템플릿에 처음 나온 순서
+TEMPLATE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    'rank_change': ('old_rank', 'new_rank', 'direction', 'diff'),
+    'challenge': ('challenger',),
+    'top_100': ('rank',),
+    'tournament_started': ('name',),
+    'tournament_battle_completed': ('tournament', 'opponent', 'result'),
+    'tournament_battles_summary': ('count', 'tournament', 'wins', 'losses', 'draws'),
+    'tournament_draws': ('draws',),
+    'tournament_rank_change': ('tournament', 'old_rank', 'new_rank', 'direction', 'diff'),
+    'tournament_ended': ('name', 'medal', 'rank'),
+    'tournament_ended_prize': ('name', 'medal', 'rank', 'prize'),
+    'tournament_registration_reminder': ('name', 'ends_in'),
+    'tournament_registration_open': ('name', 'entry_fee'),
+    'bp_earned': ('amount', 'reason'),
+    'bp_earned_balance': ('amount', 'reason', 'balance'),
+    'bp_rewards': ('count',),
+    'bp_daily_bonus': ('amount', 'streak'),
+    'referral_conversion': ('source', 'points'),
+    'referral_sources': ('source', 'count'),
+    'referral_mixed_sources': ('count',),
+    'referral_points_claimable': ('points',),
+    'default': ('message',),
+}
+
+_CONVERSIONS = {None: None, 's': str, 'r': repr, 'a': ascii}
+
+
+def compile_template(text: str, fields: Tuple[str, ...] = None):
+    """str.format 템플릿을 한 번 파싱해 렌더링 함수(*values -> str)로 변환
+
+    리터럴 조각과 필드별 (인자 위치, 서식)을 미리 나눠 두고 렌더링할 때는 값만 이어 붙이므로
+    text.format처럼 호출마다 템플릿을 다시 파싱하지 않습니다. 값은 fields 순서의 위치 인자로
+    받아 키워드 인자 dict를 만들지 않으며, 5개 이하의 인자를 순서대로 한 번씩 쓰는 흔한 모양은
+    f-string 클로저로 특수화합니다. 필드 이름은 키워드 이름만 지원합니다 ({0}, {a.b}, {a[0]}, 중첩 서식 제외).
+
+    Args:
+        text: str.format 템플릿
+        fields: 렌더링 인자 순서 (None이면 템플릿에 처음 나온 순서). 템플릿이 일부만 써도 됨
+
+    Raises:
+        ValueError: 괄호가 맞지 않거나 fields에 없는 필드를 쓰는 등 잘못된 템플릿
+            (렌더링 시점이 아니라 등록 시점에)
+    """
+    parsed = list(string.Formatter().parse(text))
+    if fields is None:
+        fields = tuple(dict.fromkeys(name for _, name, _, _ in parsed if name is not None))
+    literals = ['']
+    slots = []  # (인자 위치, 서식, 변환 함수)
+    for literal, name, spec, conversion in parsed:
+        literals[-1] += literal
+        if name is None:
+            continue
+        if not name.isidentifier() or '{' in spec:
+            raise ValueError(f"지원하지 않는 템플릿 필드입니다: {{{name}}}")
+        if name not in fields:
+            raise ValueError(f"알 수 없는 템플릿 필드입니다: {{{name}}} (사용 가능: {', '.join(fields)})")
+        if conversion not in _CONVERSIONS:
+            raise ValueError(f"알 수 없는 변환입니다: !{conversion}")
+        slots.append((fields.index(name), spec, _CONVERSIONS[conversion]))
+        literals.append('')
+
+    l0 = literals[0]
+    if not slots:
+        return lambda *v: l0
+    # 흔한 모양: 인자를 순서대로 한 번씩 쓰는 5개 이하 필드 -> 위치 인자를 그대로 쓰는 f-string
+    if [i for i, _, _ in slots] == list(range(len(fields))) and all(c is None for _, _, c in slots):
+        (_, s0, _), l1 = slots[0], literals[1]
+        if len(slots) == 1:
+            return lambda a: f"{l0}{a:{s0}}{l1}"
+        (_, s1, _), l2 = slots[1], literals[2]
+        if len(slots) == 2:
+            return lambda a, b: f"{l0}{a:{s0}}{l1}{b:{s1}}{l2}"
+        (_, s2, _), l3 = slots[2], literals[3]
+        if len(slots) == 3:
+            return lambda a, b, c: f"{l0}{a:{s0}}{l1}{b:{s1}}{l2}{c:{s2}}{l3}"
+        (_, s3, _), l4 = slots[3], literals[4]
+        if len(slots) == 4:
+            return lambda a, b, c, d: f"{l0}{a:{s0}}{l1}{b:{s1}}{l2}{c:{s2}}{l3}{d:{s3}}{l4}"
+        (_, s4, _), l5 = slots[4], literals[5]
+        if len(slots) == 5:
+            return lambda a, b, c, d, e: f"{l0}{a:{s0}}{l1}{b:{s1}}{l2}{c:{s2}}{l3}{d:{s3}}{l4}{e:{s4}}{l5}"
+
+    # 그 밖의 모양: 조각마다 (리터럴, 인자 위치, 서식, 변환)을 이어 붙임
+    pieces = tuple((literal, i, spec, convert) for literal, (i, spec, convert) in zip(literals, slots))
+    tail = literals[-1]
+    return lambda *v: ''.join([
+        literal + format(v[i] if convert is None else convert(v[i]), spec)
+        for literal, i, spec, convert in pieces
+    ]) + tail
+
+class TemplateSet:
+    """한 언어의 알림 템플릿 (등록 시 compile_template으로 한 번 파싱한 렌더링 함수)
+
+    templates[key](*values)로 렌더링합니다 (값은 TEMPLATE_FIELDS[key] 순서). 빠진 키는 base
+    템플릿 세트에서 가져오며,
+    잘못된 템플릿은 렌더링 시점이 아니라 생성 시점에 ValueError.
+    """
+
+    __slots__ = ('language', 'templates', 'labels')
+
+    def __init__(
+        self,
+        language: str,
+        templates: Dict[str, str],
+        labels: Dict[str, Any] = None,
+        base: "TemplateSet" = None
+    ):
+        self.language = language
+        self.templates = dict(base.templates) if base else {}
+        self.labels = dict(base.labels) if base else {}
+        for key, text in templates.items():
+            self.templates[key] = compile_template(text, TEMPLATE_FIELDS.get(key))
+        self.labels.update(labels or {})
+
+
+_template_sets: Dict[str, TemplateSet] = {}
+_renderers: Dict[str, "NotificationRenderer"] = {}  # 언어별 기본 렌더러 (템플릿 세트를 등록하면 비움)
+
+
+def register_template_set(
+    language: str,
+    templates: Dict[str, str],
+    labels: Dict[str, Any] = None,
+    base: str = 'ko'
+) -> TemplateSet:
+    """언어별 템플릿 세트 등록 (빠진 키는 base 언어에서 가져옴)"""
+    template_set = TemplateSet(language, templates, labels, _template_sets.get(base) if language != base else None)
+    _template_sets[language] = template_set
+    _renderers.clear()  # 없는 언어는 'ko' 세트를 쓰므로 모든 언어의 기본 렌더러를 다시 만듦
+    return template_set
+
+
+def get_template_set(language: str = 'ko') -> TemplateSet:
+    """등록된 템플릿 세트 (없는 언어는 'ko')"""
+    return _template_sets.get(language) or _template_sets['ko']
+
+
+for _language in NOTIFICATION_TEMPLATES:
+    register_template_set(_language, NOTIFICATION_TEMPLATES[_language], NOTIFICATION_LABELS.get(_language))
+
+
+# 알림 타입 -> 렌더러(data, notification, template_set) -> str
+NOTIFICATION_RENDERERS: Dict[str, Any] = {}
+
+
+def notification_renderer(*ntypes: str):
+    """알림 타입 렌더러 등록 데코레이터 (같은 타입을 다시 등록하면 교체)"""
+    def decorator(func):
+        for ntype in ntypes:
+            NOTIFICATION_RENDERERS[ntype] = func
+        return func
+    return decorator
+
+
+def _rank_movement(old_rank: Any, new_rank: Any) -> Tuple[str, int]:
+    """(방향 이모지, 변동 폭) - 순위를 모르면 변동 0"""
+    if isinstance(old_rank, int) and isinstance(new_rank, int):
+        return ("⬆️" if new_rank < old_rank else "⬇️"), abs(old_rank - new_rank)
+    return "⬇️", 0
+
+
+@notification_renderer('battle_completed')
+def _render_battle_completed(data: Dict, notification: Dict, t: TemplateSet) -> str:
+    return format_battle_result(data)
+
+
+@notification_renderer('rank_change')
+def _render_rank_change(data: Dict, notification: Dict, t: TemplateSet) -> str:
+    old_rank, new_rank = data.get('old_rank', '?'), data.get('new_rank', '?')
+    if type(old_rank) is int and type(new_rank) is int:
+        direction, diff = ("⬆️" if new_rank < old_rank else "⬇️"), abs(old_rank - new_rank)
+    else:
+        direction, diff = _rank_movement(old_rank, new_rank)
+    return t.templates['rank_change'](old_rank, new_rank, direction, diff)
+
+
+@notification_renderer('challenge')
+def _render_challenge(data: Dict, notification: Dict, t: TemplateSet) -> str:
+    return t.templates['challenge'](data['challenger'] if 'challenger' in data else t.labels['unknown'])
+
+
+@notification_renderer('top_100')
+def _render_top_100(data: Dict, notification: Dict, t: TemplateSet) -> str:
+    return t.templates['top_100'](data.get('rank', '?'))
+
 
-    for i, agent in enumerate(agents[:10], 1):
-        name = agent.get('display_name') or agent.get('name')
-        rating = agent.get('rating', 0)
+@notification_renderer('tournament_started')
+def _render_tournament_started(data: Dict, notification: Dict, t: TemplateSet) -> str:
+    return t.templates['tournament_started'](data.get('tournament_name', t.labels['tournament']))
 
-        if i == 1:
-            medal = "🥇"
-        elif i == 2:
-            medal = "🥈"
-        elif i == 3:
-            medal = "🥉"
-        else:
-            medal = f"{i}."
 
-        lines.append(f"{medal} {name} - {rating:,.0f}")
+@notification_renderer('tournament_battle_completed')
+def _render_tournament_battle(data: Dict, notification: Dict, t: TemplateSet) -> str:
+    tournament = data.get('tournament_name', '')
+    templates = t.templates
+    if data.get('count', 1) > 1:
+        draws = templates['tournament_draws'](data['draws']) if data.get('draws') else ""
+        return templates['tournament_battles_summary'](
+            data['count'], tournament, data.get('wins', 0), data.get('losses', 0), draws
+        )
+    labels = t.labels
+    return templates['tournament_battle_completed'](
+        tournament,
+        data['opponent_name'] if 'opponent_name' in data else labels['unknown'],
+        labels['tournament_results'].get(data.get('result', 'unknown'), '⚔️')
+    )
+
+
+@notification_renderer('tournament_rank_change')
+def _render_tournament_rank_change(data: Dict, notification: Dict, t: TemplateSet) -> str:
+    old_rank, new_rank = data.get('old_rank', '?'), data.get('new_rank', '?')
+    direction, diff = _rank_movement(old_rank, new_rank)
+    return t.templates['tournament_rank_change'](
+        data.get('tournament_name', t.labels['tournament']), old_rank, new_rank, direction, diff
+    )
+
+
+@notification_renderer('tournament_ended')
+def _render_tournament_ended(data: Dict, notification: Dict, t: TemplateSet) -> str:
+    rank = data.get('final_rank', '?')
+    prize = data.get('prize_amount', 0)
+    name, medal = data.get('tournament_name', t.labels['tournament']), t.labels['medals'].get(rank, "🏅")
+    if prize and prize > 0:
+        return t.templates['tournament_ended_prize'](name, medal, rank, prize)
+    return t.templates['tournament_ended'](name, medal, rank)
+
+
+@notification_renderer('tournament_registration_reminder')
+def _render_registration_reminder(data: Dict, notification: Dict, t: TemplateSet) -> str:
+    return t.templates['tournament_registration_reminder'](
+        data.get('tournament_name', t.labels['tournament']), data.get('ends_in_minutes', 30)
+    )
+
+
+@notification_renderer('tournament_registration_open')
+def _render_registration_open(data: Dict, notification: Dict, t: TemplateSet) -> str:
+    return t.templates['tournament_registration_open'](
+        data.get('tournament_name', t.labels['tournament']), data.get('entry_fee_bp', 0)
+    )
+
+
+@notification_renderer('bp_earned')
+def _render_bp_earned(data: Dict, notification: Dict, t: TemplateSet) -> str:
+    count = data.get('count', 1)
+    new_balance = data.get('new_balance')
+    templates = t.templates
+    if count > 1:
+        reason = templates['bp_rewards'](count)
+    else:
+        reason = data['reason'] if 'reason' in data else t.labels['reward']
+    if new_balance:
+        return templates['bp_earned_balance'](data.get('amount', 0), reason, new_balance)
+    return templates['bp_earned'](data.get('amount', 0), reason)
+
+
+@notification_renderer('bp_daily_bonus')
+def _render_bp_daily_bonus(data: Dict, notification: Dict, t: TemplateSet) -> str:
+    return t.templates['bp_daily_bonus'](data.get('amount', 0), data.get('streak_days', 1))
+
+
+@notification_renderer('referral_conversion')
+def _render_referral_conversion(data: Dict, notification: Dict, t: TemplateSet) -> str:
+    conv_type = data.get('type', 'unknown')
+    count = data.get('count', 1)
+    source = t.labels['referral_types'].get(conv_type, conv_type)
+    if count > 1:
+        source = (
+            t.templates['referral_mixed_sources'](count) if conv_type == 'mixed'
+            else t.templates['referral_sources'](source, count)
+        )
+    return t.templates['referral_conversion'](source, data.get('points', 0))
 
-    return "\n".join(lines)
 
+@notification_renderer('referral_points_claimable')
+def _render_referral_points_claimable(data: Dict, notification: Dict, t: TemplateSet) -> str:
+    return t.templates['referral_points_claimable'](data.get('claimable_points', 0))
 
-def format_notification(notification: Dict) -> str:
-    """알림 포맷 - v2.0 확장 (토너먼트, BP, 레퍼럴 지원)"""
-    ntype = notification.get('type')
-    data = notification.get('data', {})
 
-    # ==================== 기존 알림 ====================
+def _render_default(data: Dict, notification: Dict, t: TemplateSet) -> str:
+    return t.templates['default'](notification.get('message', str(data)))
 
-    if ntype == 'battle_completed':
-        return format_battle_result(data)
 
-    elif ntype == 'rank_change':
-        old_rank = data.get('old_rank', '?')
-        new_rank = data.get('new_rank', '?')
-        direction = "⬆️" if new_rank < old_rank else "⬇️"
-        diff = abs(old_rank - new_rank) if isinstance(old_rank, int) and isinstance(new_rank, int) else 0
-        return f"🎉 랭킹 변동!\n#{old_rank} → #{new_rank} {direction}{diff}"
+class NotificationRenderer:
+    """알림 → 메시지 렌더러 (타입별 렌더러 표 + 언어별 템플릿 세트)"""
 
-    elif ntype == 'challenge':
-        challenger = data.get('challenger', 'Unknown')
-        return f"⚔️ 도전장 도착!\n{challenger}이(가) 도전을 요청했습니다.\n수락하시겠습니까?"
+    __slots__ = ('templates', 'renderers')
 
-    elif ntype == 'top_100':
-        rank = data.get('rank', '?')
-        return f"🎉 축하합니다!\nTop 100 진입! (#{rank})"
+    def __init__(self, language: str = 'ko', renderers: Dict[str, Any] = None):
+        """
+        Args:
+            language: 템플릿 언어 (register_template_set으로 추가 가능)
+            renderers: 기본 표(NOTIFICATION_RENDERERS) 대신 쓸 타입별 렌더러
+        """
+        self.templates = get_template_set(language)
+        self.renderers = renderers if renderers is not None else NOTIFICATION_RENDERERS
+
+    def render(self, notification: Dict) -> str:
+        """알림 하나 렌더링"""
+        data = notification.get('data')
+        return self.renderers.get(notification.get('type'), _render_default)(
+            data if data is not None else {}, notification, self.templates
+        )
 
-    # ==================== 토너먼트 알림 (v2.0 신규) ====================
+    def render_many(self, notifications: List[Dict]) -> List[str]:
+        """알림 여러 개 렌더링 (조회를 루프 밖으로 빼서 한 번만 수행)"""
+        renderers_get = self.renderers.get
+        templates = self.templates
+        messages = []
+        append = messages.append
+        for n in notifications:
+            data = n.get('data')
+            append(renderers_get(n.get('type'), _render_default)(data if data is not None else {}, n, templates))
+        return messages
 
-    elif ntype == 'tournament_started':
-        name = data.get('tournament_name', 'Tournament')
-        return f"""🏆 토너먼트 시작!
-━━━━━━━━━━━━━━━━━━━━━━
-{name} 배틀이 시작되었습니다.
-행운을 빕니다! 🍀""".strip()
-
-    elif ntype == 'tournament_battle_completed':
-        result = data.get('result', 'unknown')
-        opponent = data.get('opponent_name', 'Unknown')
-        tournament = data.get('tournament_name', '')
-        result_emoji = {'win': '🏆 승리!', 'loss': '😢 패배...', 'draw': '🤝 무승부'}.get(result, '⚔️')
-        return f"""⚔️ 토너먼트 배틀 완료!
-━━━━━━━━━━━━━━━━━━━━━━
-🏆 {tournament}
-vs {opponent}
-결과: {result_emoji}""".strip()
-
-    elif ntype == 'tournament_rank_change':
-        tournament = data.get('tournament_name', 'Tournament')
-        old_rank = data.get('old_rank', '?')
-        new_rank = data.get('new_rank', '?')
-        direction = "⬆️" if isinstance(new_rank, int) and isinstance(old_rank, int) and new_rank < old_rank else "⬇️"
-        diff = abs(old_rank - new_rank) if isinstance(old_rank, int) and isinstance(new_rank, int) else 0
-        return f"""📊 토너먼트 순위 변동!
-━━━━━━━━━━━━━━━━━━━━━━
-🏆 {tournament}
-#{old_rank} → #{new_rank} {direction}{diff}""".strip()
-
-    elif ntype == 'tournament_ended':
-        name = data.get('tournament_name', 'Tournament')
-        rank = data.get('final_rank', '?')
-        prize = data.get('prize_amount', 0)
-        medal = "🥇" if rank == 1 else "🥈" if rank == 2 else "🥉" if rank == 3 else "🏅"
-        prize_text = f"\n🎁 상금: {prize:,.0f} CROSS" if prize and prize > 0 else ""
-        return f"""🎉 토너먼트 종료!
-━━━━━━━━━━━━━━━━━━━━━━
-🏆 {name}
-{medal} 최종 순위: #{rank}{prize_text}""".strip()
 
-    elif ntype == 'tournament_registration_reminder':
-        name = data.get('tournament_name', 'Tournament')
-        ends_in = data.get('ends_in_minutes', 30)
-        return f"""⏰ 등록 마감 임박!
-━━━━━━━━━━━━━━━━━━━━━━
-🏆 {name}
-등록이 {ends_in}분 후 마감됩니다!
-지금 바로 참가하세요.""".strip()
-
-    elif ntype == 'tournament_registration_open':
-        name = data.get('tournament_name', 'Tournament')
-        entry_fee = data.get('entry_fee_bp', 0)
-        return f"""🆕 토너먼트 등록 시작!
-━━━━━━━━━━━━━━━━━━━━━━
-🏆 {name}
-💰 참가비: {entry_fee} BP
-지금 바로 참가하세요!""".strip()
-
-    # ==================== BP 알림 (v2.0 신규) ====================
-
-    elif ntype == 'bp_earned':
-        amount = data.get('amount', 0)
-        reason = data.get('reason', '보상')
-        new_balance = data.get('new_balance')
-        balance_text = f"\n현재 잔액: {new_balance:,} BP" if new_balance else ""
-        return f"""💰 BP 획득!
-━━━━━━━━━━━━━━━━━━━━━━
-+{amount:,} BP ({reason}){balance_text}""".strip()
+def get_renderer(language: str = 'ko') -> NotificationRenderer:
+    """언어별 기본 렌더러 (재사용)"""
+    renderer = _renderers.get(language)
+    if renderer is None:
+        renderer = _renderers[language] = NotificationRenderer(language)
+    return renderer
 
-    elif ntype == 'bp_daily_bonus':
-        amount = data.get('amount', 0)
-        streak = data.get('streak_days', 1)
-        return f"""🎁 일일 보너스!
-━━━━━━━━━━━━━━━━━━━━━━
-+{amount:,} BP
-🔥 연속 {streak}일 출석!""".strip()
-
-    # ==================== 레퍼럴 알림 (v2.0 신규) ====================
-
-    elif ntype == 'referral_conversion':
-        conv_type = data.get('type', 'unknown')
-        points = data.get('points', 0)
-        type_names = {
-            'signup': '친구 가입',
-            'agent_create': '에이전트 생성',
-            'moltbook_skill': '스킬 연동'
-        }
-        type_name = type_names.get(conv_type, conv_type)
-        return f"""🎯 레퍼럴 전환!
-━━━━━━━━━━━━━━━━━━━━━━
-{type_name}으로 +{points:,} 포인트 획득!
-계속 공유하고 포인트 모으세요.""".strip()
 
-    elif ntype == 'referral_points_claimable':
-        points = data.get('claimable_points', 0)
-        return f"""💎 클레임 가능!
-━━━━━━━━━━━━━━━━━━━━━━
-{points:,} 포인트를 클레임할 수 있습니다.
-moltarena.crosstoken.io/settings/referral""".strip()
+def format_notification(notification: Dict, language: str = 'ko') -> str:
+    """알림 포맷 - 타입별 렌더러 표로 처리 (토너먼트, BP, 레퍼럴, 병합 알림 포함)"""
+    renderer = _renderers[language] if language in _renderers else get_renderer(language)
+    data = notification.get('data')
+    return renderer.renderers.get(notification.get('type'), _render_default)(
+        data if data is not None else {}, notification, renderer.templates
+    )
 
-    # ==================== 기타 ====================
 
-    else:
-        return f"📢 알림: {notification.get('message', str(data))}"
+def render_many(notifications: List[Dict], language: str = 'ko') -> List[str]:
+    """알림 여러 개 포맷 (format_notification을 반복 호출하는 것보다 빠름)"""
+    return get_renderer(language).render_many(notifications)
 
 
 # ============== 메인 함수들 (Moltbot이 호출) ==============
@@ -558,7 +4106,7 @@ def deploy_agent(
         traits: 성격 특성 (쉼표로 구분)
         backstory: 배경 스토리
     """
-    api = MoltArenaAPI()
+    api = get_client()
 
     traits_list = [t.strip() for t in traits.split(',')] if traits else []
 
@@ -587,7 +4135,7 @@ def deploy_agent(
 
 def list_agents() -> str:
     """내 에이전트 목록"""
-    api = MoltArenaAPI()
+    api = get_client()
 
     try:
         agents = api.list_agents()
@@ -598,7 +4146,7 @@ def list_agents() -> str:
 
 def get_status(agent_name: str = None) -> str:
     """에이전트 상태 조회"""
-    api = MoltArenaAPI()
+    api = get_client()
 
     try:
         agents = api.list_agents()
@@ -607,16 +4155,9 @@ def get_status(agent_name: str = None) -> str:
             return "등록된 에이전트가 없습니다."
 
         # 이름으로 검색 또는 첫 번째 에이전트
-        if agent_name:
-            agent = next(
-                (a for a in agents if agent_name.lower() in
-                 (a.get('name', '') + a.get('display_name', '')).lower()),
-                None
-            )
-            if not agent:
-                return f"'{agent_name}' 에이전트를 찾을 수 없습니다."
-        else:
-            agent = agents[0]
+        agent, error = find_agent(agents, agent_name)
+        if error:
+            return error
 
         status = api.get_agent_status(agent['id'])
         return format_agent_status(status.get('agent', status))
@@ -636,7 +4177,7 @@ def start_battle(
         agent_name: 배틀할 에이전트 이름 (없으면 첫 번째 에이전트)
         matchmaking: 매칭 방식 (similar_rating, challenge_up, random)
     """
-    api = MoltArenaAPI()
+    api = get_client()
 
     try:
         agents = api.list_agents()
@@ -645,16 +4186,9 @@ def start_battle(
             return "등록된 에이전트가 없습니다. 먼저 에이전트를 만들어주세요."
 
         # 에이전트 찾기
-        if agent_name:
-            agent = next(
-                (a for a in agents if agent_name.lower() in
-                 (a.get('name', '') + a.get('display_name', '')).lower()),
-                None
-            )
-            if not agent:
-                return f"'{agent_name}' 에이전트를 찾을 수 없습니다."
-        else:
-            agent = agents[0]
+        agent, error = find_agent(agents, agent_name)
+        if error:
+            return error
 
         # 배틀 시작
         result = api.start_battle(agent['id'], matchmaking=matchmaking)
@@ -684,9 +4218,74 @@ def start_battle(
         return f"❌ 배틀 시작 실패: {e.message}"
 
 
+def start_all_battles(
+    agent_names: str = None,
+    matchmaking: str = "similar_rating",
+    as_json: bool = False
+) -> str:
+    """
+    여러 에이전트 배틀 일괄 시작
+
+    Args:
+        agent_names: 배틀할 에이전트 이름 (쉼표로 구분, 없으면 전체 에이전트)
+        matchmaking: 매칭 방식 (similar_rating, challenge_up, random)
+        as_json: True면 결과를 JSON(started/failed/skipped)으로 반환
+    """
+    api = get_client()
+
+    try:
+        agents = api.list_agents()
+
+        if not agents:
+            return "등록된 에이전트가 없습니다. 먼저 에이전트를 만들어주세요."
+
+        selected = agents
+        unresolved = []
+        if agent_names:
+            selected = []
+            seen = set()
+            for name in (n.strip() for n in agent_names.split(',')):
+                if not name:
+                    continue
+                agent, error = find_agent(agents, name)
+                if error:
+                    unresolved.append(BattleLaunch(None, name, error=error))
+                elif agent['id'] not in seen:
+                    seen.add(agent['id'])
+                    selected.append(agent)
+
+        report = api.start_battles(selected, matchmaking=matchmaking)
+        report.launches.extend(unresolved)
+
+        if as_json:
+            return json.dumps(report.to_dict(), ensure_ascii=False, indent=2)
+        return format_battle_report(report)
+
+    except MoltArenaAPIError as e:
+        return f"❌ 배틀 시작 실패: {e.message}"
+
+
+def watch_battles(battle_ids: List[str]) -> Iterator[str]:
+    """
+    진행 중인 배틀들이 끝나는 대로 결과 메시지 반환
+
+    Args:
+        battle_ids: 감시할 배틀 ID 목록
+    """
+    watcher = BattleWatcher(get_client())
+    watcher.add(*battle_ids)
+    for battle in watcher.watch():
+        if battle.get('status') == 'completed':
+            yield format_battle_result(battle)
+        else:
+            yield f"⚠️ 배틀 {battle.get('id', '')}: {battle.get('status')}"
+    for battle_id, reason in watcher.errors.items():
+        yield f"❌ 배틀 {battle_id} 확인 실패: {reason}"
+
+
 def get_leaderboard(limit: int = 10) -> str:
     """리더보드 조회"""
-    api = MoltArenaAPI()
+    api = get_client()
 
     try:
         agents = api.get_leaderboard(limit=limit)
@@ -697,7 +4296,7 @@ def get_leaderboard(limit: int = 10) -> str:
 
 def import_moltbook(username: str) -> str:
     """Moltbook 에이전트 가져오기"""
-    api = MoltArenaAPI()
+    api = get_client()
 
     try:
         result = api.import_moltbook(username)
@@ -725,7 +4324,7 @@ def import_moltbook(username: str) -> str:
 
 def get_last_battle() -> str:
     """마지막 배틀 결과"""
-    api = MoltArenaAPI()
+    api = get_client()
 
     try:
         battles = api.get_my_battles(limit=1)
@@ -759,7 +4358,7 @@ def set_external_api(
     if not endpoint:
         return "❌ endpoint URL이 필요합니다."
 
-    api = MoltArenaAPI()
+    api = get_client()
 
     try:
         agents = api.list_agents()
@@ -768,16 +4367,9 @@ def set_external_api(
             return "등록된 에이전트가 없습니다. 먼저 에이전트를 만들어주세요."
 
         # 에이전트 찾기
-        if agent_name:
-            agent = next(
-                (a for a in agents if agent_name.lower() in
-                 (a.get('name', '') + a.get('display_name', '')).lower()),
-                None
-            )
-            if not agent:
-                return f"'{agent_name}' 에이전트를 찾을 수 없습니다."
-        else:
-            agent = agents[0]
+        agent, error = find_agent(agents, agent_name)
+        if error:
+            return error
 
         agent_display = agent.get('display_name') or agent.get('name')
 
@@ -809,7 +4401,7 @@ def set_external_api(
 
 def remove_external_api(agent_name: str = None) -> str:
     """에이전트의 External API 설정 제거"""
-    api = MoltArenaAPI()
+    api = get_client()
 
     try:
         agents = api.list_agents()
@@ -818,16 +4410,9 @@ def remove_external_api(agent_name: str = None) -> str:
             return "등록된 에이전트가 없습니다."
 
         # 에이전트 찾기
-        if agent_name:
-            agent = next(
-                (a for a in agents if agent_name.lower() in
-                 (a.get('name', '') + a.get('display_name', '')).lower()),
-                None
-            )
-            if not agent:
-                return f"'{agent_name}' 에이전트를 찾을 수 없습니다."
-        else:
-            agent = agents[0]
+        agent, error = find_agent(agents, agent_name)
+        if error:
+            return error
 
         agent_display = agent.get('display_name') or agent.get('name')
 
@@ -844,7 +4429,7 @@ def remove_external_api(agent_name: str = None) -> str:
 
 def test_external_api(agent_name: str = None) -> str:
     """에이전트의 External API 연결 테스트"""
-    api = MoltArenaAPI()
+    api = get_client()
 
     try:
         agents = api.list_agents()
@@ -853,16 +4438,9 @@ def test_external_api(agent_name: str = None) -> str:
             return "등록된 에이전트가 없습니다."
 
         # 에이전트 찾기
-        if agent_name:
-            agent = next(
-                (a for a in agents if agent_name.lower() in
-                 (a.get('name', '') + a.get('display_name', '')).lower()),
-                None
-            )
-            if not agent:
-                return f"'{agent_name}' 에이전트를 찾을 수 없습니다."
-        else:
-            agent = agents[0]
+        agent, error = find_agent(agents, agent_name)
+        if error:
+            return error
 
         agent_display = agent.get('display_name') or agent.get('name')
 
@@ -888,10 +4466,538 @@ def test_external_api(agent_name: str = None) -> str:
         return f"❌ 테스트 실패: {e.message}"
 
 
+# ============== External API 부하 테스트 ==============
+
+LOAD_TEST_STYLES = ['witty', 'sarcastic', 'absurd', 'dark', 'wholesome']
+LOAD_TEST_TOPICS = ['coding', 'crypto', 'gaming', 'startups', 'music', 'fitness', None]
+LOAD_TEST_LINES = [
+    "Your code is like your dating life - full of bugs and exceptions.",
+    "At least I have a dating life, unlike your forever-pending pull request.",
+    "I've seen better arguments in a merge conflict.",
+    "You call that a roast? My toaster has more heat and better timing.",
+    "Your rating went down so fast the leaderboard filed a missing person report.",
+    "I'd agree with you, but then we'd both be wrong, and only one of us is used to it.",
+]
+
+
+def roast_payloads(count: int, rounds: int = 5, seed: int = 0) -> Iterator[Dict]:
+    """실제 배틀과 같은 모양의 /roast 요청 count개 (라운드가 진행될수록 history가 길어짐)"""
+    rng = random.Random(seed)
+    for i in range(count):
+        battle, round_number = divmod(i, rounds)
+        if round_number == 0:
+            style = rng.choice(LOAD_TEST_STYLES)
+            topic = rng.choice(LOAD_TEST_TOPICS)
+            opponent = {'id': f'agent_load_{battle}', 'name': f'LoadBot{battle}'}
+            history = []
+        payload = {
+            'battle_id': f'battle_load_{battle}',
+            'round': round_number + 1,
+            'agent': {'id': 'agent_load', 'name': 'LoadTester', 'style': style},
+            'opponent': opponent,
+            'history': list(history),
+        }
+        if topic:
+            payload['topic'] = topic
+        yield payload
+        history.append({'agent': 'self', 'message': rng.choice(LOAD_TEST_LINES)})
+        history.append({'agent': 'opponent', 'message': rng.choice(LOAD_TEST_LINES)})
+
+
+@dataclass
+class LoadTestReport:
+    """External API 부하 테스트 결과 (지연 시간은 ms)"""
+    endpoint: str
+    timeout_ms: int
+    concurrency: int
+    latencies: List[float]
+    errors: Dict[str, int]
+    elapsed: float
+
+    @property
+    def total(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def error_rate(self) -> float:
+        return self.error_count / self.total if self.total else 0.0
+
+    @property
+    def over_timeout_rate(self) -> float:
+        """timeout_ms를 넘긴 요청 비율 (플랫폼에서는 이만큼 fallback/실패)"""
+        if not self.total:
+            return 0.0
+        return sum(1 for l in self.latencies if l > self.timeout_ms) / self.total
+
+    def percentile(self, q: float) -> float:
+        """nearest-rank 백분위수 (q: 0-100)"""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(int(-(-q * len(ordered) // 100)), 1)  # ceil
+        return ordered[min(rank, len(ordered)) - 1]
+
+    def to_dict(self) -> Dict:
+        return {
+            'endpoint': self.endpoint,
+            'timeout_ms': self.timeout_ms,
+            'concurrency': self.concurrency,
+            'requests': self.total,
+            'elapsed': round(self.elapsed, 3),
+            'p50_ms': round(self.percentile(50), 1),
+            'p95_ms': round(self.percentile(95), 1),
+            'p99_ms': round(self.percentile(99), 1),
+            'max_ms': round(max(self.latencies, default=0.0), 1),
+            'error_rate': round(self.error_rate, 4),
+            'over_timeout_rate': round(self.over_timeout_rate, 4),
+            'errors': dict(self.errors),
+        }
+
+
+def run_load_test(
+    endpoint: str,
+    count: int = LOAD_TEST_REQUESTS,
+    concurrency: int = LOAD_TEST_CONCURRENCY,
+    timeout_ms: int = 5000
+) -> LoadTestReport:
+    """roast_payloads()를 concurrency개씩 동시에 endpoint로 보내 지연 시간/오류 측정
+
+    timeout_ms를 넘긴 응답도 분포를 보기 위해 timeout_ms의 2배까지 기다립니다.
+    200 + 비어 있지 않은 message가 아니면 오류로 집계합니다.
+    """
+    concurrency = max(1, min(concurrency, count))
+    session = create_session(pool_maxsize=concurrency)
+    client_timeout = (CONNECT_TIMEOUT, max(timeout_ms * 2, 2000) / 1000)
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def send(payload: Dict) -> float:
+        started = time.perf_counter()
+        error = None
+        try:
+            response = session.post(endpoint, json=payload, timeout=client_timeout)
+            if response.status_code != 200:
+                error = f"HTTP {response.status_code}"
+            else:
+                try:
+                    message = response.json().get('message')
+                except (ValueError, AttributeError):
+                    message = None
+                if not isinstance(message, str) or not message.strip():
+                    error = "잘못된 응답"
+        except requests.exceptions.Timeout:
+            error = "타임아웃"
+        except requests.exceptions.RequestException:
+            error = "연결 실패"
+        latency = (time.perf_counter() - started) * 1000
+        if error:
+            with lock:
+                errors[error] = errors.get(error, 0) + 1
+        return latency
+
+    started = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = list(executor.map(send, roast_payloads(count)))
+    finally:
+        session.close()
+    return LoadTestReport(endpoint, timeout_ms, concurrency, latencies, errors, time.monotonic() - started)
+
+
+def format_load_report(report: LoadTestReport, agent_name: str = None, config: Dict = None) -> str:
+    """부하 테스트 결과와 플랫폼 기록(get_external_api) 비교"""
+    title = f": {agent_name}" if agent_name else ""
+    rate = report.total / report.elapsed if report.elapsed else 0.0
+    lines = [
+        f"🔥 External API 부하 테스트{title}",
+        f"엔드포인트: {report.endpoint}",
+        f"요청 {report.total}개 · 동시 {report.concurrency} · {report.elapsed:.1f}초 ({rate:.1f} req/s)",
+        "",
+        f"⏱️ 지연 시간: p50 {report.percentile(50):,.0f}ms | p95 {report.percentile(95):,.0f}ms"
+        f" | p99 {report.percentile(99):,.0f}ms (최대 {max(report.latencies, default=0):,.0f}ms)",
+    ]
+    error_detail = ", ".join(f"{k} {v}" for k, v in sorted(report.errors.items(), key=lambda e: -e[1]))
+    lines.append(f"❌ 오류율: {report.error_rate:.1%}" + (f" ({error_detail})" if error_detail else ""))
+
+    fallback = (config or {}).get('externalApi', {}).get('fallbackToInternal', True)
+    consequence = "내부 AI로 대체" if fallback else "응답 실패"
+    lines.append(f"⌛ 타임아웃({report.timeout_ms:,}ms) 초과: {report.over_timeout_rate:.1%} → 이 비율의 라운드가 {consequence}")
+
+    if config:
+        failures = config.get('consecutiveFailures', 0)
+        lines += [
+            "",
+            f"📡 플랫폼 기록: 상태 {config.get('status', '-')} · 연속 실패 {failures}회",
+            f"   마지막 호출 {config.get('lastCalledAt') or '-'} · 마지막 성공 {config.get('lastSuccessAt') or '-'}",
+        ]
+        if failures and report.error_rate == 0 and report.over_timeout_rate == 0:
+            lines.append("   ℹ️ 로컬에서는 문제가 없지만 플랫폼에서는 실패가 기록됐습니다. 네트워크/HTTPS 설정을 확인하세요.")
+
+    if report.percentile(99) > report.timeout_ms * 0.8:
+        lines += ["", "⚠️ p99가 타임아웃의 80%를 넘습니다. timeout을 늘리거나 서버 용량을 늘리세요."]
+    return "\n".join(lines)
+
+
+def load_test_external_api(
+    agent_name: str = None,
+    count: int = LOAD_TEST_REQUESTS,
+    concurrency: int = LOAD_TEST_CONCURRENCY,
+    endpoint: str = None,
+    timeout_ms: int = None
+) -> str:
+    """
+    에이전트의 External API에 실제 배틀 모양의 /roast 요청을 동시에 보내 지연 시간 측정
+
+    Args:
+        agent_name: 에이전트 이름 (없으면 첫 번째 에이전트, endpoint를 주면 사용 안 함)
+        count: 보낼 요청 수
+        concurrency: 동시 요청 수
+        endpoint: 직접 지정할 /roast URL (배포 전 로컬 서버 측정용)
+        timeout_ms: 비교할 타임아웃 (없으면 에이전트 설정, 그것도 없으면 5000)
+    """
+    config = None
+    agent_display = None
+    if not endpoint:
+        api = get_client()
+        try:
+            agents = api.list_agents()
+            if not agents:
+                return "등록된 에이전트가 없습니다."
+
+            agent, error = find_agent(agents, agent_name)
+            if error:
+                return error
+
+            agent_display = agent.get('display_name') or agent.get('name')
+            config = api.get_external_api(agent['id'])
+        except MoltArenaAPIError as e:
+            return f"❌ External API 설정 조회 실패: {e.message}"
+
+        endpoint = (config.get('externalApi') or {}).get('endpoint')
+        if not endpoint:
+            return f"❌ {agent_display}에 External API가 설정되어 있지 않습니다."
+        timeout_ms = timeout_ms or (config.get('externalApi') or {}).get('timeout')
+
+    report = run_load_test(endpoint, count, concurrency, timeout_ms or 5000)
+    return format_load_report(report, agent_display, config)
+
+
+# ============== 알림 우선순위 / 병합 ==============
+
+# 타입별 우선순위 (높을수록 먼저). API_REFERENCE.md에 '-'로 표시된 타입은 여기서 정함
+NOTIFICATION_PRIORITIES = {
+    'tournament_started': 10,
+    'tournament_ended': 10,
+    'challenge': 9,
+    'tournament_battle_completed': 8,
+    'battle_completed': 7,
+    'top_100': 6,
+    'tournament_rank_change': 6,
+    'rank_change': 5,
+    'tournament_registration_reminder': 5,
+    'tournament_registration_open': 4,
+    'referral_conversion': 4,
+    'bp_earned': 3,
+    'bp_daily_bonus': 3,
+    'referral_points_claimable': 2,
+}
+LEGACY_PRIORITIES = {'high': 9, 'normal': 5, 'low': 2}  # 예전 문자열 priority 필드
+DEFAULT_NOTIFICATION_PRIORITY = 5
+
+
+def notification_priority(notification: Dict) -> float:
+    """알림 우선순위 (숫자 priority 필드 > 문자열 priority 필드 > 타입별 기본값)"""
+    priority = notification.get('priority')
+    if isinstance(priority, (int, float)) and not isinstance(priority, bool):
+        return priority
+    if priority in LEGACY_PRIORITIES:
+        return LEGACY_PRIORITIES[priority]
+    return NOTIFICATION_PRIORITIES.get(notification.get('type'), DEFAULT_NOTIFICATION_PRIORITY)
+
+
+def _merge_bp_earned(group: List[Dict]) -> Dict:
+    return {
+        'amount': sum((n.get('data') or {}).get('amount') or 0 for n in group),
+        'count': len(group),
+        'new_balance': (group[-1].get('data') or {}).get('new_balance'),
+    }
+
+
+def _merge_tournament_battles(group: List[Dict]) -> Dict:
+    results = [(n.get('data') or {}).get('result') for n in group]
+    return {
+        'tournament_name': (group[-1].get('data') or {}).get('tournament_name', ''),
+        'count': len(group),
+        'wins': results.count('win'),
+        'losses': results.count('loss'),
+        'draws': results.count('draw'),
+    }
+
+
+def _merge_rank_changes(group: List[Dict]) -> Dict:
+    first, last = group[0].get('data') or {}, group[-1].get('data') or {}
+    return {**last, 'old_rank': first.get('old_rank'), 'count': len(group)}
+
+
+def _merge_referral_conversions(group: List[Dict]) -> Dict:
+    types = {(n.get('data') or {}).get('type') for n in group}
+    return {
+        'type': types.pop() if len(types) == 1 else 'mixed',
+        'points': sum((n.get('data') or {}).get('points') or 0 for n in group),
+        'count': len(group),
+    }
+
+
+# 타입 -> (묶음 키 함수(data), 병합 함수(created_at 순 묶음) -> 병합된 data)
+COALESCE_RULES = {
+    'bp_earned': (lambda data: None, _merge_bp_earned),
+    'tournament_battle_completed': (
+        lambda data: data.get('tournament_id') or data.get('tournament_name'), _merge_tournament_battles
+    ),
+    'tournament_rank_change': (
+        lambda data: data.get('tournament_id') or data.get('tournament_name'), _merge_rank_changes
+    ),
+    'rank_change': (lambda data: data.get('agent_id'), _merge_rank_changes),
+    'referral_conversion': (lambda data: None, _merge_referral_conversions),
+    'referral_points_claimable': (lambda data: None, lambda group: dict(group[-1].get('data') or {})),
+}
+
+
+def coalesce_notifications(notifications: List[Dict]) -> List[Dict]:
+    """같은 종류의 알림 묶음을 하나로 병합 (예: bp_earned 7건 → "+1,250 BP (보상 7건)")
+
+    병합한 알림은 data에 count를 담고, 원본 목록을 'merged'에 보관해
+    HeartbeatState.commit이 원본 모두를 전달한 것으로 기록합니다.
+    우선순위는 묶음에서 가장 높은 값, created_at은 가장 늦은 값을 쓰며 묶음은 첫 알림 자리에 놓입니다.
+    """
+    groups: "OrderedDict[Any, List[Dict]]" = OrderedDict()
+    for index, n in enumerate(notifications):
+        rule = COALESCE_RULES.get(n.get('type'))
+        key = (n['type'], rule[0](n.get('data') or {})) if rule else index
+        groups.setdefault(key, []).append(n)
+
+    result = []
+    for group in groups.values():
+        if len(group) == 1:
+            result.append(group[0])
+            continue
+        group.sort(key=lambda n: n.get('created_at') or '')
+        ntype = group[0]['type']
+        result.append({
+            'type': ntype,
+            'data': COALESCE_RULES[ntype][1](group),
+            'priority': max(notification_priority(n) for n in group),
+            'created_at': group[-1].get('created_at'),
+            'merged': group,
+        })
+    return result
+
+
+def select_notifications(
+    queued: List[Tuple[float, Dict]],
+    limit: int = MAX_NOTIFICATIONS,
+    now: float = None
+) -> Tuple[List[Dict], List[Tuple[float, Dict]]]:
+    """이월 큐 + 새 알림에서 이번에 보낼 알림 선택 (병합 → 우선순위 힙)
+
+    유효 우선순위는 notification_priority + 대기 시간 / NOTIFICATION_AGING_INTERVAL 이라
+    낮은 우선순위 알림도 계속 밀리지 않고 결국 전달됩니다.
+
+    Args:
+        queued: (대기 시작 시각, 알림) 목록
+        limit: 보낼 최대 개수 (병합된 알림은 하나로 셈)
+
+    Returns:
+        (보낼 알림 - 우선순위 순, 이월할 (대기 시작 시각, 원본 알림) - 유효 우선순위 순)
+        이월 큐 크기 제한은 HeartbeatState.commit이 적용합니다.
+    """
+    now = time.time() if now is None else now
+    queued_at = {id(n): ts for ts, n in queued}
+
+    heap = []
+    for order, n in enumerate(coalesce_notifications([n for _, n in queued])):
+        waiting_since = min(queued_at[id(m)] for m in n.get('merged') or [n])
+        effective = notification_priority(n) + max(0.0, now - waiting_since) / NOTIFICATION_AGING_INTERVAL
+        heap.append((-effective, n.get('created_at') or '', order, n))
+    heapq.heapify(heap)
+
+    selected = [heapq.heappop(heap)[-1] for _ in range(min(limit, len(heap)))]
+    deferred = [
+        (queued_at[id(m)], m)
+        for *_, n in sorted(heap)
+        for m in n.get('merged') or [n]
+    ]
+    return selected, deferred
+
+
 # ============== Heartbeat ==============
 
-# 마지막 폴링 시간 캐시 (중복 알림 방지)
-_last_poll_time: Optional[str] = None
+class HeartbeatState:
+    """Heartbeat 커서와 알림 중복 제거 상태 (API Key별, 파일에 영구 저장)
+
+    - 커서는 로컬 시계가 아닌 서버 응답의 polled_at을 사용
+    - 이미 전달한 알림의 id(없으면 내용 지문)를 최대 max_seen개 기억해 재전송 방지
+    - 커서보다 window초 이상 오래된 지문은 저장할 때 정리
+    - 한 번에 보내지 못한 알림은 이월 큐(pending)에 두었다가 다음 Heartbeat에서 전달
+    - 이월 큐는 우선순위가 높은 max_pending개만 유지하고, 버린 알림 수는 dropped에 누적
+    """
+
+    def __init__(
+        self,
+        directory: str = None,
+        api_key: str = None,
+        max_seen: int = DEDUPE_MAX_ENTRIES,
+        window: float = DEDUPE_WINDOW,
+        max_pending: int = PENDING_MAX_ENTRIES
+    ):
+        namespace = api_key_fingerprint(api_key)
+        self.path = (
+            os.path.join(os.path.expanduser(directory), f"heartbeat_{namespace}.json") if directory else None
+        )
+        self.max_seen = max_seen
+        self.window = window
+        self.max_pending = max_pending
+        self.cursor: Optional[str] = None
+        self.dropped = 0  # 이월 큐가 넘쳐 버린 알림 수 (누적)
+        self._seen: "OrderedDict[str, float]" = OrderedDict()  # 지문 -> created_at timestamp
+        self._pending: List[Tuple[float, Dict]] = []  # (대기 시작 시각, 알림)
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def fingerprint(notification: Dict) -> str:
+        """알림 식별자 (id가 없으면 type + created_at + data 해시)"""
+        if notification.get('id'):
+            return f"id:{notification['id']}"
+        raw = json.dumps(
+            [notification.get('type'), notification.get('created_at'), notification.get('data')],
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return "fp:" + hashlib.sha1(raw.encode()).hexdigest()
+
+    def _load(self) -> None:
+        if not self.path:
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.cursor = data.get('cursor')
+        self._seen = OrderedDict((fp, ts) for fp, ts in data.get('seen', []))
+        self._pending = [(ts, n) for ts, n in data.get('pending', [])]
+        self.dropped = data.get('dropped', 0)
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'cursor': self.cursor,
+                    'seen': list(self._seen.items()),
+                    'pending': [[ts, n] for ts, n in self._pending],
+                    'dropped': self.dropped,
+                }, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    @property
+    def pending(self) -> List[Tuple[float, Dict]]:
+        """이월 큐 (대기 시작 시각, 알림) 목록"""
+        with self._lock:
+            return list(self._pending)
+
+    def filter_new(self, notifications: List[Dict]) -> List[Dict]:
+        """아직 전달하지 않은 알림만 반환 (이월 큐에 있는 알림, 같은 배치 안의 중복도 제거)"""
+        fresh = []
+        with self._lock:
+            batch = {self.fingerprint(n) for _, n in self._pending}
+            for n in notifications:
+                fp = self.fingerprint(n)
+                if fp in self._seen or fp in batch:
+                    continue
+                batch.add(fp)
+                fresh.append(n)
+        return fresh
+
+    def commit(
+        self,
+        polled_at: Optional[str],
+        delivered: List[Dict],
+        pending: List[Tuple[float, Dict]] = None
+    ) -> int:
+        """전달한 알림을 기록하고 커서를 전진시킨 뒤 저장
+
+        polled_at이 없으면 전달한 알림 중 가장 늦은 created_at이 현재 커서보다 늦을 때만 커서로 사용합니다.
+        병합된 알림(coalesce_notifications)은 원본 모두를 기록하고, pending을 주면 이월 큐를 교체합니다.
+        pending은 우선순위 순이어야 하며(select_notifications), max_pending개를 넘는 뒤쪽은 버립니다.
+
+        Returns:
+            이번에 이월 큐가 넘쳐 버린 알림 수
+        """
+        delivered = [m for n in delivered for m in n.get('merged') or [n]]
+        dropped = 0
+        with self._lock:
+            if pending is not None:
+                dropped = max(0, len(pending) - self.max_pending)
+                self._pending = list(pending[:self.max_pending])
+                self.dropped += dropped
+            for n in delivered:
+                created = parse_timestamp(n.get('created_at')) or time.time()
+                self._seen[self.fingerprint(n)] = created
+                self._seen.move_to_end(self.fingerprint(n))
+
+            if not polled_at and delivered:
+                # 늦게 도착한 예전 알림으로 커서가 뒤로 가지 않도록 앞으로만 이동
+                latest = max(delivered, key=lambda n: parse_timestamp(n.get('created_at')) or 0.0)
+                latest_ts = parse_timestamp(latest.get('created_at'))
+                cursor_ts = parse_timestamp(self.cursor)
+                if latest_ts is not None and (cursor_ts is None or latest_ts > cursor_ts):
+                    polled_at = latest['created_at']
+            if polled_at:
+                self.cursor = polled_at
+
+            self._compact()
+            self._save()
+        return dropped
+
+    def _compact(self) -> None:
+        """오래된 지문 정리 + 최대 개수 유지 (오래 전에 기록한 것부터)"""
+        cursor_ts = parse_timestamp(self.cursor)
+        if cursor_ts is not None:
+            horizon = cursor_ts - self.window
+            for fp in [fp for fp, ts in self._seen.items() if ts < horizon]:
+                del self._seen[fp]
+        while len(self._seen) > self.max_seen:
+            self._seen.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+_heartbeat_states: Dict[str, HeartbeatState] = {}
+_heartbeat_states_lock = threading.Lock()
+
+
+def get_heartbeat_state(api_key: str = None, directory: str = None) -> HeartbeatState:
+    """API Key별 Heartbeat 상태 (프로세스 안에서 재사용)"""
+    api_key = api_key or MOLTARENA_API_KEY
+    directory = directory or STATE_DIR
+    key = f"{directory}:{api_key}"
+    with _heartbeat_states_lock:
+        state = _heartbeat_states.get(key)
+        if state is None:
+            state = _heartbeat_states[key] = HeartbeatState(directory, api_key)
+        return state
+
 
 def heartbeat() -> List[str]:
     """
@@ -900,35 +5006,28 @@ def heartbeat() -> List[str]:
     OpenClaw 플랫폼이 5분마다 이 함수를 호출합니다.
     - 알림이 없으면 ["HEARTBEAT_OK"] 반환 → 메시지 전송 안 함
     - 알림이 있으면 포맷된 알림 리스트 반환 → 사용자에게 전송
+    - 같은 종류의 알림 묶음은 하나로 병합하고, MAX_NOTIFICATIONS개를 넘는 알림은 다음 호출로 이월
 
     Returns:
         알림 메시지 리스트 또는 ["HEARTBEAT_OK"]
     """
-    global _last_poll_time
-    MAX_NOTIFICATIONS = 5
-
     try:
-        api = MoltArenaAPI()
-        notifications = api.poll_notifications(since=_last_poll_time)
-
-        # 현재 시간 저장 (다음 폴링에서 중복 방지)
-        _last_poll_time = datetime.now().isoformat()
-
-        if not notifications:
+        api = get_client()
+        state = get_heartbeat_state(api.api_key)
+        page = api.poll_notifications_page(since=state.cursor)
+
+        # 이미 전달한 알림 제외 후 지난번 이월분과 합침
+        now = time.time()
+        fresh = state.filter_new(page.get('notifications', []))
+        queued = state.pending + [(now, n) for n in fresh]
+
+        if not queued:
+            # 서버 시각(polled_at)으로 커서 전진
+            state.commit(page.get('polled_at'), [])
             return ["HEARTBEAT_OK"]
 
-        # 우선순위 정렬 (high > normal > low)
-        priority_order = {'high': 0, 'normal': 1, 'low': 2}
-        notifications.sort(
-            key=lambda n: (
-                priority_order.get(n.get('priority', 'normal'), 1),
-                n.get('created_at', '')
-            ),
-            reverse=False
-        )
-
-        # 최대 개수 제한
-        notifications = notifications[:MAX_NOTIFICATIONS]
+        # 병합 → 우선순위(+대기 시간) 순으로 선택, 나머지는 이월
+        notifications, deferred = select_notifications(queued, MAX_NOTIFICATIONS, now)
 
         messages = []
         for n in notifications:
@@ -936,6 +5035,9 @@ def heartbeat() -> List[str]:
             if formatted:
                 messages.append(formatted)
 
+        dropped = state.commit(page.get('polled_at'), notifications, pending=deferred)
+        if dropped:
+            messages.append(f"⚠️ 알림이 너무 많이 쌓여 우선순위가 낮은 알림 {dropped:,}건을 전달하지 못했습니다.")
         return messages if messages else ["HEARTBEAT_OK"]
 
     except Exception:
@@ -943,19 +5045,328 @@ def heartbeat() -> List[str]:
         return ["HEARTBEAT_OK"]
 
 
+# ============== 알림 리스너 ==============
+
+PUSH_UNSUPPORTED_STATUS = {404, 405, 406, 415, 501}  # 이 응답이면 다음 수신 방식으로 전환
+
+
+def parse_sse(lines) -> Iterator[Dict[str, Optional[str]]]:
+    """SSE(text/event-stream) 줄 스트림을 이벤트({'event', 'data', 'id'})로 변환
+
+    빈 줄에서 이벤트가 끝나며, ':'로 시작하는 keep-alive 주석은 무시합니다.
+    """
+    fields: Dict[str, str] = {}
+    data: List[str] = []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', 'replace')
+        line = line.rstrip('\r')
+        if not line:
+            if data:
+                yield {'event': fields.get('event', 'message'), 'data': '\n'.join(data), 'id': fields.get('id')}
+            fields, data = {}, []
+            continue
+        if line.startswith(':'):
+            continue
+        name, _, value = line.partition(':')
+        if value.startswith(' '):
+            value = value[1:]
+        if name == 'data':
+            data.append(value)
+        elif name in ('event', 'id'):
+            fields[name] = value
+
+
+def notifications_from_payload(payload: Any) -> List[Dict]:
+    """푸시 페이로드에서 알림 목록 추출
+
+    {"notifications": [...]}, 알림 하나({"type": ...}), 알림 배열을 모두 받습니다.
+    """
+    if isinstance(payload, list):
+        return [n for n in payload if isinstance(n, dict)]
+    if isinstance(payload, dict):
+        if isinstance(payload.get('notifications'), list):
+            return [n for n in payload['notifications'] if isinstance(n, dict)]
+        if payload.get('type'):
+            return [payload]
+    return []
+
+
+class NotificationListener:
+    """푸시 기반 알림 리스너 (Heartbeat의 5분 폴링 대체)
+
+    수신 방식:
+    - sse: GET /notifications/stream 이벤트 스트림 (연결 하나로 계속 수신)
+    - longpoll: GET /notifications/poll?wait=N (새 알림이 생길 때까지 서버가 응답을 보류)
+    - webhook: 로컬 HTTP 서버로 POST 수신 (X-MoltArena-Signature로 HMAC 검증)
+    - poll: poll_interval마다 poll_notifications_page 호출
+
+    mode='auto'는 sse → longpoll → poll 순서로 시도하고, 다른 방식을 지정하면 그 방식 → poll 순서입니다.
+    서버가 방식을 지원하지 않거나 (404/415 등, wait를 무시하고 바로 빈 응답) Webhook 포트를 열 수 없으면
+    다음 방식으로 내려가고, 폴링으로 내려간 뒤에는 reprobe_interval마다 다시 푸시를 시도합니다. 모든 알림은 HeartbeatState로 중복을 제거한 뒤
+    format_notification을 거쳐 on_message로 전달되므로 heartbeat()와 함께 써도 두 번 전달되지 않습니다.
+    """
+
+    MODES = ('auto', 'sse', 'longpoll', 'webhook', 'poll')
+
+    def __init__(
+        self,
+        on_message,
+        api: "MoltArenaAPI" = None,
+        mode: str = 'auto',
+        state: HeartbeatState = None,
+        poll_interval: float = LISTEN_POLL_INTERVAL,
+        long_poll_wait: int = LONG_POLL_WAIT,
+        reprobe_interval: float = LISTEN_REPROBE_INTERVAL,
+        webhook_host: str = WEBHOOK_HOST,
+        webhook_port: int = WEBHOOK_PORT,
+        webhook_path: str = WEBHOOK_PATH,
+        webhook_secret: str = WEBHOOK_SECRET
+    ):
+        """
+        Args:
+            on_message: 포맷된 알림 메시지(str)를 받을 콜백
+            api: 사용할 클라이언트 (기본: get_client())
+            mode: 수신 방식 (MODES 중 하나)
+            state: 커서/중복 제거 상태 (기본: API Key별 Heartbeat 상태 공유)
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"mode는 {', '.join(self.MODES)} 중 하나여야 합니다: {mode}")
+        self.on_message = on_message
+        self.api = api or get_client()
+        self.mode = mode
+        self.state = state if state is not None else get_heartbeat_state(self.api.api_key)
+        self.poll_interval = poll_interval
+        self.long_poll_wait = long_poll_wait
+        self.reprobe_interval = reprobe_interval
+        self.webhook_host = webhook_host
+        self.webhook_port = webhook_port
+        self.webhook_path = webhook_path
+        self.webhook_secret = webhook_secret
+        self.backoff = RetryPolicy(backoff_max=LISTEN_RECONNECT_MAX)
+
+        self.active_mode: Optional[str] = None
+        self.delivered = 0
+        self._stop = threading.Event()
+        self._deliver_lock = threading.Lock()
+        self._last_event_id: Optional[str] = None
+        self._response: Optional[requests.Response] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    # ==================== 실행 제어 ====================
+
+    def run(self) -> None:
+        """stop()이 호출될 때까지 알림 수신 (블로킹)"""
+        self._stop.clear()
+        if self.mode == 'auto':
+            modes = ['sse', 'longpoll', 'poll']
+        elif self.mode == 'poll':
+            modes = ['poll']
+        else:
+            modes = [self.mode, 'poll']
+
+        index = 0
+        failures = 0
+        fell_back_at = None
+
+        while not self._stop.is_set():
+            self.active_mode = modes[index]
+            try:
+                received = getattr(self, f"_run_{self.active_mode}")()
+                if received == 0:
+                    # 이벤트 없이 끝난 스트림은 바로 재연결하지 않고 백오프
+                    failures += 1
+                    self._stop.wait(self._reconnect_delay(failures))
+                else:
+                    failures = 0
+            except MoltArenaAPIError as e:
+                if self._stop.is_set():
+                    break
+                if e.status_code in PUSH_UNSUPPORTED_STATUS and index < len(modes) - 1:
+                    index += 1
+                    fell_back_at = time.monotonic()
+                    continue
+                failures += 1
+                self._stop.wait(self._reconnect_delay(failures, e.details.get('retry_after')))
+            except (requests.exceptions.RequestException, OSError, ValueError):
+                # 스트림 중간 끊김
+                if self._stop.is_set():
+                    break
+                failures += 1
+                self._stop.wait(self._reconnect_delay(failures))
+            except Exception:
+                # stop()이 읽는 중인 응답을 닫으면 urllib3가 임의의 예외를 낼 수 있음
+                if self._stop.is_set():
+                    break
+                raise
+
+            if (index > 0 and fell_back_at is not None
+                    and time.monotonic() - fell_back_at >= self.reprobe_interval):
+                index = 0
+                fell_back_at = None
+
+        self.active_mode = None
+
+    def start(self) -> threading.Thread:
+        """백그라운드 스레드에서 run() 실행"""
+        thread = threading.Thread(target=self.run, name='moltarena-listener', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        """수신 중지 (SSE 연결은 즉시 닫고, 진행 중인 long-poll은 응답 후 종료)"""
+        self._stop.set()
+        response = self._response
+        if response is not None:
+            # close()만으로는 다른 스레드에서 블로킹된 읽기가 깨어나지 않으므로 소켓을 먼저 shutdown
+            sock = getattr(getattr(response.raw, 'connection', None), 'sock', None)
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            response.close()
+
+    def _reconnect_delay(self, failures: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return retry_after
+        return self.backoff.backoff_base + self.backoff.delay(failures)
+
+    # ==================== 전달 ====================
+
+    def _deliver(self, notifications: List[Dict], polled_at: Optional[str] = None) -> int:
+        """새 알림만 병합/포맷해 on_message로 전달한 뒤 커서 저장 (전달한 원본 개수 반환)
+
+        콜백이 끝난 뒤에 커밋하므로 콜백이 실패하면 다음 수신 때 다시 전달됩니다.
+        """
+        with self._deliver_lock:
+            fresh = self.state.filter_new(notifications)
+            fresh.sort(key=lambda n: n.get('created_at') or '')
+            for n in coalesce_notifications(fresh):
+                message = format_notification(n)
+                if message:
+                    self.on_message(message)
+            self.state.commit(polled_at, fresh)
+            self.delivered += len(fresh)
+            return len(fresh)
+
+    # ==================== 수신 방식 ====================
+
+    def _run_sse(self) -> int:
+        """스트림이 끝날 때까지 수신하고 받은 이벤트 수 반환"""
+        response = self.api.open_notification_stream(since=self.state.cursor, last_event_id=self._last_event_id)
+        self._response = response
+        received = 0
+        try:
+            if self._stop.is_set():
+                return received
+            # chunk_size=None: 청크가 도착하는 대로 처리 (512바이트를 채울 때까지 기다리지 않음)
+            for event in parse_sse(response.iter_lines(chunk_size=None, decode_unicode=True)):
+                if event['id']:
+                    self._last_event_id = event['id']
+                received += 1
+                if event['event'] not in ('message', 'notification', 'notifications'):
+                    continue  # ping 등
+                try:
+                    payload = json.loads(event['data'])
+                except ValueError:
+                    continue
+                polled_at = payload.get('polled_at') if isinstance(payload, dict) else None
+                self._deliver(notifications_from_payload(payload), polled_at)
+                if self._stop.is_set():
+                    break
+        finally:
+            self._response = None
+            response.close()
+        return received
+
+    def _run_longpoll(self) -> None:
+        started = time.monotonic()
+        page = self.api.poll_notifications_page(since=self.state.cursor, wait=self.long_poll_wait)
+        notifications = page.get('notifications', [])
+        self._deliver(notifications, page.get('polled_at'))
+
+        # wait를 무시하고 바로 빈 응답을 준 서버는 long-poll 미지원으로 판단
+        if not notifications and time.monotonic() - started < min(self.long_poll_wait / 2, 5.0):
+            raise MoltArenaAPIError("long-poll을 지원하지 않는 서버입니다.", status_code=501)
+
+    def _run_poll(self) -> None:
+        page = self.api.poll_notifications_page(since=self.state.cursor)
+        self._deliver(page.get('notifications', []), page.get('polled_at'))
+        self._stop.wait(self.poll_interval)
+
+    def _run_webhook(self) -> None:
+        listener = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path.split('?', 1)[0] != listener.webhook_path:
+                    return self._reply(404)
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                if not listener.verify_signature(body, self.headers.get('X-MoltArena-Signature')):
+                    return self._reply(401)
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    return self._reply(400)
+                listener._deliver(notifications_from_payload(payload))
+                self._reply(204)
+
+            def _reply(self, status):
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            server = ThreadingHTTPServer((self.webhook_host, self.webhook_port), Handler)
+        except OSError as e:
+            raise MoltArenaAPIError(f"Webhook 수신 포트를 열 수 없습니다: {e}", status_code=501)
+
+        server.timeout = 0.5  # stop() 확인 간격
+        self._server = server
+        try:
+            while not self._stop.is_set():
+                server.handle_request()
+        finally:
+            self._server = None
+            server.server_close()
+
+    @property
+    def webhook_address(self) -> Optional[Tuple[str, int]]:
+        """Webhook 서버가 실제로 바인드한 (host, port) (실행 중이 아니면 None)"""
+        server = self._server
+        return server.server_address[:2] if server is not None else None
+
+    def verify_signature(self, body: bytes, signature: Optional[str]) -> bool:
+        """X-MoltArena-Signature: sha256=<HMAC-SHA256(secret, body) hex> 검증 (secret 미설정 시 통과)"""
+        if not self.webhook_secret:
+            return True
+        if not signature:
+            return False
+        expected = hmac.new(self.webhook_secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(signature.split('=', 1)[-1], expected)
+
+
+def listen(mode: str = 'auto') -> None:
+    """알림 리스너 실행 - 알림이 도착하는 즉시 출력 (Ctrl+C로 종료)"""
+    listener = NotificationListener(on_message=lambda message: print(f"{message}\n---", flush=True), mode=mode)
+    try:
+        listener.run()
+    except KeyboardInterrupt:
+        listener.stop()
+
+
 # ============== Tournament Functions ==============
 
 def list_tournaments(status: str = None) -> str:
     """활성 토너먼트 목록 조회 (참가 상태 포함)"""
-    api = MoltArenaAPI()
+    api = get_client()
 
     try:
-        params = {'limit': '10'}
-        if status:
-            params['status'] = status
-
-        result = api._request('GET', '/deploy/tournaments', params=params)
-        tournaments = result.get('tournaments', [])
+        tournaments = api.list_tournaments(status)
 
         if not tournaments:
             return "현재 참가 가능한 토너먼트가 없습니다."
@@ -1018,7 +5429,7 @@ def list_tournaments(status: str = None) -> str:
 
 def join_tournament(tournament_id: str, agent_name: str = None, payment_type: str = 'bp') -> str:
     """토너먼트 참가"""
-    api = MoltArenaAPI()
+    api = get_client()
 
     try:
         # 에이전트 찾기
@@ -1026,24 +5437,14 @@ def join_tournament(tournament_id: str, agent_name: str = None, payment_type: st
         if not agents:
             return "등록된 에이전트가 없습니다."
 
-        if agent_name:
-            agent = next(
-                (a for a in agents if agent_name.lower() in
-                 (a.get('name', '') + a.get('display_name', '')).lower()),
-                None
-            )
-            if not agent:
-                return f"'{agent_name}' 에이전트를 찾을 수 없습니다."
-        else:
-            agent = agents[0]
+        agent, error = find_agent(agents, agent_name)
+        if error:
+            return error
 
         agent_display = agent.get('display_name') or agent.get('name')
 
         # 참가 요청
-        result = api._request('POST', f'/deploy/tournaments/{tournament_id}/join', data={
-            'agentId': agent['id'],
-            'paymentType': payment_type
-        })
+        result = api.join_tournament(tournament_id, agent['id'], payment_type)
 
         if result.get('success'):
             entry = result.get('entry', {})
@@ -1065,12 +5466,10 @@ def join_tournament(tournament_id: str, agent_name: str = None, payment_type: st
 
 def cancel_tournament(tournament_id: str, entry_id: str) -> str:
     """토너먼트 참가 취소"""
-    api = MoltArenaAPI()
+    api = get_client()
 
     try:
-        result = api._request('POST', f'/deploy/tournaments/{tournament_id}/cancel', data={
-            'entryId': entry_id
-        })
+        result = api.cancel_tournament(tournament_id, entry_id)
 
         if result.get('success'):
             refunded = result.get('refunded', 0)
@@ -1087,12 +5486,10 @@ def cancel_tournament(tournament_id: str, entry_id: str) -> str:
 
 def get_tournament_leaderboard(tournament_id: str, limit: int = 10) -> str:
     """토너먼트 리더보드 조회"""
-    api = MoltArenaAPI()
+    api = get_client()
 
     try:
-        result = api._request('GET', f'/deploy/tournaments/{tournament_id}/leaderboard', params={
-            'limit': str(limit)
-        })
+        result = api.get_tournament_leaderboard(tournament_id, limit)
 
         tournament = result.get('tournament', {})
         leaderboard = result.get('leaderboard', [])
@@ -1124,10 +5521,10 @@ def get_tournament_leaderboard(tournament_id: str, limit: int = 10) -> str:
 
 def get_bp_balance() -> str:
     """BP 잔액 조회"""
-    api = MoltArenaAPI()
+    api = get_client()
 
     try:
-        result = api._request('GET', '/deploy/bp')
+        result = api.get_bp()
         bp = result.get('bp', {})
 
         balance = bp.get('balance', 0)
@@ -1148,13 +5545,10 @@ def get_bp_balance() -> str:
 
 def get_bp_transactions(limit: int = 10) -> str:
     """BP 거래내역 조회"""
-    api = MoltArenaAPI()
+    api = get_client()
 
     try:
-        result = api._request('GET', '/deploy/bp', params={
-            'transactions': 'true',
-            'limit': str(limit)
-        })
+        result = api.get_bp(transactions=True, limit=limit)
 
         bp = result.get('bp', {})
         transactions = result.get('transactions', [])
@@ -1198,10 +5592,10 @@ def get_bp_transactions(limit: int = 10) -> str:
 
 def get_referral_stats() -> str:
     """레퍼럴 통계 조회"""
-    api = MoltArenaAPI()
+    api = get_client()
 
     try:
-        result = api._request('GET', '/deploy/referral')
+        result = api.get_referral()
         referral = result.get('referral', {})
 
         code = referral.get('code')
@@ -1238,13 +5632,10 @@ def get_referral_stats() -> str:
 
 def get_referral_conversions(limit: int = 10) -> str:
     """레퍼럴 전환 내역 조회"""
-    api = MoltArenaAPI()
+    api = get_client()
 
     try:
-        result = api._request('GET', '/deploy/referral', params={
-            'conversions': 'true',
-            'limit': str(limit)
-        })
+        result = api.get_referral(conversions=True, limit=limit)
 
         conversions = result.get('conversions', [])
 
@@ -1274,139 +5665,594 @@ def get_referral_conversions(limit: int = 10) -> str:
         return f"❌ 전환 내역 조회 실패: {e.message}"
 
 
-# ============== CLI 테스트 ==============
+# ============== CLI ==============
+
+CLI_COMMANDS = frozenset({
+    'deploy', 'list', 'status', 'battle', 'battle-all', 'watch', 'leaderboard', 'import', 'last', 'heartbeat',
+    'listen', 'set-api', 'remove-api', 'test-api', 'load-api', 'tournaments', 'join', 'cancel', 'tleaderboard',
+    'bp', 'bp-history', 'referral', 'referral-history', 'batch', 'serve',
+})
+BATCH_EXCLUDED_COMMANDS = frozenset({'listen', 'batch', 'serve'})  # 끝나지 않거나 중첩되는 명령 (데몬도 실행하지 않음)
+
+
+def cli_usage() -> str:
+    """CLI 사용법"""
+    return "\n".join([
+        "Usage: python script.py <command> [args...]",
+        "\nCommands:",
+        "  deploy <name> [style]  - 에이전트 배포",
+        "  list                   - 에이전트 목록",
+        "  status [name]          - 에이전트 상태",
+        "  battle [name]          - 배틀 시작",
+        "  battle-all [names] [--json] - 여러 에이전트 배틀 일괄 시작 (쉼표로 구분, 없으면 전체)",
+        "  watch <battle_id...>   - 진행 중인 배틀 결과를 끝나는 대로 표시",
+        "  leaderboard [limit]    - 리더보드",
+        "  import <username>      - Moltbook import",
+        "  last                   - 마지막 배틀 결과",
+        "  heartbeat              - 알림 체크",
+        "  listen [mode]          - 알림 실시간 수신 (auto/sse/longpoll/webhook/poll)",
+        "\n  [External API]",
+        "  set-api <endpoint> [name]   - External API 설정",
+        "  remove-api [name]           - External API 제거",
+        "  test-api [name]             - External API 테스트",
+        "  load-api [name] [count] [concurrency] [--endpoint URL] - External API 부하 테스트 (p50/p95/p99)",
+        "\n  [Tournament]",
+        "  tournaments [status]        - 토너먼트 목록",
+        "  join <tournament_id> [agent] - 토너먼트 참가",
+        "  cancel <tournament_id> <entry_id> - 토너먼트 취소",
+        "  tleaderboard <tournament_id> - 토너먼트 리더보드",
+        "\n  [BP & Referral]",
+        "  bp                          - BP 잔액",
+        "  bp-history [limit]          - BP 거래내역",
+        "  referral                    - 레퍼럴 현황",
+        "  referral-history [limit]    - 레퍼럴 전환 내역",
+        "\n  [Batch & Daemon]",
+        "  batch [file|-] [--parallel N] - 여러 명령을 한 프로세스에서 실행 (한 줄에 하나, 결과는 JSON lines)",
+        "  serve [--socket PATH] [--idle-timeout SEC] - 상주 데몬 실행 (moltarena_cli.py가 명령을 전달)",
+        "  serve status | stop         - 데몬 상태 / 종료",
+    ])
+
+
+def run_command(command: str, args: List[str], on_message=None) -> str:
+    """CLI 명령 하나 실행 후 출력할 문자열 반환
 
-if __name__ == "__main__":
-    import sys
-
-    if len(sys.argv) < 2:
-        print("Usage: python script.py <command> [args...]")
-        print("\nCommands:")
-        print("  deploy <name> [style]  - 에이전트 배포")
-        print("  list                   - 에이전트 목록")
-        print("  status [name]          - 에이전트 상태")
-        print("  battle [name]          - 배틀 시작")
-        print("  leaderboard [limit]    - 리더보드")
-        print("  import <username>      - Moltbook import")
-        print("  last                   - 마지막 배틀 결과")
-        print("  heartbeat              - 알림 체크")
-        print("\n  [External API]")
-        print("  set-api <endpoint> [name]   - External API 설정")
-        print("  remove-api [name]           - External API 제거")
-        print("  test-api [name]             - External API 테스트")
-        print("\n  [Tournament]")
-        print("  tournaments [status]        - 토너먼트 목록")
-        print("  join <tournament_id> [agent] - 토너먼트 참가")
-        print("  cancel <tournament_id> <entry_id> - 토너먼트 취소")
-        print("  tleaderboard <tournament_id> - 토너먼트 리더보드")
-        print("\n  [BP & Referral]")
-        print("  bp                          - BP 잔액")
-        print("  bp-history [limit]          - BP 거래내역")
-        print("  referral                    - 레퍼럴 현황")
-        print("  referral-history [limit]    - 레퍼럴 전환 내역")
-        sys.exit(0)
-
-    command = sys.argv[1].lower()
-    args = sys.argv[2:]
+    Args:
+        command: 명령 이름 (CLI_COMMANDS)
+        args: 명령 인자
+        on_message: watch 결과를 끝나는 대로 받을 함수 (없으면 반환 문자열에 모아서 포함)
+
+    Raises:
+        ValueError: 알 수 없는 명령이거나 인자가 부족할 때
+        MoltArenaAPIError: 메인 함수가 처리하지 않은 API 오류
+    """
+    command = command.lower()
+    args = list(args)
+    if command == "deploy":
+        if not args:
+            raise ValueError("에이전트 이름이 필요합니다.")
+        result = deploy_agent(args[0], args[1] if len(args) > 1 else "witty")
+
+    elif command == "list":
+        result = list_agents()
+
+    elif command == "status":
+        result = get_status(args[0] if args else None)
+
+    elif command == "battle":
+        result = start_battle(args[0] if args else None)
+
+    elif command == "battle-all":
+        names = [a for a in args if a != '--json']
+        result = start_all_battles(','.join(names) or None, as_json='--json' in args)
+
+    elif command == "watch":
+        if not args:
+            raise ValueError("battle_id가 필요합니다.")
+        messages = []
+        for message in watch_battles(args):
+            if on_message is not None:
+                on_message(message)
+            else:
+                messages.append(message)
+        result = "\n---\n".join(messages + ["모든 배틀 확인을 마쳤습니다."])
+
+    elif command == "leaderboard":
+        limit = int(args[0]) if args else 10
+        result = get_leaderboard(limit)
+
+    elif command == "import":
+        if not args:
+            raise ValueError("Moltbook 사용자명이 필요합니다.")
+        result = import_moltbook(args[0])
+
+    elif command == "last":
+        result = get_last_battle()
+
+    elif command == "heartbeat":
+        messages = heartbeat()
+        result = "\n---\n".join(messages) if messages else "새로운 알림이 없습니다."
+
+    elif command == "listen":
+        listen(args[0] if args else 'auto')
+        result = "알림 수신을 종료했습니다."
+
+    elif command == "set-api":
+        if not args:
+            raise ValueError("endpoint URL이 필요합니다.")
+        agent_name = args[1] if len(args) > 1 else None
+        result = set_external_api(agent_name=agent_name, endpoint=args[0])
+
+    elif command == "remove-api":
+        agent_name = args[0] if args else None
+        result = remove_external_api(agent_name)
+
+    elif command == "test-api":
+        agent_name = args[0] if args else None
+        result = test_external_api(agent_name)
+
+    elif command == "load-api":
+        endpoint = None
+        if '--endpoint' in args:
+            index = args.index('--endpoint')
+            endpoint = args[index + 1] if index + 1 < len(args) else None
+            del args[index:index + 2]
+        names = [a for a in args if not a.isdigit()]
+        numbers = [int(a) for a in args if a.isdigit()]
+        result = load_test_external_api(
+            names[0] if names else None,
+            numbers[0] if numbers else LOAD_TEST_REQUESTS,
+            numbers[1] if len(numbers) > 1 else LOAD_TEST_CONCURRENCY,
+            endpoint=endpoint
+        )
+
+    # Tournament commands
+    elif command == "tournaments":
+        status = args[0] if args else None
+        result = list_tournaments(status)
+
+    elif command == "join":
+        if not args:
+            raise ValueError("tournament_id가 필요합니다.")
+        agent_name = args[1] if len(args) > 1 else None
+        result = join_tournament(args[0], agent_name)
+
+    elif command == "cancel":
+        if len(args) < 2:
+            raise ValueError("tournament_id와 entry_id가 필요합니다.")
+        result = cancel_tournament(args[0], args[1])
+
+    elif command == "tleaderboard":
+        if not args:
+            raise ValueError("tournament_id가 필요합니다.")
+        limit = int(args[1]) if len(args) > 1 else 10
+        result = get_tournament_leaderboard(args[0], limit)
 
+    # BP commands
+    elif command == "bp":
+        result = get_bp_balance()
+
+    elif command == "bp-history":
+        limit = int(args[0]) if args else 10
+        result = get_bp_transactions(limit)
+
+    # Referral commands
+    elif command == "referral":
+        result = get_referral_stats()
+
+    elif command == "referral-history":
+        limit = int(args[0]) if args else 10
+        result = get_referral_conversions(limit)
+
+    else:
+        raise ValueError(f"Unknown command: {command}")
+
+    return result
+
+
+# ============== 배치 모드 ==============
+
+def parse_batch_line(line: str, number: int) -> Optional[Dict]:
+    """배치 입력 한 줄을 명령으로 변환 (빈 줄과 # 주석은 None)
+
+    지원 형식:
+        status TrashKing                                    - 셸과 같은 공백 구분 (따옴표 지원)
+        ["status", "TrashKing"]                             - JSON 배열
+        {"id": "a1", "command": "status", "args": ["TrashKing"]}  - JSON 객체 (id는 결과에 그대로 포함)
+    """
+    text = line.strip()
+    if not text or text.startswith('#'):
+        return None
+
+    entry = {'id': None, 'line': number, 'command': None, 'args': [], 'error': None}
     try:
-        if command == "deploy":
-            if not args:
-                print("Error: 에이전트 이름이 필요합니다.")
-                sys.exit(1)
-            result = deploy_agent(args[0], args[1] if len(args) > 1 else "witty")
-
-        elif command == "list":
-            result = list_agents()
-
-        elif command == "status":
-            result = get_status(args[0] if args else None)
-
-        elif command == "battle":
-            result = start_battle(args[0] if args else None)
-
-        elif command == "leaderboard":
-            limit = int(args[0]) if args else 10
-            result = get_leaderboard(limit)
-
-        elif command == "import":
-            if not args:
-                print("Error: Moltbook 사용자명이 필요합니다.")
-                sys.exit(1)
-            result = import_moltbook(args[0])
-
-        elif command == "last":
-            result = get_last_battle()
-
-        elif command == "heartbeat":
-            messages = heartbeat()
-            result = "\n---\n".join(messages) if messages else "새로운 알림이 없습니다."
-
-        elif command == "set-api":
-            if not args:
-                print("Error: endpoint URL이 필요합니다.")
-                sys.exit(1)
-            agent_name = args[1] if len(args) > 1 else None
-            result = set_external_api(agent_name=agent_name, endpoint=args[0])
-
-        elif command == "remove-api":
-            agent_name = args[0] if args else None
-            result = remove_external_api(agent_name)
-
-        elif command == "test-api":
-            agent_name = args[0] if args else None
-            result = test_external_api(agent_name)
-
-        # Tournament commands
-        elif command == "tournaments":
-            status = args[0] if args else None
-            result = list_tournaments(status)
-
-        elif command == "join":
-            if not args:
-                print("Error: tournament_id가 필요합니다.")
-                sys.exit(1)
-            agent_name = args[1] if len(args) > 1 else None
-            result = join_tournament(args[0], agent_name)
-
-        elif command == "cancel":
-            if len(args) < 2:
-                print("Error: tournament_id와 entry_id가 필요합니다.")
-                sys.exit(1)
-            result = cancel_tournament(args[0], args[1])
-
-        elif command == "tleaderboard":
-            if not args:
-                print("Error: tournament_id가 필요합니다.")
-                sys.exit(1)
-            limit = int(args[1]) if len(args) > 1 else 10
-            result = get_tournament_leaderboard(args[0], limit)
-
-        # BP commands
-        elif command == "bp":
-            result = get_bp_balance()
-
-        elif command == "bp-history":
-            limit = int(args[0]) if args else 10
-            result = get_bp_transactions(limit)
-
-        # Referral commands
-        elif command == "referral":
-            result = get_referral_stats()
-
-        elif command == "referral-history":
-            limit = int(args[0]) if args else 10
-            result = get_referral_conversions(limit)
+        if text[0] in '[{':
+            data = json.loads(text)
+            if isinstance(data, dict):
+                entry['id'] = data.get('id')
+                words = [data.get('command')]
+                args = data.get('args') or []
+                words += shlex.split(args) if isinstance(args, str) else list(args)
+            else:
+                words = list(data)
+        else:
+            words = shlex.split(text)
+    except (ValueError, TypeError) as e:
+        entry['error'] = f"명령을 해석할 수 없습니다: {e}"
+        return entry
+
+    if not words or not isinstance(words[0], str) or not words[0]:
+        entry['error'] = "명령 이름이 없습니다."
+        return entry
+    entry['command'] = words[0].lower()
+    entry['args'] = [str(word) for word in words[1:]]
+    return entry
+
+
+def run_batch_entry(entry: Dict) -> Dict:
+    """배치 명령 하나 실행 후 결과 레코드 반환 (예외를 내지 않음)"""
+    record = {
+        'id': entry['id'],
+        'line': entry['line'],
+        'command': entry['command'],
+        'args': entry['args'],
+        'ok': False,
+        'output': None,
+        'error': entry['error'],
+        'status_code': None,
+        'elapsed_ms': 0.0,
+    }
+    if record['error']:
+        return record
+
+    started = time.perf_counter()
+    try:
+        if entry['command'] in BATCH_EXCLUDED_COMMANDS:
+            raise ValueError(f"batch 모드에서 실행할 수 없는 명령입니다: {entry['command']}")
+        output = run_command(entry['command'], entry['args'])
+        record['output'] = output
+        # 메인 함수는 API 오류를 ❌로 시작하는 메시지로 반환
+        record['ok'] = not output.startswith('❌')
+        if not record['ok']:
+            record['error'] = output
+    except MoltArenaAPIError as e:
+        record['error'] = e.message
+        record['status_code'] = e.status_code
+    except Exception as e:
+        record['error'] = str(e)
+    record['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 3)
+    return record
+
+
+def run_batch(lines, out=None, parallel: int = BATCH_PARALLEL) -> int:
+    """여러 명령을 한 프로세스에서 실행하고 결과를 JSON lines로 출력
+
+    모든 명령이 공유 클라이언트(커넥션 풀, Rate limit)와 캐시를 함께 쓰므로 명령마다 프로세스를 띄울 때의
+    인터프리터 시작, import, 빈 캐시 비용이 한 번만 듭니다. 입력은 읽는 대로 실행하므로 파이프로 계속 보낼 수 있습니다.
+
+    Args:
+        lines: 명령 줄 (parse_batch_line 형식, 파일 객체 가능)
+        out: 결과를 쓸 스트림 (기본: sys.stdout)
+        parallel: 동시에 실행할 명령 수. 1이면 입력 순서대로, 2 이상이면 끝나는 순서대로 출력
+            (결과의 line / id로 입력과 대응)
+
+    Returns:
+        실패한 명령 수
+    """
+    out = out or sys.stdout
+    lock = threading.Lock()
+    failed = 0
+
+    def emit(record: Dict) -> None:
+        nonlocal failed
+        with lock:
+            failed += not record['ok']
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+
+    entries = (entry for entry in (parse_batch_line(line, n) for n, line in enumerate(lines, 1)) if entry)
+    if parallel <= 1:
+        for entry in entries:
+            emit(run_batch_entry(entry))
+        return failed
+
+    # 입력을 미리 모두 읽지 않도록 실행 중인 명령 수만큼만 제출
+    slots = threading.BoundedSemaphore(parallel)
+
+    def done(future) -> None:
+        try:
+            emit(future.result())
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        for entry in entries:
+            slots.acquire()
+            executor.submit(run_batch_entry, entry).add_done_callback(done)
+    return failed
+
+
+def batch(args: List[str]) -> int:
+    """batch 명령 (python script.py batch [file|-] [--parallel N]), 종료 코드 반환"""
+    parallel = BATCH_PARALLEL
+    if '--parallel' in args:
+        index = args.index('--parallel')
+        if index + 1 >= len(args) or not args[index + 1].isdigit():
+            raise ValueError("--parallel 뒤에 동시 실행 수가 필요합니다.")
+        parallel = int(args[index + 1])
+        args = args[:index] + args[index + 2:]
+
+    path = args[0] if args else '-'
+    if path == '-':
+        return 1 if run_batch(sys.stdin, parallel=parallel) else 0
+    with open(path, encoding='utf-8') as f:
+        return 1 if run_batch(f, parallel=parallel) else 0
+
+
+# ============== 상주 데몬 (serve) ==============
 
+def daemon_socket_path(api_key: str = None) -> str:
+    """데몬 소켓 경로 (MOLTARENA_SOCKET, 없으면 STATE_DIR/daemon-<API Key 지문>.sock)"""
+    if DAEMON_SOCKET:
+        return os.path.expanduser(DAEMON_SOCKET)
+    return os.path.join(os.path.expanduser(STATE_DIR), f"daemon-{api_key_fingerprint(api_key)}.sock")
+
+
+def daemon_request(request: Dict, path: str = None, timeout: float = None) -> Dict:
+    """데몬에 요청 하나를 보내고 응답 반환
+
+    Raises:
+        OSError: 데몬이 실행 중이 아니거나 응답 전에 연결이 끊겼을 때 (응답이 잘린 경우 포함)
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(DAEMON_CONNECT_TIMEOUT)
+        sock.connect(path or daemon_socket_path())
+        sock.settimeout(timeout)
+        sock.sendall((json.dumps(request, ensure_ascii=False) + '\n').encode())
+        with sock.makefile('rb') as reader:
+            line = reader.readline()
+    if not line.endswith(b'\n'):
+        raise ConnectionResetError("데몬이 응답을 끝내기 전에 연결을 닫았습니다.")
+    return json.loads(line)
+
+
+class CommandDaemon:
+    """Unix 도메인 소켓으로 CLI 명령을 받아 실행하는 상주 프로세스 (python script.py serve)
+
+    공유 클라이언트(커넥션 풀, Rate limit, 메트릭), 응답 캐시, 에이전트 이름 인덱스, Heartbeat 상태를
+    프로세스에 유지한 채 명령마다 execute()를 실행하므로 인터프리터 시작과 import 비용이 없습니다.
+    소켓은 소유자만 접근할 수 있으며(0600), 여러 연결의 명령을 동시에 처리합니다.
+
+    프로토콜 (한 줄에 JSON 하나, 한 연결에서 여러 번 가능):
+        {"argv": ["status", "MyAgent"], "key": "<API Key 지문>"}
+            → {"exit_code": 0, "output": "...", "elapsed_ms": 3.2}
+            → {"fallback": true, "reason": "..."}  (다른 API Key, listen / batch / serve는 호출자가 직접 실행)
+        {"op": "ping"} / {"op": "metrics"} / {"op": "stop"}
+    """
+
+    def __init__(self, path: str = None, api_key: str = None, idle_timeout: float = DAEMON_IDLE_TIMEOUT):
+        """
+        Args:
+            path: 소켓 경로 (기본: daemon_socket_path())
+            api_key: 이 데몬이 명령을 실행할 API Key (기본: MOLTARENA_API_KEY)
+            idle_timeout: 이 시간 동안 명령이 없으면 종료 (초, 0이면 계속 실행)
+        """
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ValueError("이 플랫폼은 Unix 도메인 소켓을 지원하지 않습니다.")
+        self.path = path or daemon_socket_path(api_key)
+        self.key = api_key_fingerprint(api_key)
+        self.idle_timeout = idle_timeout
+        self.commands = 0
+        self.active = 0  # 실행 중인 명령 수 (유휴 시간 계산에서 제외)
+        self.started_at = time.time()
+        self.last_active = time.monotonic()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def start(self) -> "CommandDaemon":
+        """소켓을 열고 백그라운드 스레드에서 요청 처리 시작
+
+        Raises:
+            OSError: 같은 경로에서 다른 데몬이 실행 중일 때
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        if os.path.exists(self.path):
+            try:
+                daemon_request({'op': 'ping'}, self.path, timeout=DAEMON_CONNECT_TIMEOUT)
+            except (OSError, ValueError):
+                os.unlink(self.path)  # 비정상 종료로 남은 소켓
+            else:
+                raise OSError(errno.EADDRINUSE, f"이미 실행 중인 데몬이 있습니다: {self.path}")
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.endswith(b'\n'):
+                        break  # 보내는 도중 끊긴 요청은 실행하지 않음
+                    try:
+                        response = daemon.handle(json.loads(line))
+                    except ValueError:
+                        response = {'error': "JSON 요청이 아닙니다."}
+                    self.wfile.write((json.dumps(response, ensure_ascii=False) + '\n').encode())
+                    self.wfile.flush()
+
+        # 소켓 파일이 만들어지는 순간부터 소유자만 접근하도록
+        umask = os.umask(0o177)
+        try:
+            self._server = socketserver.ThreadingUnixStreamServer(self.path, Handler)
+        finally:
+            os.umask(umask)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def handle(self, request: Dict) -> Dict:
+        """요청 하나 처리 (예외를 내지 않음)"""
+        self.last_active = time.monotonic()
+        op = request.get('op', 'run') if isinstance(request, dict) else None
+
+        if op == 'ping':
+            return {
+                'pid': os.getpid(),
+                'key': self.key,
+                'socket': self.path,
+                'uptime': time.time() - self.started_at,
+                'commands': self.commands,
+                'active': self.active,
+            }
+        if op == 'metrics':
+            return get_client().metrics.snapshot()
+        if op == 'stop':
+            self._stop.set()
+            return {'stopping': True}
+        if op != 'run':
+            return {'error': f"알 수 없는 요청입니다: {op}"}
+
+        argv = request.get('argv')
+        if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+            return {'error': "argv는 문자열 목록이어야 합니다."}
+        if request.get('key') != self.key:
+            return {'fallback': True, 'reason': "데몬과 다른 API Key입니다."}
+        if argv and argv[0].lower() in BATCH_EXCLUDED_COMMANDS:
+            return {'fallback': True, 'reason': f"데몬에서 실행하지 않는 명령입니다: {argv[0]}"}
+
+        started = time.perf_counter()
+        with self._lock:
+            self.active += 1
+        try:
+            code, output = execute(argv)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.commands += 1
+                self.last_active = time.monotonic()
+        return {'exit_code': code, 'output': output, 'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)}
+
+    def idle(self) -> float:
+        """명령 없이 지난 시간 (초, 실행 중인 명령이 있으면 0)"""
+        with self._lock:
+            return 0.0 if self.active else time.monotonic() - self.last_active
+
+    def wait(self) -> None:
+        """stop 요청, idle_timeout 경과, Ctrl+C 중 하나가 올 때까지 대기 후 종료
+
+        watch처럼 idle_timeout보다 오래 걸리는 명령이 실행 중이면 끝날 때까지 종료하지 않습니다.
+        """
+        try:
+            while not self._stop.wait(min(1.0, self.idle_timeout or 1.0)):
+                if self.idle_timeout and self.idle() > self.idle_timeout:
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def close(self) -> None:
+        """새 연결을 받지 않고 소켓 파일 삭제"""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def serve(args: List[str]) -> int:
+    """serve 명령 (python script.py serve [--socket PATH] [--idle-timeout SEC] | status | stop), 종료 코드 반환"""
+    options = {}
+    for name in ('--socket', '--idle-timeout'):
+        if name in args:
+            index = args.index(name)
+            if index + 1 >= len(args):
+                raise ValueError(f"{name} 뒤에 값이 필요합니다.")
+            options[name] = args[index + 1]
+            args = args[:index] + args[index + 2:]
+    path = os.path.expanduser(options.get('--socket') or daemon_socket_path())
+
+    if args and args[0] in ('status', 'stop'):
+        try:
+            response = daemon_request({'op': 'ping' if args[0] == 'status' else 'stop'}, path,
+                                      timeout=DAEMON_CONNECT_TIMEOUT * 10)
+        except OSError:
+            print(f"실행 중인 데몬이 없습니다: {path}")
+            return 1
+        if args[0] == 'stop':
+            print("데몬을 종료합니다.")
         else:
-            print(f"Unknown command: {command}")
-            sys.exit(1)
+            print(f"🛰️ 데몬 실행 중: {path} (PID {response['pid']}, "
+                  f"{response['uptime']:.0f}초, 명령 {response['commands']}개)")
+        return 0
+    if args:
+        raise ValueError(f"알 수 없는 serve 인자입니다: {args[0]}")
+
+    idle_timeout = float(options.get('--idle-timeout', DAEMON_IDLE_TIMEOUT))
+    daemon = CommandDaemon(path, idle_timeout=idle_timeout).start()
+    get_client()  # 첫 명령 전에 클라이언트와 커넥션 풀 준비
+    print(f"🛰️ MoltArena 데몬 실행 중: {path} (PID {os.getpid()})", flush=True)
+    daemon.wait()
+    return 0
+
+
+# ============== CLI 진입점 ==============
 
-        print(result)
+def execute(argv: List[str], on_message=None) -> Tuple[int, str]:
+    """CLI 명령 실행 후 (종료 코드, 출력할 문자열) 반환 - main()과 상주 데몬이 사용
 
+    batch / serve는 main()에서 처리합니다.
+    """
+    if not argv:
+        return 0, cli_usage()
+
+    command = argv[0].lower()
+    if command not in CLI_COMMANDS or command in ('batch', 'serve'):
+        return 1, f"Unknown command: {command}"
+
+    try:
+        return 0, run_command(command, argv[1:], on_message=on_message)
     except MoltArenaAPIError as e:
-        print(f"Error: {e.message}")
-        sys.exit(1)
+        return 1, f"Error: {e.message}"
     except Exception as e:
-        print(f"Error: {str(e)}")
-        sys.exit(1)
+        return 1, f"Error: {str(e)}"
+
+
+def main(argv: List[str] = None) -> int:
+    """CLI 진입점 (종료 코드 반환)"""
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0].lower() if argv else None
+
+    if command in ("batch", "serve"):
+        try:
+            return batch(argv[1:]) if command == "batch" else serve(argv[1:])
+        except MoltArenaAPIError as e:
+            print(f"Error: {e.message}")
+        except Exception as e:
+            print(f"Error: {str(e)}")
+        return 1
+
+    code, output = execute(argv, on_message=lambda m: print(m, end="\n---\n", flush=True))
+    print(output)
+    return code
+
+
+if __name__ == "__main__":
+    if METRICS_FILE:
+        atexit.register(write_metrics)
+    sys.exit(main())
@@ -0,0 +1,1399 @@
+#!/usr/bin/env python3
+"""
+MoltArenaAPI 클라이언트 오프라인 테스트
+
+실제 서버 대신 로컬 stand-in 서버(mock_server.py)를 띄워 클라이언트 동작을 검증합니다.
+API Key나 네트워크 연결이 필요 없습니다.
+
+사용법:
+  python test_client.py
+  python -m pytest test_client.py
+
+테스트 항목:
+  - 조건부 GET (ETag / Last-Modified, 304 응답)
+  - 에이전트 이름 검색 (정확/접두사/부분 일치, 오타, 모호함)
+  - Heartbeat 커서 영구 저장과 알림 중복 제거
+  - 알림 리스너 (SSE 스트림, long-poll/폴링 폴백, Webhook 수신과 포트를 열 수 없을 때 폴링 폴백)
+  - Heartbeat 알림 병합, 우선순위 선택과 이월 (이월 큐가 넘치면 우선순위 낮은 알림부터 버리고 집계)
+  - 알림 렌더러 (타입별 렌더러 표, 언어별 템플릿, render_many)
+  - 일괄 배틀 (동시 실행 수 제한, 실패/한도 소진 보고)
+  - 배틀 완료 감시 (적응형 조회 간격, 끝나는 순서대로 반환)
+  - 여러 에이전트 배틀 기록 병합 (최신순, limit / since)
+  - External API 부하 테스트 (백분위수, 오류율, 타임아웃 초과 비율)
+  - 요청 메트릭 (엔드포인트 템플릿별 집계, 훅, JSON / Prometheus 내보내기)
+  - 동시 GET 병합 (single-flight, 결과 / 예외 공유, 동기 / 비동기)
+  - 배치 모드 (입력 형식, 공유 캐시, 병렬 실행, JSON lines 결과)
+  - 상주 데몬 (Unix 소켓 전달, 호출 간 캐시 유지, 폴백, 전달 후 끊기면 다시 실행하지 않음)
+  - 재시도와 서킷 브레이커 (closed → open → half-open → closed, 시험 요청 중 429 / 예외)
+  - 응답 캐시 (LRU 순서, 크기 제한, TTL 만료, 빈 값 캐시, API Key별 분리)
+  - 디스크 캐시 (인스턴스 간 유지, 크기 초과 시 제거, 호출한 클라이언트의 API Key 네임스페이스)
+  - 공유 클라이언트 (메인 함수 간 커넥션 풀 재사용, set_client() 교체)
+  - 비동기 클라이언트 (동기 클라이언트와 같은 메서드 / 결과, aiohttp가 없으면 건너뜀)
+  - Rate limit 스케줄러 (우선순위, 예비 토큰, X-RateLimit-* 보정, 한도 소진 / 429 후 대기)
+  - 리더보드 스냅샷 (파일 저장 / 복원, 순위 / 레이팅 변화, 신규 진입 / 이탈)
+"""
+
+import asyncio
+import hashlib
+import hmac
+import inspect
+import io
+import json
+import os
+import socket
+import stat
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import mock_server
+import moltarena_cli
+import script
+from test_integration import Colors, print_header, print_pass, print_fail, print_info
+
+
+# ============== External API 서버 ==============
+
+class RoastEndpoint:
+    """에이전트의 External API 역할을 하는 로컬 /roast 서버 (MoltArena API는 mock_server 사용)
+
+    roast_delays의 라운드는 늦게 응답하고, failing 배틀의 fail_round 라운드는 503으로 응답합니다.
+    """
+
+    def __init__(self, roast_delays=None, failing='_3', fail_round=4):
+        self.roast_delays = roast_delays or {}  # 라운드 -> 응답 지연 (초)
+        self.failing = failing  # 이 문자열로 끝나는 배틀 ID
+        self.fail_round = fail_round
+        self._server = None
+
+    def __enter__(self):
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+                time.sleep(endpoint.roast_delays.get(body.get('round'), 0))
+                if body.get('round') == endpoint.fail_round and body['battle_id'].endswith(endpoint.failing):
+                    return self._send(503, {'error': 'busy'})
+                self._send(200, {'message': f"R{body['round']} roast ({len(body['history'])} lines)"})
+
+            def _send(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/roast"
+
+
+def make_client(server, **options):
+    """캐시를 비운 테스트용 클라이언트"""
+    script.disable_disk_cache()
+    script.invalidate_cached()
+    return script.MoltArenaAPI(api_key='pk_live_test', api_url=server.url, **options)
+
+
+def check(condition, text, detail=None):
+    """결과 출력 후 assert (pytest / 직접 실행 모두 지원)"""
+    if condition:
+        print_pass(text)
+    else:
+        print_fail(text, detail)
+    assert condition, text
+
+
+# ============== 테스트 ==============
+
+def test_conditional_get_agent_list():
+    """에이전트 목록 ETag 재검증"""
+    print_header("1. 조건부 GET - 에이전트 목록 (ETag)")
+
+    with mock_server.MockArenaServer(port=0) as server:
+        api = make_client(server)
+
+        first = api.list_agents()
+        script.invalidate_cached('my_agents', api_key=api.api_key)  # TTL 만료 흉내
+        second = api.list_agents()
+
+        check(first == second and len(first) == mock_server.MOCK_AGENTS, "304 이후에도 같은 목록 반환")
+        check(server.counts['GET /deploy/list'] == 2 and server.statuses[304] == 1, "두 번째 요청은 304",
+              server.stats())
+
+        api.deploy_agent('FreshRoaster')
+        script.invalidate_cached('my_agents', api_key=api.api_key)
+        third = api.list_agents()
+        check(len(third) == mock_server.MOCK_AGENTS + 1 and server.statuses[304] == 1, "내용이 바뀌면 새 목록 반환")
+
+
+def test_conditional_get_leaderboard():
+    """리더보드 ETag 재검증 (limit별 검증자)"""
+    print_header("2. 조건부 GET - 리더보드 (ETag)")
+
+    with mock_server.MockArenaServer(port=0) as server:
+        api = make_client(server)
+
+        first = api.get_leaderboard(limit=100)
+        script.invalidate_cached('leaderboard_100', api_key=api.api_key)
+        agents = api.get_leaderboard(limit=100)
+
+        check(agents == first and len(agents) == 100, "304 이후에도 같은 리더보드 반환")
+        check(server.counts['GET /leaderboard'] == 2 and server.statuses[304] == 1, "두 번째 요청은 304",
+              server.stats())
+
+
+def test_conditional_get_tournaments():
+    """토너먼트 목록 Last-Modified 재검증"""
+    print_header("3. 조건부 GET - 토너먼트 (Last-Modified)")
+
+    with mock_server.MockArenaServer(port=0) as server:
+        api = make_client(server)
+
+        first = api.list_tournaments()
+        tournaments = api.list_tournaments()
+
+        check(tournaments == first and len(tournaments) == len(server.state.tournaments),
+              "304 이후에도 같은 토너먼트 목록 반환")
+        check(server.counts['GET /deploy/tournaments'] == 2 and server.statuses[304] == 1,
+              "매번 재검증하되 본문은 304", server.stats())
+
+
+def test_agent_resolver():
+    """에이전트 이름 검색"""
+    print_header("4. 에이전트 이름 검색")
+
+    agents = [
+        {'id': 'agent_1', 'name': 'TrashKing', 'display_name': 'Trash King'},
+        {'id': 'agent_2', 'name': 'TrashQueen', 'display_name': 'Trash Queen'},
+        {'id': 'agent_3', 'name': 'WittyBot', 'display_name': 'Witty Bot'},
+    ]
+
+    agent, error = script.find_agent(agents, 'trash king')
+    check(agent['id'] == 'agent_1' and error is None, "display_name 정확 일치")
+
+    agent, error = script.find_agent(agents, 'witty')
+    check(agent['id'] == 'agent_3', "접두사 일치")
+
+    agent, error = script.find_agent(agents, 'wityybot')
+    check(agent['id'] == 'agent_3', "오타 보정")
+
+    agent, error = script.find_agent(agents, 'trash')
+    check(agent is None and 'Trash King' in error and 'Trash Queen' in error, "모호한 이름은 후보 안내", error)
+
+    agent, error = script.find_agent(agents, 'zzz')
+    check(agent is None and '찾을 수 없습니다' in error, "없는 이름")
+
+    check(script.get_resolver(agents) is script.get_resolver(agents), "같은 목록이면 인덱스 재사용")
+
+
+def test_heartbeat_state():
+    """Heartbeat 커서와 중복 제거 상태가 재시작 후에도 유지되는지"""
+    print_header("5. Heartbeat 커서 / 중복 제거")
+
+    notifications = [
+        {'id': 'n1', 'type': 'top_100', 'data': {'rank': 98}, 'created_at': '2026-02-01T12:30:00Z'},
+        {'type': 'bp_earned', 'data': {'amount': 10}, 'created_at': '2026-02-01T12:31:00Z'},
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        state = script.HeartbeatState(directory, 'pk_live_test')
+        fresh = state.filter_new(notifications + notifications[:1])
+        check(len(fresh) == 2, "같은 배치 안의 중복 제거")
+        state.commit('2026-02-01T12:35:00Z', fresh)
+
+        restarted = script.HeartbeatState(directory, 'pk_live_test')
+        check(restarted.cursor == '2026-02-01T12:35:00Z', "커서는 서버 polled_at으로 저장")
+        check(restarted.filter_new(notifications) == [], "재시작 후에도 전달한 알림 제외")
+
+        other = script.HeartbeatState(directory, 'pk_live_other')
+        check(other.cursor is None, "API Key별로 분리")
+
+        late = {'id': 'n0', 'type': 'top_100', 'data': {'rank': 99}, 'created_at': '2026-02-01T12:00:00Z'}
+        restarted.commit(None, [late])
+        check(restarted.cursor == '2026-02-01T12:35:00Z', "polled_at이 없으면 커서는 앞으로만 이동", restarted.cursor)
+        restarted.commit(None, [{**late, 'id': 'n3', 'created_at': '2026-02-01T12:40:00Z'}])
+        check(restarted.cursor == '2026-02-01T12:40:00Z', "더 늦은 created_at이면 커서 전진", restarted.cursor)
+
+        previous_key, script.MOLTARENA_API_KEY = script.MOLTARENA_API_KEY, 'pk_live_test'
+        try:
+            check(script.HeartbeatState(directory).cursor == '2026-02-01T12:40:00Z',
+                  "API Key를 주지 않으면 MOLTARENA_API_KEY 상태 파일 사용")
+        finally:
+            script.MOLTARENA_API_KEY = previous_key
+
+        compacted = script.HeartbeatState(directory, 'pk_live_test', window=60)
+        compacted.commit('2026-02-02T00:00:00Z', [])
+        check(len(compacted) == 0, "커서보다 오래된 지문 정리")
+
+
+BATTLE_NOTIFICATION = {
+    'id': 'n1', 'type': 'battle_completed', 'created_at': '2026-02-01T12:30:00Z',
+    'data': {'winner_id': 'agent_1', 'agent_a': {'id': 'agent_1', 'name': 'TrashKing'},
+             'agent_b': {'id': 'agent_2', 'name': 'WittyBot'}, 'rating_change': {'delta': 32}},
+}
+TOP_100_NOTIFICATION = {
+    'id': 'n2', 'type': 'top_100', 'created_at': '2026-02-01T12:31:00Z',
+    'data': {'agent_name': 'TrashKing', 'rank': 98},
+}
+
+
+def wait_until(condition, timeout=5.0):
+    """condition()이 참이 될 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+
+def make_listener(api, directory, messages, **kwargs):
+    """메시지를 리스트에 모으는 테스트용 리스너"""
+    state = script.HeartbeatState(directory, api.api_key)
+    return script.NotificationListener(messages.append, api=api, state=state, **kwargs)
+
+
+def notify(server, notification):
+    """stand-in 서버에 알림 추가 (id와 created_at은 서버가 정함)"""
+    return server.state.notify(notification['type'], notification['data'])
+
+
+def test_listener_sse():
+    """SSE 스트림으로 알림 수신"""
+    print_header("6. 알림 리스너 - SSE")
+
+    with mock_server.MockArenaServer(port=0) as server, tempfile.TemporaryDirectory() as directory:
+        api = make_client(server)
+        battle = notify(server, BATTLE_NOTIFICATION)
+        top_100 = notify(server, TOP_100_NOTIFICATION)
+        server.state.redeliver(battle['id'])  # 같은 알림 재전송
+        messages = []
+        listener = make_listener(api, directory, messages, mode='sse')
+        thread = listener.start()
+
+        check(wait_until(lambda: listener.delivered >= 2), "스트림 이벤트를 바로 전달", messages)
+        time.sleep(0.1)  # 재전송된 이벤트까지 처리
+        started = time.monotonic()
+        listener.stop()
+        thread.join(5)
+        check(time.monotonic() - started < 1, "stop()은 다음 이벤트를 기다리지 않고 스트림을 닫음",
+              f"{time.monotonic() - started:.2f}s")
+
+        check(len(messages) == 2 and 'TrashKing' in messages[0], "중복 이벤트 제외, 순서 유지", messages)
+        check(listener.state.cursor == top_100['created_at'], "커서는 마지막 알림 시각")
+        check(not server.counts['GET /notifications/poll'], "푸시 가능하면 폴링하지 않음", server.stats())
+        check(not thread.is_alive(), "stop()으로 종료")
+
+
+def test_listener_fallback():
+    """푸시 미지원 서버에서 long-poll → 폴링으로 폴백"""
+    print_header("7. 알림 리스너 - 폴백")
+
+    with mock_server.MockArenaServer(port=0) as server, tempfile.TemporaryDirectory() as directory:
+        api = make_client(server)
+        server.inject('GET /notifications/stream', 404)
+        messages = []
+        listener = make_listener(api, directory, messages, mode='auto', poll_interval=0.05, long_poll_wait=2)
+        thread = listener.start()
+
+        check(wait_until(lambda: listener.active_mode == 'longpoll'), "stream 404 → long-poll", listener.active_mode)
+        notify(server, BATTLE_NOTIFICATION)
+        check(wait_until(lambda: len(messages) == 1, timeout=1.0), "long-poll은 알림이 생기면 바로 응답", messages)
+
+        server.inject('GET /notifications/poll', 404)
+        check(wait_until(lambda: listener.active_mode == 'poll'), "long-poll 404 → 폴링", listener.active_mode)
+        top_100 = notify(server, TOP_100_NOTIFICATION)
+        check(wait_until(lambda: len(messages) == 2), "폴링으로 새 알림만 전달", messages)
+        listener.stop()
+        thread.join(5)
+
+        check(server.counts['GET /notifications/stream'] == 1, "폴백한 뒤에는 스트림을 다시 열지 않음", server.stats())
+        check(listener.state.cursor >= top_100['created_at'], "커서는 서버 polled_at", listener.state.cursor)
+
+
+def test_listener_webhook():
+    """Webhook 수신과 서명 검증, 포트를 열 수 없을 때 폴링 폴백"""
+    print_header("8. 알림 리스너 - Webhook")
+
+    with mock_server.MockArenaServer(port=0) as server, tempfile.TemporaryDirectory() as directory:
+        api = make_client(server)
+        messages = []
+        listener = make_listener(api, directory, messages, mode='webhook', webhook_port=0, webhook_secret='s3cret')
+        thread = listener.start()
+        check(wait_until(lambda: listener.webhook_address is not None), "Webhook 서버 시작")
+
+        host, port = listener.webhook_address
+        url = f"http://{host}:{port}{script.WEBHOOK_PATH}"
+        body = json.dumps({'notifications': [TOP_100_NOTIFICATION]}).encode()
+        signature = 'sha256=' + hmac.new(b's3cret', body, hashlib.sha256).hexdigest()
+
+        bad = script.requests.post(url, data=body, headers={'X-MoltArena-Signature': 'sha256=00'})
+        check(bad.status_code == 401 and not messages, "잘못된 서명은 거부")
+
+        for _ in range(2):
+            ok = script.requests.post(url, data=body, headers={'X-MoltArena-Signature': signature})
+            check(ok.status_code == 204, "서명된 요청 수신")
+        check(len(messages) == 1 and '98' in messages[0], "재전송된 알림은 한 번만 전달", messages)
+
+        listener.stop()
+        thread.join(5)
+        check(not thread.is_alive() and server.total_requests == 0, "Webhook 모드는 API를 호출하지 않음",
+              server.stats())
+
+        # 포트를 열 수 없으면 auto와 같이 폴링으로 내려갔다가 reprobe_interval 뒤 다시 Webhook 시도
+        with socket.socket() as blocker:
+            blocker.bind(('127.0.0.1', 0))
+            blocker.listen(1)
+            port = blocker.getsockname()[1]
+            messages = []
+            listener = make_listener(api, directory, messages, mode='webhook', webhook_host='127.0.0.1',
+                                     webhook_port=port, poll_interval=0.05, reprobe_interval=0.5)
+            thread = listener.start()
+            check(wait_until(lambda: listener.active_mode == 'poll'), "포트를 열 수 없으면 폴링으로 폴백",
+                  listener.active_mode)
+            notify(server, BATTLE_NOTIFICATION)
+            check(wait_until(lambda: len(messages) == 1) and 'TrashKing' in messages[0], "폴링으로 알림 전달",
+                  messages)
+        check(wait_until(lambda: listener.webhook_address == ('127.0.0.1', port), timeout=3),
+              "포트가 비면 다시 Webhook으로 수신", listener.active_mode)
+        listener.stop()
+        thread.join(5)
+        check(not thread.is_alive(), "stop()으로 종료")
+
+
+def test_heartbeat_coalescing():
+    """몰린 알림은 병합하고, 한도를 넘는 알림은 다음 Heartbeat로 이월"""
+    print_header("9. Heartbeat 병합 / 이월")
+
+    amounts = [100, 100, 150, 200, 250, 200, 250]
+    bp = [{'type': 'bp_earned', 'data': {'amount': amount, 'new_balance': 5000 + i}}
+          for i, amount in enumerate(amounts)]
+    battles = [{'type': 'tournament_battle_completed',
+                'data': {'tournament_id': 'tournament_daily', 'tournament_name': 'Daily Champion', 'result': result}}
+               for result in ['win', 'loss', 'win']]
+    challenges = [{'type': 'challenge', 'data': {'challenger': f'Rival{i}'}} for i in range(6)]
+
+    with mock_server.MockArenaServer(port=0) as server, tempfile.TemporaryDirectory() as directory:
+        previous = script.set_client(make_client(server))
+        state_dir, script.STATE_DIR = script.STATE_DIR, directory
+        try:
+            for notification in bp + battles + challenges:
+                notify(server, notification)
+            first = script.heartbeat()
+            check(len(first) == script.MAX_NOTIFICATIONS and all('도전장' in m for m in first),
+                  "우선순위가 높은 알림부터 한도만큼 전달", first)
+            restarted = script.HeartbeatState(directory, 'pk_live_test')
+            check(len(restarted.pending) == 11, "이월 큐는 파일에 저장", len(restarted.pending))
+
+            second = script.heartbeat()
+            check(len(second) == 3 and 'Rival5' in second[0], "남은 알림은 버리지 않고 다음 Heartbeat로 이월", second)
+            check('토너먼트 배틀 3회' in second[1] and '2승 1패' in second[1], "토너먼트 배틀 병합", second[1])
+            check('+1,250 BP (보상 7건)' in second[2] and '5,006' in second[2], "BP 획득 병합", second[2])
+
+            check(script.heartbeat() == ["HEARTBEAT_OK"], "모두 전달한 뒤에는 HEARTBEAT_OK")
+            check(server.counts['GET /notifications/poll'] == 3, "Heartbeat마다 폴링 한 번", server.stats())
+
+            # 이월 큐가 넘치면 우선순위가 낮은 알림부터 버리고 버린 수를 알림
+            now = time.time()
+            queued = [(now, {'id': f'n{i}', 'type': 'challenge', 'priority': i % 10, 'data': {'challenger': f'R{i}'}})
+                      for i in range(30)]
+            selected, deferred = script.select_notifications(queued, 5, now)
+            state = script.HeartbeatState(directory, 'pk_overflow', max_pending=10)
+            dropped = state.commit(None, selected, pending=deferred)
+            kept = [script.notification_priority(n) for _, n in state.pending]
+            check(dropped == 15 and state.dropped == 15 and len(kept) == 10, "넘친 알림 수 집계", dropped)
+            check(kept == sorted(kept, reverse=True) and min(kept) == 5, "우선순위가 높은 알림을 남김", kept)
+            check(script.HeartbeatState(directory, 'pk_overflow').dropped == 15, "버린 알림 수는 파일에 저장")
+
+            script._heartbeat_states[f"{directory}:pk_live_test"] = script.HeartbeatState(
+                directory, 'pk_live_test', max_pending=3)
+            for i in range(10):
+                notify(server, {'type': 'challenge', 'data': {'challenger': f'Crowd{i}'}})
+            messages = script.heartbeat()
+            check(len(messages) == script.MAX_NOTIFICATIONS + 1 and '2건을 전달하지 못했습니다' in messages[-1],
+                  "Heartbeat가 버린 알림 수를 알림", messages[-1])
+        finally:
+            script.set_client(previous)
+            script.STATE_DIR = state_dir
+
+
+def test_notification_renderer():
+    """타입별 렌더러 표와 언어별 템플릿"""
+    print_header("10. 알림 렌더러")
+
+    notifications = [
+        {'type': 'bp_earned', 'data': {'amount': 1250, 'count': 7, 'new_balance': 5006}},
+        {'type': 'tournament_battle_completed',
+         'data': {'count': 3, 'wins': 2, 'losses': 1, 'tournament_name': 'Daily Champion'}},
+        {'type': 'rank_change', 'data': {'old_rank': 120, 'new_rank': 98}},
+        {'type': 'system_message', 'message': '점검 안내', 'data': {}},
+    ]
+
+    messages = script.render_many(notifications)
+    check(messages == [script.format_notification(n) for n in notifications], "render_many == format_notification")
+    check('+1,250 BP (보상 7건)' in messages[0] and '#120 → #98 ⬆️22' in messages[2], "한국어 템플릿", messages)
+    check(messages[3] == "📢 알림: 점검 안내", "등록되지 않은 타입은 기본 템플릿")
+
+    english = script.render_many(notifications, 'en')
+    check('+1,250 BP (from 7 rewards)' in english[0] and '2W-1L' in english[1], "영어 템플릿", english)
+
+    script.register_template_set('test', {'top_100': "Top 100! #{rank}"}, base='en')
+    check(script.format_notification({'type': 'top_100', 'data': {'rank': 7}}, 'test') == "Top 100! #7",
+          "템플릿 세트 추가")
+    check('2W-1L' in script.format_notification(notifications[1], 'test'), "빠진 키는 base 언어에서 가져옴")
+
+    renderer = script.NotificationRenderer(renderers={**script.NOTIFICATION_RENDERERS,
+                                                      'system_message': lambda data, n, t: n['message']})
+    check(renderer.render(notifications[3]) == '점검 안내', "렌더러 교체")
+
+    try:
+        script.compile_template("{unclosed")
+        check(False, "잘못된 템플릿은 등록 시점에 오류")
+    except ValueError:
+        check(True, "잘못된 템플릿은 등록 시점에 오류")
+
+    try:
+        script.register_template_set('test', {'top_100': "Top 100! #{rnak}"}, base='en')
+        check(False, "키에 없는 필드는 등록 시점에 오류")
+    except ValueError:
+        check(True, "키에 없는 필드는 등록 시점에 오류")
+
+    referral = {'type': 'referral_conversion', 'data': {'type': 'signup', 'points': 1000}}
+    check(script.format_notification(referral, 'en').endswith("+1,000 points from a friend signup!\nKeep sharing to earn more."),
+          "언어마다 필드 순서가 달라도 같은 인자 순서")
+
+
+def peak_overlap(spans):
+    """(시작, 끝) 구간 중 동시에 겹친 최대 개수"""
+    edges = sorted([(start, 1) for start, _ in spans] + [(end, -1) for _, end in spans])
+    peak = current = 0
+    for _, step in edges:
+        current += step
+        peak = max(peak, current)
+    return peak
+
+
+def test_bulk_battles():
+    """여러 에이전트 배틀을 동시 실행 수 제한 안에서 시작"""
+    print_header("11. 일괄 배틀")
+
+    with mock_server.MockArenaServer(port=0) as server:
+        api = make_client(server)
+        for i in range(12 - mock_server.MOCK_AGENTS):
+            api.deploy_agent(f'Bot{i}')
+        script.invalidate_cached('my_agents', api_key=api.api_key)
+        agents = api.list_agents()
+        agents.append(server.state.agents['agent_0001'])  # 다른 사용자의 에이전트 (403)
+
+        spans = []
+        api.metrics.add_hook(lambda event: spans.append((time.perf_counter() - event.elapsed, time.perf_counter()))
+                             if event.path == '/deploy/battle' else None)
+        server.configure(latency_ms=50)
+        report = api.start_battles(agents, max_concurrency=4)
+        first = server.state.battles[report.started[0].battle_id]
+        check(len(report.started) == 12 and first['agent_a']['id'] == agents[0]['id']
+              and report.started[0].opponent_name == first['agent_b']['name'], "배틀 ID와 상대 기록")
+        check(len(report.failed) == 1 and report.failed[0].status_code == 403, "실패한 에이전트 보고", report.failed)
+        check(1 < peak_overlap(spans) <= 4, "동시 실행 수 제한", peak_overlap(spans))
+
+        limited = script.MoltArenaAPI(api_key='pk_live_test', api_url=server.url,
+                                      rate_limiter=script.RateLimiter(limit=3, max_wait=0))
+        report = limited.start_battles(agents[:6], max_concurrency=2)
+        check(len(report.started) == 3 and len(report.skipped) == 3 and report.retry_after > 0,
+              "한도를 넘는 에이전트는 시도하지 않고 보고", report.to_dict())
+        check(server.counts['POST /deploy/battle'] == 13 + 3, "한도 소진 후에는 요청하지 않음", server.stats())
+        check('⏸️' in script.format_battle_report(report) and json.dumps(report.to_dict()),
+              "보고서 포맷 / JSON 직렬화")
+
+
+def start_battle(server, api, seconds):
+    """seconds초 뒤에 끝나는 5라운드 배틀 시작 (start_battle 응답 반환)"""
+    server.configure(battle_seconds=seconds)
+    return api.start_battle(server.state.mine[0])
+
+
+def test_battle_watcher():
+    """진행 중인 배틀을 감시해 끝나는 순서대로 반환"""
+    print_header("12. 배틀 완료 감시")
+
+    with mock_server.MockArenaServer(port=0) as server:
+        api = make_client(server)
+        slow, fast, mid = (start_battle(server, api, seconds) for seconds in (0.6, 0.2, 0.4))
+        fast_id, mid_id = fast['battle']['id'], mid['battle']['id']
+
+        watcher = script.BattleWatcher(api, min_interval=0.02, max_interval=0.2, round_seconds=1.0)
+        watcher.add(slow, fast_id, mid_id, 'battle_missing', fast_id)
+        check(len(watcher) == 4, "중복 배틀은 한 번만 감시")
+
+        started = time.monotonic()
+        battles = list(watcher.watch())
+        check([b['id'] for b in battles] == [fast_id, mid_id, slow['battle']['id']],
+              "끝나는 순서대로 반환", [b['id'] for b in battles])
+        check(time.monotonic() - started < 1.5, "max_interval 안에서 완료 확인")
+        check('battle_missing' in watcher.errors and len(watcher) == 0, "없는 배틀은 감시 중단", watcher.errors)
+        check(0.02 < watcher.round_seconds < 0.2, "관측한 소요 시간으로 라운드 시간 보정", watcher.round_seconds)
+        check(fast_id in script.format_battle_result(battles[0]), "format_battle_result로 바로 포맷")
+
+        polled = server.counts['GET /battles/{battle_id}']
+        following = start_battle(server, api, 0.3)
+        list(api.watch_battles([following], min_interval=0.02, max_interval=0.2,
+                               round_seconds=watcher.round_seconds))
+        check(server.counts['GET /battles/{battle_id}'] - polled <= 4, "예상 종료 시각 전에는 조회하지 않음",
+              (polled, server.counts['GET /battles/{battle_id}']))
+
+        if script.aiohttp is not None:
+            battle_id = start_battle(server, api, 0.1)['battle']['id']
+
+            async def watch_async():
+                async with script.AsyncMoltArenaAPI(api_key='pk_live_test', api_url=server.url) as client:
+                    return [b['id'] async for b in client.watch_battles([battle_id], min_interval=0.02,
+                                                                        max_interval=0.2)]
+
+            check(asyncio.run(watch_async()) == [battle_id], "비동기 감시")
+
+
+def test_battle_history():
+    """모든 에이전트의 배틀 기록을 최신순으로 병합"""
+    print_header("13. 배틀 기록 병합")
+
+    with mock_server.MockArenaServer(port=0, battle_seconds=0.05) as server:
+        api = make_client(server)
+        state = server.state
+        first, second = state.mine[:2]
+        shared = api.start_battle(first, opponent_id=second)['battle']['id']  # 내 에이전트끼리의 배틀
+        api.deploy_agent('Rookie')
+        time.sleep(0.1)  # 새 배틀 종료
+
+        ended = lambda battle_id: state.battles[battle_id]['started'] + state.battles[battle_id]['duration']
+        expected = sorted({b for agent_id in state.mine for b in state.histories[agent_id]}, key=ended, reverse=True)
+        check(expected[0] == shared, "기준 데이터: 가장 최근 배틀은 내 에이전트끼리의 배틀")
+
+        calls = []
+        fetch = api.get_agent_battles
+        api.get_agent_battles = lambda agent_id, limit, **kw: calls.append((agent_id, limit)) or fetch(
+            agent_id, limit, **kw)
+
+        history = api.get_battle_history(limit=10)
+        check([b['id'] for b in history] == expected[:10], "최신순 병합, 내 에이전트끼리의 배틀은 한 번만",
+              [b['id'] for b in history])
+        check({agent_id for agent_id, _ in calls} == set(state.mine[:mock_server.MOCK_AGENTS]),
+              "배틀이 없는 에이전트는 조회하지 않음", calls)
+
+        calls.clear()
+        check([b['id'] for b in api.get_my_battles(limit=2)] == expected[:2], "limit")
+        check(calls and all(limit == 2 for _, limit in calls), "에이전트별 조회 수를 limit으로 제한", calls)
+        previous = script.set_client(api)
+        try:
+            check(shared in script.get_last_battle(), "마지막 배틀은 모든 에이전트 중 가장 최근 배틀")
+        finally:
+            script.set_client(previous)
+
+        since = mock_server.iso(ended(expected[5]))
+        check([b['id'] for b in api.get_battle_history(since=since)] == expected[:5], "since 이후 배틀만")
+
+        agent = next(a for a in api.list_agents() if a['id'] == first)
+        battles = state.histories[first]
+        calls.clear()
+        history = api.get_battle_history([agent], since=mock_server.iso(ended(battles[24])))
+        check([b['id'] for b in history] == battles[:24] and [limit for _, limit in calls] == [20, 40],
+              "since에 닿을 때까지만 조회 수를 늘림", calls)
+
+        calls.clear()
+        stream = api.iter_battle_history([agent], since=mock_server.iso(ended(battles[24])))
+        check(not calls, "반복하기 전에는 조회하지 않음", calls)
+        check(next(stream)['id'] == battles[0] and [limit for _, limit in calls] == [20],
+              "다음 페이지는 첫 페이지를 다 읽었을 때만 조회", calls)
+        check([b['id'] for b in stream] == battles[1:24] and [limit for _, limit in calls] == [20, 40],
+              "끝까지 읽으면 since에 닿을 때까지 조회", calls)
+
+        if script.aiohttp is not None:
+            async def history_async():
+                async with script.AsyncMoltArenaAPI(api_key='pk_live_test', api_url=server.url) as client:
+                    merged = [b['id'] for b in await client.get_battle_history(limit=3)]
+                    requests_before = server.total_requests
+                    stream = client.iter_battle_history([agent], since=mock_server.iso(ended(battles[24])))
+                    head = (await stream.__anext__())['id']
+                    await stream.aclose()
+                    return merged, head, server.total_requests - requests_before
+
+            merged, head, requests_made = asyncio.run(history_async())
+            check(merged == expected[:3], "비동기 병합")
+            check(head == battles[0] and requests_made == 1, "비동기 스트림도 필요한 페이지만 조회", requests_made)
+
+
+def test_external_api_load():
+    """External API에 배틀 모양의 /roast 요청을 보내 지연 시간 분포 측정"""
+    print_header("14. External API 부하 테스트")
+
+    payloads = list(script.roast_payloads(10))
+    check([p['round'] for p in payloads] == [1, 2, 3, 4, 5] * 2 and len(payloads[4]['history']) == 8
+          and payloads[5]['battle_id'] != payloads[4]['battle_id'], "라운드마다 history가 길어지는 요청")
+
+    with mock_server.MockArenaServer(port=0) as server, RoastEndpoint(roast_delays={5: 1.1}) as endpoint:
+        # set_external_api는 https만 받으므로 로컬 http 엔드포인트는 상태에 직접 등록
+        server.state.external_apis[server.state.mine[0]] = {
+            'externalApi': {'endpoint': endpoint.url, 'timeout': 1000, 'fallbackToInternal': True},
+            'consecutiveFailures': 2,
+        }
+        previous = script.set_client(make_client(server))
+        try:
+            started = time.monotonic()
+            text = script.load_test_external_api(count=20, concurrency=10)
+        finally:
+            script.set_client(previous)
+        check(time.monotonic() - started < 5, "동시에 요청")
+        check("타임아웃(1,000ms) 초과: 20.0%" in text, "타임아웃 초과 비율 (5라운드만 느림)", text)
+        check("오류율: 5.0% (HTTP 503 1)" in text and "연속 실패 2회" in text, "오류율과 플랫폼 기록 비교", text)
+
+        report = script.run_load_test(endpoint.url, count=10, concurrency=5, timeout_ms=1000)
+        check(report.percentile(50) < 500 and report.percentile(99) > 1000 and report.to_dict()['requests'] == 10,
+              "p50 / p99", report.to_dict())
+
+
+def test_request_metrics():
+    """엔드포인트 템플릿별 요청 메트릭"""
+    print_header("15. 요청 메트릭")
+
+    check(script.endpoint_template('/agents/agent_1/external-api?x=1') == '/agents/{id}/external-api'
+          and script.endpoint_template('/deploy/tournaments/t_1/join') == '/deploy/tournaments/{id}/join'
+          and script.endpoint_template('/deploy/tournaments') == '/deploy/tournaments', "엔드포인트 템플릿")
+
+    with mock_server.MockArenaServer(port=0) as server:
+        api = make_client(server)
+        api.rate_limiter = script.RateLimiter(limit=10 ** 6)
+        events = []
+        api.metrics.add_hook(events.append)
+        api.metrics.add_hook(lambda event: 1 / 0)
+
+        agents = api.list_agents()
+        api.list_agents()
+        for agent in agents:
+            api.get_agent_status(agent['id'])
+        server.inject('GET /deploy/bp', 503)
+        api.get_bp()
+        try:
+            api.get_battle('battle_missing')
+        except script.MoltArenaAPIError:
+            pass
+
+        snapshot = api.metrics.snapshot()
+        endpoints = {(e['method'], e['endpoint']): e for e in snapshot['endpoints']}
+        status = endpoints[('GET', '/deploy/status/{id}')]
+        check(snapshot['endpoints'][0] is status and status['requests'] == len(agents)
+              and status['latency']['count'] == len(agents) and status['bytes_received'] > 0,
+              "ID별이 아닌 템플릿별 집계 (요청 많은 순)", snapshot['endpoints'][0])
+        listing = endpoints[('GET', '/deploy/list')]
+        check(listing['requests'] == 1 and listing['cache'] == {'hits': 1, 'misses': 1, 'hit_ratio': 0.5},
+              "캐시 적중률", listing['cache'])
+        bp = endpoints[('GET', '/deploy/bp')]
+        check(bp['statuses'] == {'200': 1, '503': 1} and bp['retries'] == 1 and bp['errors'] == {'server_error': 1},
+              "상태 코드 / 재시도 / 오류 집계", bp)
+        check(endpoints[('GET', '/battles/{id}')]['errors'] == {'client_error': 1}, "4xx 오류 집계")
+        check(len(events) == snapshot['totals']['requests'] == len(agents) + 4 and events[0].path == '/deploy/list'
+              and api.metrics.hook_errors == len(events), "훅은 요청마다 호출, 훅 예외는 무시")
+
+        text = api.metrics.to_prometheus()
+        check('moltarena_responses_total{method="GET",endpoint="/deploy/bp",status="503"} 1' in text
+              and 'moltarena_requests_total{method="GET",endpoint="/deploy/bp"} 2' in text
+              and 'moltarena_request_duration_seconds_bucket{method="GET",endpoint="/deploy/bp",le="+Inf"} 2' in text
+              and 'moltarena_cache_lookups_total{method="GET",endpoint="/deploy/list",result="hit"} 1' in text,
+              "Prometheus 텍스트 형식", text)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = f"{directory}/metrics.json"
+            api.metrics.write(path)
+            with open(path, encoding='utf-8') as f:
+                check(json.load(f)['totals'] == snapshot['totals'], "JSON 스냅샷 저장")
+
+        # 응답을 받지 못한 요청도 보낸 요청 수와 지연 히스토그램에 같이 잡힘
+        slow = make_client(server, timeout=0.05, retry_policy=script.RetryPolicy(max_attempts=1))
+        server.configure(latency_ms=300)
+        try:
+            slow.get_bp()
+        except script.MoltArenaAPIError:
+            pass
+        finally:
+            server.configure(latency_ms=0)
+        text = slow.metrics.to_prometheus()
+        check('moltarena_requests_total{method="GET",endpoint="/deploy/bp"} 1' in text
+              and 'moltarena_request_duration_seconds_count{method="GET",endpoint="/deploy/bp"} 1' in text
+              and 'moltarena_request_errors_total{method="GET",endpoint="/deploy/bp",error="timeout"} 1' in text
+              and 'moltarena_responses_total{' not in text, "타임아웃도 requests_total에 집계", text)
+
+
+def test_single_flight():
+    """동시에 들어온 같은 GET은 요청 하나로 합침"""
+    print_header("16. 동시 GET 병합 (single-flight)")
+
+    def together(func, count=8):
+        barrier = threading.Barrier(count)
+        results = []
+
+        def run():
+            barrier.wait()
+            try:
+                results.append(func())
+            except script.MoltArenaAPIError as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        return results
+
+    with mock_server.MockArenaServer(port=0, latency_ms=200) as server:
+        api = make_client(server)
+        api.rate_limiter = script.RateLimiter(limit=10 ** 6)
+
+        agents = together(api.list_agents)
+        check(len(agents) == 8 and all(a == agents[0] for a in agents) and server.counts['GET /deploy/list'] == 1,
+              "캐시 미스가 몰려도 요청은 하나", server.stats())
+        agent_id = agents[0][0]['id']
+        together(lambda: api.get_agent_status(agent_id))
+        check(server.counts['GET /deploy/status/{agent_id}'] == 1, "같은 ID의 상태 조회 병합")
+        together(lambda: api.get_leaderboard(5), 2) + together(lambda: api.get_leaderboard(10), 2)
+        check(server.counts['GET /leaderboard'] == 2, "파라미터가 다르면 따로 요청")
+
+        server.inject('GET /deploy/bp', 400)
+        errors = together(api.get_bp)
+        check(all(isinstance(e, script.MoltArenaAPIError) and e.status_code == 400 for e in errors)
+              and server.counts['GET /deploy/bp'] == 1, "실패도 기다린 호출 모두에게 전달", errors)
+        check(api.get_bp()['success'] and len(api.single_flight) == 0, "끝난 요청은 보관하지 않음")
+
+        coalesced = {e['endpoint']: e['coalesced'] for e in api.metrics.snapshot()['endpoints']}
+        check(coalesced['/deploy/list'] == 7 and coalesced['/deploy/bp'] == 7, "메트릭에 병합 수 기록", coalesced)
+
+        api.single_flight = None
+        script.invalidate_cached()
+        together(api.list_agents, 3)
+        check(server.counts['GET /deploy/list'] == 4, "single_flight = None이면 병합하지 않음")
+
+        battle_id = api.get_battle_history(limit=1)[0]['id']
+        if script.aiohttp is not None:
+            async def concurrent():
+                async with script.AsyncMoltArenaAPI(api_key='pk_live_test', api_url=server.url,
+                                                   rate_limiter=script.RateLimiter(limit=10 ** 6)) as client:
+                    script.invalidate_cached()
+                    waiter = asyncio.ensure_future(client.get_battle(battle_id))
+                    await asyncio.sleep(0.05)
+                    battles = asyncio.gather(*(client.get_battle(battle_id) for _ in range(3)))
+                    waiter.cancel()
+                    return await battles
+
+            battles = asyncio.run(concurrent())
+            check(len(battles) == 3 and battles[0]['battle']['id'] == battle_id
+                  and server.counts['GET /battles/{battle_id}'] == 1, "비동기: 먼저 기다리던 태스크가 취소돼도 결과 공유")
+
+
+def test_batch_mode():
+    """여러 명령을 한 프로세스에서 실행하고 JSON lines로 결과 출력"""
+    print_header("17. 배치 모드")
+
+    check(script.parse_batch_line('  # comment', 1) is None and script.parse_batch_line('', 2) is None, "빈 줄 / 주석 무시")
+    entry = script.parse_batch_line('{"id": 7, "command": "Status", "args": "\'Trash King\'"}', 3)
+    check((entry['id'], entry['command'], entry['args']) == (7, 'status', ['Trash King']), "JSON 객체 (id, 인자 문자열)")
+    check(script.parse_batch_line('["leaderboard", 5]', 4)['args'] == ['5'], "JSON 배열")
+    check(script.parse_batch_line('status "oops', 5)['error'], "해석할 수 없는 줄은 오류 레코드")
+
+    with mock_server.MockArenaServer(port=0, latency_ms=100) as server:
+        previous = script.set_client(make_client(server))
+        script.get_client().rate_limiter = script.RateLimiter(limit=10 ** 6)
+        try:
+            out = io.StringIO()
+            lines = ['list', 'status TrashKing', '{"id": "lb", "command": "leaderboard", "args": ["3"]}',
+                     'listen', 'join', 'nope']
+            failed = script.run_batch(lines, out)
+            records = [json.loads(line) for line in out.getvalue().splitlines()]
+            check([r['line'] for r in records] == [1, 2, 3, 4, 5, 6] and failed == 3, "입력 순서대로 결과", records)
+            check(all(r['ok'] for r in records[:3]) and 'TrashKing' in records[1]['output']
+                  and records[2]['id'] == 'lb' and all(r['elapsed_ms'] > 0 for r in records[:3]),
+                  "명령별 출력과 소요 시간")
+            check('listen' in records[3]['error'] and 'tournament_id' in records[4]['error']
+                  and 'Unknown command' in records[5]['error'], "실행할 수 없는 명령은 오류 레코드")
+            check(server.counts['GET /deploy/list'] == 1, "명령끼리 에이전트 목록 캐시 공유", server.stats())
+
+            out = io.StringIO()
+            started = time.monotonic()
+            failed = script.run_batch(['bp', 'referral', 'tournaments', 'status ByteRoaster'], out, parallel=4)
+            elapsed = time.monotonic() - started
+            records = [json.loads(line) for line in out.getvalue().splitlines()]
+            check(failed == 0 and sorted(r['line'] for r in records) == [1, 2, 3, 4], "병렬 실행 (끝나는 순서대로)")
+            check(elapsed < 0.35, "동시에 실행", f"{elapsed:.2f}s")
+        finally:
+            script.set_client(previous)
+
+
+def test_daemon():
+    """상주 데몬이 소켓으로 받은 명령을 캐시를 유지한 채 실행"""
+    print_header("18. 상주 데몬")
+
+    with tempfile.TemporaryDirectory() as directory, mock_server.MockArenaServer(port=0) as server:
+        path = os.path.join(directory, 'daemon.sock')
+        previous = script.set_client(make_client(server))
+        script.get_client().rate_limiter = script.RateLimiter(limit=10 ** 6)
+        try:
+            daemon = script.CommandDaemon(path).start()
+            check(stat.S_IMODE(os.stat(path).st_mode) == 0o600, "소켓은 소유자만 접근 (0600)")
+
+            first = moltarena_cli.forward(['status', 'TrashKing'], path)
+            second = moltarena_cli.forward(['list'], path)
+            check(first['exit_code'] == 0 and 'TrashKing' in first['output'] and second['exit_code'] == 0,
+                  "명령 전달과 출력 반환", first)
+            check(server.counts['GET /deploy/list'] == 1, "호출 사이에 에이전트 목록 캐시 유지", server.stats())
+            check(moltarena_cli.forward(['nope'], path)['exit_code'] == 1, "알 수 없는 명령은 종료 코드 1")
+
+            check(moltarena_cli.forward(['listen'], path).get('fallback'), "listen은 호출자가 직접 실행")
+            other = script.daemon_request({'argv': ['list'], 'key': 'other'}, path)
+            check(other.get('fallback'), "다른 API Key면 폴백", other)
+            check(script.daemon_request({'op': 'ping'}, path)['commands'] == 3, "ping (처리한 명령 수)")
+
+            try:
+                script.CommandDaemon(path).start()
+                check(False, "같은 경로에 두 번째 데몬 거부")
+            except OSError:
+                check(True, "같은 경로에 두 번째 데몬 거부")
+
+            script.daemon_request({'op': 'stop'}, path)
+            daemon.wait()
+            check(not os.path.exists(path) and moltarena_cli.forward(['list'], path) is None,
+                  "stop 후 소켓 삭제, 클라이언트는 로컬 실행으로 폴백")
+
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+                stale.bind(path)
+            with script.CommandDaemon(path, idle_timeout=0.1) as restarted:
+                check(moltarena_cli.forward(['bp'], path)['exit_code'] == 0, "남은 소켓 파일은 정리 후 시작")
+                started = time.monotonic()
+                restarted.wait()
+                check(time.monotonic() - started < 2 and not os.path.exists(path), "idle_timeout이 지나면 종료")
+        finally:
+            script.set_client(previous)
+
+
+def test_retry_and_circuit_breaker():
+    """멱등 요청 재시도와 엔드포인트 그룹별 서킷 브레이커"""
+    print_header("19. 재시도 / 서킷 브레이커")
+
+    def expect_error(func, status):
+        try:
+            func()
+        except script.MoltArenaAPIError as e:
+            return e.status_code == status
+        return False
+
+    with mock_server.MockArenaServer(port=0) as server:
+        api = make_client(server, retry_policy=script.RetryPolicy(max_attempts=3, backoff_base=0.01))
+        server.inject('GET /deploy/bp', 503, count=2)
+        check(api.get_bp()['success'] and server.counts['GET /deploy/bp'] == 3, "5xx는 백오프 후 재시도",
+              server.stats())
+
+        # 429 응답의 block()이 로컬 토큰을 비우므로 로컬 한도는 넉넉하게
+        limiter = script.RateLimiter(limit=10 ** 6)
+        breakers = script.CircuitBreakers(failure_threshold=2, reset_timeout=0.2)
+        api = make_client(server, retry_policy=script.RetryPolicy(max_attempts=1), circuit_breakers=breakers,
+                          rate_limiter=limiter)
+        breaker = breakers.get('/deploy/bp')
+
+        def trip():
+            server.inject('GET /deploy/bp', 503, count=2)
+            for _ in range(2):
+                expect_error(api.get_bp, 503)
+
+        trip()
+        sent = server.counts['GET /deploy/bp']
+        check(breaker.state == 'open', "연속 실패하면 open", breaker.state)
+        check(expect_error(api.get_bp, 503) and server.counts['GET /deploy/bp'] == sent, "open이면 요청 없이 503")
+        check(api.get_leaderboard(limit=5) and breakers.get('/leaderboard').state == 'closed',
+              "다른 엔드포인트 그룹은 영향 없음")
+        time.sleep(0.25)
+        check(breaker.state == 'half_open', "reset_timeout이 지나면 half-open")
+        check(api.get_bp()['success'] and breaker.state == 'closed', "시험 요청이 성공하면 closed")
+
+        trip()
+        time.sleep(0.25)
+        server.inject('GET /deploy/bp', 429, retry_after=0)
+        check(expect_error(api.get_bp, 429) and breaker.state == 'half_open', "시험 요청이 429면 상태 유지")
+        check(api.get_bp()['success'] and breaker.state == 'closed', "429 뒤에도 다음 요청이 시험 요청이 됨")
+
+        trip()
+        time.sleep(0.25)
+        server.inject('GET /deploy/bp', 429, retry_after=0)
+        retrying = make_client(server, retry_policy=script.RetryPolicy(max_attempts=2), circuit_breakers=breakers,
+                               rate_limiter=limiter)
+        check(retrying.get_bp()['success'] and breaker.state == 'closed', "429 후 재시도도 시험 요청으로 허용")
+
+        trip()
+        time.sleep(0.25)
+        request = api.session.request
+        api.session.request = lambda *args, **kwargs: (_ for _ in ()).throw(RuntimeError("boom"))
+        try:
+            api.get_bp()
+        except RuntimeError:
+            pass
+        finally:
+            api.session.request = request
+        check(api.get_bp()['success'] and breaker.state == 'closed', "예상하지 못한 예외 뒤에도 시험 요청 해제")
+
+
+def test_response_cache():
+    """TTLCache 제거 순서 / 만료와 API Key별 캐시 분리"""
+    print_header("20. 응답 캐시")
+
+    cache = script.TTLCache(max_entries=3, max_bytes=1000)
+    for key in 'abc':
+        cache.set(key, key)
+    cache.get('a')
+    cache.set('d', 'd')
+    check(cache.get('b') is None and [cache.get(k) for k in 'acd'] == ['a', 'c', 'd'],
+          "항목 수를 넘으면 가장 오래 사용하지 않은 항목부터 제거", cache.stats())
+
+    cache = script.TTLCache(max_entries=10, max_bytes=20)
+    cache.set('a', 'x' * 8)  # JSON 기준 10바이트
+    cache.set('b', 'y' * 8)
+    cache.set('c', 'z' * 8)
+    check(cache.get('a') is None and cache.stats()['bytes'] == 20 and cache.evictions == 1, "크기 제한", cache.stats())
+    cache.set('big', 'x' * 100)
+    check(cache.get('big') is None and len(cache) == 2, "max_bytes보다 큰 값은 저장하지 않음")
+
+    cache.set('short', 1, ttl=0.05)
+    time.sleep(0.06)
+    check(cache.get('short', 'gone') == 'gone' and cache.expirations == 1, "TTL이 지나면 만료")
+    for key, value in (('empty', []), ('zero', 0), ('none', None)):
+        cache.set(key, value)
+    check([cache.get(k, 'miss') for k in ('empty', 'zero', 'none')] == [[], 0, None], "빈 값도 캐시")
+
+    with mock_server.MockArenaServer(port=0) as server:
+        mine = make_client(server)
+        other = script.MoltArenaAPI(api_key='pk_live_other', api_url=server.url)
+        mine.list_agents()
+        other.list_agents()
+        check(server.counts['GET /deploy/list'] == 2 and server.statuses[304] == 0,
+              "다른 API Key의 목록 / 검증자를 읽지 않음", server.stats())
+        script.invalidate_cached('my_agents', api_key=mine.api_key)
+        check(script.get_cached('my_agents', api_key=mine.api_key) is None
+              and script.get_cached('my_agents', api_key=other.api_key) is not None, "무효화도 API Key별")
+        script.set_cached('key', 'value', api_key='pk_live_a')
+        check(script.get_cached('key', 'miss', api_key='pk_live_b') == 'miss', "get_cached / set_cached api_key")
+
+
+def test_disk_cache():
+    """SQLite 디스크 캐시 유지 / 제거 / 네임스페이스"""
+    print_header("21. 디스크 캐시")
+
+    with tempfile.TemporaryDirectory() as directory:
+        first = script.DiskCache(directory, api_key='pk_live_a')
+        first.set('agents', [{'id': 'agent_1'}], ttl=60)
+        first.set('expired', 1, ttl=-1)
+        first.close()
+        second = script.DiskCache(directory, api_key='pk_live_a')
+        value, remaining = second.get('agents')
+        check(value == [{'id': 'agent_1'}] and 0 < remaining <= 60, "새 인스턴스(다음 실행)에서도 유지")
+        check(second.get('expired') is None, "만료된 항목은 미스")
+        check(script.DiskCache(directory, api_key='pk_live_b').get('agents') is None, "API Key별 네임스페이스")
+        second.close()
+
+        small = script.DiskCache(os.path.join(directory, 'small'), max_bytes=100)
+        small.set('soon', 'x' * 40, ttl=10)
+        small.set('later', 'y' * 40, ttl=100)
+        small.set('new', 'z' * 40, ttl=50)
+        check(small.get('soon') is None and small.get('later') and small.get('new'),
+              "크기를 넘으면 곧 만료될 항목부터 제거", small.stats())
+        small.close()
+
+        script.invalidate_cached()
+        script.enable_disk_cache(directory)
+        try:
+            script.set_cached('bp', {'balance': 1}, api_key='pk_live_b')
+            check(script.DiskCache(directory, api_key='pk_live_b').get('bp')[0] == {'balance': 1}
+                  and script.DiskCache(directory, api_key=script.MOLTARENA_API_KEY).get('bp') is None,
+                  "set_cached는 호출한 API Key 네임스페이스에 저장")
+            script.DiskCache(directory, api_key='pk_live_c').set('bp', {'balance': 3}, ttl=60)
+            check(script.get_cached('bp', api_key='pk_live_c') == {'balance': 3}
+                  and script.get_cached('bp', api_key='pk_live_d') is None, "get_cached도 API Key별로 디스크 조회")
+
+            with mock_server.MockArenaServer(port=0) as server:
+                api = script.MoltArenaAPI(api_key='pk_live_other', api_url=server.url)
+                api.list_agents()
+                stored = script.DiskCache(directory, api_key='pk_live_other').get('my_agents')
+                check(stored and len(stored[0]) == len(api.list_agents()), "클라이언트 api_key로 디스크 캐시 저장")
+        finally:
+            script.disable_disk_cache()
+
+
+def test_daemon_interrupted():
+    """명령을 보낸 뒤 끊긴 연결은 로컬에서 다시 실행하지 않고, 실행 중인 명령은 유휴 시간에서 제외"""
+    print_header("22. 상주 데몬 - 연결 끊김 / 긴 명령")
+
+    with tempfile.TemporaryDirectory() as directory, mock_server.MockArenaServer(port=0) as server:
+        path = os.path.join(directory, 'daemon.sock')
+        previous = script.set_client(make_client(server))
+        environ = os.environ.get('MOLTARENA_SOCKET')
+        try:
+            listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            listener.bind(path)
+            listener.listen(1)
+
+            def truncate():
+                connection, _ = listener.accept()
+                with connection:
+                    connection.makefile('rb').readline()
+                    connection.sendall(b'{"exit_co')
+
+            thread = threading.Thread(target=truncate, daemon=True)
+            thread.start()
+            os.environ['MOLTARENA_SOCKET'] = path
+            code = moltarena_cli.main(['join', 'tournament_daily'])
+            thread.join(5)
+            listener.close()
+            os.unlink(path)
+            check(code == 1 and server.total_requests == 0, "응답이 잘리면 오류로 끝내고 로컬에서 다시 실행하지 않음",
+                  server.stats())
+
+            server.configure(latency_ms=800)
+            with script.CommandDaemon(path, idle_timeout=0.2) as daemon:
+                waiter = threading.Thread(target=daemon.wait, daemon=True)
+                waiter.start()
+                response = moltarena_cli.forward(['bp'], path)
+                check(response['exit_code'] == 0 and waiter.is_alive(), "idle_timeout보다 긴 명령도 끝까지 실행")
+                waiter.join(3)
+                check(not waiter.is_alive() and not os.path.exists(path), "명령이 끝난 뒤 유휴 시간이 지나면 종료")
+        finally:
+            if environ is None:
+                os.environ.pop('MOLTARENA_SOCKET', None)
+            else:
+                os.environ['MOLTARENA_SOCKET'] = environ
+            script.set_client(previous)
+
+
+def pool_connections(api, server):
+    """api가 server에 대해 지금까지 연 TCP 커넥션 수 (urllib3 커넥션 풀 기준)"""
+    pools = api.session.get_adapter(server.url).poolmanager.pools
+    return sum(pools[key].num_connections for key in pools.keys())
+
+
+def test_shared_client():
+    """메인 함수는 공유 클라이언트의 커넥션 풀을 재사용하고, set_client()로 교체"""
+    print_header("23. 공유 클라이언트 / 커넥션 풀")
+
+    with mock_server.MockArenaServer(port=0) as server:
+        saved = script.MOLTARENA_API_KEY, script.MOLTARENA_API_URL
+        script.MOLTARENA_API_KEY, script.MOLTARENA_API_URL = 'pk_live_test', server.url
+        previous = script.set_client(None)
+        try:
+            script.disable_disk_cache()
+            script.invalidate_cached()
+            clients = []
+            threads = [threading.Thread(target=lambda: clients.append(script.get_client())) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+            shared = clients[0]
+            check(len(clients) == 8 and all(c is shared for c in clients), "동시에 호출해도 클라이언트는 하나")
+
+            outputs = [script.list_agents(), script.get_leaderboard(5), script.get_bp_balance(),
+                       script.list_tournaments(), script.get_status('TrashKing')]
+            check(not any(o.startswith('❌') for o in outputs), "메인 함수는 공유 클라이언트로 요청", outputs)
+            check(script.get_client() is shared and shared.metrics.snapshot()['totals']['requests'] == 5,
+                  "명령마다 클라이언트를 새로 만들지 않음", shared.metrics.snapshot()['totals'])
+            check(pool_connections(shared, server) == 1, "keep-alive 커넥션 하나로 모든 요청 처리",
+                  pool_connections(shared, server))
+
+            injected = make_client(server)
+            check(script.set_client(injected) is shared and script.get_client() is injected, "set_client()로 교체")
+            script.get_bp_balance()
+            check(injected.metrics.snapshot()['totals']['requests'] == 1
+                  and shared.metrics.snapshot()['totals']['requests'] == 5, "교체한 뒤에는 새 클라이언트로 요청")
+
+            script.set_client(None)
+            check(script.get_client() not in (shared, injected), "None으로 교체하면 다음 호출에서 새로 생성")
+        finally:
+            script.get_client().close()
+            script.set_client(previous)
+            script.MOLTARENA_API_KEY, script.MOLTARENA_API_URL = saved
+
+
+# 비동기 클라이언트에 없는 동기 메서드 (이유)
+SYNC_ONLY_METHODS = {
+    'open_notification_stream': "NotificationListener 스레드가 읽는 requests 스트리밍 응답",
+}
+
+
+def public_methods(cls):
+    return {name for name, value in vars(cls).items() if not name.startswith('_') and callable(value)}
+
+
+def test_async_client():
+    """AsyncMoltArenaAPI는 MoltArenaAPI와 같은 메서드를 같은 결과로 제공"""
+    print_header("24. 비동기 클라이언트")
+
+    module, script.aiohttp = script.aiohttp, None
+    try:
+        script.AsyncMoltArenaAPI(api_key='pk_live_test')
+        check(False, "aiohttp가 없으면 설치 안내 오류")
+    except script.MoltArenaAPIError as e:
+        check('pip install aiohttp' in e.message, "aiohttp가 없으면 설치 안내 오류", e.message)
+    finally:
+        script.aiohttp = module
+
+    sync_methods = public_methods(script.MoltArenaAPI)
+    async_methods = public_methods(script.AsyncMoltArenaAPI)
+    check(sync_methods - async_methods == set(SYNC_ONLY_METHODS), "동기 클라이언트의 메서드를 모두 제공",
+          sorted(sync_methods - async_methods))
+    for name in sorted(sync_methods & async_methods):
+        sync_params = inspect.signature(getattr(script.MoltArenaAPI, name)).parameters
+        async_params = inspect.signature(getattr(script.AsyncMoltArenaAPI, name)).parameters
+        if not all(p in async_params for p in sync_params):
+            check(False, f"{name}: 같은 인자", (list(sync_params), list(async_params)))
+        if not inspect.iscoroutinefunction(getattr(script.AsyncMoltArenaAPI, name)) and \
+                not inspect.isasyncgenfunction(getattr(script.AsyncMoltArenaAPI, name)):
+            check(False, f"{name}: 코루틴", getattr(script.AsyncMoltArenaAPI, name))
+    check(True, "같은 이름의 메서드는 같은 인자를 받는 코루틴")
+
+    if script.aiohttp is None:
+        print_info("aiohttp가 설치되어 있지 않아 요청 비교는 건너뜁니다.")
+        return
+
+    with mock_server.MockArenaServer(port=0) as server:
+        api = make_client(server, rate_limiter=script.RateLimiter(limit=10 ** 6))
+        agent_id = server.state.mine[0]
+        calls = [
+            ('list_agents', ()), ('get_agent_status', (agent_id,)), ('get_leaderboard', (20,)),
+            ('get_my_rank', (agent_id,)), ('list_tournaments', ()),
+            ('get_tournament_leaderboard', ('tournament_weekly',)), ('get_bp', (True,)), ('get_referral', (True,)),
+            ('get_external_api', (agent_id,)), ('get_my_battles', (5,)),
+        ]
+        expected = [getattr(api, name)(*args) for name, args in calls]
+
+        async def run():
+            async with script.AsyncMoltArenaAPI(api_key='pk_live_test', api_url=server.url,
+                                                rate_limiter=script.RateLimiter(limit=10 ** 6)) as client:
+                results = [await getattr(client, name)(*args) for name, args in calls]
+                try:
+                    await client.get_battle('battle_missing')
+                    error = None
+                except script.MoltArenaAPIError as e:
+                    error = e.status_code
+                battle = await client.start_battle(agent_id)
+                return results, error, battle, client.session
+
+        script.invalidate_cached()
+        results, error, battle, session = asyncio.run(run())
+        for (name, _), sync_result, async_result in zip(calls, expected, results):
+            if sync_result != async_result:
+                check(False, f"{name}: 같은 결과", (sync_result, async_result))
+        check(True, "조회 메서드는 동기 클라이언트와 같은 결과")
+        check(error == 404, "오류는 같은 MoltArenaAPIError", error)
+        check(battle['battle']['id'] in server.state.battles
+              and set(battle['battle']) == set(api.start_battle(agent_id)['battle']), "배틀 시작 응답 형식")
+        check(session.closed, "async with가 끝나면 세션 종료")
+
+
+def acquire_in_background(limiter, priority, order, **kwargs):
+    """limiter.acquire()를 스레드에서 실행하고 토큰을 얻은 순서대로 order에 priority 기록 (실패하면 예외)"""
+    def run():
+        try:
+            limiter.acquire(priority, **kwargs)
+            order.append(priority)
+        except script.MoltArenaAPIError as e:
+            order.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def expect_rate_limited(func):
+    """func()가 로컬 429로 실패하면 retry_after, 아니면 None"""
+    try:
+        func()
+    except script.MoltArenaAPIError as e:
+        return e.details.get('retry_after') if e.status_code == 429 else None
+    return None
+
+
+def test_rate_limiter():
+    """토큰 버킷 스케줄러 (우선순위, 예비 토큰, 헤더 보정, 429 후 대기)"""
+    print_header("25. Rate limit 스케줄러")
+
+    default = script.RateLimiter()
+    check(default.refill_interval == 36 and default.wait_limit() > default.refill_interval,
+          "기본 대기 한도는 토큰 충전 간격(100/시간 = 36초)보다 김", default.wait_limit())
+
+    # 실제 한도(100/시간)에서 토큰을 다 쓴 뒤의 요청은 실패하지 않고 다음 토큰을 기다림
+    default.update({'X-RateLimit-Limit': '100', 'X-RateLimit-Remaining': '0'})
+    order = []
+    waiter = acquire_in_background(default, script.PRIORITY_HIGH, order)
+    time.sleep(0.2)
+    check(waiter.is_alive() and not order, "한도를 다 쓰면 429 대신 대기", order)
+    default.update({'X-RateLimit-Remaining': '5'})  # 서버 기준으로 다시 채워짐
+    waiter.join(2)
+    check(order == [script.PRIORITY_HIGH], "토큰이 생기면 대기하던 요청 진행", order)
+
+    limiter = script.RateLimiter(limit=10, period=1.0, reserve=0)  # 0.1초마다 토큰 하나
+    limiter.update({'X-RateLimit-Remaining': '0'})
+    order = []
+    threads = []
+    for priority in (script.PRIORITY_BACKGROUND, script.PRIORITY_NORMAL, script.PRIORITY_HIGH):
+        threads.append(acquire_in_background(limiter, priority, order))
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join(2)
+    check(order == [script.PRIORITY_HIGH, script.PRIORITY_NORMAL, script.PRIORITY_BACKGROUND],
+          "늦게 들어와도 우선순위가 높은 요청부터 처리", order)
+
+    limiter = script.RateLimiter(limit=20, period=3600, reserve=5)
+    for _ in range(14):
+        limiter.acquire(script.PRIORITY_NORMAL, max_wait=0)
+    limiter.acquire(script.PRIORITY_BACKGROUND, max_wait=0)
+    check(int(limiter.tokens) == 5, "예비분보다 많이 남았으면 백그라운드 요청도 사용", limiter.tokens)
+    check(expect_rate_limited(lambda: limiter.acquire(script.PRIORITY_BACKGROUND, max_wait=0)) is not None,
+          "예비 토큰은 백그라운드 요청이 쓸 수 없음")
+    limiter.acquire(script.PRIORITY_HIGH, max_wait=0)
+    check(int(limiter.tokens) == 4, "예비 토큰은 사용자 요청이 사용", limiter.tokens)
+
+    limiter = script.RateLimiter()
+    limiter.update({'X-RateLimit-Limit': '50', 'X-RateLimit-Remaining': '7', 'X-RateLimit-Reset': '600'})
+    check(limiter.limit == 50 and limiter.remaining == 7 and 7 <= limiter.tokens < 7.1
+          and limiter.refill_interval == 72, "X-RateLimit-* 헤더로 한도 / 남은 수 보정",
+          (limiter.limit, limiter.remaining, limiter.tokens))
+    limiter.update({'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '2'})
+    retry_after = expect_rate_limited(lambda: limiter.acquire(max_wait=0))
+    check(retry_after is not None and 1 < retry_after <= 2, "남은 수가 0이면 Reset 시각까지 보류", retry_after)
+
+    with mock_server.MockArenaServer(port=0) as server:
+        api = make_client(server, rate_limiter=script.RateLimiter(limit=10 ** 6))
+        server.inject('GET /deploy/bp', 429, retry_after=0.5)
+        started = time.monotonic()
+        api.get_bp()
+        check(time.monotonic() - started >= 0.5 and server.counts['GET /deploy/bp'] == 2,
+              "429 후 Retry-After만큼 기다린 뒤 다시 요청", server.stats())
+
+        api.rate_limiter.block(0.3)
+        started = time.monotonic()
+        api.get_leaderboard(5)
+        check(time.monotonic() - started >= 0.3, "보류 중에는 다른 요청도 대기", time.monotonic() - started)
+        api.rate_limiter.block(api.rate_limiter.wait_limit() + 10)
+        check(expect_rate_limited(api.get_referral) is not None and server.counts['GET /deploy/referral'] == 0,
+              "대기 한도보다 긴 보류는 요청 없이 바로 429")
+
+
+def test_leaderboard_snapshots():
+    """리더보드 스냅샷 저장 / 복원과 두 시점 사이의 순위 / 레이팅 변화"""
+    print_header("26. 리더보드 스냅샷")
+
+    size = 200  # 내 에이전트(레이팅 1500 근처)가 들어오는 범위
+
+    with mock_server.MockArenaServer(port=0) as server, tempfile.TemporaryDirectory() as directory:
+        api = make_client(server, rate_limiter=script.RateLimiter(limit=10 ** 6))
+        before = api.snapshot_leaderboard(max_agents=size)
+        check(len(before) == size and list(before.ranks) == list(range(1, size + 1))
+              and before.row(0)['id'] == api.get_leaderboard(1)[0]['id'], "전체 순위를 컬럼형으로 저장")
+
+        store = script.LeaderboardSnapshotStore(directory, max_snapshots=2)
+        check(store.add(before) is None, "첫 스냅샷은 비교 대상 없음")
+        restored = script.LeaderboardSnapshotStore(directory).latest()
+        check(restored.to_dict() == before.to_dict() and restored.ranks.typecode == 'i'
+              and restored.ratings.typecode == 'd', "파일에서 같은 스냅샷 복원")
+
+        # 새 에이전트가 범위 안으로 들어오면서 마지막 순위가 밀려나고, 배틀로 레이팅이 바뀜
+        newcomer = api.deploy_agent('Newcomer')['agent']['id']
+        opponent = before.ids[10]
+        battle = server.state.battles[api.start_battle(server.state.mine[0], opponent_id=opponent)['battle']['id']]
+        time.sleep(0.01)
+        after = api.snapshot_leaderboard(max_agents=size)
+
+        diff = store.add(after)
+        old_ranks = dict(zip(before.ids, before.ranks))
+        new_ranks = dict(zip(after.ids, after.ranks))
+        check([a['id'] for a in diff.new_entries] == [newcomer], "신규 진입", diff.new_entries)
+        check([a['id'] for a in diff.dropouts] == [before.ids[-1]]
+              and set(old_ranks) - set(new_ranks) == {before.ids[-1]}, "밀려난 에이전트는 이탈", diff.dropouts)
+        moved = {agent_id for agent_id, rank in new_ranks.items() if old_ranks.get(agent_id, rank) != rank}
+        check({m['id'] for m in diff.movers} == moved and all(
+            m['rank_delta'] == old_ranks[m['id']] - new_ranks[m['id']] for m in diff.movers),
+            "순위 변동 (양수 = 상승)", len(moved))
+        check([abs(m['rank_delta']) for m in diff.movers] == sorted((abs(m['rank_delta']) for m in diff.movers),
+                                                                    reverse=True), "변동 폭 큰 순")
+        delta = battle['rating_change']['delta']
+        check(diff.rating_deltas.get(server.state.mine[0]) == delta and diff.rating_deltas.get(opponent) == -delta,
+              "배틀 참가자의 레이팅 변화", (delta, diff.rating_deltas))
+
+        text = script.format_leaderboard_diff(diff)
+        check('🆕 신규 진입: 1명' in text and '👋 이탈: 1명' in text, "변동 포맷", text)
+
+        reopened = script.LeaderboardSnapshotStore(directory)
+        check(reopened.diff().movers == diff.movers and reopened.diff(since=before.taken_at).dropouts == diff.dropouts,
+              "재시작 후에도 같은 비교 결과")
+        store.add(script.LeaderboardSnapshot.from_agents(after.row(i) for i in range(len(after))))
+        check(len(os.listdir(directory)) == 2 and not store.diff().movers and not store.diff().rating_deltas,
+              "최근 max_snapshots개만 보관, 변화 없으면 빈 비교")
+
+
+def main():
+    """메인 테스트 실행"""
+    print(f"\n{Colors.BOLD}🧪 MoltArenaAPI 클라이언트 오프라인 테스트{Colors.RESET}")
+
+    tests = [
+        test_conditional_get_agent_list,
+        test_conditional_get_leaderboard,
+        test_conditional_get_tournaments,
+        test_agent_resolver,
+        test_heartbeat_state,
+        test_listener_sse,
+        test_listener_fallback,
+        test_listener_webhook,
+        test_heartbeat_coalescing,
+        test_notification_renderer,
+        test_bulk_battles,
+        test_battle_watcher,
+        test_battle_history,
+        test_external_api_load,
+        test_request_metrics,
+        test_single_flight,
+        test_batch_mode,
+        test_daemon,
+        test_retry_and_circuit_breaker,
+        test_response_cache,
+        test_disk_cache,
+        test_daemon_interrupted,
+        test_shared_client,
+        test_async_client,
+        test_rate_limiter,
+        test_leaderboard_snapshots,
+    ]
+
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError:
+            failed += 1
+        except Exception as e:
+            print_fail(f"예외 발생: {e}")
+            failed += 1
+
+    print_header("테스트 결과 요약")
+    print_info(f"총 {len(tests)}개 중 {len(tests) - failed}개 통과")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
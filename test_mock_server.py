@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+MoltArena API stand-in 서버 (mock_server.py) 테스트
+
+로컬 포트에 stand-in 서버를 띄우고 MoltArenaAPI 클라이언트로 모든 엔드포인트를 호출해
+응답 형식과 지연 / 오류 주입 / 요청 한도 동작을 검증합니다.
+API Key나 네트워크 연결이 필요 없습니다.
+
+사용법:
+  python test_mock_server.py
+  python -m pytest test_mock_server.py
+
+테스트 항목:
+  - 에이전트 / 배틀 / 리더보드 / 토너먼트 / BP / 레퍼럴 / External API 엔드포인트
+  - 알림 폴링 (since, long-poll), SSE 스트림
+  - 응답 지연, 오류 주입 (재시도 / 비멱등 요청), 인증
+  - API Key별 요청 한도 (X-RateLimit-* 헤더, 429 + Retry-After)
+  - 명령별 벤치마크 (benchmark.py commands)
+"""
+
+import sys
+import time
+
+import requests
+
+import benchmark
+import mock_server
+import script
+from test_client import check
+from test_integration import Colors, print_header, print_fail, print_info
+
+
+def make_client(server, **options):
+    """캐시를 비운 테스트용 클라이언트 (로컬 요청 한도 없음)"""
+    script.disable_disk_cache()
+    script.invalidate_cached()
+    options.setdefault('rate_limiter', script.RateLimiter(limit=10 ** 6))
+    return script.MoltArenaAPI(api_key='pk_live_test', api_url=server.url, **options)
+
+
+def expect_error(func, status):
+    """func가 status 코드의 MoltArenaAPIError를 내는지"""
+    try:
+        func()
+    except script.MoltArenaAPIError as e:
+        return e.status_code == status
+    return False
+
+
+# ============== 테스트 ==============
+
+def test_agent_endpoints():
+    """에이전트, 배틀, 리더보드 엔드포인트"""
+    print_header("1. 에이전트 / 배틀 / 리더보드")
+
+    with mock_server.MockArenaServer(port=0, battle_seconds=0.3) as server:
+        api = make_client(server)
+        agents = api.list_agents()
+        check([a['name'] for a in agents] == mock_server.MY_AGENT_NAMES, "내 에이전트 목록", agents)
+        script.invalidate_cached('my_agents', api_key=api.api_key)
+        api.list_agents()
+        check(server.statuses[304] == 1, "목록 재조회는 304 (ETag)", server.stats())
+
+        status = api.get_agent_status(agents[0]['id'])['agent']
+        check(status['rank'] >= 1 and status['total_battles'] == mock_server.MOCK_BATTLE_HISTORY, "에이전트 상태")
+        history = api.get_battle_history(limit=5)
+        check(len(history) == 5 and history == sorted(history, key=script.battle_timestamp, reverse=True),
+              "배틀 기록 (모든 에이전트, 최신순)")
+
+        battle = api.start_battle(agents[0]['id'])['battle']
+        check(battle['status'] == 'in_progress' and battle['participants']['agent1']['id'] == agents[0]['id'],
+              "배틀 시작", battle)
+        time.sleep(0.35)
+        finished = api.get_battle(battle['id'])['battle']
+        check(finished['status'] == 'completed' and len(finished['rounds']) == 5 and 'rating_change' in finished,
+              "시간이 지나면 배틀 완료", finished)
+        check(expect_error(lambda: api.get_battle('battle_missing'), 404), "없는 배틀은 404")
+        check(expect_error(lambda: api.start_battle('agent_0001'), 403), "남의 에이전트로 배틀 시작은 403")
+
+        page = list(api.iter_leaderboard(page_size=100, max_agents=120))
+        check([a['rank'] for a in page] == list(range(1, 121)), "리더보드 페이지 순회 (limit/offset)")
+
+        deployed = api.deploy_agent('NewBot', style='dark')['agent']
+        check(deployed['name'] == 'NewBot' and len(api.list_agents(use_cache=False)) == 4, "에이전트 배포")
+        check(expect_error(lambda: api.deploy_agent('NewBot'), 400), "중복 이름은 400")
+        imported = api.import_moltbook('molty')
+        check(imported['ratingMapping']['initialRating'] == imported['agent']['rating'], "Moltbook import", imported)
+
+        agent_id = agents[0]['id']
+        api.set_external_api(agent_id, 'https://bot.example.com/roast', timeout=2000)
+        config = api.get_external_api(agent_id)
+        check(config['externalApi']['timeout'] == 2000 and api.test_external_api(agent_id)['success'],
+              "External API 설정 / 테스트", config)
+        api.remove_external_api(agent_id)
+        check(api.get_external_api(agent_id)['externalApi'] is None, "External API 제거")
+        check(expect_error(lambda: api.set_external_api(agent_id, 'http://insecure/roast'), 400), "https가 아니면 400")
+
+
+def test_account_endpoints():
+    """토너먼트, BP, 레퍼럴 엔드포인트"""
+    print_header("2. 토너먼트 / BP / 레퍼럴")
+
+    with mock_server.MockArenaServer(port=0) as server:
+        api = make_client(server)
+        agent_id = api.list_agents()[0]['id']
+        tournaments = {t['id']: t for t in api.list_tournaments()}
+        check(tournaments['tournament_daily']['canJoin'] and not tournaments['tournament_weekly']['canJoin'],
+              "토너먼트 목록 (참가 가능 여부)")
+        api.list_tournaments()
+        check(server.statuses[304] == 1, "재조회는 304 (Last-Modified)", server.stats())
+
+        balance = api.get_bp()['bp']['balance']
+        entry = api.join_tournament('tournament_daily', agent_id)['entry']
+        check(entry['paymentAmount'] == 100 and api.get_bp()['bp']['balance'] == balance - 100, "참가비 차감", entry)
+        mine = {t['id']: t for t in api.list_tournaments()}['tournament_daily']
+        check(mine['myEntry']['id'] == entry['id'], "목록이 바뀌면 304 대신 새 응답 (myEntry)")
+        check(expect_error(lambda: api.join_tournament('tournament_daily', agent_id), 400), "중복 참가는 400")
+
+        refunded = api.cancel_tournament('tournament_daily', entry['id'])['refunded']
+        transactions = api.get_bp(transactions=True, limit=2)['transactions']
+        check(refunded == 100 and [t['type'] for t in transactions] == ['tournament_refund', 'tournament_entry'],
+              "참가 취소와 환불 거래내역", transactions)
+
+        leaderboard = api.get_tournament_leaderboard('tournament_weekly', limit=5)
+        check(len(leaderboard['leaderboard']) == 5 and leaderboard['leaderboard'][0]['rank'] == 1, "토너먼트 리더보드")
+        referral = api.get_referral(conversions=True, limit=3)
+        check(referral['referral']['code'] and len(referral['conversions']) == 3, "레퍼럴 현황 / 전환 내역")
+
+
+def test_notifications():
+    """알림 폴링, long-poll, SSE 스트림"""
+    print_header("3. 알림")
+
+    with mock_server.MockArenaServer(port=0, battle_seconds=0.2) as server:
+        api = make_client(server)
+        first = api.poll_notifications_page()
+        check(first['notifications'] == [] and first['polled_at'], "알림이 없으면 빈 목록 + polled_at")
+
+        api.start_battle(api.list_agents()[0]['id'])
+        started = time.monotonic()
+        page = api.poll_notifications_page(since=first['polled_at'], wait=5)
+        elapsed = time.monotonic() - started
+        notification = page['notifications'][0] if page['notifications'] else {}
+        check(notification.get('type') == 'battle_completed' and notification['data']['status'] == 'completed',
+              "배틀이 끝나면 battle_completed (long-poll)", page)
+        check(elapsed < 1.0, "long-poll은 알림이 생기면 바로 응답", f"{elapsed:.2f}s")
+        check(api.poll_notifications(since=page['polled_at']) == [], "since 이후 알림만")
+
+        server.state.notify('bp_earned', {'amount': 150})
+        response = api.open_notification_stream(since=page['polled_at'])
+        try:
+            event = next(script.parse_sse(response.iter_lines()))
+        finally:
+            response.close()
+        check(event['event'] == 'notification' and '"bp_earned"' in event['data'] and event['id'],
+              "SSE 스트림", event)
+
+
+def test_faults_and_latency():
+    """응답 지연, 오류 주입, 인증"""
+    print_header("4. 지연 / 오류 주입")
+
+    with mock_server.MockArenaServer(port=0, latency_ms=100) as server:
+        api = make_client(server)
+        started = time.monotonic()
+        api.get_bp()
+        check(time.monotonic() - started >= 0.1, "응답 지연")
+
+        server.configure(latency_ms=0)
+        server.inject('GET /deploy/bp', 503)
+        check(api.get_bp()['success'] and server.counts['GET /deploy/bp'] == 3, "GET은 주입한 503 후 재시도",
+              server.stats())
+        server.inject('POST /deploy/battle', 500)
+        check(expect_error(lambda: api.start_battle(api.list_agents()[0]['id']), 500), "POST는 재시도하지 않음")
+
+        server.configure(error_rate=1.0, error_status=502)
+        check(expect_error(lambda: make_client(server, retry_policy=script.RetryPolicy(max_attempts=1)).get_bp(), 502),
+              "error_rate만큼 무작위 오류")
+        server.configure(error_rate=0)
+
+        response = requests.get(f"{server.url}/deploy/bp", timeout=5)
+        check(response.status_code == 401 and response.json()['error']['code'] == 'unauthorized', "API Key 없으면 401")
+
+
+def test_rate_limit():
+    """API Key별 요청 한도와 429"""
+    print_header("5. 요청 한도")
+
+    with mock_server.MockArenaServer(port=0, rate_limit=3, rate_limit_period=60) as server:
+        api = make_client(server, rate_limiter=script.RateLimiter(max_wait=1))
+        api.get_bp()
+        check(api.rate_limiter.limit == 3 and api.rate_limiter.remaining == 2, "X-RateLimit-* 헤더 반영",
+              api.rate_limiter.remaining)
+
+        headers = {'Authorization': 'Bearer pk_live_test'}
+        for _ in range(2):
+            requests.get(f"{server.url}/deploy/bp", headers=headers, timeout=5)
+        response = requests.get(f"{server.url}/deploy/bp", headers=headers, timeout=5)
+        check(response.status_code == 429 and 0 < int(response.headers['Retry-After']) <= 60,
+              "한도를 넘으면 429 + Retry-After", dict(response.headers))
+        other = requests.get(f"{server.url}/deploy/bp", headers={'Authorization': 'Bearer pk_live_other'}, timeout=5)
+        check(other.ok, "한도는 API Key별")
+        check(expect_error(api.get_bp, 429), "클라이언트는 기다리지 않고 429")
+
+
+def test_command_benchmark():
+    """명령별 벤치마크 측정"""
+    print_header("6. 명령별 벤치마크")
+
+    state_dir = script.STATE_DIR
+    with mock_server.MockArenaServer(port=0) as server:
+        rows = {row['command']: row for row in benchmark.run_commands(
+            server.url, repeat=2, names=['list', 'last', 'join', 'cancel', 'heartbeat'])}
+        check(set(rows) == {'list', 'last', 'join', 'cancel', 'heartbeat'}, "선택한 명령만 측정")
+        check(rows['list']['requests'] == 1 and rows['last']['requests'] == 1 + mock_server.MOCK_AGENTS,
+              "명령 1회당 요청 수", rows)
+        check(all(row['failures'] == 0 and row['peak_kb'] > 0 for row in rows.values()), "실패 없음, 할당량 측정", rows)
+        check(script.STATE_DIR == state_dir, "Heartbeat 상태 경로 복원")
+
+
+def main():
+    """메인 테스트 실행"""
+    print(f"\n{Colors.BOLD}🧪 MoltArena API stand-in 서버 테스트{Colors.RESET}")
+
+    tests = [
+        test_agent_endpoints,
+        test_account_endpoints,
+        test_notifications,
+        test_faults_and_latency,
+        test_rate_limit,
+        test_command_benchmark,
+    ]
+
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError:
+            failed += 1
+        except Exception as e:
+            print_fail(f"예외 발생: {e}")
+            failed += 1
+
+    print_header("테스트 결과 요약")
+    print_info(f"총 {len(tests)}개 중 {len(tests) - failed}개 통과")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+External API 레퍼런스 서버 (roast_server.py) 테스트
+
+로컬 포트에 서버를 띄워 /roast, /health 계약과 부하 시 동작을 검증합니다.
+API Key나 네트워크 연결이 필요 없습니다.
+
+사용법:
+  python test_roast_server.py
+  python -m pytest test_roast_server.py
+
+테스트 항목:
+  - /roast 요청/응답 계약, /health
+  - 요청 검증 (JSON, 필수 필드, 본문 크기, history 길이)
+  - 동시 생성 수 제한과 대기열 초과 시 503
+  - 마감 시간 초과 / 생성기 오류 시 대체 응답
+  - 정상 종료 (처리 중인 요청 완료 후 종료)
+  - 응답 풀 (미리 만든 후보, 마감 기반 선택, 늦은 결과 보관, 보충 작업자)
+  - 생성 슬롯 집계 (보충 생성, 취소된 스레드 생성)
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import roast_server
+from test_client import check
+from test_integration import Colors, print_header, print_fail, print_info
+
+
+ROAST_REQUEST = {
+    'battle_id': 'battle_xxx',
+    'round': 2,
+    'agent': {'id': 'agent_xxx', 'name': 'MyAgent', 'style': 'sarcastic'},
+    'opponent': {'id': 'agent_yyy', 'name': 'OpponentBot'},
+    'history': [{'agent': 'opponent', 'message': 'Previous roast...'}],
+    'topic': 'coding',
+}
+
+
+# ============== 서버 실행 ==============
+
+class RunningServer:
+    """별도 스레드의 이벤트 루프에서 RoastServer 실행"""
+
+    def __init__(self, generator=None, **options):
+        self.server = roast_server.RoastServer(generator, port=0, **options)
+        self.loop = asyncio.new_event_loop()
+        self._thread = None
+
+    def __enter__(self):
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self.server.start())
+            started.set()
+            self.loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        started.wait(5)
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(5)
+        self.loop.close()
+
+    def shutdown(self, grace=5):
+        asyncio.run_coroutine_threadsafe(self.server.shutdown(grace), self.loop).result(grace + 5)
+
+    @property
+    def url(self):
+        host, port = self.server.address
+        return f"http://{host}:{port}"
+
+    def roast(self, payload=None, **kwargs):
+        return requests.post(f"{self.url}/roast", json=payload or ROAST_REQUEST, timeout=10, **kwargs)
+
+
+class SlowGenerator:
+    """delay초 걸리는 비동기 생성기 (동시 실행 수 기록)"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def generate(self, request):
+        self.active += 1
+        self.calls += 1
+        calls = self.calls
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return f"slow roast #{calls} for {request.opponent_name}"
+
+
+class BlockingGenerator:
+    """delay초 걸리는 동기 생성기 (스레드 풀에서 실행, 동시 실행 수 기록)"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+        finally:
+            with self._lock:
+                self.active -= 1
+        return f"blocking roast for {request.opponent_name}"
+
+
+def echo_generator(request):
+    """load_generator 테스트용 동기 생성기"""
+    return {'message': f"R{request.round}: {request.opponent_name}"}
+
+
+# ============== 테스트 ==============
+
+def test_roast_contract():
+    """/roast 요청/응답 계약과 /health"""
+    print_header("1. /roast 계약")
+
+    with RunningServer() as running:
+        with requests.Session() as session:
+            response = session.post(f"{running.url}/roast", json=ROAST_REQUEST, timeout=10)
+            message = response.json().get('message')
+            check(response.status_code == 200 and 'OpponentBot' in message, "message 반환", response.text)
+            check(session.post(f"{running.url}/roast", json=ROAST_REQUEST, timeout=10).ok, "keep-alive 재사용")
+
+            health = session.get(f"{running.url}/health", timeout=10)
+            check(health.status_code == 200 and health.json()['status'] == 'healthy', "/health", health.text)
+            check(session.get(f"{running.url}/roast", timeout=10).status_code == 405, "GET /roast는 405")
+            check(session.get(f"{running.url}/nope", timeout=10).status_code == 404, "알 수 없는 경로는 404")
+
+    with RunningServer(roast_server.load_generator('test_roast_server:echo_generator')) as running:
+        check(running.roast().json() == {'message': 'R2: OpponentBot'}, "모듈:함수 생성기 (동기, dict 반환)")
+
+
+def test_request_validation():
+    """잘못된 요청 거부와 history 크기 제한"""
+    print_header("2. 요청 검증")
+
+    with RunningServer() as running:
+        response = requests.post(f"{running.url}/roast", data=b'{not json', timeout=10,
+                                 headers={'Content-Type': 'application/json'})
+        check(response.status_code == 400, "JSON이 아니면 400")
+        check(running.roast({'battle_id': 'b', 'round': 1}).status_code == 400, "agent/opponent 없으면 400")
+        big = dict(ROAST_REQUEST, history=[{'agent': 'opponent', 'message': 'x' * 1000}] * 100)
+        check(running.roast(big).status_code == 413, "본문 크기 제한 (413)")
+        check(running.server.stats['invalid'] == 2, "검증 실패 집계", running.server.stats)
+
+    history = [{'agent': 'opponent' if i % 2 else 'self', 'message': f'm{i}' * 600} for i in range(50)]
+    request = roast_server.RoastRequest.parse(json.dumps(dict(ROAST_REQUEST, history=history)).encode())
+    check(len(request.history) == roast_server.MAX_HISTORY and request.history[-1]['message'].startswith('m49'),
+          "history는 최근 항목만 유지")
+    check(all(len(h['message']) <= roast_server.MAX_MESSAGE_CHARS for h in request.history), "메시지 길이 제한")
+    check(request.last_opponent_message.startswith('m49') and request.style == 'sarcastic', "요청 필드 접근")
+
+
+def test_backpressure():
+    """동시 생성 수 제한, 대기열 초과 시 즉시 503"""
+    print_header("3. 동시 처리 제한 / 백프레셔")
+
+    generator = SlowGenerator(0.3)
+    with RunningServer(generator, max_concurrency=2, max_queue=1, timeout_ms=3000) as running:
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            started = time.monotonic()
+            responses = list(executor.map(lambda _: running.roast(), range(6)))
+        statuses = sorted(r.status_code for r in responses)
+        check(generator.peak == 2, "동시 생성 수 제한", generator.peak)
+        check(statuses == [200, 200, 200, 503, 503, 503], "대기열을 넘는 요청은 503", statuses)
+        rejected = [r for r in responses if r.status_code == 503]
+        check(rejected[0].headers.get('Retry-After') == '1', "Retry-After 헤더")
+        check(time.monotonic() - started < 2, "거절은 마감까지 기다리지 않음")
+
+
+def test_deadline_fallback():
+    """마감 시간 초과나 생성기 오류 시 대체 응답"""
+    print_header("4. 마감 시간 / 대체 응답")
+
+    with RunningServer(SlowGenerator(3), timeout_ms=1000) as running:
+        started = time.monotonic()
+        response = running.roast()
+        elapsed = time.monotonic() - started
+        check(response.status_code == 200 and response.json()['message'], "마감 전에 대체 응답", response.text)
+        check(elapsed < 1.0, "timeout보다 먼저 응답", f"{elapsed:.2f}s")
+        check(running.server.stats['timeouts'] == 1 and running.server.stats['fallbacks'] == 1, "시간 초과 집계")
+
+    with RunningServer(SlowGenerator(3), timeout_ms=1000, use_fallback=False) as running:
+        check(running.roast().status_code == 504, "use_fallback=False면 504")
+
+    def broken(request):
+        raise RuntimeError("model unavailable")
+
+    with RunningServer(broken) as running:
+        response = running.roast()
+        check(response.status_code == 200 and running.server.stats['errors'] == 1, "생성기 오류 시 대체 응답")
+
+
+def test_graceful_shutdown():
+    """종료 시 처리 중인 요청은 끝까지 응답"""
+    print_header("5. 정상 종료")
+
+    with RunningServer(SlowGenerator(0.5)) as running:
+        url = running.url
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = executor.submit(running.roast)
+            time.sleep(0.2)
+            started = time.monotonic()
+            running.shutdown()
+            check(pending.result().status_code == 200, "처리 중인 요청 완료")
+            check(time.monotonic() - started < 2, "처리가 끝나면 바로 종료")
+        try:
+            requests.get(f"{url}/health", timeout=2)
+            check(False, "종료 후 새 연결 거부")
+        except requests.ConnectionError:
+            check(True, "종료 후 새 연결 거부")
+
+
+def test_response_pool():
+    """응답 풀 후보 관리와 마감 기반 선택"""
+    print_header("6. 응답 풀")
+
+    request = roast_server.RoastRequest.parse(json.dumps(ROAST_REQUEST).encode())
+    pool = roast_server.RoastPool(size=2, max_keys=2, ttl=60)
+    pool.put(request, 'plain')
+    pool.put(request, 'best', score=9)
+    pool.put(request, 'plain')
+    check(pool.ready(request) == 2 and pool.take(request).message == 'best', "점수가 높은 후보부터, 중복 제외")
+    other = roast_server.RoastRequest.parse(json.dumps(dict(ROAST_REQUEST, topic='music')).encode())
+    third = roast_server.RoastRequest.parse(json.dumps(dict(ROAST_REQUEST, opponent={'id': 'agent_z'})).encode())
+    pool.put(other, 'music roast')
+    pool.put(third, 'z roast')
+    check(pool.ready(request) == 0 and pool.ready(third) == 1, "키 수 제한 (LRU)")
+    pool.ttl = 0
+    check(pool.take(third) is None, "유효 시간이 지난 후보는 버림")
+
+    generator = SlowGenerator(1.0)
+    with RunningServer(generator, timeout_ms=800, pool_size=2, pool_workers=1) as running:
+        first = running.roast()
+        check(first.ok and running.server.stats['fallbacks'] == 1, "풀이 비어 있으면 대체 응답")
+        check(wait_until(lambda: running.server.pool.ready(request) >= 2, 5), "보충 작업자가 후보를 채움",
+              running.server.stats)
+
+        response = running.roast()
+        check(response.json()['message'].startswith('slow roast') and running.server.stats['pool_hits'] == 1,
+              "마감까지 생성이 끝나지 않으면 풀 후보 반환", response.text)
+        check(wait_until(lambda: running.server.stats['late'] >= 1, 3), "마감을 넘긴 생성 결과는 풀에 보관")
+
+        for _ in range(roast_server.LatencyTracker.MIN_SAMPLES):
+            running.server.latency.add(1.0)
+        started = time.monotonic()
+        response = running.roast()
+        check(response.ok and time.monotonic() - started < 0.3, "p95가 마감보다 길면 기다리지 않고 풀 후보 반환",
+              f"{time.monotonic() - started:.2f}s")
+        check(running.server.stats['pool_hits'] == 2 and running.server.stats['fallbacks'] == 1, "풀 적중 집계",
+              running.server.stats)
+
+
+def test_generation_slots():
+    """보충 생성도 in_flight에 집계하고, 취소된 스레드 생성은 끝날 때까지 슬롯을 차지"""
+    print_header("7. 생성 슬롯 집계")
+
+    request = roast_server.RoastRequest.parse(json.dumps(ROAST_REQUEST).encode())
+    generator = SlowGenerator(0.5)
+    with RunningServer(generator, pool_size=1, pool_workers=1) as running:
+        running.loop.call_soon_threadsafe(running.server.pool.want, request)
+        check(wait_until(lambda: generator.active == 1, 2), "보충 작업자가 생성 시작")
+        health = requests.get(f"{running.url}/health", timeout=10).json()
+        check(running.server.in_flight == 1 and health['in_flight'] == 1, "보충 생성도 in_flight에 집계", health)
+        check(wait_until(lambda: running.server.pool.ready(request) == 1, 2) and running.server.in_flight == 0,
+              "보충이 끝나면 슬롯 반환", running.server.in_flight)
+
+    generator = BlockingGenerator(1.5)
+    with RunningServer(generator, timeout_ms=800, max_concurrency=1, pool_size=0) as running:
+        check(running.roast().ok and running.server.stats['timeouts'] == 1, "마감을 넘기면 대체 응답")
+        check(generator.active == 1 and running.server.in_flight == 1, "취소된 생성의 스레드가 끝날 때까지 슬롯 유지",
+              running.server.in_flight)
+        check(running.roast().ok and generator.peak == 1, "스레드가 실행 중이면 새 생성을 시작하지 않음",
+              generator.peak)
+        check(wait_until(lambda: generator.active == 0 and running.server.in_flight == 0, 3),
+              "스레드가 끝나면 슬롯 반환", running.server.in_flight)
+        response = running.roast()
+        check(response.ok and running.server.stats['timeouts'] == 3, "반환된 슬롯으로 다시 생성", response.text)
+
+
+def wait_until(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+def main():
+    """메인 테스트 실행"""
+    print(f"\n{Colors.BOLD}🧪 External API 레퍼런스 서버 테스트{Colors.RESET}")
+
+    tests = [
+        test_roast_contract,
+        test_request_validation,
+        test_backpressure,
+        test_deadline_fallback,
+        test_graceful_shutdown,
+        test_response_pool,
+        test_generation_slots,
+    ]
+
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError:
+            failed += 1
+        except Exception as e:
+            print_fail(f"예외 발생: {e}")
+            failed += 1
+
+    print_header("테스트 결과 요약")
+    print_info(f"총 {len(tests)}개 중 {len(tests) - failed}개 통과")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())